@@ -5,14 +5,12 @@ import os
 import sys
 import traceback
 from dotenv import load_dotenv
-import cv2
-import pyaudio
-import PIL.Image
-import mss
+# cv2, pyaudio and PIL are imported where they are used, so importing this module stays cheap
 import argparse
 import math
 import struct
 import time
+import contextlib
 
 from google import genai
 from google.genai import types
@@ -23,8 +21,11 @@ if sys.version_info < (3, 11, 0):
     asyncio.ExceptionGroup = exceptiongroup.ExceptionGroup
 
 from tools import tools_list
+from live_resumption import LiveResumption, build_fallback_context, estimate_tokens
+from live_connection import LiveConnectionManager, SendBuffer
+from voice_latency import VoiceLatencyTracker
 
-FORMAT = pyaudio.paInt16
+FORMAT = 8  # pyaudio.paInt16
 CHANNELS = 1
 SEND_SAMPLE_RATE = 16000
 RECEIVE_SAMPLE_RATE = 24000
@@ -34,7 +35,31 @@ MODEL = "models/gemini-2.5-flash-native-audio-preview-12-2025"
 DEFAULT_MODE = "camera"
 
 load_dotenv()
-client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
+_client = None
+
+def live_http_options() -> dict:
+    """
+    http_options for the Live API client.
+
+    ADA_LIVE_BASE_URL points the client at another endpoint (e.g. fake_live.py),
+    ADA_LIVE_CA_FILE at the certificate that endpoint uses.
+    """
+    options = {"api_version": "v1beta"}
+    base_url = os.getenv("ADA_LIVE_BASE_URL")
+    if base_url:
+        options["base_url"] = base_url
+        ca_file = os.getenv("ADA_LIVE_CA_FILE")
+        if ca_file:
+            import ssl
+            options["async_client_args"] = {"ssl": ssl.create_default_context(cafile=ca_file)}
+    return options
+
+def get_client():
+    """Live API client, created on first connect."""
+    global _client
+    if _client is None:
+        _client = genai.Client(http_options=live_http_options(), api_key=os.getenv("GEMINI_API_KEY"))
+    return _client
 
 # Function definitions
 run_web_agent = {
@@ -43,7 +68,8 @@ run_web_agent = {
     "parameters": {
         "type": "OBJECT",
         "properties": {
-            "prompt": {"type": "STRING", "description": "The detailed instructions for the web browser agent."}
+            "prompt": {"type": "STRING", "description": "The detailed instructions for the web browser agent."},
+            "refresh": {"type": "BOOLEAN", "description": "Ignore cached results for this prompt and browse again. Use when the user asks for fresh or up-to-date data."}
         },
         "required": ["prompt"]
     },
@@ -139,13 +165,24 @@ config = types.LiveConnectConfig(
     )
 )
 
-pya = pyaudio.PyAudio()
+_pya = None
+
+def get_pya():
+    """PortAudio is initialised on first use rather than at import (it probes every audio device)."""
+    global _pya
+    if _pya is None:
+        import pyaudio
+        _pya = pyaudio.PyAudio()
+    return _pya
 
 from web_agent import WebAgent
-from memory_agent import MemoryAgent
+from web_tasks import WebTaskScheduler
+from web_result_cache import WebResultCache
+from memory_agent import MemoryAgent, TurnRecall, get_memory_agent, close_memory_agent
+from file_writer import FileWriter
 
 class AudioLoop:
-    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_video_frame=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_project_update=None, on_error=None, input_device_index=None, input_device_name=None, output_device_index=None):
+    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_video_frame=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_project_update=None, on_error=None, input_device_index=None, input_device_name=None, output_device_index=None, temp_project="temp", on_latency=None):
         self.video_mode = video_mode
         self.on_audio_data = on_audio_data
         self.on_video_frame = on_video_frame
@@ -154,6 +191,7 @@ class AudioLoop:
         self.on_tool_confirmation = on_tool_confirmation 
         self.on_project_update = on_project_update
         self.on_error = on_error
+        self.on_latency = on_latency
         self.input_device_index = input_device_index
         self.input_device_name = input_device_name
         self.output_device_index = output_device_index
@@ -173,9 +211,40 @@ class AudioLoop:
         self.paused = False
 
         self.session = None
+
+        # Resources opened ahead of start_audio in warm mode (see warm_pool.py)
+        self._warm_input = None    # (stream, (input_device_name, input_device_index))
+        self._warm_output = None   # (stream, output_device_index)
+        self._preconnected = None  # (session, exit stack, opened at)
+
+        # Live API session resumption handles and context compression (see live_resumption.py)
+        self.resumption = LiveResumption(
+            enabled=os.getenv("ADA_LIVE_RESUMPTION", "1") != "0",
+            compression_trigger_tokens=int(os.getenv("ADA_CONTEXT_TRIGGER_TOKENS", "0")),
+            compression_target_tokens=int(os.getenv("ADA_CONTEXT_TARGET_TOKENS", "0")),
+        )
+        # Speech end -> first model audio played, per turn (see voice_latency.py)
+        self.latency = VoiceLatencyTracker(on_turn=lambda turn: self.on_latency and self.on_latency(turn))
+
+        # Reconnects: resume, else swap in the (opt-in) standby session, else connect fresh
+        self.connections = LiveConnectionManager(
+            self._connect_live, self.resumption,
+            standby=os.getenv("ADA_LIVE_STANDBY", "0") == "1",
+            standby_ttl=float(os.getenv("ADA_LIVE_STANDBY_TTL", "480")),
+        )
         
         self.web_agent = WebAgent()
-        self.memory_agent = MemoryAgent()
+        # Each web task gets its own WebAgent (and browser context); they share the API client and browser pool
+        self.web_tasks = WebTaskScheduler(
+            agent_factory=lambda: WebAgent(pool=self.web_agent.pool, client=self.web_agent.client),
+            max_concurrency=int(os.getenv("WEB_AGENT_MAX_CONCURRENCY", "2")),
+            on_update=self._on_web_task_update,
+            result_cache=self._web_result_cache,
+        )
+        self.memory_agent = get_memory_agent() # Shared by every AudioLoop; closed on server shutdown
+        self.turn_recall = TurnRecall(self.memory_agent) # This loop's prefetch for the current turn
+        self.auto_remember = False # Store each exchange via remember_conversation
+        self._last_user_utterance = None
 
         self.send_text_task = None
         self.stop_event = asyncio.Event()
@@ -191,14 +260,11 @@ class AudioLoop:
         self._is_speaking = False
         self._silence_start_time = None
         
-        # Initialize ProjectManager
-        from project_manager import ProjectManager
-        # Assuming we are running from backend/ or root? 
-        # Using abspath of current file to find root
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # If ada.py is in backend/, project root is one up
-        project_root = os.path.dirname(current_dir)
-        self.project_manager = ProjectManager(project_root)
+        # Initialize ProjectManager (a warm spare gets temp_project=None and its project when taken)
+        self.project_manager = None
+        self.file_writer = None
+        if temp_project is not None:
+            self.use_temp_project(temp_project)
         
         # Sync Initial Project State
         if self.on_project_update:
@@ -207,15 +273,46 @@ class AudioLoop:
             # We will handle this by calling it in run() or just print for now.
             pass
 
+    def use_temp_project(self, temp_project):
+        """Create the ProjectManager (clearing its scratch project) and the file writer."""
+        from project_manager import ProjectManager
+        # Assuming we are running from backend/ or root? 
+        # Using abspath of current file to find root
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        # If ada.py is in backend/, project root is one up
+        project_root = os.path.dirname(current_dir)
+        self.project_manager = ProjectManager(project_root, temp_project=temp_project)
+
+        # Atomic, batched file writes; each write is reported to the project context cache
+        self.file_writer = FileWriter(on_written=self.project_manager.record_file_write)
+
     def flush_chat(self):
         """Forces the current chat buffer to be written to log."""
         if self.chat_buffer["sender"] and self.chat_buffer["text"].strip():
+            if self.chat_buffer["sender"] == "User":
+                self._on_user_utterance()
+            elif self.auto_remember and self._last_user_utterance:
+                # Queued via the memory outbox, so this costs no round-trip
+                asyncio.create_task(self.memory_agent.remember_conversation(self._last_user_utterance, self.chat_buffer["text"]))
+                self._last_user_utterance = None
             self.project_manager.log_chat(self.chat_buffer["sender"], self.chat_buffer["text"])
             self.chat_buffer = {"sender": None, "text": ""}
         # Reset transcription tracking for new turn
         self._last_input_transcription = ""
         self._last_output_transcription = ""
 
+    def _on_user_utterance(self):
+        """Called when the user utterance in chat_buffer finishes transcribing (once per utterance)."""
+        # A tool call ends the utterance before the buffer is flushed, so this can be reached twice
+        if self.chat_buffer.get("utterance_done"):
+            return
+        self.chat_buffer["utterance_done"] = True
+        utterance = self.chat_buffer["text"]
+        self._last_user_utterance = utterance
+
+        # Speculatively search memory so this turn's recall_memories finds the results ready
+        self.turn_recall.utterance(utterance)
+
     def update_permissions(self, new_perms):
         print(f"[ADA DEBUG] [CONFIG] Updating tool permissions: {new_perms}")
         self.permissions.update(new_perms)
@@ -225,6 +322,61 @@ class AudioLoop:
 
     def stop(self):
         self.stop_event.set()
+
+    CONFIGURABLE = {"on_audio_data", "on_video_frame", "on_web_data", "on_transcription", "on_tool_confirmation",
+                    "on_project_update", "on_error", "on_latency", "input_device_index", "input_device_name", "output_device_index"}
+
+    def configure(self, **options):
+        """Set callbacks and devices on a loop built ahead of time (same names as the constructor)."""
+        unknown = set(options) - self.CONFIGURABLE
+        if unknown:
+            raise TypeError(f"Unknown AudioLoop options: {', '.join(sorted(unknown))}")
+        for name, value in options.items():
+            setattr(self, name, value)
+
+    async def prepare_audio(self):
+        """Open the microphone and speaker streams now, so run() doesn't have to."""
+        if self._warm_input is None:
+            stream = await self._open_input_stream()
+            if stream:
+                self._warm_input = (stream, (self.input_device_name, self.input_device_index))
+        if self._warm_output is None:
+            stream = await self._open_output_stream()
+            self._warm_output = (stream, self.output_device_index)
+
+    async def preconnect(self):
+        """Open the Live API session now; run() uses it instead of connecting."""
+        if self._preconnected:
+            return
+        stack = contextlib.AsyncExitStack()
+        session = await stack.enter_async_context(self._connect_live(resume=False))
+        self._preconnected = (session, stack, time.monotonic())
+
+    @property
+    def preconnected_age(self):
+        """Seconds since the speculative Live session was opened (None if there is none)."""
+        return time.monotonic() - self._preconnected[2] if self._preconnected else None
+
+    async def drop_preconnection(self):
+        if self._preconnected:
+            _, stack, _ = self._preconnected
+            self._preconnected = None
+            try:
+                await stack.aclose()
+            except Exception as e:
+                print(f"[ADA DEBUG] [WARN] Closing speculative session failed: {e}")
+
+    async def close_warm(self):
+        """Release whatever was opened ahead of time and not taken over by run()."""
+        await self.drop_preconnection()
+        for warm in (self._warm_input, self._warm_output):
+            if warm:
+                try:
+                    warm[0].close()
+                except Exception:
+                    pass
+        self._warm_input = None
+        self._warm_output = None
         
     def resolve_tool_confirmation(self, request_id, confirmed):
         print(f"[ADA DEBUG] [RESOLVE] resolve_tool_confirmation called. ID: {request_id}, Confirmed: {confirmed}")
@@ -264,9 +416,19 @@ class AudioLoop:
     async def send_realtime(self):
         while True:
             msg = await self.out_queue.get()
-            await self.session.send(input=msg, end_of_turn=False)
-
-    async def listen_audio(self):
+            enqueued_at = self.out_queue.last_enqueued_at
+            try:
+                await self.session.send(input=msg, end_of_turn=False)
+            except BaseException:
+                # Not delivered: goes out first on the next connection
+                self.out_queue.requeue(msg, enqueued_at)
+                raise
+            if msg.get("mime_type") == "audio/pcm":
+                self.latency.audio_sent(enqueued_at)
+
+    async def _open_input_stream(self):
+        """Resolve the configured input device and open it (None if it can't be opened)."""
+        pya = get_pya()
         mic_info = pya.get_default_input_device_info()
 
         # Resolve Input Device by Name if provided
@@ -310,7 +472,7 @@ class AudioLoop:
              print("[ADA] Using Default Input Device")
 
         try:
-            self.audio_stream = await asyncio.to_thread(
+            return await asyncio.to_thread(
                 pya.open,
                 format=FORMAT,
                 channels=CHANNELS,
@@ -322,6 +484,18 @@ class AudioLoop:
         except OSError as e:
             print(f"[ADA] [ERR] Failed to open audio input stream: {e}")
             print("[ADA] [WARN] Audio features will be disabled. Please check microphone permissions.")
+            return None
+
+    async def listen_audio(self):
+        stream = None
+        if self._warm_input:
+            stream, device = self._warm_input
+            self._warm_input = None
+            if device != (self.input_device_name, self.input_device_index):
+                stream.close()  # Opened for another device
+                stream = None
+        self.audio_stream = stream or await self._open_input_stream()
+        if self.audio_stream is None:
             return
 
         if __debug__:
@@ -378,6 +552,8 @@ class AudioLoop:
                             self._silence_start_time = time.time()
                         
                         elif time.time() - self._silence_start_time > SILENCE_DURATION:
+                            # Speech ended when the silence began (monotonic clock for the latency tracker)
+                            self.latency.speech_ended(time.monotonic() - (time.time() - self._silence_start_time))
                             # Silence confirmed, reset state
                             print(f"[ADA DEBUG] [VAD] Silence detected. Resetting speech state.")
                             self._is_speaking = False
@@ -393,7 +569,7 @@ class AudioLoop:
         print(f"[ADA DEBUG] [FS] Writing file: '{path}'")
         
         # Auto-create project if stuck in temp
-        if self.project_manager.current_project == "temp":
+        if self.project_manager.current_project == self.project_manager.temp_project:
             import datetime
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             new_project_name = f"Project_{timestamp}"
@@ -429,10 +605,8 @@ class AudioLoop:
         print(f"[ADA DEBUG] [FS] Resolved path: '{final_path}'")
 
         try:
-            # Ensure parent exists
-            os.makedirs(os.path.dirname(final_path), exist_ok=True)
-            with open(final_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Atomic write on a worker thread (batched with other writes from this turn)
+            await self.file_writer.write(final_path, content)
             result = f"File '{final_path.name}' written successfully to project '{self.project_manager.current_project}'."
         except Exception as e:
             result = f"Failed to write file '{path}': {str(e)}"
@@ -478,16 +652,24 @@ class AudioLoop:
         except Exception as e:
              print(f"[ADA DEBUG] [ERR] Failed to send fs result: {e}")
 
-    async def handle_web_agent_request(self, prompt):
-        print(f"[ADA DEBUG] [WEB] Web Agent Task: '{prompt}'")
-        
-        async def update_frontend(image_b64, log_text):
-            if self.on_web_data:
-                 self.on_web_data({"image": image_b64, "log": log_text})
-                 
-        # Run the web agent and wait for it to return
-        result = await self.web_agent.run_task(prompt, update_callback=update_frontend)
-        print(f"[ADA DEBUG] [WEB] Web Agent Task Returned: {result}")
+    def _on_web_task_update(self, data):
+        if self.on_web_data:
+            self.on_web_data(data)
+
+    def _web_result_cache(self):
+        """Web results are cached per project, in its browser/ folder."""
+        ttl = float(os.getenv("WEB_AGENT_RESULT_TTL", str(6 * 3600)))
+        if ttl <= 0:
+            return None
+        return WebResultCache(self.project_manager.get_current_project_path() / "browser", ttl=ttl)
+
+    async def handle_web_agent_request(self, prompt, refresh=False):
+        print(f"[ADA DEBUG] [WEB] Web Agent Task: '{prompt}'" + (" (refresh)" if refresh else ""))
+
+        # Queue the task (or answer it from the cache) and wait for it to return
+        task = self.web_tasks.submit(prompt, refresh=refresh)
+        result = await task.future
+        print(f"[ADA DEBUG] [WEB] Web Agent Task {task.id} Returned ({task.status}): {result}")
         
         # Send the final result back to the main model
         try:
@@ -501,8 +683,12 @@ class AudioLoop:
             while True:
                 turn = self.session.receive()
                 async for response in turn:
+                    # 0. Resumption handle updates / GoAway
+                    self.resumption.on_message(response)
+
                     # 1. Handle Audio Data
                     if data := response.data:
+                        self.latency.response_received()
                         self.audio_in_queue.put_nowait(data)
                         # NOTE: 'continue' removed here to allow processing transcription/tools in same packet
 
@@ -560,6 +746,9 @@ class AudioLoop:
                                         if self.chat_buffer["sender"] != "ADA":
                                             # Flush previous
                                             if self.chat_buffer["sender"] and self.chat_buffer["text"].strip():
+                                                if self.chat_buffer["sender"] == "User":
+                                                    # User utterance finished transcribing
+                                                    self._on_user_utterance()
                                                 self.project_manager.log_chat(self.chat_buffer["sender"], self.chat_buffer["text"])
                                             # Start new
                                             self.chat_buffer = {"sender": "ADA", "text": delta}
@@ -574,6 +763,8 @@ class AudioLoop:
                     # 3. Handle Tool Calls
                     if response.tool_call:
                         print("The tool was called")
+                        if self.chat_buffer["sender"] == "User" and self.chat_buffer["text"].strip():
+                            self._on_user_utterance()
                         function_responses = []
                         for fc in response.tool_call.function_calls:
                             if fc.name in ["run_web_agent", "write_file", "read_directory", "read_file", "create_project", "switch_project", "list_projects", "remember_fact", "recall_memories"]:
@@ -638,7 +829,7 @@ class AudioLoop:
                                 # If confirmed (or no callback configured, or auto-allowed), proceed
                                 if fc.name == "run_web_agent":
                                     print(f"[ADA DEBUG] [TOOL] Tool Call: 'run_web_agent' with prompt='{prompt}'")
-                                    asyncio.create_task(self.handle_web_agent_request(prompt))
+                                    asyncio.create_task(self.handle_web_agent_request(prompt, refresh=fc.args.get("refresh", False)))
                                     
                                     result_text = "Web Navigation started. Do not reply to this message."
                                     function_response = types.FunctionResponse(
@@ -727,7 +918,9 @@ class AudioLoop:
                                     fact = fc.args["fact"]
                                     print(f"[JARVIS] [TOOL] Tool Call: 'remember_fact' fact='{fact[:50]}...'")
                                     result = await self.memory_agent.add_memory(fact)
-                                    if result["success"]:
+                                    if result.get("duplicate"):
+                                        result_msg = "I already had that in my long-term memory; nothing new was stored."
+                                    elif result["success"]:
                                         result_msg = f"I've stored that in my long-term memory."
                                     else:
                                         result_msg = f"Memory storage unavailable: {result.get('error', 'Unknown error')}"
@@ -739,7 +932,7 @@ class AudioLoop:
                                 elif fc.name == "recall_memories":
                                     query = fc.args["query"]
                                     print(f"[JARVIS] [TOOL] Tool Call: 'recall_memories' query='{query}'")
-                                    memories = await self.memory_agent.search_memories(query)
+                                    memories = await self.turn_recall.recall(query)
                                     if memories:
                                         memory_texts = [m["content"] for m in memories]
                                         result_msg = f"Found {len(memories)} relevant memories:\n" + "\n".join(f"- {m}" for m in memory_texts)
@@ -754,6 +947,7 @@ class AudioLoop:
                 
                 # Turn/Response Loop Finished
                 self.flush_chat()
+                self.latency.model_turn_ended()
 
                 while not self.audio_in_queue.empty():
                     self.audio_in_queue.get_nowait()
@@ -763,22 +957,37 @@ class AudioLoop:
             # CRITICAL: Re-raise to crash the TaskGroup and trigger outer loop reconnect
             raise e
 
-    async def play_audio(self):
-        stream = await asyncio.to_thread(
-            pya.open,
+    async def _open_output_stream(self):
+        return await asyncio.to_thread(
+            get_pya().open,
             format=FORMAT,
             channels=CHANNELS,
             rate=RECEIVE_SAMPLE_RATE,
             output=True,
             output_device_index=self.output_device_index,
         )
-        while True:
-            bytestream = await self.audio_in_queue.get()
-            if self.on_audio_data:
-                self.on_audio_data(bytestream)
-            await asyncio.to_thread(stream.write, bytestream)
+
+    async def play_audio(self):
+        stream = None
+        if self._warm_output:
+            stream, device = self._warm_output
+            self._warm_output = None
+            if device != self.output_device_index:
+                stream.close()
+                stream = None
+        stream = stream or await self._open_output_stream()
+        try:
+            while True:
+                bytestream = await self.audio_in_queue.get()
+                if self.on_audio_data:
+                    self.on_audio_data(bytestream)
+                await asyncio.to_thread(stream.write, bytestream)
+                self.latency.audio_played()
+        finally:
+            stream.close()
 
     async def get_frames(self):
+        import cv2
         cap = await asyncio.to_thread(cv2.VideoCapture, 0, cv2.CAP_AVFOUNDATION)
         while True:
             if self.paused:
@@ -793,6 +1002,9 @@ class AudioLoop:
         cap.release()
 
     def _get_frame(self, cap):
+        import cv2
+        import PIL.Image
+
         ret, frame = cap.read()
         if not ret:
             return None
@@ -810,102 +1022,133 @@ class AudioLoop:
     async def get_screen(self):
          pass
 
+    def _connect_live(self, resume=True):
+        """Live API connection (async context manager) with the loop's resumption settings."""
+        return get_client().aio.live.connect(model=MODEL, config=self.resumption.connect_config(config, resume=resume))
+
     async def run(self, start_message=None):
-        retry_delay = 1
+        retry_delay = 0 # The first reconnect is immediate; only repeated failures back off
         is_reconnect = False
-        
-        while not self.stop_event.is_set():
-            try:
-                print(f"[ADA DEBUG] [CONNECT] Connecting to Gemini Live API...")
-                async with (
-                    client.aio.live.connect(model=MODEL, config=config) as session,
-                    asyncio.TaskGroup() as tg,
-                ):
-                    self.session = session
-
-                    self.audio_in_queue = asyncio.Queue()
-                    self.out_queue = asyncio.Queue(maxsize=10)
-
-                    tg.create_task(self.send_realtime())
-                    tg.create_task(self.listen_audio())
-                    # tg.create_task(self._process_video_queue()) # Removed in favor of VAD
-
-                    if self.video_mode == "camera":
-                        tg.create_task(self.get_frames())
-                    elif self.video_mode == "screen":
-                        tg.create_task(self.get_screen())
-
-                    tg.create_task(self.receive_audio())
-                    tg.create_task(self.play_audio())
-
-                    # Handle Startup vs Reconnect Logic
-                    if not is_reconnect:
-                        if start_message:
-                            print(f"[ADA DEBUG] [INFO] Sending start message: {start_message}")
-                            await self.session.send(input=start_message, end_of_turn=True)
-                        
-                        # Sync Project State
-                        if self.on_project_update and self.project_manager:
-                            self.on_project_update(self.project_manager.current_project)
-                    
-                    else:
-                        print(f"[ADA DEBUG] [RECONNECT] Connection restored.")
-                        # Restore Context
-                        print(f"[ADA DEBUG] [RECONNECT] Fetching recent chat history to restore context...")
-                        history = self.project_manager.get_recent_chat_history(limit=10)
-                        
-                        context_msg = "System Notification: Connection was lost and just re-established. Here is the recent chat history to help you resume seamlessly:\n\n"
-                        for entry in history:
-                            sender = entry.get('sender', 'Unknown')
-                            text = entry.get('text', '')
-                            context_msg += f"[{sender}]: {text}\n"
+        started = False
+        speculative = False
+
+        # Start background memory work (outbox uploads)
+        self.memory_agent.start()
+
+        # Devices and their queues outlive connections: during a reconnect the mic keeps
+        # filling out_queue, which is sent once the next session is up (see live_connection.py)
+        self.audio_in_queue = asyncio.Queue()
+        self.out_queue = SendBuffer(max_audio_seconds=float(os.getenv("ADA_RECONNECT_BUFFER_SECONDS", "10")))
+        device_tasks = [asyncio.create_task(self.listen_audio()), asyncio.create_task(self.play_audio())]
+        if self.video_mode == "camera":
+            device_tasks.append(asyncio.create_task(self.get_frames()))
+        elif self.video_mode == "screen":
+            device_tasks.append(asyncio.create_task(self.get_screen()))
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    async with contextlib.AsyncExitStack() as stack:
+                        speculative = self._preconnected is not None
+                        if speculative:
+                            # Opened while the client was connecting (warm mode)
+                            session, warm_stack, _ = self._preconnected
+                            self._preconnected = None
+                            stack.push_async_exit(warm_stack)
+                            self.resumption.opened(False)
+                            print(f"[ADA DEBUG] [CONNECT] Using speculative Live API session")
+                        else:
+                            print(f"[ADA DEBUG] [CONNECT] Connecting to Gemini Live API...")
+                            session, kind = await self.connections.open(stack)
+                            print(f"[ADA DEBUG] [CONNECT] Connected ({kind}, {self.connections.stats['last_open_ms']} ms)")
+                        tg = await stack.enter_async_context(asyncio.TaskGroup())
+                        self.session = session
+
+                        session_tasks = [tg.create_task(self.send_realtime()), tg.create_task(self.receive_audio())]
+
+                        # Handle Startup vs Reconnect Logic
+                        if not is_reconnect:
+                            if start_message:
+                                print(f"[ADA DEBUG] [INFO] Sending start message: {start_message}")
+                                await self.session.send(input=start_message, end_of_turn=True)
+                            
+                            # Sync Project State
+                            if self.on_project_update and self.project_manager:
+                                self.on_project_update(self.project_manager.current_project)
+                            started = True
                         
-                        context_msg += "\nPlease acknowledge the reconnection to the user (e.g. 'I lost connection for a moment, but I'm back...') and resume what you were doing."
+                        else:
+                            context_tokens = 0
+                            if self.resumption.resuming:
+                                print(f"[ADA DEBUG] [RECONNECT] Session resumed; server-side context intact.")
+                            else:
+                                # Restore Context from the project history, within a token budget
+                                print(f"[ADA DEBUG] [RECONNECT] No resumption handle; restoring context from chat history...")
+                                history = self.project_manager.get_recent_chat_history(limit=500)
+                                context_msg = build_fallback_context(
+                                    history, token_budget=int(os.getenv("ADA_RECONNECT_CONTEXT_TOKENS", "2000")))
+                                if context_msg:
+                                    # Not end_of_turn: context only, the model shouldn't start talking
+                                    await self.session.send(input=context_msg, end_of_turn=False)
+                                    context_tokens = estimate_tokens(context_msg)
+                            self.resumption.reconnected(context_tokens)
+                            stats = self.resumption.summary()
+                            print(f"[ADA DEBUG] [RECONNECT] Connection restored in {stats['last_reconnect_ms']} ms "
+                                  f"(context re-sent: ~{context_tokens} tokens, handle reuse rate: {stats['handle_reuse_rate']}, "
+                                  f"mic audio buffered: {self.out_queue.buffered_ms} ms)")
+
+                        # Reset retry delay on successful connection
+                        retry_delay = 0
+                        self.connections.start_standby()
                         
-                        print(f"[ADA DEBUG] [RECONNECT] Sending restoration context to model...")
-                        await self.session.send(input=context_msg, end_of_turn=True)
-
-                    # Reset retry delay on successful connection
-                    retry_delay = 1
-                    
-                    # Wait until stop event, or until the session task group exits (which happens on error)
-                    # Actually, the TaskGroup context manager will exit if any tasks fail/cancel.
-                    # We need to keep this block alive.
-                    # The original code just waited on stop_event, but that doesn't account for session death.
-                    # We should rely on the TaskGroup raising an exception when subtasks fail (like receive_audio).
+                        # Wait until stop event, or until the session task group exits (which happens on error)
+                        # If the connection dies, receive_audio or send_realtime crashes -> group closes ->
+                        # we exit `async with` -> reconnect. The audio devices keep running meanwhile.
+                        await self.stop_event.wait()
+                        for task in session_tasks:
+                            task.cancel()
+
+                except asyncio.CancelledError:
+                    print(f"[ADA DEBUG] [STOP] Main loop cancelled.")
+                    break
                     
-                    # However, since receive_audio is a task in the group, if it crashes (connection closed), 
-                    # the group will cancel others and exit. We catch that exit below.
+                except Exception as e:
+                    # This catches the ExceptionGroup from TaskGroup or direct exceptions
+                    print(f"[ADA DEBUG] [ERR] Connection Error: {e}")
                     
-                    # We can await stop_event, but if the connection dies, receive_audio crashes -> group closes -> we exit `async with` -> restart loop.
-                    # To ensure we don't block indefinitely if connection dies silently (unlikely with receive_audio), we just wait.
-                    await self.stop_event.wait()
+                    if self.stop_event.is_set():
+                        break
 
-            except asyncio.CancelledError:
-                print(f"[ADA DEBUG] [STOP] Main loop cancelled.")
-                break
-                
-            except Exception as e:
-                # This catches the ExceptionGroup from TaskGroup or direct exceptions
-                print(f"[ADA DEBUG] [ERR] Connection Error: {e}")
-                
-                if self.stop_event.is_set():
-                    break
-                
-                print(f"[ADA DEBUG] [RETRY] Reconnecting in {retry_delay} seconds...")
-                await asyncio.sleep(retry_delay)
-                retry_delay = min(retry_delay * 2, 10) # Exponential backoff capped at 10s
-                is_reconnect = True # Next loop will be a reconnect
-                
-            finally:
-                # Cleanup before retry
-                if hasattr(self, 'audio_stream') and self.audio_stream:
-                    try:
-                        self.audio_stream.close()
-                    except: 
-                        pass
+                    self.resumption.connection_lost()
+
+                    if self.resumption.go_away and self.resumption.usable_handle():
+                        # Announced close: resume right away, nothing to back off from
+                        print(f"[ADA DEBUG] [RETRY] Resuming session after GoAway...")
+                    elif retry_delay:
+                        print(f"[ADA DEBUG] [RETRY] Reconnecting in {retry_delay} seconds...")
+                        await asyncio.sleep(retry_delay)
+                    else:
+                        print(f"[ADA DEBUG] [RETRY] Reconnecting...")
+                    retry_delay = min(max(retry_delay * 2, 1), 10) # Exponential backoff capped at 10s
+                    # Next loop will be a reconnect (unless it was a speculative session that died before the start)
+                    is_reconnect = started or not speculative
+
+        finally:
+            for task in device_tasks:
+                task.cancel()
+            await asyncio.gather(*device_tasks, return_exceptions=True)
+            if getattr(self, 'audio_stream', None):
+                try:
+                    self.audio_stream.close()
+                except Exception:
+                    pass
+            await self.connections.close()
+            await self.close_warm()
+            # Web tasks belong to this session: stop them leasing browser contexts and emitting to it
+            await self.web_tasks.close()
 
 def get_input_devices():
+    import pyaudio
     p = pyaudio.PyAudio()
     info = p.get_host_api_info_by_index(0)
     numdevices = info.get('deviceCount')
@@ -917,6 +1160,7 @@ def get_input_devices():
     return devices
 
 def get_output_devices():
+    import pyaudio
     p = pyaudio.PyAudio()
     info = p.get_host_api_info_by_index(0)
     numdevices = info.get('deviceCount')
@@ -938,4 +1182,11 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
     main = AudioLoop(video_mode=args.mode)
-    asyncio.run(main.run())
\ No newline at end of file
+
+    async def run_standalone():
+        try:
+            await main.run()
+        finally:
+            await close_memory_agent()
+
+    asyncio.run(run_standalone())
\ No newline at end of file
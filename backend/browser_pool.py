@@ -0,0 +1,254 @@
+"""
+BrowserPool - Long-lived, pre-warmed Chromium for the web agent
+
+Launching Chromium and opening a fresh context for every run_web_agent call
+costs seconds. The pool keeps one browser alive for the life of the server and
+a few contexts warmed up ahead of time (page open, start URL loaded), so a
+task gets a clean context in milliseconds.
+
+Contexts are single-use: a task's context is closed when it finishes and a new
+one is warmed in the background. The browser itself is relaunched after
+`max_tasks_per_browser` tasks or once page heap usage crosses `max_heap_mb`:
+from then on new leases wait until the running tasks have finished, so a busy
+pool can't put the recycle off indefinitely.
+"""
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+class BrowserPool:
+    """
+    Keeps a Chromium instance and a queue of pre-warmed (context, page) pairs.
+    """
+
+    def __init__(self, size: int = 2, max_tasks_per_browser: int = 25, max_heap_mb: int = 512,
+                 headless: bool = True, viewport: dict = None, user_agent: str = DEFAULT_USER_AGENT,
+                 start_url: str = "https://www.google.com", profile_dir: str = None):
+        """
+        Args:
+            size: Number of contexts kept warm
+            max_tasks_per_browser: Relaunch the browser after this many tasks
+            max_heap_mb: Relaunch the browser once a finished task's JS heap exceeds this
+            headless: Run Chromium headless
+            viewport: Page viewport, e.g. {"width": 1440, "height": 900}
+            user_agent: User agent for new contexts
+            start_url: URL pre-loaded in warm pages (None for about:blank)
+            profile_dir: Persistent profile directory. Tasks then share one context
+                (cookies/logins persist) and only get a fresh page each.
+        """
+        self.size = size
+        self.max_tasks_per_browser = max_tasks_per_browser
+        self.max_heap_mb = max_heap_mb
+        self.headless = headless
+        self.viewport = viewport or {"width": 1440, "height": 900}
+        self.user_agent = user_agent
+        self.start_url = start_url
+        self.profile_dir = profile_dir
+
+        self.browser = None
+        self._playwright = None
+        self._persistent_context = None
+        self._ready = None
+        self._warming = set()
+        self._lock = None
+        self._leases = 0
+        self._drained = None  # Set whenever the last lease is released
+        self._tasks_since_launch = 0
+        self._needs_recycle = False
+
+        # Stats
+        self.stats = {"launches": 0, "warm_hits": 0, "cold_starts": 0, "recycles": 0}
+
+    @property
+    def is_running(self) -> bool:
+        return self.browser is not None or self._persistent_context is not None
+
+    async def start(self):
+        """Launch the browser and begin warming contexts."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._ready = asyncio.Queue()
+            self._drained = asyncio.Event()
+        async with self._lock:
+            if not self.is_running:
+                await self._launch()
+
+    async def stop(self):
+        """Close everything (pending warm-ups are cancelled)."""
+        await self._close_browser()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _launch_browser(self):
+        """Starts Playwright and returns a Browser (or a persistent BrowserContext)."""
+        from playwright.async_api import async_playwright
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        if self.profile_dir:
+            return await self._playwright.chromium.launch_persistent_context(
+                self.profile_dir, headless=self.headless,
+                viewport=self.viewport, user_agent=self.user_agent,
+            )
+        return await self._playwright.chromium.launch(headless=self.headless)
+
+    async def _launch(self):
+        launched = await self._launch_browser()
+        if self.profile_dir:
+            self._persistent_context = launched
+        else:
+            self.browser = launched
+        self._tasks_since_launch = 0
+        self._needs_recycle = False
+        self.stats["launches"] += 1
+        print(f"[BrowserPool] Browser launched (warming {self.size} context(s))")
+        for _ in range(self.size):
+            self._schedule_warm()
+
+    async def _close_browser(self):
+        # Warm-ups still in flight would fail against the closed browser, or hand its
+        # contexts to the next one's pool
+        warming = list(self._warming)
+        for task in warming:
+            task.cancel()
+        if warming:
+            await asyncio.gather(*warming, return_exceptions=True)
+        while self._ready is not None and not self._ready.empty():
+            context, page = self._ready.get_nowait()
+            await self._dispose(context, page)
+        target = self._persistent_context or self.browser
+        self.browser = None
+        self._persistent_context = None
+        if target is not None:
+            try:
+                await target.close()
+            except Exception as e:
+                print(f"[BrowserPool] [WARN] Error closing browser: {e}")
+
+    async def _new_context(self):
+        if self._persistent_context is not None:
+            context = self._persistent_context
+        else:
+            context = await self.browser.new_context(viewport=self.viewport, user_agent=self.user_agent)
+        page = await context.new_page()
+        if self.start_url:
+            try:
+                await page.goto(self.start_url, wait_until="domcontentloaded")
+            except Exception as e:
+                print(f"[BrowserPool] [WARN] Failed to pre-load {self.start_url}: {e}")
+        return context, page
+
+    def _schedule_warm(self):
+        async def warm():
+            try:
+                self._ready.put_nowait(await self._new_context())
+            except Exception as e:
+                print(f"[BrowserPool] [WARN] Failed to warm context: {e}")
+
+        task = asyncio.create_task(warm())
+        self._warming.add(task)
+        task.add_done_callback(self._warming.discard)
+
+    async def _dispose(self, context, page):
+        try:
+            if context is self._persistent_context:
+                await page.close()
+            else:
+                await context.close()
+        except Exception as e:
+            print(f"[BrowserPool] [WARN] Error disposing context: {e}")
+
+    async def _heap_mb(self, context, page) -> float:
+        """JS heap of a page in MB, via CDP (0 if unavailable)."""
+        try:
+            cdp = await context.new_cdp_session(page)
+            metrics = await cdp.send("Performance.getMetrics")
+            await cdp.detach()
+            values = {m["name"]: m["value"] for m in metrics.get("metrics", [])}
+            return values.get("JSHeapTotalSize", 0) / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    async def acquire(self):
+        """
+        Returns a (context, page) pair for one task. Pass it back to release() when done.
+        """
+        await self.start()
+
+        async with self._lock:
+            if self._needs_recycle:
+                # No new leases until the running tasks are done (later callers queue on the lock)
+                while self._leases > 0:
+                    self._drained.clear()
+                    await self._drained.wait()
+                print("[BrowserPool] Recycling browser...")
+                self.stats["recycles"] += 1
+                await self._close_browser()
+                await self._launch()
+            self._leases += 1
+
+        try:
+            if not self._ready.empty():
+                context, page = self._ready.get_nowait()
+                self.stats["warm_hits"] += 1
+            else:
+                self.stats["cold_starts"] += 1
+                context, page = await self._new_context()
+        except Exception:
+            self._leases -= 1
+            if self._leases == 0:
+                self._drained.set()
+            raise
+
+        # Top the pool back up in the background
+        if len(self._warming) + self._ready.qsize() < self.size:
+            self._schedule_warm()
+        return context, page
+
+    async def release(self, context, page):
+        """Dispose of a task's context and decide whether the browser needs recycling."""
+        heap_mb = await self._heap_mb(context, page) if self.max_heap_mb else 0.0
+        await self._dispose(context, page)
+
+        self._leases -= 1
+        if self._leases == 0:
+            self._drained.set()
+        self._tasks_since_launch += 1
+        if self._tasks_since_launch >= self.max_tasks_per_browser:
+            self._needs_recycle = True
+        elif self.max_heap_mb and heap_mb > self.max_heap_mb:
+            print(f"[BrowserPool] Task heap {heap_mb:.0f} MB exceeds {self.max_heap_mb} MB; recycling soon.")
+            self._needs_recycle = True
+
+    @asynccontextmanager
+    async def session(self):
+        """async with pool.session() as (context, page): ..."""
+        context, page = await self.acquire()
+        try:
+            yield context, page
+        finally:
+            await self.release(context, page)
+
+
+_pool = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Process-wide pool, configured from the environment:
+    WEB_AGENT_POOL_SIZE, WEB_AGENT_PROFILE_DIR, WEB_AGENT_MAX_TASKS.
+    """
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool(
+            size=int(os.getenv("WEB_AGENT_POOL_SIZE", "2")),
+            max_tasks_per_browser=int(os.getenv("WEB_AGENT_MAX_TASKS", "25")),
+            profile_dir=os.getenv("WEB_AGENT_PROFILE_DIR") or None,
+        )
+    return _pool
@@ -0,0 +1,296 @@
+"""
+DomNavigator - Accessibility-snapshot fast path for the web agent
+
+Extracts a compact text view of the page: title, URL, scroll position, the
+interactive elements (links, buttons, inputs, ...) each tagged with a numeric
+id, and a slice of the visible text. The model gets element-targeted actions
+(click_element, type_into_element, select_option) that act on those ids, so
+form- and link-heavy pages can be driven from text alone. A full screenshot is
+only attached when the snapshot can't describe the page (canvas/iframe-heavy,
+nearly empty), when the model used a coordinate action, or when it asks for
+one with take_screenshot.
+"""
+
+from google.genai import types
+
+# Attribute written onto every indexed element; element ids are only valid until the next snapshot
+ID_ATTRIBUTE = "data-ada-id"
+
+SNAPSHOT_SCRIPT = """
+({ maxElements, maxText }) => {
+    const SELECTOR = [
+        'a[href]', 'button', 'input:not([type=hidden])', 'select', 'textarea', 'summary',
+        '[role=button]', '[role=link]', '[role=checkbox]', '[role=radio]', '[role=tab]',
+        '[role=menuitem]', '[role=option]', '[role=switch]', '[role=combobox]',
+        '[role=searchbox]', '[role=textbox]', '[contenteditable=""]', '[contenteditable=true]',
+        '[onclick]', '[tabindex]:not([tabindex="-1"])',
+    ].join(',');
+    const IMPLICIT_ROLES = { A: 'link', BUTTON: 'button', SELECT: 'combobox', TEXTAREA: 'textbox', SUMMARY: 'button' };
+    const INPUT_ROLES = { checkbox: 'checkbox', radio: 'radio', submit: 'button', button: 'button',
+                          reset: 'button', search: 'searchbox', range: 'slider' };
+    const clean = (s, n) => (s || '').replace(/\\s+/g, ' ').trim().slice(0, n);
+    const vw = window.innerWidth, vh = window.innerHeight;
+
+    const labelOf = (el) => {
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            const text = labelledBy.split(/\\s+/).map(id => document.getElementById(id)?.innerText || '').join(' ');
+            if (text.trim()) return text;
+        }
+        if (el.labels && el.labels.length) return el.labels[0].innerText;
+        const img = el.querySelector && el.querySelector('img[alt]');
+        return el.getAttribute('aria-label') || el.innerText || (el.type === 'submit' && el.value) ||
+               el.placeholder || el.title || el.alt || (img && img.alt) || el.name || '';
+    };
+
+    document.querySelectorAll('[data-ada-id]').forEach(el => el.removeAttribute('data-ada-id'));
+    const elements = [];
+    let candidates = 0;
+    for (const el of document.querySelectorAll(SELECTOR)) {
+        const r = el.getBoundingClientRect();
+        if (r.width < 1 || r.height < 1) continue;
+        if (r.bottom < -vh || r.top > 2 * vh) continue;
+        const style = getComputedStyle(el);
+        if (style.visibility === 'hidden' || style.display === 'none' || style.opacity === '0') continue;
+        candidates++;
+        if (elements.length >= maxElements) continue;
+
+        const id = elements.length + 1;
+        el.setAttribute('data-ada-id', String(id));
+        const tag = el.tagName;
+        const role = el.getAttribute('role') ||
+            (tag === 'INPUT' ? (INPUT_ROLES[el.type] || 'textbox') : IMPLICIT_ROLES[tag]) ||
+            (el.isContentEditable ? 'textbox' : 'generic');
+        const entry = { id, role, name: clean(labelOf(el), 80) };
+        if (['INPUT', 'TEXTAREA', 'SELECT'].includes(tag) && !['checkbox', 'radio', 'submit', 'button'].includes(el.type)) {
+            entry.value = clean(tag === 'SELECT' ? el.selectedOptions[0]?.innerText : el.value, 60);
+        }
+        if (tag === 'SELECT') entry.options = Array.from(el.options).slice(0, 10).map(o => clean(o.innerText, 30));
+        if (tag === 'A') entry.href = el.href.slice(0, 100);
+        if (el.checked) entry.checked = true;
+        if (el.disabled) entry.disabled = true;
+        if (r.bottom <= 0 || r.top >= vh || r.right <= 0 || r.left >= vw) entry.offscreen = true;
+        elements.push(entry);
+    }
+
+    // Share of the viewport covered by content a text snapshot can't describe
+    let visualArea = 0;
+    for (const el of document.querySelectorAll('canvas, iframe, embed, object, video')) {
+        const r = el.getBoundingClientRect();
+        const w = Math.max(0, Math.min(r.right, vw) - Math.max(r.left, 0));
+        const h = Math.max(0, Math.min(r.bottom, vh) - Math.max(r.top, 0));
+        visualArea += w * h;
+    }
+
+    const text = document.body ? document.body.innerText.replace(/[ \\t]+/g, ' ').replace(/\\n\\s*\\n+/g, '\\n').trim() : '';
+    return {
+        url: location.href,
+        title: document.title,
+        scroll_y: Math.round(window.scrollY),
+        scroll_height: document.documentElement.scrollHeight,
+        viewport_height: vh,
+        elements,
+        candidates,
+        text: text.slice(0, maxText),
+        text_length: text.length,
+        visual_ratio: Math.min(1, visualArea / (vw * vh)),
+    };
+}
+"""
+
+# Model-facing declarations, offered next to the built-in Computer Use actions
+ELEMENT_FUNCTIONS = [
+    types.FunctionDeclaration(
+        name="click_element",
+        description="Click an interactive element from the latest page snapshot by its id.",
+        parameters={
+            "type": "OBJECT",
+            "properties": {"element_id": {"type": "INTEGER", "description": "Id shown as [id] in the snapshot"}},
+            "required": ["element_id"],
+        },
+    ),
+    types.FunctionDeclaration(
+        name="type_into_element",
+        description="Type text into an input, textarea or editable element from the latest page snapshot.",
+        parameters={
+            "type": "OBJECT",
+            "properties": {
+                "element_id": {"type": "INTEGER", "description": "Id shown as [id] in the snapshot"},
+                "text": {"type": "STRING"},
+                "press_enter": {"type": "BOOLEAN", "description": "Press Enter after typing"},
+                "clear_before_typing": {"type": "BOOLEAN", "description": "Replace the current value (default true)"},
+            },
+            "required": ["element_id", "text"],
+        },
+    ),
+    types.FunctionDeclaration(
+        name="select_option",
+        description="Choose an option of a <select> element from the latest page snapshot, by label or value.",
+        parameters={
+            "type": "OBJECT",
+            "properties": {
+                "element_id": {"type": "INTEGER", "description": "Id shown as [id] in the snapshot"},
+                "option": {"type": "STRING"},
+            },
+            "required": ["element_id", "option"],
+        },
+    ),
+    types.FunctionDeclaration(
+        name="take_screenshot",
+        description="Attach a full screenshot to the next response when the page snapshot is not enough.",
+        parameters={
+            "type": "OBJECT",
+            "properties": {"reason": {"type": "STRING"}},
+        },
+    ),
+]
+
+ELEMENT_FUNCTION_NAMES = {f.name for f in ELEMENT_FUNCTIONS}
+
+# Built-in actions that target pixels; after these the model needs to see the page
+COORDINATE_FUNCTIONS = {"click_at", "type_text_at", "hover_at", "drag_and_drop", "scroll_at"}
+
+SYSTEM_INSTRUCTION = (
+    "Function responses include `page`, a text snapshot listing the page's interactive elements as "
+    "[id] role \"name\". Prefer click_element, type_into_element and select_option with those ids. "
+    "Screenshots are only attached when the snapshot can't describe the page; call take_screenshot "
+    "or use coordinate actions if you need to see it."
+)
+
+
+def format_snapshot(snapshot: dict) -> str:
+    """Render a snapshot as the compact text sent to the model."""
+    lines = [
+        f"Page: {snapshot['title'] or '(untitled)'} ({snapshot['url']})",
+        f"Scroll: {snapshot['scroll_y']}/{snapshot['scroll_height']} px, viewport {snapshot['viewport_height']} px",
+        f"Interactive elements ({len(snapshot['elements'])} of {snapshot['candidates']}, * = off-screen):",
+    ]
+    for el in snapshot["elements"]:
+        line = f"[{el['id']}]{'*' if el.get('offscreen') else ''} {el['role']} \"{el['name']}\""
+        if "value" in el:
+            line += f" value=\"{el['value']}\""
+        if el.get("options"):
+            line += " options=" + "|".join(el["options"])
+        if el.get("checked"):
+            line += " checked"
+        if el.get("disabled"):
+            line += " disabled"
+        if el.get("href"):
+            line += f" -> {el['href']}"
+        lines.append(line)
+    if snapshot["text"]:
+        truncated = " (truncated)" if snapshot["text_length"] > len(snapshot["text"]) else ""
+        lines.append(f"Text{truncated}:")
+        lines.append(snapshot["text"])
+    return "\n".join(lines)
+
+
+class DomNavigator:
+    """
+    Takes page snapshots and executes element-id actions for one page.
+    """
+
+    def __init__(self, page, max_elements: int = 150, max_text: int = 1500,
+                 min_elements: int = 3, min_text: int = 200, max_visual_ratio: float = 0.5):
+        """
+        Args:
+            page: Playwright Page
+            max_elements: Most interactive elements listed per snapshot
+            max_text: Characters of visible page text included per snapshot
+            min_elements: Snapshots with fewer elements than this and less than `min_text`
+                characters of text are insufficient
+            min_text: See min_elements
+            max_visual_ratio: Snapshots of pages where canvas/iframe/video cover more of the viewport are insufficient
+        """
+        self.page = page
+        self.max_elements = max_elements
+        self.max_text = max_text
+        self.min_elements = min_elements
+        self.min_text = min_text
+        self.max_visual_ratio = max_visual_ratio
+        self.last = None
+
+        # Stats
+        self.stats = {"snapshots": 0, "snapshot_bytes": 0, "screenshots": 0, "screenshots_skipped": 0,
+                      "element_actions": 0}
+
+    async def capture(self) -> str:
+        """
+        Snapshot the page, re-indexing its elements.
+
+        Returns:
+            The text for the model, or None if the page couldn't be read (e.g. mid-navigation)
+        """
+        try:
+            self.last = await self.page.evaluate(SNAPSHOT_SCRIPT, {"maxElements": self.max_elements, "maxText": self.max_text})
+        except Exception as e:
+            print(f"[WEB] [WARN] Page snapshot failed: {e}")
+            self.last = None
+            return None
+        text = format_snapshot(self.last)
+        self.stats["snapshots"] += 1
+        self.stats["snapshot_bytes"] += len(text.encode("utf-8"))
+        return text
+
+    def sufficient(self) -> bool:
+        """Whether the latest snapshot describes the page well enough to skip the screenshot."""
+        if self.last is None:
+            return False
+        if self.last["visual_ratio"] > self.max_visual_ratio:
+            return False
+        return len(self.last["elements"]) >= self.min_elements or self.last["text_length"] >= self.min_text
+
+    def needs_screenshot(self, fn_names) -> bool:
+        """
+        Decide whether to attach a screenshot after the given actions (call after capture()).
+        Records the decision in stats.
+        """
+        needed = (
+            not self.sufficient()
+            or "take_screenshot" in fn_names
+            or any(name in COORDINATE_FUNCTIONS for name in fn_names)
+        )
+        self.stats["screenshots" if needed else "screenshots_skipped"] += 1
+        return needed
+
+    def handles(self, fn_name: str) -> bool:
+        return fn_name in ELEMENT_FUNCTION_NAMES
+
+    def _locator(self, element_id):
+        return self.page.locator(f'[{ID_ATTRIBUTE}="{int(element_id)}"]').first
+
+    async def execute(self, fn_name: str, args: dict) -> dict:
+        """
+        Run one element action.
+
+        Returns:
+            Extra fields for the function response
+        """
+        if fn_name == "take_screenshot":
+            return {}
+
+        locator = self._locator(args["element_id"])
+        if await locator.count() == 0:
+            raise ValueError(f"Element {args['element_id']} is not on the page anymore; use the latest snapshot")
+
+        self.stats["element_actions"] += 1
+        if fn_name == "click_element":
+            await locator.click(timeout=5000)
+        elif fn_name == "type_into_element":
+            if args.get("clear_before_typing", True):
+                await locator.fill(args["text"], timeout=5000)
+            else:
+                await locator.click(timeout=5000)
+                await self.page.keyboard.type(args["text"])
+            if args.get("press_enter", False):
+                await locator.press("Enter")
+        elif fn_name == "select_option":
+            selected = await locator.select_option(args["option"], timeout=5000)
+            return {"selected": selected}
+        return {}
+
+    def summary(self) -> str:
+        s = self.stats
+        avg_kb = s["snapshot_bytes"] / max(1, s["snapshots"]) / 1024
+        return (f"{s['snapshots']} snapshots (avg {avg_kb:.1f} KB), {s['element_actions']} element actions, "
+                f"screenshots {s['screenshots']} sent / {s['screenshots_skipped']} skipped")
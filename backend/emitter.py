@@ -0,0 +1,129 @@
+"""
+CoalescingEmitter - Micro-batched Socket.IO fan-out
+
+Callbacks from the AudioLoop fire many times per second (one transcription
+delta per word fragment, one audio_data chunk per output buffer). Instead of
+spawning a task and a socket frame per event, events are queued per room and
+flushed together after a short window (a few ms), by one task per room:
+- consecutive transcription deltas from the same sender are merged into one
+  event (the frontend appends deltas, so the merged text renders identically)
+- "latest only" events (audio_data, which only drives the visualizer) replace
+  any still-queued event of the same name
+- everything else is sent in order, never dropped
+
+While a flush is still sending (slow client or transport), new events keep
+queueing and merging, which is the backpressure: a slow room receives fewer,
+larger frames instead of an ever-growing task backlog.
+"""
+
+import time
+import asyncio
+
+MERGE_EVENTS = {"transcription"}
+LATEST_EVENTS = {"audio_data"}
+
+
+class CoalescingEmitter:
+    """
+    Per-room queued, coalescing wrapper around `sio.emit`.
+    """
+
+    def __init__(self, sio, window_ms: float = 8.0, warn_pending: int = 500):
+        """
+        Args:
+            sio: socketio.AsyncServer (anything with `async emit(event, data, room=...)`)
+            window_ms: How long events are collected before a room is flushed
+            warn_pending: Log a warning when a room's queue grows past this (slow client)
+        """
+        self.sio = sio
+        self.window = window_ms / 1000
+        self.warn_pending = warn_pending
+
+        self._pending = {}   # room -> list of [event, data, on_sent]
+        self._flushing = {}  # room -> asyncio.Task
+        self._scheduled = set()
+
+        # Stats
+        self.stats = {"events": 0, "emitted": 0, "merged": 0, "replaced": 0, "batches": 0,
+                      "max_pending": 0, "slow_flushes": 0}
+
+    def emit(self, event: str, data, room: str, on_sent=None):
+        """
+        Queue an event for a room. Safe to call from sync callbacks on the loop thread.
+
+        Args:
+            event: Socket.IO event name
+            data: Payload
+            room: Target room (or sid)
+            on_sent: Optional callable(data) run when the (possibly merged) event is sent
+        """
+        self.stats["events"] += 1
+        pending = self._pending.setdefault(room, [])
+
+        if event in LATEST_EVENTS:
+            for i, entry in enumerate(pending):
+                if entry[0] == event:
+                    del pending[i]
+                    self.stats["replaced"] += 1
+                    break
+        elif event in MERGE_EVENTS and isinstance(data, dict):
+            last = next((e for e in reversed(pending) if e[0] not in LATEST_EVENTS), None)
+            if last and last[0] == event and last[1].get("sender") == data.get("sender"):
+                last[1] = {**last[1], "text": (last[1].get("text") or "") + (data.get("text") or "")}
+                self.stats["merged"] += 1
+                return
+
+        pending.append([event, data, on_sent])
+        if len(pending) > self.stats["max_pending"]:
+            self.stats["max_pending"] = len(pending)
+            if len(pending) == self.warn_pending:
+                print(f"[EMIT] [WARN] {len(pending)} events queued for {room} (slow client?)")
+        self._schedule(room)
+
+    def _schedule(self, room: str):
+        if room in self._scheduled or room in self._flushing:
+            return  # A running flush picks the new events up when it's done
+        self._scheduled.add(room)
+        asyncio.get_running_loop().call_later(self.window, self._start_flush, room)
+
+    def _start_flush(self, room: str):
+        self._scheduled.discard(room)
+        if room not in self._flushing and self._pending.get(room):
+            self._flushing[room] = asyncio.create_task(self._flush(room))
+
+    async def _flush(self, room: str):
+        try:
+            while self._pending.get(room):
+                batch = self._pending.pop(room)
+                self.stats["batches"] += 1
+                start = time.monotonic()
+                for event, data, on_sent in batch:
+                    try:
+                        await self.sio.emit(event, data, room=room)
+                        self.stats["emitted"] += 1
+                        if on_sent:
+                            on_sent(data)
+                    except Exception as e:
+                        print(f"[EMIT] [ERR] Failed to emit {event} to {room}: {e}")
+                if time.monotonic() - start > self.window * 4:
+                    self.stats["slow_flushes"] += 1
+        finally:
+            self._flushing.pop(room, None)
+            if self._pending.get(room):
+                self._schedule(room)
+            else:
+                self._pending.pop(room, None)
+
+    async def flush(self):
+        """Send everything queued now (e.g. before shutdown or in tests)."""
+        for room in list(self._pending):
+            self._scheduled.discard(room)
+            if room not in self._flushing:
+                self._flushing[room] = asyncio.create_task(self._flush(room))
+        tasks = list(self._flushing.values())
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def summary(self) -> dict:
+        s = self.stats
+        return {**s, "saved_frames": s["events"] - s["emitted"]}
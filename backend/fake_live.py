@@ -0,0 +1,473 @@
+"""
+FakeLiveServer - Local stand-in for the Gemini Live API
+
+Implements the subset of the Live websocket protocol ADA uses, so AudioLoop
+can run offline against the real google-genai client:
+- setup -> setupComplete (plus session resumption handles when requested)
+- realtime audio/images and text turns in; a turn ends after speech followed
+  by `silence_ms` of silence (any non-zero sample counts as speech), or on a
+  text turn with turn_complete
+- scripted replies out: input/output transcription, PCM audio at 24 kHz, and
+  tool calls that wait for the client's tool response
+- configurable response latency, audio pacing, disconnects and GoAway notices
+
+The SDK only speaks wss://, so the server uses a throwaway self-signed
+certificate (needs the `cryptography` package). Point a client at it with
+`genai.Client(http_options=server.http_options(), ...)`, or run ADA against
+it with ADA_LIVE_BASE_URL/ADA_LIVE_CA_FILE (see `python fake_live.py serve`).
+
+`python fake_live.py bench` runs a headless AudioLoop (fake mic and speaker)
+through scripted turns and prints latency, reconnect and tool dispatch stats.
+"""
+
+import os
+import ssl
+import sys
+import json
+import math
+import time
+import array
+import base64
+import asyncio
+import argparse
+import datetime
+import tempfile
+import ipaddress
+
+from websockets.asyncio.server import serve
+
+RECEIVE_SAMPLE_RATE = 24000  # Model audio (16-bit mono)
+SEND_SAMPLE_RATE = 16000     # Mic audio (16-bit mono)
+
+DEFAULT_REPLY = {"text": "Okay.", "audio_ms": 400}
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def _get(d: dict, camel: str, snake: str, default=None):
+    """Client messages mix camelCase and snake_case keys depending on the SDK call."""
+    if camel in d:
+        return d[camel]
+    return d.get(snake, default)
+
+
+def tone(ms: int, rate: int = RECEIVE_SAMPLE_RATE, freq: float = 440.0, amplitude: int = 2000) -> bytes:
+    """`ms` of a quiet sine tone as 16-bit PCM."""
+    samples = rate * ms // 1000
+    return array.array("h", (int(amplitude * math.sin(2 * math.pi * freq * i / rate)) for i in range(samples))).tobytes()
+
+
+def self_signed_cert(directory: str):
+    """
+    Write a certificate for localhost/127.0.0.1 and its key to `directory`.
+
+    Returns:
+        (cert_file, key_file)
+    """
+    try:
+        from cryptography import x509
+        from cryptography.x509.oid import NameOID
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+    except ImportError as e:
+        raise RuntimeError("FakeLiveServer needs the 'cryptography' package for its TLS certificate") from e
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=7))
+        .add_extension(x509.SubjectAlternativeName(
+            [x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_file = os.path.join(directory, "fake_live_cert.pem")
+    key_file = os.path.join(directory, "fake_live_key.pem")
+    with open(cert_file, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_file, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return cert_file, key_file
+
+
+class FakeLiveServer:
+    """
+    Scripted Live API endpoint on 127.0.0.1.
+
+    Replies are dicts, used in order across all connections (DEFAULT_REPLY once
+    the script runs out):
+        {"input_text": "what the user said", "tool_call": {"name": ..., "args": {...}},
+         "text": "what the model says", "audio_ms": 600}
+    All keys are optional; a tool call is sent first and the rest of the reply
+    follows the client's tool response.
+    """
+
+    def __init__(self, script=None, latency: float = 0.0, chunk_ms: int = 40, pace: float = 0.0,
+                 silence_ms: int = 300, disconnect_after_turns: int = 0, go_away: bool = False,
+                 reject_resume: bool = False, tool_timeout: float = 10.0, port: int = 0):
+        """
+        Args:
+            script: List of reply dicts (see class docstring)
+            latency: Seconds between the end of a user turn and the first reply message
+            chunk_ms: Length of each audio message
+            pace: Playback speed of reply audio (1.0 = real time, 0 = as fast as possible)
+            silence_ms: Silence after speech that ends a user turn
+            disconnect_after_turns: Close each connection after this many replies (0 = never)
+            go_away: Send a GoAway (with a fresh handle) before such a disconnect
+            reject_resume: Refuse connections that try to resume with a handle
+            tool_timeout: Seconds to wait for a tool response before continuing anyway
+            port: Port to listen on (0 = any free port)
+        """
+        self.script = list(script or [])
+        self.latency = latency
+        self.chunk_ms = chunk_ms
+        self.pace = pace
+        self.silence_ms = silence_ms
+        self.disconnect_after_turns = disconnect_after_turns
+        self.go_away = go_away
+        self.reject_resume = reject_resume
+        self.tool_timeout = tool_timeout
+        self.port = port
+
+        self.setups = []          # Setup message of every connection
+        self.tool_responses = []  # functionResponses received, in order
+        self._chunk = tone(chunk_ms)
+        self._next_reply = 0
+        self._handles = set()
+        self._connections = set()
+        self._server = None
+        self._tempdir = None
+        self.ca_file = None
+
+        # Stats
+        self.stats = {"connections": 0, "resumed": 0, "rejected_resumes": 0, "messages_in": 0,
+                      "audio_in_bytes": 0, "images_in": 0, "texts_in": 0, "turns": 0, "audio_out_bytes": 0,
+                      "tool_calls": 0, "tool_timeouts": 0, "last_tool_ms": None, "disconnects": 0,
+                      "go_aways": 0}
+
+    @property
+    def url(self) -> str:
+        return f"https://127.0.0.1:{self.port}"
+
+    def http_options(self, api_version: str = "v1beta") -> dict:
+        """http_options for genai.Client that point the Live API at this server."""
+        return {
+            "api_version": api_version,
+            "base_url": self.url,
+            "async_client_args": {"ssl": ssl.create_default_context(cafile=self.ca_file)},
+        }
+
+    async def start(self):
+        self._tempdir = tempfile.TemporaryDirectory(prefix="fake_live_")
+        self.ca_file, key_file = self_signed_cert(self._tempdir.name)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.ca_file, key_file)
+        self._server = await serve(self._handle, "127.0.0.1", self.port, ssl=context, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._tempdir:
+            self._tempdir.cleanup()
+            self._tempdir = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def drop(self, code: int = 1011, reason: str = "Simulated disconnect"):
+        """Close every open connection now, like a network failure."""
+        for ws in list(self._connections):
+            self.stats["disconnects"] += 1
+            await ws.close(code, reason)
+
+    def _take_reply(self) -> dict:
+        if self._next_reply < len(self.script):
+            reply = self.script[self._next_reply]
+        else:
+            reply = DEFAULT_REPLY
+        self._next_reply += 1
+        return reply
+
+    def _new_handle(self) -> str:
+        handle = f"fake-handle-{len(self._handles) + 1}"
+        self._handles.add(handle)
+        return handle
+
+    async def _handle(self, ws):
+        if not ws.request.path.split("?")[0].endswith("BidiGenerateContent"):
+            await ws.close(1008, "Unknown method")
+            return
+        try:
+            setup = _get(json.loads(await ws.recv()), "setup", "setup") or {}
+        except Exception:
+            return
+        self.setups.append(setup)
+        self.stats["connections"] += 1
+
+        resumption = _get(setup, "sessionResumption", "session_resumption")
+        handle = (resumption or {}).get("handle")
+        if handle:
+            if self.reject_resume or handle not in self._handles:
+                self.stats["rejected_resumes"] += 1
+                await ws.close(1008, "Invalid session resumption handle")
+                return
+            self.stats["resumed"] += 1
+
+        self._connections.add(ws)
+        state = {"ws": ws, "resumable": resumption is not None, "turns": 0, "speech": False,
+                 "silence_bytes": 0, "reply": None, "tools": {}}
+        try:
+            await ws.send(json.dumps({"setupComplete": {}}))
+            if state["resumable"]:
+                await ws.send(json.dumps({"sessionResumptionUpdate": {"newHandle": self._new_handle(),
+                                                                      "resumable": True}}))
+            async for raw in ws:
+                self._on_message(state, json.loads(raw))
+        except Exception:
+            pass  # Connection closed by either side
+        finally:
+            self._connections.discard(ws)
+            if state["reply"]:
+                state["reply"].cancel()
+
+    def _on_message(self, state: dict, msg: dict):
+        self.stats["messages_in"] += 1
+        realtime = _get(msg, "realtimeInput", "realtime_input")
+        content = _get(msg, "clientContent", "client_content")
+        tool_response = _get(msg, "toolResponse", "tool_response")
+
+        if realtime:
+            blobs = list(_get(realtime, "mediaChunks", "media_chunks", []))
+            for key in ("audio", "video", "media"):
+                if realtime.get(key):
+                    blobs.append(realtime[key])
+            for blob in blobs:
+                mime_type = _get(blob, "mimeType", "mime_type", "")
+                if mime_type.startswith("audio/"):
+                    self._on_audio(state, base64.urlsafe_b64decode(blob.get("data", "")))
+                else:
+                    self.stats["images_in"] += 1
+
+        if content:
+            self.stats["texts_in"] += 1
+            if _get(content, "turnComplete", "turn_complete"):
+                self._start_reply(state)
+
+        if tool_response:
+            for response in _get(tool_response, "functionResponses", "function_responses", []):
+                self.tool_responses.append(response)
+                waiter = state["tools"].pop(response.get("id"), None)
+                if waiter and not waiter.done():
+                    waiter.set_result(response)
+
+    def _on_audio(self, state: dict, data: bytes):
+        self.stats["audio_in_bytes"] += len(data)
+        if data.strip(b"\x00"):
+            state["speech"] = True
+            state["silence_bytes"] = 0
+        elif state["speech"]:
+            state["silence_bytes"] += len(data)
+            if state["silence_bytes"] * 1000 >= self.silence_ms * SEND_SAMPLE_RATE * 2:
+                state["speech"] = False
+                state["silence_bytes"] = 0
+                self._start_reply(state)
+
+    def _start_reply(self, state: dict):
+        if state["reply"] and not state["reply"].done():
+            return  # Still answering the previous turn
+        state["reply"] = asyncio.create_task(self._reply(state, self._take_reply()))
+
+    async def _send(self, state: dict, msg: dict):
+        await state["ws"].send(json.dumps(msg))
+
+    async def _reply(self, state: dict, reply: dict):
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if reply.get("input_text"):
+                await self._send(state, {"serverContent": {"inputTranscription": {"text": reply["input_text"]}}})
+
+            tool_call = reply.get("tool_call")
+            if tool_call:
+                call_id = f"call-{self.stats['tool_calls'] + 1}"
+                waiter = asyncio.get_running_loop().create_future()
+                state["tools"][call_id] = waiter
+                self.stats["tool_calls"] += 1
+                start = time.perf_counter()
+                await self._send(state, {"toolCall": {"functionCalls": [
+                    {"id": call_id, "name": tool_call["name"], "args": tool_call.get("args", {})}]}})
+                try:
+                    await asyncio.wait_for(waiter, self.tool_timeout)
+                    self.stats["last_tool_ms"] = round((time.perf_counter() - start) * 1000)
+                except asyncio.TimeoutError:
+                    self.stats["tool_timeouts"] += 1
+                    state["tools"].pop(call_id, None)
+
+            if reply.get("text"):
+                await self._send(state, {"serverContent": {"outputTranscription": {"text": reply["text"]}}})
+            chunks = reply.get("audio_ms", 0) // self.chunk_ms
+            for _ in range(chunks):
+                await self._send(state, {"serverContent": {"modelTurn": {"parts": [
+                    {"inlineData": {"mimeType": f"audio/pcm;rate={RECEIVE_SAMPLE_RATE}", "data": _b64(self._chunk)}}]}}})
+                self.stats["audio_out_bytes"] += len(self._chunk)
+                if self.pace:
+                    await asyncio.sleep(self.chunk_ms / 1000 / self.pace)
+            await self._send(state, {"serverContent": {"turnComplete": True}})
+            self.stats["turns"] += 1
+            state["turns"] += 1
+
+            if state["resumable"]:
+                await self._send(state, {"sessionResumptionUpdate": {"newHandle": self._new_handle(),
+                                                                     "resumable": True}})
+            if self.disconnect_after_turns and state["turns"] >= self.disconnect_after_turns:
+                if self.go_away:
+                    self.stats["go_aways"] += 1
+                    await self._send(state, {"goAway": {"timeLeft": "0s"}})
+                self.stats["disconnects"] += 1
+                await state["ws"].close(1011, "Simulated disconnect")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # Connection went away mid-reply
+
+
+async def run_benchmark(turns: int = 10, latency: float = 0.2, pace: float = 1.0, speech_ms: int = 600,
+                        silence_ms: int = 300, pause_ms: int = 800, disconnect_after_turns: int = 0,
+                        go_away: bool = False, tool_every: int = 0) -> dict:
+    """
+    Drive a headless AudioLoop through `turns` spoken turns against a FakeLiveServer.
+
+    The fake mic streams `speech_ms` of tone, then silence; the fake speaker
+    drains model audio without a device.
+
+    Args:
+        turns: Number of user turns
+        latency: Server response latency in seconds
+        pace: Reply audio speed (1.0 = real time; AudioLoop discards model audio still queued at
+            turn_complete, so 0 would leave nothing to play)
+        speech_ms: Length of each utterance
+        silence_ms: Silence that ends a turn (server side)
+        pause_ms: Silence after each reply before the next utterance
+        disconnect_after_turns: Drop the connection after this many replies (0 = never)
+        go_away: Announce those disconnects with a GoAway
+        tool_every: Make every n-th reply a list_projects tool call (0 = never)
+
+    Returns:
+        Dict with "latency", "connection", "resumption" and "server" stats, plus "elapsed_s"
+    """
+    if not os.getenv("GEMINI_API_KEY"):
+        os.environ["GEMINI_API_KEY"] = "fake"  # The fake server accepts any key
+    script = []
+    for i in range(turns):
+        reply = {"input_text": f"Utterance {i + 1}", "text": f"Reply {i + 1}.", "audio_ms": 480}
+        if tool_every and (i + 1) % tool_every == 0:
+            reply["tool_call"] = {"name": "list_projects"}
+        script.append(reply)
+
+    with tempfile.TemporaryDirectory(prefix="fake_live_bench_") as workdir:
+        os.environ.setdefault("LOCAL_MEMORY_DIR", os.path.join(workdir, "memory"))
+        async with FakeLiveServer(script=script, latency=latency, pace=pace, silence_ms=silence_ms,
+                                  disconnect_after_turns=disconnect_after_turns, go_away=go_away) as server:
+            os.environ["ADA_LIVE_BASE_URL"] = server.url
+            os.environ["ADA_LIVE_CA_FILE"] = server.ca_file
+            import ada
+            from project_manager import ProjectManager
+            ada._client = None
+
+            loop = ada.AudioLoop(video_mode="none", temp_project=None)
+            loop.project_manager = ProjectManager(workdir)
+            loop.permissions = {"list_projects": False}
+            chunk_ms = ada.CHUNK_SIZE * 1000 // SEND_SAMPLE_RATE
+            speech = tone(chunk_ms, rate=SEND_SAMPLE_RATE)
+            silence = bytes(len(speech))
+
+            async def fake_mic():
+                async def stream(data, ms):
+                    for _ in range(max(1, ms // chunk_ms)):
+                        await loop.out_queue.put({"data": data, "mime_type": "audio/pcm"})
+                        await asyncio.sleep(chunk_ms / 1000)
+
+                for i in range(turns):
+                    await stream(speech, speech_ms)
+                    loop.latency.speech_ended(time.monotonic())
+                    deadline = time.monotonic() + 10  # A reply lost to a disconnect is dropped by the next turn
+                    while loop.latency.stats["turns"] <= i - loop.latency.stats["dropped"] and time.monotonic() < deadline:
+                        await stream(silence, chunk_ms)
+                    await stream(silence, pause_ms)
+                loop.stop()
+
+            async def fake_speaker():
+                while True:
+                    await loop.audio_in_queue.get()
+                    loop.latency.audio_played()
+
+            loop.listen_audio = fake_mic
+            loop.play_audio = fake_speaker
+
+            start = time.perf_counter()
+            await asyncio.wait_for(loop.run(), timeout=turns * 30)
+            return {
+                "elapsed_s": round(time.perf_counter() - start, 2),
+                "latency": loop.latency.summary(),
+                "connection": loop.connections.summary(loop.out_queue),
+                "resumption": loop.resumption.summary(),
+                "server": dict(server.stats),
+            }
+
+
+async def _serve(args):
+    async with FakeLiveServer(latency=args.latency, pace=args.pace, silence_ms=args.silence_ms,
+                              disconnect_after_turns=args.disconnect_after_turns, go_away=args.go_away,
+                              port=args.port) as server:
+        print(f"[FAKE LIVE] Listening on {server.url}")
+        print(f"[FAKE LIVE] Run the backend with:")
+        print(f"    ADA_LIVE_BASE_URL={server.url} ADA_LIVE_CA_FILE={server.ca_file} python server.py")
+        await asyncio.Event().wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Gemini Live server for offline testing")
+    parser.add_argument("command", choices=["serve", "bench"])
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--pace", type=float, default=1.0)
+    parser.add_argument("--silence-ms", type=int, default=300)
+    parser.add_argument("--disconnect-after-turns", type=int, default=0)
+    parser.add_argument("--go-away", action="store_true")
+    parser.add_argument("--tool-every", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(_serve(args))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    result = asyncio.run(run_benchmark(
+        turns=args.turns, latency=args.latency, pace=args.pace, silence_ms=args.silence_ms,
+        disconnect_after_turns=args.disconnect_after_turns, go_away=args.go_away, tool_every=args.tool_every))
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
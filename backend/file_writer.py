@@ -0,0 +1,163 @@
+"""
+FileWriter - Atomic, batched file writes for the write_file tool.
+
+Writes are handed to a worker thread so large generated files never stall the
+event loop (and with it audio playback). Each file is written to a temp file
+next to its destination and swapped in with os.replace, so a crash mid-write
+leaves either the old file or the new one - never a truncated one.
+
+Writes requested within the same short window (e.g. several write_file calls
+in one model turn) are flushed together in one worker-thread hop. Each temp file
+is fsynced before the swap and its directory after it, and a replaced file keeps
+its permissions (new files get the usual 0666 & ~umask).
+"""
+
+import asyncio
+import os
+import tempfile
+
+# Read once: os.umask can only be queried by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class FileWriter:
+    """
+    Coalesces write requests into batches and commits them atomically off the event loop.
+    """
+
+    def __init__(self, on_written=None, batch_window: float = 0.02):
+        """
+        Args:
+            on_written: Optional callback(path, content) invoked after each successful write
+            batch_window: Seconds to wait for more writes before flushing a batch
+        """
+        self.on_written = on_written
+        self.batch_window = batch_window
+
+        self._pending = []
+        self._flush_task = None
+
+        # Stats
+        self.batches_flushed = 0
+        self.files_written = 0
+
+    async def write(self, path, content: str, encoding: str = "utf-8"):
+        """
+        Queue a file write and wait for it to be committed to disk.
+
+        Args:
+            path: Destination path (parent directories are created as needed)
+            content: Text content to write
+            encoding: Text encoding
+
+        Raises:
+            OSError (or other exception) if the write failed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((str(path), content.encode(encoding), content, future))
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_soon())
+
+        await future
+
+    async def flush(self):
+        """Wait for any scheduled batch to finish."""
+        if self._flush_task and not self._flush_task.done():
+            await self._flush_task
+
+    async def _flush_soon(self):
+        if self.batch_window > 0:
+            await asyncio.sleep(self.batch_window)
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            errors = await asyncio.to_thread(self._write_batch, [(path, data) for path, data, _, _ in batch])
+        except Exception as e:
+            errors = [e] * len(batch)
+
+        self.batches_flushed += 1
+        print(f"[FileWriter] Flushed batch of {len(batch)} file(s)")
+
+        for (path, _, content, future), error in zip(batch, errors):
+            if error is None:
+                self.files_written += 1
+                if self.on_written:
+                    try:
+                        self.on_written(path, content)
+                    except Exception as e:
+                        print(f"[FileWriter] [ERR] on_written callback failed for {path}: {e}")
+                if not future.done():
+                    future.set_result(None)
+            elif not future.done():
+                future.set_exception(error)
+
+        # Writes that arrived while this batch was on disk get their own flush
+        if self._pending:
+            self._flush_task = asyncio.create_task(self._flush_soon())
+
+    @staticmethod
+    def _write_batch(items):
+        """
+        Runs in a worker thread. Returns a list of per-item errors (None on success).
+        """
+        errors = [None] * len(items)
+        staged = []  # (index, temp_path, final_path)
+
+        # 1. Stage every file next to its destination
+        for i, (path, data) in enumerate(items):
+            tmp_path = None
+            try:
+                directory = os.path.dirname(path) or "."
+                os.makedirs(directory, exist_ok=True)
+                try:
+                    mode = os.stat(path).st_mode & 0o7777
+                except FileNotFoundError:
+                    mode = 0o666 & ~_UMASK
+                # mkstemp creates the file 0600, which os.replace would carry over
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(tmp_path, mode)
+                staged.append((i, tmp_path, path))
+            except Exception as e:
+                errors[i] = e
+                if tmp_path and os.path.exists(tmp_path):
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+        # 2. Atomically swap staged files into place
+        directories = set()
+        for i, tmp_path, path in staged:
+            try:
+                os.replace(tmp_path, path)
+                directories.add(os.path.dirname(path) or ".")
+            except Exception as e:
+                errors[i] = e
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+        # 3. Persist the renames (directories can't be opened for fsync on Windows)
+        if os.name != "nt":
+            for directory in directories:
+                try:
+                    dir_fd = os.open(directory, os.O_RDONLY)
+                    try:
+                        os.fsync(dir_fd)
+                    finally:
+                        os.close(dir_fd)
+                except OSError as e:
+                    print(f"[FileWriter] [WARN] Could not fsync {directory}: {e}")
+
+        return errors
@@ -0,0 +1,224 @@
+"""
+LiveConnectionManager - Short reconnect gaps for the Gemini Live session
+
+AudioLoop used to tear down the mic and speaker together with a dead
+connection, sleep the backoff and reopen everything. Now the audio devices
+live for the whole run and only the connection is replaced:
+- mic audio keeps flowing into a SendBuffer while there is no connection and
+  is sent once the next connection is up; a message whose send failed is put
+  back at the front, so nothing in flight is lost
+- a new connection resumes the old session with its handle if there is one
+  (bounded by `resume_timeout`), else swaps in a standby session, else connects
+  from scratch
+- the standby is a second, idle Live session opened after each successful
+  connect and refreshed before the server would drop it (opt-in, since it
+  holds an extra session open)
+"""
+
+import time
+import asyncio
+import contextlib
+from collections import deque
+
+# 16 kHz, 16-bit mono mic audio
+MIC_BYTES_PER_SECOND = 16000 * 2
+
+
+class SendBuffer:
+    """
+    FIFO of realtime input for the Live session (replaces a bounded asyncio.Queue).
+
+    `put` never blocks the mic reader. During a long gap the oldest audio is
+    dropped beyond `max_audio_seconds`, and only the newest image is kept.
+    """
+
+    def __init__(self, max_audio_seconds: float = 10.0):
+        self.max_audio_bytes = int(max_audio_seconds * MIC_BYTES_PER_SECOND)
+        self._items = deque()
+        self._times = deque()  # Enqueue time (monotonic) of each item
+        self._audio_bytes = 0
+        self.last_enqueued_at = None  # Of the item last returned by get()
+        self._ready = asyncio.Event()
+
+        # Stats
+        self.stats = {"queued": 0, "requeued": 0, "dropped_audio_ms": 0, "replaced_images": 0, "peak_ms": 0}
+
+    def _audio_size(self, msg) -> int:
+        if isinstance(msg, dict) and msg.get("mime_type", "").startswith("audio/"):
+            return len(msg.get("data") or b"")
+        return 0
+
+    def put_nowait(self, msg):
+        self.stats["queued"] += 1
+        if isinstance(msg, dict) and msg.get("mime_type", "").startswith("image/"):
+            for i, item in enumerate(self._items):
+                if isinstance(item, dict) and item.get("mime_type", "").startswith("image/"):
+                    del self._items[i]
+                    del self._times[i]
+                    self.stats["replaced_images"] += 1
+                    break
+        self._items.append(msg)
+        self._times.append(time.monotonic())
+        self._audio_bytes += self._audio_size(msg)
+
+        while self._audio_bytes > self.max_audio_bytes:
+            index = next(i for i, item in enumerate(self._items) if self._audio_size(item))
+            dropped = self._items[index]
+            del self._items[index]
+            del self._times[index]
+            size = self._audio_size(dropped)
+            self._audio_bytes -= size
+            self.stats["dropped_audio_ms"] += size * 1000 // MIC_BYTES_PER_SECOND
+
+        self.stats["peak_ms"] = max(self.stats["peak_ms"], self._audio_bytes * 1000 // MIC_BYTES_PER_SECOND)
+        self._ready.set()
+
+    async def put(self, msg):
+        self.put_nowait(msg)
+
+    def requeue(self, msg, enqueued_at: float = None):
+        """Put back a message whose send failed, ahead of everything else."""
+        self._items.appendleft(msg)
+        self._times.appendleft(time.monotonic() if enqueued_at is None else enqueued_at)
+        self._audio_bytes += self._audio_size(msg)
+        self.stats["requeued"] += 1
+        self._ready.set()
+
+    async def get(self):
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        msg = self._items.popleft()
+        self.last_enqueued_at = self._times.popleft()
+        self._audio_bytes -= self._audio_size(msg)
+        return msg
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    @property
+    def buffered_ms(self) -> int:
+        return self._audio_bytes * 1000 // MIC_BYTES_PER_SECOND
+
+
+class LiveConnectionManager:
+    """
+    Opens Live connections for AudioLoop.run and keeps an optional standby.
+    """
+
+    def __init__(self, connect, resumption, standby: bool = False, standby_ttl: float = 480.0,
+                 resume_timeout: float = 3.0):
+        """
+        Args:
+            connect: Callable(resume: bool) -> async context manager yielding a Live session
+            resumption: LiveResumption of the loop (handles, reconnect metrics)
+            standby: Keep a second session open to swap in when resuming isn't possible
+            standby_ttl: Seconds before an unused standby session is replaced
+            resume_timeout: Seconds a resume attempt may take before falling back
+        """
+        self.connect = connect
+        self.resumption = resumption
+        self.standby_enabled = standby
+        self.standby_ttl = standby_ttl
+        self.resume_timeout = resume_timeout
+
+        self._standby = None  # (session, exit stack, opened at)
+        self._standby_task = None
+
+        # Stats
+        self.stats = {"opens": 0, "resumed": 0, "standby_swaps": 0, "fresh": 0, "resume_failures": 0,
+                      "standby_opened": 0, "standby_expired": 0, "standby_errors": 0, "last_open_ms": None}
+
+    async def open(self, stack):
+        """
+        Open the next connection; it is closed with `stack`.
+
+        Returns:
+            (session, kind) with kind "resumed", "standby" or "fresh"
+        """
+        start = time.perf_counter()
+        if self.resumption.usable_handle():
+            try:
+                session = await asyncio.wait_for(
+                    stack.enter_async_context(self.connect(resume=True)), self.resume_timeout)
+                return self._opened(session, "resumed", start)
+            except Exception as e:
+                self.stats["resume_failures"] += 1
+                print(f"[ADA DEBUG] [CONNECT] Resume failed ({type(e).__name__}: {e})")
+                self.resumption.resume_failed()
+
+        standby = await self._take_standby()
+        if standby:
+            session, standby_stack, _ = standby
+            stack.push_async_exit(standby_stack)
+            # Restart the keeper so the next start_standby() opens a replacement right away
+            if self._standby_task:
+                self._standby_task.cancel()
+                self._standby_task = None
+            return self._opened(session, "standby", start)
+
+        session = await stack.enter_async_context(self.connect(resume=False))
+        return self._opened(session, "fresh", start)
+
+    def _opened(self, session, kind: str, start: float):
+        self.resumption.opened(kind == "resumed")
+        self.stats["opens"] += 1
+        self.stats[{"resumed": "resumed", "standby": "standby_swaps", "fresh": "fresh"}[kind]] += 1
+        self.stats["last_open_ms"] = round((time.perf_counter() - start) * 1000)
+        return session, kind
+
+    async def _take_standby(self):
+        standby, self._standby = self._standby, None
+        if standby and time.monotonic() - standby[2] >= self.standby_ttl:
+            self.stats["standby_expired"] += 1
+            await self._close(standby)
+            return None
+        return standby
+
+    def start_standby(self):
+        """Keep a standby session open in the background (no-op unless enabled)."""
+        if self.standby_enabled and (self._standby_task is None or self._standby_task.done()):
+            self._standby_task = asyncio.create_task(self._keep_standby())
+
+    async def _keep_standby(self):
+        while True:
+            if self._standby is None or time.monotonic() - self._standby[2] >= self.standby_ttl * 0.9:
+                old, self._standby = self._standby, None
+                if old:
+                    self.stats["standby_expired"] += 1
+                    await self._close(old)
+                stack = contextlib.AsyncExitStack()
+                try:
+                    session = await stack.enter_async_context(self.connect(resume=False))
+                    self._standby = (session, stack, time.monotonic())
+                    self.stats["standby_opened"] += 1
+                except Exception as e:
+                    self.stats["standby_errors"] += 1
+                    print(f"[ADA DEBUG] [CONNECT] [WARN] Standby session failed: {e}")
+                    await stack.aclose()
+            await asyncio.sleep(min(self.standby_ttl / 4, 30))
+
+    async def _close(self, standby):
+        try:
+            await standby[1].aclose()
+        except Exception as e:
+            print(f"[ADA DEBUG] [WARN] Closing standby session failed: {e}")
+
+    async def close(self):
+        """Stop keeping a standby and close it."""
+        if self._standby_task:
+            self._standby_task.cancel()
+            self._standby_task = None
+        standby, self._standby = self._standby, None
+        if standby:
+            await self._close(standby)
+
+    def summary(self, buffer: SendBuffer = None) -> dict:
+        return {
+            **self.stats,
+            "send_buffer": {**buffer.stats, "buffered_ms": buffer.buffered_ms} if buffer else None,
+            "standby": self._standby is not None if self.standby_enabled else None,
+        }
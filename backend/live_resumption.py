@@ -0,0 +1,202 @@
+"""
+LiveResumption - Reconnecting a Gemini Live session without losing its context
+
+The Live API sends session resumption handles during a session (and a GoAway
+shortly before it closes a connection). Reconnecting with the latest handle
+restores the full server-side context, so nothing needs to be re-sent and the
+model doesn't start talking. Context window compression (a sliding window)
+lets long sessions continue instead of hitting the context limit.
+
+When no usable handle exists (SDK without resumption, handle expired, resume
+rejected), the caller falls back to `build_fallback_context`: a summary of
+the project chat history that fits a token budget, sent without ending the
+turn so it doesn't trigger a spoken reply.
+"""
+
+import time
+
+from google.genai import types
+
+# Handles stay valid for a while after a disconnect (2 h per the Live API docs)
+HANDLE_MAX_AGE = 2 * 60 * 60
+
+SUPPORTS_RESUMPTION = hasattr(types, "SessionResumptionConfig")
+SUPPORTS_COMPRESSION = hasattr(types, "ContextWindowCompressionConfig") and hasattr(types, "SlidingWindow")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def build_fallback_context(history: list, token_budget: int = 2000, snippet_chars: int = 80) -> str:
+    """
+    Summarise chat history into a context message that fits `token_budget`.
+
+    The newest messages are kept verbatim (up to ~3/4 of the budget); older
+    ones are shortened to one-line snippets while budget remains, and anything
+    beyond that is only counted.
+
+    Args:
+        history: Chat entries ({"sender", "text"}), oldest first
+        token_budget: Approximate maximum size of the result in tokens
+        snippet_chars: Length older messages are cut to
+
+    Returns:
+        The context message ("" for an empty history)
+    """
+    if not history:
+        return ""
+    header = ("System Notification: The connection was re-established. Conversation so far, "
+              "for context only (do not reply to this message):\n")
+    budget = token_budget - estimate_tokens(header)
+
+    recent = []
+    used = 0
+    index = len(history)
+    while index > 0:
+        entry = history[index - 1]
+        line = f"[{entry.get('sender', 'Unknown')}]: {entry.get('text', '')}\n"
+        cost = estimate_tokens(line)
+        if used + cost > budget * 3 // 4:
+            break
+        recent.append(line)
+        used += cost
+        index -= 1
+    recent.reverse()
+
+    older = []
+    while index > 0:
+        entry = history[index - 1]
+        text = " ".join(entry.get("text", "").split())
+        if len(text) > snippet_chars:
+            text = text[:snippet_chars - 3] + "..."
+        line = f"- {entry.get('sender', 'Unknown')}: {text}\n"
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        older.append(line)
+        used += cost
+        index -= 1
+    older.reverse()
+
+    parts = [header]
+    if index:
+        parts.append(f"({index} earlier messages omitted)\n")
+    if older:
+        parts.append("Earlier (abridged):\n" + "".join(older))
+    parts.append("Most recent:\n" + "".join(recent))
+    return "".join(parts)
+
+
+class LiveResumption:
+    """
+    Tracks the resumption handle of one AudioLoop and reconnect metrics.
+    """
+
+    def __init__(self, enabled: bool = True, compression_trigger_tokens: int = 0,
+                 compression_target_tokens: int = 0):
+        """
+        Args:
+            enabled: Request resumption handles (ignored if the SDK lacks support)
+            compression_trigger_tokens: Context size that triggers sliding-window compression (0 = server default)
+            compression_target_tokens: Size compression shrinks the context to (0 = server default)
+        """
+        self.enabled = enabled and SUPPORTS_RESUMPTION
+        self.compression_trigger_tokens = compression_trigger_tokens
+        self.compression_target_tokens = compression_target_tokens
+
+        self.handle = None
+        self.handle_at = None
+        self.go_away = False  # Server announced it will close the connection
+        self._resuming = False
+        self._lost_at = None
+
+        # Stats
+        self.stats = {"handles": 0, "reconnects": 0, "resumed": 0, "fallbacks": 0, "rejected_handles": 0,
+                      "go_aways": 0, "last_reconnect_ms": None, "total_reconnect_ms": 0,
+                      "last_context_tokens": None}
+
+    def connect_config(self, base, resume: bool = True):
+        """
+        The LiveConnectConfig to connect with: `base` plus resumption and compression settings.
+
+        Args:
+            base: LiveConnectConfig
+            resume: Resume with the current handle; False opens a new session (e.g. a standby)
+        """
+        update = {}
+        if self.enabled:
+            handle = self.usable_handle() if resume else None
+            update["session_resumption"] = types.SessionResumptionConfig(handle=handle)
+        if SUPPORTS_COMPRESSION:
+            window = types.SlidingWindow(target_tokens=self.compression_target_tokens or None)
+            update["context_window_compression"] = types.ContextWindowCompressionConfig(
+                trigger_tokens=self.compression_trigger_tokens or None, sliding_window=window)
+        return base.model_copy(update=update) if update else base
+
+    def usable_handle(self):
+        if self.handle and time.monotonic() - self.handle_at < HANDLE_MAX_AGE:
+            return self.handle
+        return None
+
+    def on_message(self, response):
+        """Pick up handle updates and GoAway notices from a LiveServerMessage."""
+        update = getattr(response, "session_resumption_update", None)
+        if update and update.resumable and update.new_handle:
+            self.handle = update.new_handle
+            self.handle_at = time.monotonic()
+            self.stats["handles"] += 1
+        if getattr(response, "go_away", None):
+            self.go_away = True
+            self.stats["go_aways"] += 1
+            print(f"[ADA DEBUG] [RESUME] Server closing connection soon (time left: {response.go_away.time_left})")
+
+    @property
+    def resuming(self) -> bool:
+        """Whether the current connection was opened with a resumption handle."""
+        return self._resuming
+
+    def opened(self, resumed: bool):
+        """Record how the current connection was opened."""
+        self._resuming = resumed
+
+    def connection_lost(self):
+        if self._lost_at is None:
+            self._lost_at = time.monotonic()
+
+    def resume_failed(self):
+        """Resuming with the current handle failed; stop offering it."""
+        self.stats["rejected_handles"] += 1
+        print("[ADA DEBUG] [RESUME] Resume failed, continuing with a new session")
+        self.handle = None
+        self._resuming = False
+
+    def reconnected(self, context_tokens: int = 0):
+        """
+        Record a completed reconnect.
+
+        Args:
+            context_tokens: Size of the fallback context that was re-sent (0 when resumed)
+        """
+        resumed = self._resuming
+        self.stats["reconnects"] += 1
+        self.stats["resumed" if resumed else "fallbacks"] += 1
+        if self._lost_at is not None:
+            elapsed = round((time.monotonic() - self._lost_at) * 1000)
+            self.stats["last_reconnect_ms"] = elapsed
+            self.stats["total_reconnect_ms"] += elapsed
+        self.stats["last_context_tokens"] = 0 if resumed else context_tokens
+        self._lost_at = None
+        self.go_away = False
+
+    def summary(self) -> dict:
+        s = self.stats
+        reconnects = s["reconnects"]
+        return {
+            **s,
+            "enabled": self.enabled,
+            "has_handle": self.usable_handle() is not None,
+            "handle_reuse_rate": round(s["resumed"] / reconnects, 2) if reconnects else None,
+            "avg_reconnect_ms": round(s["total_reconnect_ms"] / reconnects) if reconnects else None,
+        }
@@ -0,0 +1,450 @@
+"""
+Socket.IO load test for server.py
+
+Starts the backend in a child process with a mocked AudioLoop (no audio
+devices, no Live API) and drives it with N simulated frontends, each of which:
+- connects and starts audio (one session per client)
+- sends video_frame JPEG-sized binary blobs at `fps`, like App.jsx
+- sends user_input every `input_interval` seconds (the mock answers with
+  transcription deltas and audio_data chunks, like a talking model)
+- sends update_settings every `settings_interval` seconds (broadcast to all)
+- probes get_tool_permissions -> tool_permissions round trips
+
+Reported per run: server event-loop lag, request round trip and emit
+fan-out latency percentiles, server RSS growth and CPU, and event counts.
+
+Usage:
+    python load_test.py --clients 20 --duration 30 --fps 12
+    python load_test.py --clients 5 --json
+
+The clients speak Engine.IO v4 / Socket.IO v5 over a plain websocket (the
+`websockets` package google-genai already depends on), so the harness
+doesn't need python-socketio's aiohttp-based client.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+from collections import deque
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentiles(samples) -> dict:
+    """p50/p90/p99/max of a list of millisecond samples (None values when empty)."""
+    if not samples:
+        return {"count": 0, "p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 1)
+
+    return {"count": len(ordered), "p50": pick(50), "p90": pick(90), "p99": pick(99), "max": round(ordered[-1], 1)}
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (peak where only that is available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+# --- Server side (child process) ---
+
+class MockAudioLoop:
+    """
+    Stand-in for ada.AudioLoop with the attributes server.py uses.
+
+    Text turns are answered with transcription deltas (stamped with `sent_at`
+    so clients can measure fan-out latency) and audio_data chunks.
+    """
+
+    stats = {"loops": 0, "frames": 0, "texts": 0, "emitted": 0}  # Whole process
+
+    REPLY = "Sure, here is a simulated answer from the mock model for the load test.".split()
+    AUDIO_CHUNK = bytes(2048)  # ~43 ms of 24 kHz output audio
+
+    def __init__(self, video_mode=None, on_audio_data=None, on_transcription=None, temp_project="temp", **callbacks):
+        from project_manager import ProjectManager
+
+        self.video_mode = video_mode
+        self.on_audio_data = on_audio_data
+        self.on_transcription = on_transcription
+        self.callbacks = callbacks
+        self.project_manager = ProjectManager(os.getcwd(), temp_project=temp_project or "temp")
+        self.session = MockSession(self)
+        self.permissions = {}
+        self.auto_remember = False
+        self.paused = False
+        self._latest_image_payload = None
+        self.stop_event = asyncio.Event()
+
+    def update_permissions(self, new_perms):
+        self.permissions.update(new_perms)
+
+    def set_paused(self, paused):
+        self.paused = paused
+
+    def stop(self):
+        self.stop_event.set()
+
+    async def send_frame(self, frame_data):
+        import base64
+        if isinstance(frame_data, bytes):
+            frame_data = base64.b64encode(frame_data).decode("utf-8")
+        self._latest_image_payload = {"mime_type": "image/jpeg", "data": frame_data}
+        MockAudioLoop.stats["frames"] += 1
+
+    async def run(self):
+        MockAudioLoop.stats["loops"] += 1
+        await self.stop_event.wait()
+
+    async def reply(self):
+        for word in self.REPLY:
+            if self.stop_event.is_set():
+                return
+            if self.on_transcription:
+                self.on_transcription({"sender": "ADA", "text": word + " ", "sent_at": time.time()})
+            if self.on_audio_data:
+                self.on_audio_data(self.AUDIO_CHUNK)
+            MockAudioLoop.stats["emitted"] += 2
+            await asyncio.sleep(0.04)
+
+
+class MockSession:
+    """The Live session of a MockAudioLoop: text turns trigger a reply."""
+
+    def __init__(self, audio_loop):
+        self.audio_loop = audio_loop
+
+    async def send(self, input=None, end_of_turn=False):
+        if isinstance(input, str) and end_of_turn:
+            MockAudioLoop.stats["texts"] += 1
+            asyncio.create_task(self.audio_loop.reply())
+
+
+class LagProbe:
+    """Measures how late a periodic sleep wakes up on the event loop."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.samples = deque(maxlen=100_000)
+
+    async def run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval) * 1000)
+
+    def summary(self, reset: bool = False) -> dict:
+        result = percentiles(list(self.samples))
+        if reset:
+            self.samples.clear()
+        return result
+
+
+def serve(port: int):
+    """Run server.py on `port` with MockAudioLoop in place of ada.AudioLoop (cwd holds its files)."""
+    import types
+
+    sys.path.insert(0, BACKEND_DIR)
+    sys.modules["ada"] = types.ModuleType("ada")
+    sys.modules["ada"].AudioLoop = MockAudioLoop
+
+    import uvicorn
+    import server
+
+    probe = LagProbe()
+
+    @server.app.on_event("startup")
+    async def start_probe():
+        asyncio.create_task(probe.run())
+
+    @server.app.get("/loadtest")
+    async def loadtest_stats(reset: bool = False):
+        times = os.times()
+        return {
+            "lag_ms": probe.summary(reset=reset),
+            "rss_mb": rss_mb(),
+            "cpu_s": round(times.user + times.system, 3),
+            "mock": dict(MockAudioLoop.stats),
+            "emitter": server.emitter.summary(),
+            "slow_callbacks": server.loop_monitor.summary(recent=0) if server.loop_monitor else None,
+            "sessions_live": len(server.sessions.live_sessions()),
+        }
+
+    uvicorn.run(server.app_socketio, host="127.0.0.1", port=port, log_level="warning")
+
+
+# --- Client side ---
+
+class SimClient:
+    """One simulated frontend on a raw Engine.IO websocket."""
+
+    def __init__(self, url: str, index: int):
+        self.url = url
+        self.index = index
+        self.ws = None
+        self._reader = None
+        self._connected = asyncio.Event()
+        self.started = asyncio.Event()
+        self._probe = None  # Future of the outstanding round-trip probe
+
+        self.rtt_ms = []
+        self.fanout_ms = []
+        self.stats = {"sent": 0, "received": 0, "frames": 0, "inputs": 0, "settings": 0, "errors": 0}
+
+    async def connect(self):
+        import websockets
+
+        ws_url = self.url.replace("http://", "ws://") + "/socket.io/?EIO=4&transport=websocket"
+        self.ws = await websockets.connect(ws_url, max_size=None)
+        await self.ws.recv()  # Engine.IO open packet
+        await self.ws.send("40")  # Socket.IO connect to "/"
+        self._reader = asyncio.create_task(self._read())
+        await asyncio.wait_for(self._connected.wait(), 10)
+
+    async def close(self):
+        if self._reader:
+            self._reader.cancel()
+        if self.ws:
+            await self.ws.close()
+
+    async def _read(self):
+        try:
+            async for msg in self.ws:
+                if isinstance(msg, bytes):
+                    continue
+                if msg == "2":  # Engine.IO ping
+                    await self.ws.send("3")
+                elif msg.startswith("40"):
+                    self._connected.set()
+                elif msg.startswith("42"):
+                    event, *args = json.loads(msg[2:])
+                    self._on_event(event, args[0] if args else None)
+        except Exception:
+            self.stats["errors"] += 1
+
+    def _on_event(self, event: str, data):
+        self.stats["received"] += 1
+        if event == "tool_permissions" and self._probe and not self._probe.done():
+            self._probe.set_result(time.perf_counter())
+        elif event == "transcription" and isinstance(data, dict) and "sent_at" in data:
+            self.fanout_ms.append((time.time() - data["sent_at"]) * 1000)
+        elif event == "status" and isinstance(data, dict) and data.get("msg") == "Jarvis Started":
+            self.started.set()
+
+    async def emit(self, event: str, data=None):
+        await self.ws.send("42" + json.dumps([event] if data is None else [event, data]))
+        self.stats["sent"] += 1
+
+    async def emit_blob(self, event: str, key: str, blob: bytes):
+        """Emit {key: blob} the way socket.io-client sends a Blob: a placeholder plus a binary frame."""
+        await self.ws.send("451-" + json.dumps([event, {key: {"_placeholder": True, "num": 0}}]))
+        await self.ws.send(blob)
+        self.stats["sent"] += 1
+
+    async def probe(self, timeout: float = 5.0):
+        self._probe = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self.emit("get_tool_permissions")
+        try:
+            self.rtt_ms.append((await asyncio.wait_for(self._probe, timeout) - start) * 1000)
+        except asyncio.TimeoutError:
+            self.stats["errors"] += 1
+
+    async def traffic(self, duration: float, fps: float, frame: bytes, input_interval: float,
+                      settings_interval: float, probe_interval: float):
+        """Send the event mix for `duration` seconds."""
+        deadline = time.perf_counter() + duration
+
+        async def every(interval, action):
+            if interval <= 0:
+                return
+            # Random phase, so the clients don't fire in lockstep
+            await asyncio.sleep(min(random.uniform(0, interval), max(0.0, deadline - time.perf_counter())))
+            while time.perf_counter() < deadline:
+                await action()
+                await asyncio.sleep(min(interval, max(0.0, deadline - time.perf_counter())))
+
+        async def send_frame():
+            await self.emit_blob("video_frame", "image", frame)
+            self.stats["frames"] += 1
+
+        async def send_input():
+            await self.emit("user_input", {"text": f"Load test message {self.stats['inputs']} from client {self.index}"})
+            self.stats["inputs"] += 1
+
+        async def send_settings():
+            await self.emit("update_settings", {"camera_flipped": bool(self.stats["settings"] % 2)})
+            self.stats["settings"] += 1
+
+        await asyncio.gather(
+            every(1 / fps if fps else 0, send_frame),
+            every(input_interval, send_input),
+            every(settings_interval, send_settings),
+            every(probe_interval, self.probe),
+        )
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+async def run_load_test(clients: int = 10, duration: float = 20.0, fps: float = 12.0, frame_kb: int = 30,
+                        input_interval: float = 5.0, settings_interval: float = 10.0, probe_interval: float = 0.5,
+                        warmup: float = 1.0, log_file: str = None) -> dict:
+    """
+    Start a mocked backend, run `clients` simulated frontends against it and collect stats.
+
+    Args:
+        clients: Number of concurrent frontends (each starts its own session)
+        duration: Seconds of traffic measured
+        fps: video_frame events per second per client
+        frame_kb: Size of each video frame blob
+        input_interval: Seconds between user_input events per client (0 = none)
+        settings_interval: Seconds between update_settings events per client (0 = none)
+        probe_interval: Seconds between round-trip probes per client
+        warmup: Seconds between all sessions running and the start of measurement
+        log_file: Where the server's output goes (discarded if None)
+
+    Returns:
+        Dict of results (see `format_report`)
+    """
+    from startup_profile import wait_until_ready
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "ADA_MAX_SESSIONS": str(clients), "ADA_WARM_START": "0", "ADA_PREIMPORT": "0",
+           "WEB_AGENT_PREWARM": "0", "PYTHONUNBUFFERED": "1"}
+
+    with tempfile.TemporaryDirectory(prefix="ada_load_") as workdir:
+        log = open(log_file, "w") if log_file else subprocess.DEVNULL
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port)],
+                                cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        sims = []
+        try:
+            if await asyncio.to_thread(wait_until_ready, f"{url}/status", 30.0) is None:
+                raise RuntimeError("Backend did not start (pass log_file to see its output)")
+
+            sims = [SimClient(url, i) for i in range(clients)]
+            await asyncio.gather(*(sim.connect() for sim in sims))
+            await asyncio.gather(*(sim.emit("start_audio", {"muted": True}) for sim in sims))
+            await asyncio.wait_for(asyncio.gather(*(sim.started.wait() for sim in sims)), 30)
+            await asyncio.sleep(warmup)
+
+            before = await asyncio.to_thread(_get_json, f"{url}/loadtest?reset=true")
+            start = time.perf_counter()
+            frame = os.urandom(frame_kb * 1024)
+            await asyncio.gather(*(sim.traffic(duration, fps, frame, input_interval, settings_interval, probe_interval)
+                                   for sim in sims))
+            await asyncio.sleep(0.5)  # Let the last replies arrive
+            elapsed = time.perf_counter() - start
+            after = await asyncio.to_thread(_get_json, f"{url}/loadtest")
+        finally:
+            await asyncio.gather(*(sim.close() for sim in sims), return_exceptions=True)
+            proc.terminate()
+            try:
+                await asyncio.to_thread(proc.wait, 10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            if log_file:
+                log.close()
+
+    sent = sum(sim.stats["sent"] for sim in sims)
+    received = sum(sim.stats["received"] for sim in sims)
+    rss_start, rss_end = before["rss_mb"], after["rss_mb"]
+    return {
+        "clients": clients,
+        "elapsed_s": round(elapsed, 2),
+        "events_sent": sent,
+        "events_received": received,
+        "events_per_s": round((sent + received) / elapsed, 1),
+        "frames_processed": after["mock"]["frames"] - before["mock"]["frames"],
+        "frames_sent": sum(sim.stats["frames"] for sim in sims),
+        "loop_lag_ms": after["lag_ms"],
+        "rtt_ms": percentiles([ms for sim in sims for ms in sim.rtt_ms]),
+        "fanout_ms": percentiles([ms for sim in sims for ms in sim.fanout_ms]),
+        "rss_mb": {"start": rss_start, "end": rss_end,
+                   "growth": round(rss_end - rss_start, 1) if rss_start is not None and rss_end is not None else None},
+        "cpu_percent": round((after["cpu_s"] - before["cpu_s"]) / elapsed * 100, 1),
+        "emitter": after["emitter"],
+        "slow_callbacks": after["slow_callbacks"],
+        "client_errors": sum(sim.stats["errors"] for sim in sims),
+    }
+
+
+def format_report(result: dict) -> str:
+    def pct(stats):
+        return f"p50 {stats['p50']}  p90 {stats['p90']}  p99 {stats['p99']}  max {stats['max']}  (n={stats['count']})"
+
+    rss = result["rss_mb"]
+    slow = result["slow_callbacks"]
+    return "\n".join([
+        f"clients            {result['clients']}  ({result['elapsed_s']} s)",
+        f"events             {result['events_sent']} sent, {result['events_received']} received "
+        f"({result['events_per_s']}/s)",
+        f"video frames       {result['frames_processed']} of {result['frames_sent']} processed",
+        f"event-loop lag ms  {pct(result['loop_lag_ms'])}",
+        f"round trip ms      {pct(result['rtt_ms'])}",
+        f"emit fan-out ms    {pct(result['fanout_ms'])}",
+        f"server RSS MB      {rss['start']} -> {rss['end']} ({rss['growth']:+})" if rss["growth"] is not None
+        else "server RSS MB      n/a",
+        f"server CPU         {result['cpu_percent']}%",
+        f"loop stalls        {slow['slow']} over {slow['threshold_ms']:g} ms"
+        + (f" (top: {slow['top_sites'][0]['where']})" if slow["top_sites"] else "") if slow else "loop stalls        n/a",
+        f"client errors      {result['client_errors']}",
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Socket.IO load test for the ADA backend (mocked AudioLoop)")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--fps", type=float, default=12.0)
+    parser.add_argument("--frame-kb", type=int, default=30)
+    parser.add_argument("--input-interval", type=float, default=5.0)
+    parser.add_argument("--settings-interval", type=float, default=10.0)
+    parser.add_argument("--log", help="Write the server's output to this file")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    sys.path.insert(0, BACKEND_DIR)
+    result = asyncio.run(run_load_test(
+        clients=args.clients, duration=args.duration, fps=args.fps, frame_kb=args.frame_kb,
+        input_interval=args.input_interval, settings_interval=args.settings_interval,
+        log_file=os.path.abspath(args.log) if args.log else None))
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
+
+
+if __name__ == "__main__":
+    main()
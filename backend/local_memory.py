@@ -0,0 +1,345 @@
+"""
+LocalMemoryAgent - Offline long-term memory for Jarvis
+
+Drop-in alternative to the Supermemory-backed MemoryAgent that never touches
+the network:
+- Facts are embedded locally and stored in a memory-mapped float32 matrix
+- Content and metadata live in a small SQLite database next to it
+- Recall is a top-k cosine similarity search with NumPy, switching to a coarse
+  IVF index once the store grows past a size threshold
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import asyncio
+import sqlite3
+import threading
+import numpy as np
+
+from memory_agent import BaseMemoryAgent
+
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "long_term_memory",
+    "vector_store",
+)
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder: signed feature hashing of words and character trigrams.
+    Not semantic, but robust to word order and small spelling differences.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str):
+        words = re.findall(r"\w+", text.lower())
+        for w in words:
+            yield "w:" + w, 1.0
+            padded = f"#{w}#"
+            for i in range(len(padded) - 2):
+                yield "c:" + padded[i:i + 3], 0.5
+
+    def embed(self, texts) -> np.ndarray:
+        """
+        Args:
+            texts: List of strings
+
+        Returns:
+            (len(texts), dim) float32 matrix of L2-normalized rows
+        """
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if (h >> 31) & 1 else -1.0
+                out[row, h % self.dim] += sign * weight
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+class SentenceTransformerEmbedder:
+    """Wraps a local sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def embed(self, texts) -> np.ndarray:
+        return self.model.encode(list(texts), normalize_embeddings=True).astype(np.float32)
+
+
+def load_embedder(model_name: str = None):
+    """
+    Returns a local embedder. Uses sentence-transformers when LOCAL_MEMORY_EMBEDDER
+    names a model and the package is installed, else falls back to HashingEmbedder.
+    """
+    model_name = model_name or os.getenv("LOCAL_MEMORY_EMBEDDER")
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except ImportError:
+            print("[MEMORY] Warning: sentence-transformers not installed. Falling back to hashing embedder.")
+        except Exception as e:
+            print(f"[MEMORY] Error loading embedder '{model_name}': {e}. Falling back to hashing embedder.")
+    return HashingEmbedder()
+
+
+class VectorStore:
+    """
+    Memory-mapped float32 vectors plus SQLite metadata. Thread-safe; all methods are blocking.
+
+    Several stores (or processes) may share one path: SQLite allocates rows, and a
+    row's vector is written inside the transaction that inserts it.
+    """
+
+    def __init__(self, path: str, dim: int, embedder_name: str = "", ivf_threshold: int = 20000,
+                 initial_capacity: int = 1024):
+        self.path = path
+        self.dim = dim
+        self.ivf_threshold = ivf_threshold
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        self.vectors_path = os.path.join(path, "vectors.f32")
+
+        self.db = sqlite3.connect(os.path.join(path, "memories.db"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS memories ("
+            "row INTEGER PRIMARY KEY, content TEXT NOT NULL, metadata TEXT, created_at REAL)"
+        )
+        self.db.execute("CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT)")
+        self._check_compatible(embedder_name)
+        self.db.commit()
+
+        self.count = self._row_span()
+        self._open_matrix(max(initial_capacity, self.count))
+
+        # IVF index state (built lazily above ivf_threshold)
+        self._centroids = None
+        self._lists = None
+        self._indexed_count = 0
+
+    def _check_compatible(self, embedder_name):
+        info = dict(self.db.execute("SELECT key, value FROM store_info").fetchall())
+        expected = {"dim": str(self.dim), "embedder": embedder_name}
+        if info and info != expected:
+            raise ValueError(
+                f"Vector store at {self.path} was built with {info}, not {expected}. "
+                "Use a different LOCAL_MEMORY_DIR or delete the store."
+            )
+        self.db.executemany("INSERT OR REPLACE INTO store_info VALUES (?, ?)", expected.items())
+
+    def _row_span(self):
+        """One past the highest committed row (includes rows added by other stores)."""
+        return self.db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM memories").fetchone()[0]
+
+    def _open_matrix(self, capacity):
+        # Never shrink the file: another store on this path may have grown it further
+        with open(self.vectors_path, "ab") as f:
+            existing = f.tell() // (4 * self.dim)
+            if existing < capacity:
+                f.truncate(capacity * self.dim * 4)
+        self.capacity = max(existing, capacity)
+        self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim))
+
+    def _ensure_capacity(self, rows):
+        if rows > self.capacity:
+            self.matrix.flush()
+            del self.matrix
+            self._open_matrix(max(rows, self.capacity * 2))
+
+    def add(self, vector: np.ndarray, content: str, metadata: dict) -> int:
+        with self._lock:
+            # BEGIN IMMEDIATE takes SQLite's write lock, so the row can't be handed out twice
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._row_span()
+                self.db.execute(
+                    "INSERT INTO memories (row, content, metadata, created_at) VALUES (?, ?, ?, ?)",
+                    (row, content, json.dumps(metadata or {}), time.time())
+                )
+                self._ensure_capacity(row + 1)
+                self.matrix[row] = vector
+                self.matrix.flush()
+                self.db.commit()
+            except BaseException:
+                self.db.rollback()
+                raise
+            self.count = max(self.count, row + 1)
+            return row
+
+    def search(self, query: np.ndarray, limit: int, nprobe: int = 8) -> list:
+        """
+        Returns:
+            List of (row, score, content, metadata) sorted by descending cosine similarity
+        """
+        with self._lock:
+            self.count = count = self._row_span()
+            if count == 0:
+                return []
+            self._ensure_capacity(count)
+
+            if count >= self.ivf_threshold:
+                if self._centroids is None or count >= 2 * self._indexed_count:
+                    self._build_ivf(count)
+                candidates = self._ivf_candidates(query, nprobe, count)
+                scores = self.matrix[candidates] @ query
+            else:
+                candidates = None
+                scores = self.matrix[:count] @ query
+
+            k = min(limit, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            rows = [int(candidates[i]) if candidates is not None else int(i) for i in top]
+            top_scores = [float(scores[i]) for i in top]
+
+            placeholders = ",".join("?" * len(rows))
+            found = {
+                r: (c, m) for r, c, m in self.db.execute(
+                    f"SELECT row, content, metadata FROM memories WHERE row IN ({placeholders})", rows
+                )
+            }
+
+        return [
+            (r, s, found[r][0], json.loads(found[r][1] or "{}"))
+            for r, s in zip(rows, top_scores) if r in found
+        ]
+
+    def _build_ivf(self, count, iterations: int = 8):
+        """Coarse k-means quantizer over the first `count` rows."""
+        n_lists = max(1, int(np.sqrt(count)))
+        data = self.matrix[:count]
+        rng = np.random.default_rng(0)
+        sample = data[rng.choice(count, size=min(count, n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assign == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[c] = centroid / norm if norm else centroid
+
+        assign = np.argmax(data @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._lists = [np.flatnonzero(assign == c) for c in range(n_lists)]
+        self._indexed_count = count
+        print(f"[MEMORY] Built IVF index: {n_lists} lists over {count} vectors")
+
+    def _ivf_candidates(self, query, nprobe, count):
+        probes = np.argsort(-(self._centroids @ query))[:nprobe]
+        parts = [self._lists[p] for p in probes]
+        # Rows added since the last build are searched exhaustively
+        if count > self._indexed_count:
+            parts.append(np.arange(self._indexed_count, count))
+        return np.concatenate(parts)
+
+    def close(self):
+        with self._lock:
+            self.matrix.flush()
+            self.db.close()
+
+
+class LocalMemoryAgent(BaseMemoryAgent):
+    """
+    Offline memory backend with the same interface as MemoryAgent.
+    """
+
+    def __init__(self, path: str = None, embedder=None, ivf_threshold: int = 20000):
+        """
+        Args:
+            path: Store directory (defaults to LOCAL_MEMORY_DIR or long_term_memory/vector_store)
+            embedder: Object with `dim`, `name` and `embed(texts)`; defaults to load_embedder()
+            ivf_threshold: Number of stored facts above which the IVF index is used
+        """
+        self.path = path or os.getenv("LOCAL_MEMORY_DIR", DEFAULT_STORE_DIR)
+        self.embedder = embedder or load_embedder()
+        self.store = None
+
+        try:
+            self.store = VectorStore(self.path, self.embedder.dim, self.embedder.name, ivf_threshold=ivf_threshold)
+            print(f"[MEMORY] LocalMemoryAgent initialized ({self.store.count} memories, embedder={self.embedder.name})")
+        except Exception as e:
+            print(f"[MEMORY] Error initializing local memory store: {e}")
+
+    @property
+    def is_available(self) -> bool:
+        """Check if memory agent is properly initialized."""
+        return self.store is not None
+
+    async def close(self) -> None:
+        """Flush and close the store."""
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def _add_sync(self, content, metadata):
+        vector = self.embedder.embed([content])[0]
+        return self.store.add(vector, content, metadata)
+
+    def _search_sync(self, query, limit):
+        vector = self.embedder.embed([query])[0]
+        return self.store.search(vector, limit)
+
+    async def add_memory(self, content: str, metadata: dict = None) -> dict:
+        """
+        Store a memory/fact in the local store.
+
+        Args:
+            content: The text content to remember
+            metadata: Optional metadata (e.g., category, importance)
+
+        Returns:
+            Result dict with status and memory_id
+        """
+        if not self.is_available:
+            return {"success": False, "error": "Memory agent not initialized"}
+
+        try:
+            row = await asyncio.to_thread(self._add_sync, content, metadata)
+            print(f"[MEMORY] Stored local memory: {content[:50]}...")
+            return {"success": True, "memory_id": f"local_{row}"}
+        except Exception as e:
+            print(f"[MEMORY] Error storing local memory: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def search_memories(self, query: str, limit: int = 5) -> list:
+        """
+        Search for relevant memories by cosine similarity.
+
+        Args:
+            query: Natural language search query
+            limit: Maximum number of results to return
+
+        Returns:
+            List of relevant memory objects
+        """
+        if not self.is_available:
+            return []
+
+        try:
+            start = time.perf_counter()
+            results = await asyncio.to_thread(self._search_sync, query, limit)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"[MEMORY] Found {len(results)} local memories for: {query[:30]}... ({elapsed_ms:.1f} ms)")
+            return [
+                {"content": content, "relevance": score}
+                for _, score, content, _ in results
+            ]
+        except Exception as e:
+            print(f"[MEMORY] Error searching local memories: {e}")
+            return []
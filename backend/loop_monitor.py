@@ -0,0 +1,159 @@
+"""
+LoopMonitor - Event-loop lag and blocking-call detection
+
+Everything in server.py shares one asyncio loop, so synchronous work on it
+(settings and chat log writes, project context walks, blocking HTTP calls,
+model construction) stalls audio fan-out without an error anywhere. The
+monitor makes that visible:
+- a heartbeat task sleeps `interval` and records how late it wakes up: the
+  loop lag (histogram for /metrics, percentiles for /status)
+- a watchdog thread notices when the heartbeat is overdue by more than
+  `threshold_ms` and samples the loop thread's stack while it is still
+  blocked, so a stall is attributed to the code that was actually running
+- stalls over the threshold go into a ring buffer of recent offenders (where,
+  how long, stack) and a per-site count
+
+Works with any event loop implementation (no per-callback hooks); stalls
+shorter than `threshold_ms` only show up in the lag histogram.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import deque, Counter
+
+from voice_latency import LatencyHistogram
+
+# Histogram bucket upper bounds (ms)
+LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class LoopMonitor:
+    """
+    Watches the event loop it is started on.
+    """
+
+    def __init__(self, interval: float = 0.02, threshold_ms: float = 50.0, history: int = 50,
+                 stack_depth: int = 12):
+        """
+        Args:
+            interval: Heartbeat period in seconds
+            threshold_ms: Lag from which a stall is recorded as an offender
+            history: Number of recent offenders kept
+            stack_depth: Frames kept per offender stack
+        """
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.stack_depth = stack_depth
+
+        self.lag = LatencyHistogram(window=3000, buckets=LAG_BUCKETS_MS)  # Percentiles over the last ~minute
+        self.offenders = deque(maxlen=history)
+        self.sites = Counter()
+
+        self._expected = None  # perf_counter() at which the heartbeat should wake
+        self._sample = None    # (expected, where, stack) taken by the watchdog during a stall
+        self._loop_thread = None
+        self._task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+        # Stats
+        self.stats = {"slow": 0, "slow_ms_total": 0, "max_lag_ms": 0, "unattributed": 0}
+
+    def start(self):
+        """Start watching the running loop (no-op if already started)."""
+        if self._task and not self._task.done():
+            return
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            self._expected = expected
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+            self._expected = None
+            self.lag.observe(lag_ms)
+            self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], round(lag_ms))
+            if lag_ms >= self.threshold_ms:
+                sample = self._sample
+                self._record(lag_ms, sample if sample and sample[0] == expected else None)
+            self._sample = None
+
+    def _watch(self):
+        poll = min(self.threshold_ms / 4000, 0.01)
+        while not self._stopped.wait(poll):
+            expected = self._expected
+            if expected is None or (self._sample and self._sample[0] == expected):
+                continue
+            if (time.perf_counter() - expected) * 1000 >= self.threshold_ms:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._sample = (expected, *self._describe(frame))
+
+    def _describe(self, frame):
+        """(where, stack lines) of a loop thread frame; `where` is the innermost app frame."""
+        stack = [f for f in traceback.extract_stack(frame) if f.filename != __file__][-self.stack_depth:]
+        if not stack:
+            return None, []
+        app = [f for f in stack if f.filename.startswith(APP_DIR)]
+        site = (app or stack)[-1]
+        where = f"{os.path.basename(site.filename)}:{site.lineno} {site.name}"
+        lines = [f"{os.path.basename(f.filename)}:{f.lineno} {f.name}" for f in stack]
+        return where, lines
+
+    def _record(self, lag_ms: float, sample):
+        where, stack = (sample[1], sample[2]) if sample else (None, [])
+        self.stats["slow"] += 1
+        self.stats["slow_ms_total"] += round(lag_ms)
+        if where is None:
+            self.stats["unattributed"] += 1
+        self.sites[where or "unknown"] += 1
+        self.offenders.append({"at": time.time(), "lag_ms": round(lag_ms), "where": where, "stack": stack})
+        print(f"[LOOP] [WARN] Event loop blocked {lag_ms:.0f} ms" + (f" in {where}" if where else ""))
+
+    def summary(self, recent: int = 10) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "lag_ms": {f"p{p}": self.lag.percentile(p) for p in (50, 90, 99)},
+            **self.stats,
+            "top_sites": [{"where": where, "count": count} for where, count in self.sites.most_common(5)],
+            "recent": list(self.offenders)[-recent:] if recent else [],
+        }
+
+    def prometheus(self) -> list:
+        """Metric lines for /metrics, with their HELP/TYPE lines (process-wide, so emitted once)."""
+        lines = [
+            "# HELP ada_event_loop_lag_ms How late the event loop ran a periodic heartbeat",
+            "# TYPE ada_event_loop_lag_ms histogram",
+        ]
+        lines.extend(f'ada_event_loop_lag_ms_bucket{{le="{bound}"}} {count}' for bound, count in self.lag.cumulative())
+        lines.append(f"ada_event_loop_lag_ms_sum {round(self.lag.sum)}")
+        lines.append(f"ada_event_loop_lag_ms_count {self.lag.count}")
+        lines.extend([
+            "# HELP ada_event_loop_slow_total Stalls of the event loop over the threshold",
+            "# TYPE ada_event_loop_slow_total counter",
+            f"ada_event_loop_slow_total {self.stats['slow']}",
+            "# HELP ada_event_loop_slow_ms_total Time the event loop spent in such stalls",
+            "# TYPE ada_event_loop_slow_ms_total counter",
+            f"ada_event_loop_slow_ms_total {self.stats['slow_ms_total']}",
+        ])
+        return lines
@@ -5,139 +5,503 @@ This agent provides persistent memory capabilities, allowing Jarvis to:
 - Remember facts and preferences about the user
 - Recall relevant context from past conversations
 - Build a dynamic user profile over time
+
+All calls go through a single pooled httpx.AsyncClient (keep-alive connections),
+so memory tools never block the event loop that also drives audio.
+Without an API key, create_memory_agent() falls back to the offline
+LocalMemoryAgent (see local_memory.py).
 """
 
 import os
+import re
+import time
+import random
+import asyncio
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import httpx
 from dotenv import load_dotenv
 
 load_dotenv()
 
-class MemoryAgent:
+DEFAULT_BASE_URL = "https://api.supermemory.ai"
+
+# Status codes worth retrying (rate limits and transient server errors)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# Failures after which a request that isn't safe to repeat (adding a memory) can still be
+# retried: the server refused it (rate limit) or it never left this process
+UNSENT_STATUS = {429}
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class BaseMemoryAgent(ABC):
     """
-    Wraps the Supermemory SDK to provide long-term memory for Jarvis.
+    Shared interface for memory backends. Subclasses implement add_memory and search_memories.
     """
-    
-    def __init__(self):
-        self.api_key = os.getenv("SUPERMEMORY_API_KEY")
+
+    @property
+    def is_available(self) -> bool:
+        """Check if memory agent is properly initialized."""
+        return False
+
+    def start(self) -> None:
+        """Start background work (must be called from the running event loop)."""
+
+    async def close(self) -> None:
+        """Release any resources held by the backend."""
+
+    @abstractmethod
+    async def add_memory(self, content: str, metadata: dict = None) -> dict:
+        """Store a memory; returns {"success": bool, ...}."""
+
+    @abstractmethod
+    async def search_memories(self, query: str, limit: int = 5) -> list:
+        """Returns up to `limit` memories ({"content", "relevance"}) relevant to the query."""
+
+    async def get_context_for_query(self, query: str) -> str:
+        """
+        Get a formatted context string of relevant memories for a query.
+
+        Args:
+            query: The current user query
+
+        Returns:
+            Formatted context string to inject into the conversation
+        """
+        memories = await self.search_memories(query, limit=3)
+
+        if not memories:
+            return ""
+
+        context_parts = ["[Relevant memories from past conversations:]"]
+        for i, mem in enumerate(memories, 1):
+            context_parts.append(f"{i}. {mem['content']}")
+
+        return "\n".join(context_parts)
+
+    async def remember_conversation(self, user_message: str, assistant_response: str) -> None:
+        """
+        Automatically store a conversation exchange for future reference.
+
+        Args:
+            user_message: What the user said
+            assistant_response: How Jarvis responded
+        """
+        if not self.is_available:
+            return
+
+        # Only store meaningful exchanges (not greetings, etc.)
+        if len(user_message) < 20 or len(assistant_response) < 20:
+            return
+
+        summary = f"User asked: {user_message[:100]}... | Jarvis responded about: {assistant_response[:100]}..."
+
+        await self.add_memory(
+            content=summary,
+            metadata={"type": "conversation", "auto_saved": True}
+        )
+
+
+class MemoryAgent(BaseMemoryAgent):
+    """
+    Async client for the Supermemory REST API providing long-term memory for Jarvis.
+    """
+
+    def __init__(self, api_key: str = None, base_url: str = None, timeout: float = 5.0,
+                 max_retries: int = 2, max_connections: int = 4):
+        """
+        Args:
+            api_key: Supermemory API key (defaults to SUPERMEMORY_API_KEY)
+            base_url: API base URL (defaults to SUPERMEMORY_BASE_URL or the hosted API)
+            timeout: Per-call deadline in seconds, covering every retry attempt (each
+                attempt gets an equal share, so a hung attempt leaves time for a retry)
+            max_retries: Retries for timeouts, connection errors and retryable statuses
+            max_connections: Size of the keep-alive connection pool
+        """
+        self.api_key = api_key or os.getenv("SUPERMEMORY_API_KEY")
+        self.base_url = base_url or os.getenv("SUPERMEMORY_BASE_URL", DEFAULT_BASE_URL)
+        self.timeout = timeout
+        self.max_retries = max_retries
         self.client = None
         self._initialized = False
-        
+
+        # Stats
+        self.stats = {"requests": 0, "retries": 0, "timeouts": 0, "errors": 0}
+
         if not self.api_key:
             print("[MEMORY] Warning: SUPERMEMORY_API_KEY not found in .env")
             print("[MEMORY] Memory features will be disabled. Get a free key at supermemory.ai")
             return
-            
+
         try:
-            from supermemory import Supermemory
-            self.client = Supermemory(api_key=self.api_key)
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(timeout),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=60.0,
+                ),
+            )
             self._initialized = True
             print("[MEMORY] MemoryAgent initialized successfully")
-        except ImportError:
-            print("[MEMORY] Warning: supermemory package not installed. Run: pip install supermemory")
         except Exception as e:
             print(f"[MEMORY] Error initializing Supermemory client: {e}")
-    
+
     @property
     def is_available(self) -> bool:
         """Check if memory agent is properly initialized."""
         return self._initialized and self.client is not None
-    
+
+    async def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def _post(self, path: str, payload: dict, idempotent: bool = True) -> dict:
+        """
+        POST to the API with a per-call deadline and jittered exponential backoff.
+
+        Args:
+            path: API path (e.g. "/v4/search")
+            payload: JSON body
+            idempotent: False for requests that must not be repeated once the server may
+                have received them; those are only retried after UNSENT_STATUS/UNSENT_ERRORS
+
+        Returns:
+            Decoded JSON response
+
+        Raises:
+            httpx.HTTPError or asyncio.TimeoutError once retries are exhausted
+        """
+        attempt_timeout = self.timeout / (self.max_retries + 1)
+        retry_status = RETRYABLE_STATUS if idempotent else UNSENT_STATUS
+
+        async def attempt_loop():
+            attempt = 0
+            while True:
+                self.stats["requests"] += 1
+                try:
+                    response = await self.client.post(path, json=payload, timeout=attempt_timeout)
+                    if response.status_code not in retry_status or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        return response.json()
+                except httpx.TransportError as e:
+                    if attempt >= self.max_retries or not (idempotent or isinstance(e, UNSENT_ERRORS)):
+                        raise
+
+                # Full jitter: sleep a random slice of the exponential window
+                attempt += 1
+                self.stats["retries"] += 1
+                await asyncio.sleep(random.uniform(0, min(2.0, 0.1 * (2 ** attempt))))
+
+        try:
+            return await asyncio.wait_for(attempt_loop(), timeout=self.timeout)
+        except (asyncio.TimeoutError, httpx.TimeoutException) as e:
+            self.stats["timeouts"] += 1
+            raise asyncio.TimeoutError() from e
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
     async def add_memory(self, content: str, metadata: dict = None) -> dict:
         """
         Store a memory/fact in long-term storage.
-        
+
         Args:
             content: The text content to remember
             metadata: Optional metadata (e.g., category, importance)
-            
+
         Returns:
             Result dict with status and memory_id
         """
         if not self.is_available:
             return {"success": False, "error": "Memory agent not initialized"}
-        
+
         try:
-            # Add memory using Supermemory SDK
-            result = self.client.memories.add(
-                content=content,
-                metadata=metadata or {}
-            )
+            # Not idempotent: a retried add could store the memory twice
+            result = await self._post("/v3/documents", {
+                "content": content,
+                "metadata": metadata or {}
+            }, idempotent=False)
             print(f"[MEMORY] Stored memory: {content[:50]}...")
-            return {"success": True, "memory_id": result.id if hasattr(result, 'id') else None}
+            return {"success": True, "memory_id": result.get("id")}
+        except asyncio.TimeoutError:
+            print(f"[MEMORY] Timed out storing memory after {self.timeout}s")
+            return {"success": False, "error": "Memory service timed out"}
+        except httpx.HTTPStatusError as e:
+            print(f"[MEMORY] Error storing memory: {e}")
+            status = e.response.status_code
+            # The request itself was refused; sending it again won't help. Auth errors and
+            # timeouts/rate limits are about the account or the moment, not the memory.
+            permanent = 400 <= status < 500 and status not in (401, 403, 408, 429)
+            return {"success": False, "error": str(e), "permanent": permanent}
         except Exception as e:
             print(f"[MEMORY] Error storing memory: {e}")
             return {"success": False, "error": str(e)}
-    
+
     async def search_memories(self, query: str, limit: int = 5) -> list:
         """
         Search for relevant memories based on a query.
-        
+
         Args:
             query: Natural language search query
             limit: Maximum number of results to return
-            
+
         Returns:
             List of relevant memory objects
         """
         if not self.is_available:
             return []
-        
+
         try:
-            results = self.client.memories.search(
-                query=query,
-                limit=limit
-            )
+            data = await self._post("/v4/search", {"q": query, "limit": limit})
+            results = data.get("results", [])
             print(f"[MEMORY] Found {len(results)} relevant memories for: {query[:30]}...")
             return [
                 {
-                    "content": r.content if hasattr(r, 'content') else str(r),
-                    "relevance": r.score if hasattr(r, 'score') else None
+                    "content": r.get("memory") or r.get("chunk") or "",
+                    "relevance": r.get("similarity")
                 }
                 for r in results
             ]
+        except asyncio.TimeoutError:
+            print(f"[MEMORY] Timed out searching memories after {self.timeout}s")
+            return []
         except Exception as e:
             print(f"[MEMORY] Error searching memories: {e}")
             return []
-    
-    async def get_context_for_query(self, query: str) -> str:
+
+
+class CachingMemoryAgent(BaseMemoryAgent):
+    """
+    Wraps a memory backend with a normalized-query LRU cache and speculative prefetch.
+
+    Searches with the same normalized query (case, punctuation, stopwords and word
+    order ignored) within the TTL are answered from memory, and the cache is
+    cleared whenever a new memory is stored. Queries that differ in any content
+    word ("sister" / "brother") never share results.
+    """
+
+    STOPWORDS = {
+        "a", "an", "the", "is", "are", "was", "were", "do", "does", "did", "i", "me", "my",
+        "you", "your", "what", "which", "who", "about", "of", "to", "for", "in", "on", "and",
+        "or", "it", "that", "this", "can", "could", "please", "remember", "recall", "tell",
+    }
+
+    def __init__(self, backend: BaseMemoryAgent, max_entries: int = 128, ttl: float = 300.0):
         """
-        Get a formatted context string of relevant memories for a query.
-        
         Args:
-            query: The current user query
-            
+            backend: The memory backend to wrap
+            max_entries: Maximum number of cached queries
+            ttl: Seconds a cached result stays valid
+        """
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._cache = OrderedDict()  # key -> (timestamp, limit, results)
+        self._inflight = {}  # key -> (limit, task)
+        self._generation = 0
+
+        # Stats
+        self.stats = {"hits": 0, "misses": 0, "prefetches": 0, "invalidations": 0}
+
+    @property
+    def is_available(self) -> bool:
+        return self.backend.is_available
+
+    def start(self) -> None:
+        self.backend.start()
+
+    async def close(self) -> None:
+        for _, task in self._inflight.values():
+            task.cancel()
+        await self.backend.close()
+
+    @classmethod
+    def normalize(cls, query: str):
+        """Returns (cache key, token set) for a query."""
+        words = re.findall(r"\w+", query.lower())
+        tokens = frozenset(w for w in words if w not in cls.STOPWORDS) or frozenset(words)
+        return " ".join(sorted(tokens)), tokens
+
+    def invalidate(self) -> None:
+        """Drop all cached results (in-flight searches won't be cached either)."""
+        self._cache.clear()
+        self._generation += 1
+        self.stats["invalidations"] += 1
+
+    def _lookup(self, key, limit):
+        entry = self._cache.get(key)
+        if entry and entry[1] >= limit and time.monotonic() - entry[0] < self.ttl:
+            self._cache.move_to_end(key)
+            return entry[2][:limit]
+        return None
+
+    def _find_inflight(self, key, limit):
+        entry = self._inflight.get(key)
+        if entry and entry[0] >= limit:
+            return entry[1]
+        return None
+
+    def _start_search(self, key, query, limit):
+        generation = self._generation
+
+        async def run():
+            try:
+                results = await self.backend.search_memories(query, limit=limit)
+                # Empty results may just mean the backend failed; don't pin them
+                if results and generation == self._generation:
+                    self._cache[key] = (time.monotonic(), limit, results)
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+                return results
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.create_task(run())
+        self._inflight[key] = (limit, task)
+        return task
+
+    def prefetch(self, query: str, limit: int = 5):
+        """
+        Start a background search so a later search for the same topic hits a warm cache.
+
         Returns:
-            Formatted context string to inject into the conversation
+            The background task, or None if the result is already cached or being fetched
         """
-        memories = await self.search_memories(query, limit=3)
-        
-        if not memories:
-            return ""
-        
-        context_parts = ["[Relevant memories from past conversations:]"]
-        for i, mem in enumerate(memories, 1):
-            context_parts.append(f"{i}. {mem['content']}")
-        
-        return "\n".join(context_parts)
-    
-    async def remember_conversation(self, user_message: str, assistant_response: str) -> None:
+        if not self.is_available:
+            return None
+        key, tokens = self.normalize(query)
+        if len(tokens) < 2:
+            return None
+        if self._lookup(key, limit) is not None or self._find_inflight(key, limit):
+            return None
+        self.stats["prefetches"] += 1
+        print(f"[MEMORY] Prefetching memories for: {query[:30]}...")
+        return self._start_search(key, query, limit)
+
+    async def add_memory(self, content: str, metadata: dict = None) -> dict:
+        result = await self.backend.add_memory(content, metadata)
+        if result.get("success"):
+            self.invalidate()
+        return result
+
+    async def search_memories(self, query: str, limit: int = 5) -> list:
+        if not self.is_available:
+            return []
+
+        key, _ = self.normalize(query)
+        cached = self._lookup(key, limit)
+        if cached is not None:
+            self.stats["hits"] += 1
+            print(f"[MEMORY] Cache hit for: {query[:30]}...")
+            return list(cached)
+
+        task = self._find_inflight(key, limit)
+        if task is not None:
+            self.stats["hits"] += 1
+            return list((await asyncio.shield(task))[:limit])
+
+        self.stats["misses"] += 1
+        return list(await asyncio.shield(self._start_search(key, query, limit)))
+
+
+class TurnRecall:
+    """
+    Serves the user's latest utterance's prefetch to the next recall in the same turn.
+
+    recall_memories runs the model's own rephrasing of what the user said, which
+    rarely normalizes to the same key as the utterance, so an exact-key cache alone
+    wouldn't reuse the prefetch. One per AudioLoop (the memory agent is shared).
+    """
+
+    def __init__(self, agent: BaseMemoryAgent, ttl: float = 30.0):
         """
-        Automatically store a conversation exchange for future reference.
-        
         Args:
-            user_message: What the user said
-            assistant_response: How Jarvis responded
+            agent: The memory agent (prefetching needs a CachingMemoryAgent)
+            ttl: Seconds after the utterance during which a recall may use its prefetch
         """
-        if not self.is_available:
+        self.agent = agent
+        self.ttl = ttl
+        self._slot = None  # (timestamp, utterance)
+
+        # Stats
+        self.stats = {"served": 0, "fallbacks": 0}
+
+    def utterance(self, text: str) -> None:
+        """A user utterance finished transcribing: prefetch it and make it the turn's slot."""
+        prefetch = getattr(self.agent, "prefetch", None)
+        if prefetch is None:
             return
-        
-        # Only store meaningful exchanges (not greetings, etc.)
-        if len(user_message) < 20 or len(assistant_response) < 20:
+        try:
+            prefetch(text)
+        except Exception as e:
+            print(f"[MEMORY] [ERR] Memory prefetch failed: {e}")
             return
-        
-        summary = f"User asked: {user_message[:100]}... | Jarvis responded about: {assistant_response[:100]}..."
-        
-        await self.add_memory(
-            content=summary,
-            metadata={"type": "conversation", "auto_saved": True}
-        )
+        self._slot = (time.monotonic(), text)
+
+    async def recall(self, query: str, limit: int = 5) -> list:
+        """
+        Results for a recall_memories call: the turn's prefetch (waiting for it if it is
+        still in flight) the first time, else a search for `query`.
+        """
+        slot, self._slot = self._slot, None
+        if slot is not None and time.monotonic() - slot[0] < self.ttl:
+            # Same key as the prefetch, so this is a cache hit or joins the in-flight search
+            results = await self.agent.search_memories(slot[1], limit=limit)
+            if results:
+                self.stats["served"] += 1
+                return results
+            self.stats["fallbacks"] += 1
+        return await self.agent.search_memories(query, limit=limit)
+
+
+def create_memory_agent() -> BaseMemoryAgent:
+    """
+    Pick the memory backend from the environment.
+
+    MEMORY_BACKEND=local|supermemory forces a backend; otherwise Supermemory is used
+    when SUPERMEMORY_API_KEY is set and the offline local store when it is not.
+    Writes go through a WriteBehindMemoryAgent outbox (MEMORY_WRITE_BEHIND=0 disables it)
+    and reads through a CachingMemoryAgent.
+    """
+    backend = os.getenv("MEMORY_BACKEND", "").lower()
+    if backend == "supermemory" or (backend != "local" and os.getenv("SUPERMEMORY_API_KEY")):
+        agent = MemoryAgent()
+    else:
+        from local_memory import LocalMemoryAgent
+        agent = LocalMemoryAgent()
+
+    if agent.is_available and os.getenv("MEMORY_WRITE_BEHIND", "1") != "0":
+        from memory_outbox import WriteBehindMemoryAgent
+        agent = WriteBehindMemoryAgent(agent)
+
+    return CachingMemoryAgent(agent)
+
+
+_shared = None
+
+
+def get_memory_agent() -> BaseMemoryAgent:
+    """
+    Process-wide memory agent, created on first use.
+
+    Every AudioLoop (live session, warm standby) shares it, so there is one outbox
+    worker and one open store per process. Close it with close_memory_agent().
+    """
+    global _shared
+    if _shared is None:
+        _shared = create_memory_agent()
+    return _shared
+
+
+async def close_memory_agent() -> None:
+    """Flush and close the process-wide memory agent (no-op if it was never created)."""
+    global _shared
+    agent, _shared = _shared, None
+    if agent is not None:
+        await agent.close()
@@ -0,0 +1,365 @@
+"""
+WriteBehindMemoryAgent - Durable write-behind queue for long-term memory
+
+add_memory returns as soon as the fact is in a local SQLite outbox. A background
+worker uploads queued facts to the real backend in batches (when enough are
+queued or after a short interval). Queued facts survive restarts and backend
+outages: a failed upload is retried with exponential backoff until it goes
+through, and only a fact the backend rejects outright (a 4xx other than 429)
+is dropped. Near-identical facts are collapsed before they are uploaded (never when they
+differ in a number, date or time: "at 9am" vs "at 11am" is a correction).
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import difflib
+import threading
+
+from memory_agent import BaseMemoryAgent, CachingMemoryAgent
+
+DEFAULT_OUTBOX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "long_term_memory",
+    "outbox.db",
+)
+
+
+def fingerprint(text: str) -> str:
+    """Lowercased, lightly stemmed word sequence used to spot duplicate facts."""
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words)
+
+
+TEMPORAL_WORDS = {
+    "january", "february", "march", "april", "may", "june", "july", "august", "september",
+    "october", "november", "december", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep",
+    "sept", "oct", "nov", "dec", "monday", "tuesday", "wednesday", "thursday", "friday",
+    "saturday", "sunday", "today", "tonight", "tomorrow", "yesterday", "morning", "afternoon",
+    "evening", "noon", "midnight", "am", "pm", "one", "two", "three", "four", "five", "six",
+    "seven", "eight", "nine", "ten", "eleven", "twelve",
+}
+
+
+def specifics(words) -> set:
+    """Numbers, dates and times in a fingerprint's words; facts differing in these are never duplicates."""
+    return {w for w in words if w in TEMPORAL_WORDS or any(c.isdigit() for c in w)}
+
+
+class MemoryOutbox:
+    """
+    SQLite-backed queue of facts waiting to be uploaded. Thread-safe; all methods are blocking.
+    """
+
+    def __init__(self, path: str, similarity: float = 0.92, history_size: int = 500):
+        """
+        Args:
+            path: SQLite database file
+            similarity: Word-sequence similarity above which two facts count as duplicates
+            history_size: Number of uploaded fingerprints kept for deduplication
+        """
+        self.path = path
+        self.similarity = similarity
+        self.history_size = history_size
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, content TEXT NOT NULL, metadata TEXT, "
+            "fingerprint TEXT NOT NULL, created_at REAL, attempts INTEGER DEFAULT 0, "
+            "next_attempt_at REAL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(outbox)")]
+        if "next_attempt_at" not in columns:
+            self.db.execute("ALTER TABLE outbox ADD COLUMN next_attempt_at REAL DEFAULT 0")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS uploaded (fingerprint TEXT PRIMARY KEY, uploaded_at REAL)"
+        )
+        self.db.commit()
+
+    def _find_duplicate(self, fp):
+        words = fp.split()
+        rows = self.db.execute("SELECT id, fingerprint FROM outbox").fetchall()
+        rows += [(None, f) for (f,) in self.db.execute("SELECT fingerprint FROM uploaded")]
+        for row_id, other in rows:
+            if other == fp:
+                return row_id, True
+            # Word-level comparison: a long fact with a filler word added is a duplicate,
+            # but "exam is in march" vs "exam is in may" is not
+            other_words = other.split()
+            if specifics(other_words) != specifics(words):
+                continue
+            if abs(len(other_words) - len(words)) <= len(words) * (1 - self.similarity) and \
+                    difflib.SequenceMatcher(None, words, other_words).ratio() >= self.similarity:
+                return row_id, True
+        return None, False
+
+    def enqueue(self, content: str, metadata: dict = None) -> dict:
+        """
+        Returns:
+            {"id": outbox row id or None, "duplicate": bool}
+        """
+        fp = fingerprint(content)
+        with self._lock:
+            row_id, duplicate = self._find_duplicate(fp)
+            if duplicate:
+                return {"id": row_id, "duplicate": True}
+            cursor = self.db.execute(
+                "INSERT INTO outbox (content, metadata, fingerprint, created_at) VALUES (?, ?, ?, ?)",
+                (content, json.dumps(metadata or {}), fp, time.time())
+            )
+            self.db.commit()
+            return {"id": cursor.lastrowid, "duplicate": False}
+
+    def pending(self, limit: int = None, due_only: bool = False) -> list:
+        """
+        Returns [(id, content, metadata, attempts)] oldest first.
+
+        Args:
+            limit: Maximum number of rows
+            due_only: Skip facts still backing off after a failed upload
+        """
+        sql = "SELECT id, content, metadata, attempts FROM outbox"
+        params = ()
+        if due_only:
+            sql += " WHERE next_attempt_at <= ?"
+            params = (time.time(),)
+        sql += " ORDER BY id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self.db.execute(sql, params).fetchall()
+        return [(i, c, json.loads(m or "{}"), a) for i, c, m, a in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def mark_uploaded(self, ids):
+        with self._lock:
+            now = time.time()
+            for row_id in ids:
+                row = self.db.execute("SELECT fingerprint FROM outbox WHERE id = ?", (row_id,)).fetchone()
+                if row:
+                    self.db.execute("INSERT OR REPLACE INTO uploaded VALUES (?, ?)", (row[0], now))
+                self.db.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+            self.db.execute(
+                "DELETE FROM uploaded WHERE fingerprint NOT IN "
+                "(SELECT fingerprint FROM uploaded ORDER BY uploaded_at DESC LIMIT ?)",
+                (self.history_size,)
+            )
+            self.db.commit()
+
+    def mark_failed(self, ids, retry_delay: float, max_retry_delay: float):
+        """Bumps attempt counts and holds the facts back for retry_delay * 2^(attempts - 1), capped."""
+        with self._lock:
+            now = time.time()
+            for row_id in ids:
+                row = self.db.execute("SELECT attempts FROM outbox WHERE id = ?", (row_id,)).fetchone()
+                if row is None:
+                    continue
+                delay = min(max_retry_delay, retry_delay * 2 ** row[0])
+                self.db.execute(
+                    "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ? WHERE id = ?",
+                    (now + delay, row_id)
+                )
+            self.db.commit()
+
+    def drop(self, ids):
+        """Removes facts the backend rejected for good."""
+        with self._lock:
+            for row_id in ids:
+                self.db.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+            self.db.commit()
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+
+class WriteBehindMemoryAgent(BaseMemoryAgent):
+    """
+    Acknowledges add_memory from a local outbox and uploads to the backend in batches.
+    """
+
+    def __init__(self, backend: BaseMemoryAgent, path: str = None, batch_size: int = 10,
+                 flush_interval: float = 5.0, retry_delay: float = 5.0, max_retry_delay: float = 600.0):
+        """
+        Args:
+            backend: The memory backend that receives uploads
+            path: Outbox database (defaults to MEMORY_OUTBOX_PATH or long_term_memory/outbox.db)
+            batch_size: Queued facts that trigger an immediate flush (and max per batch)
+            flush_interval: Seconds between time-triggered flushes
+            retry_delay: Backoff after a fact's first failed upload (doubles with each failure)
+            max_retry_delay: Longest backoff between upload attempts
+        """
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.outbox = MemoryOutbox(path or os.getenv("MEMORY_OUTBOX_PATH", DEFAULT_OUTBOX_PATH))
+        self._wake = None
+        self._worker = None
+        self._flush_lock = None
+
+        # Stats
+        self.stats = {"queued": 0, "deduplicated": 0, "uploaded": 0, "failed": 0, "dropped": 0, "batches": 0}
+
+        pending = self.outbox.count()
+        if pending:
+            print(f"[MEMORY] Outbox has {pending} fact(s) from a previous session; they will be uploaded.")
+
+    @property
+    def is_available(self) -> bool:
+        return self.backend.is_available
+
+    def start(self) -> None:
+        """Start the background uploader (also drains facts left over from a previous run)."""
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        moved = self._worker is not None and self._worker.get_loop() is not loop
+        if self._worker is None or self._worker.done() or moved:
+            self._wake = asyncio.Event()
+            if self._flush_lock is None or moved:
+                self._flush_lock = asyncio.Lock()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[MEMORY] [ERR] Outbox flush failed: {e}")
+
+    async def flush(self) -> int:
+        """
+        Upload everything currently queued (and not backing off), one batch at a time.
+
+        Returns:
+            Number of facts uploaded
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        uploaded = 0
+        async with self._flush_lock:
+            while self.backend.is_available:
+                batch = await asyncio.to_thread(self.outbox.pending, self.batch_size, True)
+                if not batch:
+                    break
+
+                results = await asyncio.gather(
+                    *[self.backend.add_memory(content, metadata) for _, content, metadata, _ in batch],
+                    return_exceptions=True
+                )
+                ok, failed, rejected = [], [], []
+                for row, r in zip(batch, results):
+                    if isinstance(r, dict) and r.get("success"):
+                        ok.append(row[0])
+                    elif isinstance(r, dict) and r.get("permanent"):
+                        rejected.append(row[0])
+                        print(f"[MEMORY] [ERR] Backend rejected memory, dropping it ({r.get('error')}): {row[1][:50]}...")
+                    else:
+                        failed.append(row[0])
+
+                if ok:
+                    await asyncio.to_thread(self.outbox.mark_uploaded, ok)
+                if failed:
+                    await asyncio.to_thread(self.outbox.mark_failed, failed, self.retry_delay, self.max_retry_delay)
+                if rejected:
+                    await asyncio.to_thread(self.outbox.drop, rejected)
+                    self.stats["dropped"] += len(rejected)
+
+                self.stats["batches"] += 1
+                self.stats["uploaded"] += len(ok)
+                self.stats["failed"] += len(failed)
+                uploaded += len(ok)
+                print(f"[MEMORY] Outbox batch: {len(ok)} uploaded, {len(failed)} failed")
+
+                # The backend is struggling; leave the rest for a later flush instead of spinning
+                if failed:
+                    break
+        return uploaded
+
+    async def close(self) -> None:
+        """Try a final flush, then stop the worker and close everything."""
+        if self._worker is not None:
+            self._worker.cancel()
+        try:
+            await asyncio.wait_for(self.flush(), timeout=5.0)
+        except Exception as e:
+            print(f"[MEMORY] Outbox not fully flushed on close ({e}); it will resume next start.")
+        self.outbox.close()
+        await self.backend.close()
+
+    async def add_memory(self, content: str, metadata: dict = None) -> dict:
+        """
+        Queue a memory for upload and acknowledge immediately.
+
+        Args:
+            content: The text content to remember
+            metadata: Optional metadata (e.g., category, importance)
+
+        Returns:
+            Result dict with status and memory_id (an outbox id)
+        """
+        if not self.is_available:
+            return {"success": False, "error": "Memory agent not initialized"}
+
+        try:
+            entry = await asyncio.to_thread(self.outbox.enqueue, content, metadata)
+        except Exception as e:
+            print(f"[MEMORY] Error queueing memory: {e}")
+            return {"success": False, "error": str(e)}
+
+        self._ensure_worker()
+        if entry["duplicate"]:
+            self.stats["deduplicated"] += 1
+            print(f"[MEMORY] Skipped duplicate memory: {content[:50]}...")
+            return {"success": True, "memory_id": None, "duplicate": True}
+
+        self.stats["queued"] += 1
+        print(f"[MEMORY] Queued memory: {content[:50]}...")
+        if await asyncio.to_thread(self.outbox.count) >= self.batch_size:
+            self._wake.set()
+        return {"success": True, "memory_id": f"outbox_{entry['id']}", "queued": True}
+
+    async def search_memories(self, query: str, limit: int = 5) -> list:
+        """
+        Search the backend, including still-queued facts that match the query.
+
+        Args:
+            query: Natural language search query
+            limit: Maximum number of results to return
+
+        Returns:
+            List of relevant memory objects
+        """
+        results = await self.backend.search_memories(query, limit=limit)
+
+        _, tokens = CachingMemoryAgent.normalize(query)
+        if tokens:
+            known = {r["content"] for r in results}
+            queued = [
+                {"content": content, "relevance": None}
+                for _, content, _, _ in await asyncio.to_thread(self.outbox.pending)
+                if content not in known and tokens & CachingMemoryAgent.normalize(content)[1]
+            ]
+            results = queued + results
+        return results[:limit]
@@ -0,0 +1,161 @@
+"""
+PageSettler - Adaptive "wait until the page is stable" for the web agent
+
+Replaces the fixed sleep after each browser action. A page counts as settled
+once, for a short quiet window, all of these hold:
+- the document has reached `domcontentloaded`
+- no network requests are in flight (long-polls and streams older than
+  `stale_request` seconds are ignored)
+- no DOM mutations have happened (MutationObserver)
+- two consecutive low-quality screenshots are identical (optional)
+The wait always ends by `max_wait`, settled or not.
+"""
+
+import time
+import asyncio
+import hashlib
+
+# Installed on every document; records the time of the last DOM mutation
+MUTATION_SCRIPT = """
+(() => {
+    if (window.__adaSettle) return;
+    window.__adaSettle = { last: performance.now() };
+    const observer = new MutationObserver(() => { window.__adaSettle.last = performance.now(); });
+    const start = () => observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    if (document.documentElement) start(); else document.addEventListener('DOMContentLoaded', start);
+})()
+"""
+
+QUIET_SCRIPT = "() => window.__adaSettle ? performance.now() - window.__adaSettle.last : null"
+
+
+class PageSettler:
+    """
+    Tracks a page's network activity and waits for it to settle after actions.
+    """
+
+    def __init__(self, page, quiet_ms: int = 150, max_wait: float = 3.0, poll_interval: float = 0.05,
+                 pixel_check: bool = True, stale_request: float = 1.0):
+        """
+        Args:
+            page: Playwright Page
+            quiet_ms: How long network and DOM must stay idle to count as settled
+            max_wait: Upper bound in seconds for a single wait
+            poll_interval: Seconds between stability checks
+            pixel_check: Also require two identical consecutive screenshots
+            stale_request: Requests in flight longer than this (seconds) no longer block settling
+        """
+        self.page = page
+        self.quiet_ms = quiet_ms
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.pixel_check = pixel_check
+        self.stale_request = stale_request
+
+        self._inflight = {}
+        self._last_network = time.monotonic()
+
+        # Stats
+        self.stats = {"waits": 0, "timeouts": 0, "total_ms": 0.0}
+
+    async def attach(self):
+        """Start listening for requests and install the mutation observer."""
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_request_done)
+        self.page.on("requestfailed", self._on_request_done)
+        await self.page.context.add_init_script(MUTATION_SCRIPT)
+        try:
+            await self.page.evaluate(MUTATION_SCRIPT)
+        except Exception:
+            pass
+
+    def _on_request(self, request):
+        if request.resource_type in ("websocket", "eventsource"):
+            return
+        self._inflight[request] = time.monotonic()
+        self._last_network = time.monotonic()
+
+    def _on_request_done(self, request):
+        if self._inflight.pop(request, None) is not None:
+            self._last_network = time.monotonic()
+
+    @property
+    def inflight(self) -> int:
+        """Requests in flight that still block settling."""
+        cutoff = time.monotonic() - self.stale_request
+        return sum(1 for started in self._inflight.values() if started > cutoff)
+
+    async def _dom_quiet_ms(self):
+        try:
+            quiet = await self.page.evaluate(QUIET_SCRIPT)
+            if quiet is None:
+                # New document that loaded before the init script applied
+                await self.page.evaluate(MUTATION_SCRIPT)
+            return quiet
+        except Exception:
+            # Execution context destroyed mid-navigation
+            return None
+
+    async def _frame_hash(self):
+        try:
+            data = await self.page.screenshot(type="jpeg", quality=20)
+            return hashlib.sha1(data).digest()
+        except Exception:
+            return None
+
+    async def wait(self, max_wait: float = None, min_wait: float = 0.0) -> dict:
+        """
+        Wait until the page is stable or max_wait elapses.
+
+        Args:
+            max_wait: Override the default upper bound (seconds)
+            min_wait: Always wait at least this long (seconds)
+
+        Returns:
+            {"waited_ms": float, "settled": bool}
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        start = time.monotonic()
+        deadline = start + max_wait
+        quiet_s = self.quiet_ms / 1000
+        last_frame = None
+        settled = False
+
+        try:
+            await self.page.wait_for_load_state("domcontentloaded", timeout=max_wait * 1000)
+        except Exception:
+            pass
+
+        while True:
+            now = time.monotonic()
+            if now - start >= min_wait:
+                # The quiet window starts no earlier than the wait itself, so requests an action
+                # triggers a few ms later are still seen
+                network_quiet = not self.inflight and now - max(self._last_network, start) >= quiet_s
+                if network_quiet:
+                    dom_quiet = await self._dom_quiet_ms()
+                    if dom_quiet is not None and dom_quiet >= self.quiet_ms:
+                        if not self.pixel_check:
+                            settled = True
+                            break
+                        frame = await self._frame_hash()
+                        if frame is not None and frame == last_frame:
+                            settled = True
+                            break
+                        last_frame = frame
+                    else:
+                        last_frame = None
+                else:
+                    last_frame = None
+
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        waited_ms = (time.monotonic() - start) * 1000
+        self.stats["waits"] += 1
+        self.stats["total_ms"] += waited_ms
+        if not settled:
+            self.stats["timeouts"] += 1
+            print(f"[WEB] Page not settled after {waited_ms:.0f} ms ({self.inflight} request(s) in flight)")
+        return {"waited_ms": waited_ms, "settled": settled}
@@ -0,0 +1,123 @@
+"""
+PreviewStream - Cheap screenshot stream for the BrowserWindow preview
+
+The model needs lossless full-size PNGs; the preview pane does not. This
+stream downscales each screenshot to a small JPEG (or WebP) in a worker
+thread, hands it on as raw bytes (Socket.IO sends them as a binary
+attachment instead of a base64 string), skips frames identical to the last
+one sent and sends at most `max_fps` frames per second. Frames arriving too
+fast are coalesced: only the latest is sent once the next slot opens.
+"""
+
+import io
+import time
+import asyncio
+import hashlib
+
+
+def encode_preview(png_bytes: bytes, width: int, fmt: str = "JPEG", quality: int = 60) -> bytes:
+    """Downscale a PNG screenshot to `width` pixels wide and re-encode it."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png_bytes)).convert("RGB")
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.BILINEAR)
+    out = io.BytesIO()
+    image.save(out, format=fmt, quality=quality)
+    return out.getvalue()
+
+
+class PreviewStream:
+    """
+    Rate-limited, deduplicated preview frames for one web task.
+    """
+
+    def __init__(self, send, max_fps: float = 4.0, width: int = 720, fmt: str = "JPEG", quality: int = 60):
+        """
+        Args:
+            send: async function(image_bytes or None, log_text or None)
+            max_fps: Maximum preview frames per second
+            width: Preview width in pixels
+            fmt: "JPEG" or "WEBP"
+            quality: Encoder quality (1-100)
+        """
+        self.send = send
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.width = width
+        self.fmt = fmt
+        self.quality = quality
+
+        self._last_digest = None
+        self._last_sent = 0.0
+        self._pending = None
+        self._flush_task = None
+
+        # Stats
+        self.stats = {
+            "frames_in": 0, "frames_sent": 0, "unchanged": 0, "coalesced": 0,
+            "source_bytes": 0, "preview_bytes": 0, "encode_ms": 0.0,
+        }
+
+    async def push(self, png_bytes: bytes = None, log: str = None):
+        """
+        Offer a new screenshot (and/or a log line). Logs are always delivered;
+        frames may be skipped or delayed.
+        """
+        if png_bytes is None:
+            if log:
+                await self.send(None, log)
+            return
+
+        self.stats["frames_in"] += 1
+        self.stats["source_bytes"] += len(png_bytes)
+        digest = hashlib.sha1(png_bytes).digest()
+        if digest == self._last_digest:
+            self.stats["unchanged"] += 1
+            if log:
+                await self.send(None, log)
+            return
+
+        wait = self._last_sent + self.min_interval - time.monotonic()
+        if wait > 0:
+            if self._pending is not None:
+                self.stats["coalesced"] += 1
+            self._pending = (png_bytes, digest)
+            if log:
+                await self.send(None, log)
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_later(wait))
+            return
+
+        # A newer frame supersedes any pending one
+        if self._pending is not None:
+            self.stats["coalesced"] += 1
+            self._pending = None
+        await self._send_frame(png_bytes, digest, log)
+
+    async def _flush_later(self, delay):
+        await asyncio.sleep(delay)
+        if self._pending is not None:
+            png_bytes, digest = self._pending
+            self._pending = None
+            await self._send_frame(png_bytes, digest, None)
+
+    async def _send_frame(self, png_bytes, digest, log):
+        self._last_sent = time.monotonic()
+        self._last_digest = digest
+        start = time.perf_counter()
+        preview = await asyncio.to_thread(encode_preview, png_bytes, self.width, self.fmt, self.quality)
+        self.stats["encode_ms"] += (time.perf_counter() - start) * 1000
+        self.stats["frames_sent"] += 1
+        self.stats["preview_bytes"] += len(preview)
+        await self.send(preview, log)
+
+    async def close(self):
+        """Deliver any frame still waiting for its slot."""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['frames_sent']}/{s['frames_in']} frames sent ({s['unchanged']} unchanged, {s['coalesced']} coalesced), "
+                f"{s['preview_bytes'] / 1024:.0f} KB vs {s['source_bytes'] / 1024:.0f} KB PNG, "
+                f"encode {s['encode_ms']:.0f} ms")
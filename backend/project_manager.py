@@ -5,23 +5,28 @@ import time
 from pathlib import Path
 
 class ProjectManager:
-    def __init__(self, workspace_root: str):
+    def __init__(self, workspace_root: str, temp_project: str = "temp"):
+        # temp_project: scratch project cleared on startup (one per concurrent server session)
         self.workspace_root = Path(workspace_root)
         self.projects_dir = self.workspace_root / "projects"
-        self.current_project = "temp"
+        self.temp_project = temp_project
+        self.current_project = temp_project
+
+        # Project context cache: absolute path -> (mtime_ns, size, content)
+        self._file_cache = {}
         
         # Ensure projects root exists
         if not self.projects_dir.exists():
             self.projects_dir.mkdir(parents=True)
             
         # Clear temp project on startup if it exists
-        temp_path = self.projects_dir / "temp"
+        temp_path = self.projects_dir / temp_project
         if temp_path.exists():
-            print("[ProjectManager] Clearing temp project...")
+            print(f"[ProjectManager] Clearing {temp_project} project...")
             shutil.rmtree(temp_path)
             
         # Ensure temp project receives fresh creation
-        self.create_project("temp")
+        self.create_project(temp_project)
 
     def create_project(self, name: str):
         """Creates a new project directory with subfolders."""
@@ -66,6 +71,27 @@ class ProjectManager:
         with open(log_file, "a", encoding="utf-8") as f:
             f.write(json.dumps(entry) + "\n")
 
+    def record_file_write(self, path, content: str):
+        """Records a freshly written file in the project context cache."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._file_cache.pop(str(path), None)
+            return
+        self._file_cache[str(path)] = (stat.st_mtime_ns, stat.st_size, content)
+
+    def _read_cached(self, full_path, stat):
+        """Returns file content, served from the context cache when the file is unchanged."""
+        key = str(full_path)
+        cached = self._file_cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        self._file_cache[key] = (stat.st_mtime_ns, stat.st_size, content)
+        return content
+
     def save_cad_artifact(self, source_path: str, prompt: str):
         """Copies a generated CAD file to the project's 'cad' folder."""
         if not os.path.exists(source_path):
@@ -126,13 +152,13 @@ class ProjectManager:
 
             full_path = project_path / rel_path
             try:
-                file_size = full_path.stat().st_size
+                stat = full_path.stat()
+                file_size = stat.st_size
                 if file_size > max_file_size:
                     context_lines.append(f"--- {rel_path} (too large: {file_size} bytes, skipped) ---")
                     continue
 
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+                content = self._read_cached(full_path, stat)
                 context_lines.append(f"--- {rel_path} ---")
                 context_lines.append(content)
                 context_lines.append("")
@@ -0,0 +1,125 @@
+"""
+ScreenshotHistory - Bounded Computer Use conversation history
+
+The web agent resends its whole conversation on every generate_content call,
+so keeping every full-resolution screenshot inline makes requests (and memory)
+grow with each turn. This history keeps only the last `keep_last` screenshots
+inline; older ones are replaced with a short text placeholder or a tiny JPEG
+thumbnail. Text page snapshots (the `page` field of function responses, see
+dom_snapshot.py) are bounded the same way. It also measures how many bytes
+each request carries.
+"""
+
+import io
+import json
+
+from google.genai import types
+
+PLACEHOLDER_TEXT = "[Earlier screenshot omitted]"
+SNAPSHOT_PLACEHOLDER = "[Earlier page snapshot omitted]"
+
+
+def make_thumbnail(png_bytes: bytes, width: int = 160) -> bytes:
+    """Downscale a screenshot to a small JPEG."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png_bytes)).convert("RGB")
+    image.thumbnail((width, width))
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=60)
+    return out.getvalue()
+
+
+class ScreenshotHistory:
+    """
+    Chat history for the Computer Use loop that bounds inline screenshots.
+    """
+
+    def __init__(self, keep_last: int = 3, mode: str = "text", thumbnail_width: int = 160):
+        """
+        Args:
+            keep_last: Number of most recent screenshots kept at full resolution
+            mode: "text" replaces older screenshots with a placeholder, "thumbnail" with a tiny JPEG
+            thumbnail_width: Longest side of thumbnails in pixels
+        """
+        self.keep_last = keep_last
+        self.mode = mode
+        self.thumbnail_width = thumbnail_width
+        self.contents = []
+        self.turn_bytes = []
+
+    def append(self, content: types.Content):
+        """Add a message and demote screenshots that fell out of the window."""
+        self.contents.append(content)
+        self._trim()
+
+    def _screenshot_slots(self):
+        """Yields (part, function_response_part or None) for every full screenshot, oldest first."""
+        for content in self.contents:
+            for part in content.parts or []:
+                if part.inline_data and part.inline_data.mime_type == "image/png":
+                    yield part, None
+                elif part.function_response and part.function_response.parts:
+                    for fr_part in part.function_response.parts:
+                        if fr_part.inline_data and fr_part.inline_data.mime_type == "image/png":
+                            yield part, fr_part
+
+    def _trim(self):
+        slots = list(self._screenshot_slots())
+        for part, fr_part in slots[:max(0, len(slots) - self.keep_last)]:
+            if fr_part is None:
+                data = part.inline_data.data
+                part.inline_data = None
+                if self.mode == "thumbnail":
+                    part.inline_data = types.Blob(mime_type="image/jpeg", data=make_thumbnail(data, self.thumbnail_width))
+                else:
+                    part.text = PLACEHOLDER_TEXT
+            else:
+                fr = part.function_response
+                if self.mode == "thumbnail":
+                    fr_part.inline_data = types.FunctionResponseBlob(
+                        mime_type="image/jpeg", data=make_thumbnail(fr_part.inline_data.data, self.thumbnail_width)
+                    )
+                else:
+                    fr.parts = [p for p in fr.parts if p is not fr_part] or None
+                    fr.response = {**(fr.response or {}), "screenshot": PLACEHOLDER_TEXT}
+
+        snapshots = list(self._snapshot_slots())
+        for fr in snapshots[:max(0, len(snapshots) - self.keep_last)]:
+            fr.response = {**fr.response, "page": SNAPSHOT_PLACEHOLDER}
+
+    def _snapshot_slots(self):
+        """Yields every function response still carrying a page snapshot, oldest first."""
+        for content in self.contents:
+            for part in content.parts or []:
+                fr = part.function_response
+                if fr and fr.response and fr.response.get("page") not in (None, SNAPSHOT_PLACEHOLDER):
+                    yield fr
+
+    @staticmethod
+    def content_bytes(content: types.Content) -> int:
+        """Approximate payload size of one message (inline data + text + JSON)."""
+        size = 0
+        for part in content.parts or []:
+            if part.text:
+                size += len(part.text.encode("utf-8"))
+            if part.inline_data and part.inline_data.data:
+                size += len(part.inline_data.data)
+            if part.function_call:
+                size += len(json.dumps(part.function_call.args or {}, default=str))
+            if part.function_response:
+                size += len(json.dumps(part.function_response.response or {}, default=str))
+                for fr_part in part.function_response.parts or []:
+                    if fr_part.inline_data and fr_part.inline_data.data:
+                        size += len(fr_part.inline_data.data)
+        return size
+
+    def request_bytes(self) -> int:
+        """Approximate size of the next generate_content request."""
+        return sum(self.content_bytes(c) for c in self.contents)
+
+    def record_request(self) -> int:
+        """Measure the request about to be sent and remember it for the task summary."""
+        size = self.request_bytes()
+        self.turn_bytes.append(size)
+        return size
@@ -1,6 +1,13 @@
 import sys
 import asyncio
 
+# Startup profiling (ADA_PROFILE_STARTUP=1) has to hook imports before anything else is loaded
+import startup_profile
+import_profiler = None
+if startup_profile.enabled():
+    import_profiler = startup_profile.ImportProfiler()
+    import_profiler.install()
+
 # Fix for asyncio subprocess support on Windows
 # MUST BE SET BEFORE OTHER IMPORTS
 if sys.platform == 'win32':
@@ -9,11 +16,14 @@ if sys.platform == 'win32':
 import socketio
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 import asyncio
 import threading
 import sys
 import os
 import json
+import time
+import importlib
 from datetime import datetime
 from pathlib import Path
 
@@ -22,8 +32,13 @@ from pathlib import Path
 # Ensure we can import ada
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-import ada
-from authenticator import FaceAuthenticator
+# ada (google-genai, PyAudio, OpenCV) and authenticator (MediaPipe) are imported on first use,
+# so /status answers before they are loaded; see startup_profile.py for the measured costs
+from browser_pool import get_browser_pool
+from session_registry import SessionRegistry, SessionLimitError
+from emitter import CoalescingEmitter
+from warm_pool import WarmAudioLoopPool
+from loop_monitor import LoopMonitor
 
 # Create a Socket.IO server
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
@@ -35,13 +50,12 @@ import signal
 # --- SHUTDOWN HANDLER ---
 def signal_handler(sig, frame):
     print(f"\n[SERVER] Caught signal {sig}. Exiting gracefully...")
-    # Clean up audio loop
-    if audio_loop:
-        try:
-            print("[SERVER] Stopping Audio Loop...")
-            audio_loop.stop() 
-        except:
-            pass
+    # Clean up audio loops
+    try:
+        print("[SERVER] Stopping Audio Loops...")
+        sessions.close_all()
+    except:
+        pass
     # Force kill
     print("[SERVER] Force exiting...")
     os._exit(0)
@@ -50,8 +64,33 @@ signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
 # Global state
-audio_loop = None
-loop_task = None
+# One AudioLoop and emit room per client session (see session_registry.py)
+sessions = SessionRegistry(
+    max_live=int(os.getenv("ADA_MAX_SESSIONS", "1")),
+    idle_timeout=float(os.getenv("ADA_SESSION_IDLE_TIMEOUT", "1800")),
+    reconnect_grace=float(os.getenv("ADA_SESSION_RECONNECT_GRACE", "60")),
+)
+# Session events are micro-batched per room (transcription deltas merged, see emitter.py)
+emitter = CoalescingEmitter(sio, window_ms=float(os.getenv("ADA_EMIT_WINDOW_MS", "8")))
+
+def temp_project_for(slot):
+    # Each live slot gets its own scratch project so sessions don't clear each other's
+    return "temp" if slot == 0 else f"temp-{slot + 1}"
+
+def build_audio_loop():
+    import ada
+    return ada.AudioLoop(video_mode="none", temp_project=None)
+
+# Opt-in warm mode: a spare AudioLoop with open audio devices and a speculative Live session (see warm_pool.py)
+warm_pool = None
+if os.getenv("ADA_WARM_START", "0") == "1":
+    warm_pool = WarmAudioLoopPool(build_audio_loop, preconnect_ttl=float(os.getenv("ADA_PRECONNECT_TTL", "300")))
+
+# Event-loop lag and blocking-call detection (see loop_monitor.py); ADA_LOOP_MONITOR=0 turns it off
+loop_monitor = None
+if os.getenv("ADA_LOOP_MONITOR", "1") != "0":
+    loop_monitor = LoopMonitor(threshold_ms=float(os.getenv("ADA_LOOP_SLOW_MS", "50")))
+
 authenticator = None
 SETTINGS_FILE = "settings.json"
 
@@ -66,7 +105,8 @@ DEFAULT_SETTINGS = {
         "switch_project": True,
         "list_projects": True
     },
-    "camera_flipped": False # Invert cursor horizontal direction
+    "camera_flipped": False, # Invert cursor horizontal direction
+    "memory_auto_remember": False # Save each conversation exchange to long-term memory
 }
 
 SETTINGS = DEFAULT_SETTINGS.copy()
@@ -115,65 +155,163 @@ async def startup_event():
     except Exception as e:
         print(f"[SERVER DEBUG] Error checking loop: {e}")
 
+    if loop_monitor:
+        loop_monitor.start()
 
-@app.get("/status")
-async def status():
-    return {"status": "running", "service": "A.D.A Backend"}
+    if warm_pool:
+        warm_pool.fill()
 
-@sio.event
-async def connect(sid, environ):
-    print(f"Client connected: {sid}")
-    await sio.emit('status', {'msg': 'Connected to A.D.A Backend'}, room=sid)
+    # Load ada in the background so the first start_audio doesn't pay its import
+    elif os.getenv("ADA_PREIMPORT", "1") != "0":
+        async def preimport_ada():
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(importlib.import_module, "ada")
+                print(f"[SERVER] ada loaded in the background ({(time.perf_counter() - start) * 1000:.0f} ms)")
+            except Exception as e:
+                print(f"[SERVER] [WARN] Background import of ada failed: {e}")
+        asyncio.create_task(preimport_ada())
 
-    global authenticator
-    
-    # Callback for Auth Status
-    async def on_auth_status(is_auth):
-        print(f"[SERVER] Auth status change: {is_auth}")
-        await sio.emit('auth_status', {'authenticated': is_auth})
+    # Warm the web agent's browser in the background so the first task doesn't pay the launch
+    if os.getenv("WEB_AGENT_PREWARM", "1") != "0":
+        async def warm_browser():
+            try:
+                await get_browser_pool().start()
+            except Exception as e:
+                print(f"[SERVER] [WARN] Browser pool not started: {e}")
+        asyncio.create_task(warm_browser())
+
+    async def notify_evicted(session, reason):
+        if reason == "idle":
+            emit_to(session, 'status', {'msg': 'A.D.A Stopped (idle)'})
+    asyncio.create_task(sessions.run_evictor(on_evict=notify_evicted))
+
+
+async def close_warm_pool():
+    """Release the spare AudioLoop's mic/speaker and speculative Live session."""
+    if not warm_pool:
+        return
+    try:
+        await asyncio.wait_for(warm_pool.close(), timeout=3.0)
+    except Exception as e:
+        print(f"[SERVER] Warm pool close failed: {e}")
+
+
+async def close_memory():
+    """Flush the shared memory agent's outbox and close its store."""
+    from memory_agent import close_memory_agent
+    try:
+        await asyncio.wait_for(close_memory_agent(), timeout=6.0)
+    except Exception as e:
+        print(f"[SERVER] Memory agent close failed: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_warm_pool()  # First, so stopping the sessions doesn't build a new spare
+    sessions.close_all()
+    await close_memory()
 
-    # Callback for Auth Camera Frames
-    async def on_auth_frame(frame_b64):
-        await sio.emit('auth_frame', {'image': frame_b64})
 
-    # Initialize Authenticator if not already done
+@app.get("/status")
+async def status():
+    return {"status": "running", "service": "A.D.A Backend", "sessions": sessions.summary(),
+            "emitter": emitter.summary(), "warm": warm_pool.summary() if warm_pool else None,
+            "loop": loop_monitor.summary() if loop_monitor else None}
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text format: voice latency histograms per live session, event-loop lag."""
+    lines = [
+        "# HELP ada_voice_latency_ms User speech end to first model audio played, by stage",
+        "# TYPE ada_voice_latency_ms histogram",
+    ]
+    for session in sessions.sessions.values():
+        latency = getattr(session.audio_loop, "latency", None)
+        if latency:
+            lines.extend(latency.prometheus(f'session="{session.key[:8]}"'))
+    lines.append(f"ada_sessions_live {len(sessions.live_sessions())}")
+    if loop_monitor:
+        lines.extend(loop_monitor.prometheus())
+    return PlainTextResponse("\n".join(lines) + "\n")
+
+def emit_to(session, event, data):
+    """Queue an emit to the clients of one session only; counted against the session when sent."""
+    emitter.emit(event, data, room=session.room, on_sent=session.account_emit)
+
+def get_audio_loop(sid):
+    """The AudioLoop of a socket's session (None if it isn't running). Marks the session active."""
+    session = sessions.get(sid)
+    return session.audio_loop if session else None
+
+# Callback for Auth Status
+async def on_auth_status(is_auth):
+    print(f"[SERVER] Auth status change: {is_auth}")
+    await sio.emit('auth_status', {'authenticated': is_auth})
+
+# Callback for Auth Camera Frames
+async def on_auth_frame(frame_b64):
+    await sio.emit('auth_frame', {'image': frame_b64})
+
+def get_authenticator():
+    """The face authenticator, created (and MediaPipe imported) only once face auth is used."""
+    global authenticator
     if authenticator is None:
+        from authenticator import FaceAuthenticator
         authenticator = FaceAuthenticator(
             reference_image_path="reference.jpg",
             on_status_change=on_auth_status,
             on_frame=on_auth_frame
         )
-    
-    # Check if already authenticated or needs to start
-    if authenticator.authenticated:
-        await sio.emit('auth_status', {'authenticated': True})
-    else:
-        # Check Settings for Auth
-        if SETTINGS.get("face_auth_enabled", False):
-            await sio.emit('auth_status', {'authenticated': False})
-            # Start the auth loop in background
-            asyncio.create_task(authenticator.start_authentication_loop())
+    return authenticator
+
+@sio.event
+async def connect(sid, environ, auth=None):
+    # auth: { session_id: "..." } lets a reconnecting client rejoin its running session
+    session = sessions.attach(sid, (auth or {}).get('session_id'))
+    await sio.enter_room(sid, session.room)
+    print(f"Client connected: {sid} (session {session.key[:8]}, {len(session.sids)} client(s))")
+    await sio.emit('status', {'msg': 'Connected to A.D.A Backend'}, room=sid)
+    if session.live:
+        await sio.emit('status', {'msg': 'A.D.A Already Running'}, room=sid)
+    elif warm_pool:
+        # Open the Live session now; start_audio (mic click) will most likely follow
+        asyncio.create_task(warm_pool.preconnect())
+
+    # Check Settings for Auth
+    if SETTINGS.get("face_auth_enabled", False):
+        auth = get_authenticator()
+        if auth.authenticated:
+            await sio.emit('auth_status', {'authenticated': True}, room=sid)
         else:
-            # Bypass Auth
-            print("Face Auth Disabled. Auto-authenticating.")
-            # We don't change authenticator state to true to avoid confusion if re-enabled? 
-            # Or we should just tell client it's auth'd.
-            await sio.emit('auth_status', {'authenticated': True})
+            await sio.emit('auth_status', {'authenticated': False}, room=sid)
+            # Start the auth loop in background
+            asyncio.create_task(auth.start_authentication_loop())
+    else:
+        # Bypass Auth (MediaPipe is never loaded)
+        print("Face Auth Disabled. Auto-authenticating.")
+        await sio.emit('auth_status', {'authenticated': True}, room=sid)
 
 @sio.event
 async def disconnect(sid):
     print(f"Client disconnected: {sid}")
+    # Sessions without a client-supplied id end with their socket; others wait for a reconnect
+    session = sessions.detach(sid)
+    if session:
+        sessions.close(session)
 
 @sio.event
 async def start_audio(sid, data=None):
-    global audio_loop, loop_task
+    session = sessions.get(sid)
+    if session is None:
+        return
     
     # Optional: Block if not authenticated
     # Only block if auth is ENABLED and not authenticated
     if SETTINGS.get("face_auth_enabled", False):
         if authenticator and not authenticator.authenticated:
             print("Blocked start_audio: Not authenticated.")
-            await sio.emit('error', {'msg': 'Authentication Required'})
+            await sio.emit('error', {'msg': 'Authentication Required'}, room=sid)
             return
 
     print("Starting Audio Loop...")
@@ -188,68 +326,101 @@ async def start_audio(sid, data=None):
             
     print(f"Using input device: Name='{device_name}', Index={device_index}")
     
-    if audio_loop:
-        if loop_task and (loop_task.done() or loop_task.cancelled()):
+    if session.audio_loop:
+        if not session.live:
              print("Audio loop task appeared finished/cancelled. Clearing and restarting...")
-             audio_loop = None
-             loop_task = None
+             sessions.stop(session)
         else:
              print("Audio loop already running. Re-connecting client to session.")
-             await sio.emit('status', {'msg': 'A.D.A Already Running'})
+             emit_to(session, 'status', {'msg': 'A.D.A Already Running'})
              return
 
+    # Admission control: bounded number of live sessions per process
+    try:
+        sessions.admit(session)
+    except SessionLimitError as e:
+        print(f"[SERVER] Rejected start_audio for session {session.key[:8]}: {e}")
+        await sio.emit('error', {'msg': str(e)}, room=sid)
+        return
+
 
     # Callback to send audio data to frontend
     def on_audio_data(data_bytes):
-        # We need to schedule this on the event loop
-        # This is high frequency, so we might want to downsample or batch if it's too much
-        asyncio.create_task(sio.emit('audio_data', {'data': list(data_bytes)}))
+        # High frequency; the emitter only keeps the newest chunk per flush window (visualizer only)
+        session.mark_active()
+        emit_to(session, 'audio_data', {'data': list(data_bytes)})
 
     # Callback to send Browser data to frontend
     def on_web_data(data):
-        print(f"Sending Browser data to frontend: {len(data.get('log', ''))} chars logs")
-        asyncio.create_task(sio.emit('browser_frame', data))
+        print(f"Sending Browser data to frontend: {len(data.get('log') or '')} chars logs, {len(data.get('image') or b'')} bytes preview")
+        emit_to(session, 'browser_frame', data)
         
     # Callback to send Transcription data to frontend
     def on_transcription(data):
         # data = {"sender": "User"|"ADA", "text": "..."}
-        asyncio.create_task(sio.emit('transcription', data))
+        # A voice-only conversation sends no socket events; keep it from being evicted as idle
+        session.mark_active()
+        emit_to(session, 'transcription', data)
 
     # Callback to send Confirmation Request to frontend
     def on_tool_confirmation(data):
         # data = {"id": "uuid", "tool": "tool_name", "args": {...}}
         print(f"Requesting confirmation for tool: {data.get('tool')}")
-        asyncio.create_task(sio.emit('tool_confirmation_request', data))
+        emit_to(session, 'tool_confirmation_request', data)
 
     # Callback to send Project Update to frontend
     def on_project_update(project_name):
         print(f"Sending Project Update: {project_name}")
-        asyncio.create_task(sio.emit('project_update', {'project': project_name}))
+        emit_to(session, 'project_update', {'project': project_name})
 
     # Callback to send Error to frontend
     def on_error(msg):
         print(f"Sending Error to frontend: {msg}")
-        asyncio.create_task(sio.emit('error', {'msg': msg}))
+        emit_to(session, 'error', {'msg': msg})
+
+    # Callback to send each voice turn's latency breakdown (overlay)
+    def on_latency(turn):
+        emit_to(session, 'voice_latency', turn)
 
     # Initialize Jarvis
     try:
-        print(f"Initializing AudioLoop with device_index={device_index}")
-        audio_loop = ada.AudioLoop(
-            video_mode="none", 
-            on_audio_data=on_audio_data,
-            on_web_data=on_web_data,
-            on_transcription=on_transcription,
-            on_tool_confirmation=on_tool_confirmation,
-            on_project_update=on_project_update,
-            on_error=on_error,
-
-            input_device_index=device_index,
-            input_device_name=device_name
-        )
-        print("AudioLoop initialized successfully.")
+        temp_project = temp_project_for(session.slot)
+        audio_loop = await warm_pool.take(temp_project) if warm_pool else None
+        if audio_loop:
+            print(f"Using warm AudioLoop with device_index={device_index}")
+            audio_loop.configure(
+                on_audio_data=on_audio_data,
+                on_web_data=on_web_data,
+                on_transcription=on_transcription,
+                on_tool_confirmation=on_tool_confirmation,
+                on_project_update=on_project_update,
+                on_error=on_error,
+                on_latency=on_latency,
+                input_device_index=device_index,
+                input_device_name=device_name,
+            )
+        else:
+            print(f"Initializing AudioLoop with device_index={device_index}")
+            import ada
+            audio_loop = ada.AudioLoop(
+                video_mode="none", 
+                on_audio_data=on_audio_data,
+                on_web_data=on_web_data,
+                on_transcription=on_transcription,
+                on_tool_confirmation=on_tool_confirmation,
+                on_project_update=on_project_update,
+                on_error=on_error,
+                on_latency=on_latency,
+
+                input_device_index=device_index,
+                input_device_name=device_name,
+                temp_project=temp_project,
+            )
+            print("AudioLoop initialized successfully.")
 
         # Apply current permissions
         audio_loop.update_permissions(SETTINGS["tool_permissions"])
+        audio_loop.auto_remember = SETTINGS.get("memory_auto_remember", False)
         
         # Check initial mute state
         if data and data.get('muted', False):
@@ -258,6 +429,7 @@ async def start_audio(sid, data=None):
 
         print("Creating asyncio task for AudioLoop.run()")
         loop_task = asyncio.create_task(audio_loop.run())
+        sessions.bind(session, audio_loop, loop_task)
         
         # Add a done callback to catch silent failures in the loop
         def handle_loop_exit(task):
@@ -268,44 +440,48 @@ async def start_audio(sid, data=None):
             except Exception as e:
                 print(f"Audio Loop Crashed: {e}")
                 # You could emit 'error' here if you have context
+            # Get the next spare ready once the devices are free again (a spare opens its own mic/speaker)
+            if warm_pool and not sessions.live_sessions():
+                warm_pool.fill()
         
         loop_task.add_done_callback(handle_loop_exit)
         
         print("Emitting 'Jarvis Started'")
-        await sio.emit('status', {'msg': 'Jarvis Started'})
+        emit_to(session, 'status', {'msg': 'Jarvis Started'})
         
     except Exception as e:
         print(f"CRITICAL ERROR STARTING JARVIS: {e}")
         import traceback
         traceback.print_exc()
-        await sio.emit('error', {'msg': f"Failed to start: {str(e)}"})
-        audio_loop = None # Ensure we can try again
+        await sio.emit('error', {'msg': f"Failed to start: {str(e)}"}, room=sid)
+        sessions.stop(session) # Ensure we can try again (and free the slot)
+        if warm_pool and not sessions.live_sessions():
+            warm_pool.fill()
 
 
 @sio.event
 async def stop_audio(sid):
-    global audio_loop
-    if audio_loop:
-        audio_loop.stop() 
+    session = sessions.get(sid)
+    if session and session.audio_loop:
+        sessions.stop(session)
         print("Stopping Audio Loop")
-        audio_loop = None
-        await sio.emit('status', {'msg': 'A.D.A Stopped'})
+        emit_to(session, 'status', {'msg': 'A.D.A Stopped'})
 
 @sio.event
 async def pause_audio(sid):
-    global audio_loop
-    if audio_loop:
-        audio_loop.set_paused(True)
+    session = sessions.get(sid)
+    if session and session.audio_loop:
+        session.audio_loop.set_paused(True)
         print("Pausing Audio")
-        await sio.emit('status', {'msg': 'Audio Paused'})
+        emit_to(session, 'status', {'msg': 'Audio Paused'})
 
 @sio.event
 async def resume_audio(sid):
-    global audio_loop
-    if audio_loop:
-        audio_loop.set_paused(False)
+    session = sessions.get(sid)
+    if session and session.audio_loop:
+        session.audio_loop.set_paused(False)
         print("Resuming Audio")
-        await sio.emit('status', {'msg': 'Audio Resumed'})
+        emit_to(session, 'status', {'msg': 'Audio Resumed'})
 
 @sio.event
 async def confirm_tool(sid, data):
@@ -315,6 +491,7 @@ async def confirm_tool(sid, data):
     
     print(f"[SERVER DEBUG] Received confirmation response for {request_id}: {confirmed}")
     
+    audio_loop = get_audio_loop(sid)
     if audio_loop:
         audio_loop.resolve_tool_confirmation(request_id, confirmed)
     else:
@@ -323,28 +500,32 @@ async def confirm_tool(sid, data):
 @sio.event
 async def shutdown(sid, data=None):
     """Gracefully shutdown the server when the application closes."""
-    global audio_loop, loop_task, authenticator
+    global authenticator
     
     print("[SERVER] ========================================")
     print("[SERVER] SHUTDOWN SIGNAL RECEIVED FROM FRONTEND")
     print("[SERVER] ========================================")
     
-    # Stop audio loop
-    if audio_loop:
-        print("[SERVER] Stopping Audio Loop...")
-        audio_loop.stop()
-        audio_loop = None
-    
-    # Cancel the loop task if running
-    if loop_task and not loop_task.done():
-        print("[SERVER] Cancelling loop task...")
-        loop_task.cancel()
-        loop_task = None
+    # Release the spare AudioLoop's devices (first, so stopping the sessions doesn't refill it)
+    await close_warm_pool()
+
+    # Stop every session's audio loop and cancel its task
+    print(f"[SERVER] Stopping {len(sessions.live_sessions())} Audio Loop(s)...")
+    sessions.close_all()
     
     # Stop authenticator if running
     if authenticator:
         print("[SERVER] Stopping Authenticator...")
         authenticator.stop()
+
+    # Close the web agent's browser so no Chromium processes are left behind
+    try:
+        await asyncio.wait_for(get_browser_pool().stop(), timeout=3.0)
+    except Exception as e:
+        print(f"[SERVER] Browser pool stop failed: {e}")
+
+    # Flush pending memories (one agent shared by every session)
+    await close_memory()
     
     print("[SERVER] Graceful shutdown complete. Terminating process...")
     
@@ -356,6 +537,7 @@ async def user_input(sid, data):
     text = data.get('text')
     print(f"[SERVER DEBUG] User input received: '{text}'")
     
+    audio_loop = get_audio_loop(sid)
     if not audio_loop:
         print("[SERVER DEBUG] [Error] Audio loop is None. Cannot send text.")
         return
@@ -394,6 +576,7 @@ from pathlib import Path
 async def video_frame(sid, data):
     # data should contain 'image' which is binary (blob) or base64 encoded
     image_data = data.get('image')
+    audio_loop = get_audio_loop(sid)
     if image_data and audio_loop:
         # We don't await this because we don't want to block the socket handler
         # But send_frame is async, so we create a task
@@ -431,11 +614,11 @@ async def save_memory(sid, data):
                 sender = msg.get('sender', 'Unknown')
                 text = msg.get('text', '')
         print(f"Conversation saved to {filename}")
-        await sio.emit('status', {'msg': 'Memory Saved Successfully'})
+        await sio.emit('status', {'msg': 'Memory Saved Successfully'}, room=sid)
 
     except Exception as e:
         print(f"Error saving memory: {e}")
-        await sio.emit('error', {'msg': f"Failed to save memory: {str(e)}"})
+        await sio.emit('error', {'msg': f"Failed to save memory: {str(e)}"}, room=sid)
 
 @sio.event
 async def upload_memory(sid, data):
@@ -446,14 +629,15 @@ async def upload_memory(sid, data):
             print("No memory data provided.")
             return
 
+        audio_loop = get_audio_loop(sid)
         if not audio_loop:
              print("[SERVER DEBUG] [Error] Audio loop is None. Cannot load memory.")
-             await sio.emit('error', {'msg': "System not ready (Audio Loop inactive)"})
+             await sio.emit('error', {'msg': "System not ready (Audio Loop inactive)"}, room=sid)
              return
         
         if not audio_loop.session:
              print("[SERVER DEBUG] [Error] Session is None. Cannot load memory.")
-             await sio.emit('error', {'msg': "System not ready (No active session)"})
+             await sio.emit('error', {'msg': "System not ready (No active session)"}, room=sid)
              return
 
         # Send to model
@@ -462,34 +646,56 @@ async def upload_memory(sid, data):
         
         await audio_loop.session.send(input=context_msg, end_of_turn=True)
         print("Memory context sent successfully.")
-        await sio.emit('status', {'msg': 'Memory Loaded into Context'})
+        await sio.emit('status', {'msg': 'Memory Loaded into Context'}, room=sid)
 
     except Exception as e:
         print(f"Error uploading memory: {e}")
-        await sio.emit('error', {'msg': f"Failed to upload memory: {str(e)}"})
+        await sio.emit('error', {'msg': f"Failed to upload memory: {str(e)}"}, room=sid)
 
 @sio.event
 async def prompt_web_agent(sid, data):
-    # data: { prompt: "find xyz" }
+    # data: { prompt: "find xyz", refresh: bool (optional, skip the result cache) }
     prompt = data.get('prompt')
     print(f"Received web agent prompt: '{prompt}'")
     
-    if not audio_loop or not audio_loop.web_agent:
-        await sio.emit('error', {'msg': "Web Agent not available"})
+    audio_loop = get_audio_loop(sid)
+    if not audio_loop or not audio_loop.web_tasks:
+        await sio.emit('error', {'msg': "Web Agent not available"}, room=sid)
         return
 
     try:
-        await sio.emit('status', {'msg': 'Web Agent running...'})
-        await audio_loop.web_agent.run(prompt)
-        await sio.emit('status', {'msg': 'Web Agent finished'})
+        task = audio_loop.web_tasks.submit(prompt, refresh=bool(data.get('refresh', False)))
+        await sio.emit('status', {'msg': f'Web Agent task {task.id} queued'}, room=sid)
+        await task.future
+        await sio.emit('status', {'msg': f'Web Agent task {task.id} {task.status}' + (' (cached)' if task.cached else '')}, room=sid)
         
     except Exception as e:
         print(f"Error running Web Agent: {e}")
-        await sio.emit('error', {'msg': f"Web Agent Error: {str(e)}"})
+        await sio.emit('error', {'msg': f"Web Agent Error: {str(e)}"}, room=sid)
+
+@sio.event
+async def cancel_web_task(sid, data):
+    # data: { task_id: "abcd1234" }
+    task_id = data.get('task_id')
+    audio_loop = get_audio_loop(sid)
+    if audio_loop and audio_loop.web_tasks.cancel(task_id):
+        await sio.emit('status', {'msg': f'Web Agent task {task_id} cancelled'}, room=sid)
+    else:
+        await sio.emit('error', {'msg': f"No active web task {task_id}"}, room=sid)
+
+@sio.event
+async def list_web_tasks(sid):
+    audio_loop = get_audio_loop(sid)
+    tasks = audio_loop.web_tasks.list_tasks() if audio_loop else []
+    await sio.emit('web_tasks', {'tasks': tasks}, room=sid)
 
 @sio.event
 async def get_settings(sid):
-    await sio.emit('settings', SETTINGS)
+    await sio.emit('settings', SETTINGS, room=sid)
+
+def each_audio_loop():
+    """AudioLoops of all live sessions (settings are process-wide)."""
+    return [s.audio_loop for s in sessions.live_sessions()]
 
 @sio.event
 async def update_settings(sid, data):
@@ -499,7 +705,7 @@ async def update_settings(sid, data):
     # Handle specific keys if needed
     if "tool_permissions" in data:
         SETTINGS["tool_permissions"].update(data["tool_permissions"])
-        if audio_loop:
+        for audio_loop in each_audio_loop():
             audio_loop.update_permissions(SETTINGS["tool_permissions"])
             
     if "face_auth_enabled" in data:
@@ -515,6 +721,11 @@ async def update_settings(sid, data):
         SETTINGS["camera_flipped"] = data["camera_flipped"]
         print(f"[SERVER] Camera flip set to: {data['camera_flipped']}")
 
+    if "memory_auto_remember" in data:
+        SETTINGS["memory_auto_remember"] = data["memory_auto_remember"]
+        for audio_loop in each_audio_loop():
+            audio_loop.auto_remember = data["memory_auto_remember"]
+
     save_settings()
     # Broadcast new full settings
     await sio.emit('settings', SETTINGS)
@@ -523,7 +734,7 @@ async def update_settings(sid, data):
 # Deprecated/Mapped for compatibility if frontend still uses specific events
 @sio.event
 async def get_tool_permissions(sid):
-    await sio.emit('tool_permissions', SETTINGS["tool_permissions"])
+    await sio.emit('tool_permissions', SETTINGS["tool_permissions"], room=sid)
 
 @sio.event
 async def update_tool_permissions(sid, data):
@@ -531,16 +742,20 @@ async def update_tool_permissions(sid, data):
     SETTINGS["tool_permissions"].update(data)
     save_settings()
     
-    if audio_loop:
+    for audio_loop in each_audio_loop():
         audio_loop.update_permissions(SETTINGS["tool_permissions"])
     # Broadcast update to all
     await sio.emit('tool_permissions', SETTINGS["tool_permissions"])
 
 if __name__ == "__main__":
+    port = int(os.getenv("ADA_PORT", "8000"))
+    if startup_profile.enabled():
+        startup_profile.report_when_ready(f"http://127.0.0.1:{port}/status", import_profiler)
     uvicorn.run(
-        "server:app_socketio", 
+        # The app object rather than "server:app_socketio": an import string would load this module a second time
+        app_socketio,
         host="127.0.0.1", 
-        port=8000, 
+        port=port, 
         reload=False, # Reload enabled causes spawn of worker which might miss the event loop policy patch
         loop="asyncio",
         reload_excludes=["temp_cad_gen.py", "output.stl", "*.stl"]
@@ -0,0 +1,251 @@
+"""
+SessionRegistry - Per-client A.D.A sessions for the Socket.IO server
+
+Each session owns one AudioLoop (and with it a ProjectManager context) and one
+Socket.IO room, so transcripts, audio and browser frames only reach the
+clients of that session. A session is keyed by the `session_id` a client sends
+in its connect auth payload, so a reloaded window rejoins its running session.
+Without one, the socket id is the key and the session ends with the socket.
+
+The registry also does admission control (at most `max_live` running
+AudioLoops), idle eviction and per-session accounting of traffic.
+"""
+
+import time
+import asyncio
+
+
+class SessionLimitError(Exception):
+    """Raised when starting another live session would exceed max_live."""
+
+
+class Session:
+    """State of one client session."""
+
+    def __init__(self, key: str, keyed_by_client: bool):
+        self.key = key
+        self.keyed_by_client = keyed_by_client
+        self.room = f"ada:{key}"
+        self.sids = set()
+        self.audio_loop = None
+        self.loop_task = None
+        self.slot = None  # Index of the live slot (names the session's temp project)
+        self.created_at = time.time()
+        self.last_active = time.monotonic()
+        self.detached_at = None
+
+        # Accounting
+        self.stats = {"events_in": 0, "emits": 0, "emit_bytes": 0, "live_seconds": 0.0}
+        self._live_since = None
+
+    @property
+    def live(self) -> bool:
+        return self.audio_loop is not None and not (self.loop_task and self.loop_task.done())
+
+    def touch(self):
+        self.last_active = time.monotonic()
+        self.stats["events_in"] += 1
+
+    def mark_active(self):
+        """Voice activity (transcripts, model audio) keeps a session from idling out."""
+        self.last_active = time.monotonic()
+
+    def account_emit(self, data):
+        self.stats["emits"] += 1
+        self.stats["emit_bytes"] += payload_size(data)
+
+    def to_dict(self) -> dict:
+        resumption = getattr(self.audio_loop, "resumption", None)
+        connections = getattr(self.audio_loop, "connections", None)
+        latency = getattr(self.audio_loop, "latency", None)
+        live_seconds = self.stats["live_seconds"]
+        if self._live_since is not None:
+            live_seconds += time.monotonic() - self._live_since
+        return {
+            "session": self.key[:8],
+            "clients": len(self.sids),
+            "live": self.live,
+            "slot": self.slot,
+            "idle_s": round(time.monotonic() - self.last_active, 1),
+            **self.stats,
+            "live_seconds": round(live_seconds, 1),
+            "resumption": resumption.summary() if resumption else None,
+            "connection": connections.summary(getattr(self.audio_loop, "out_queue", None)) if connections else None,
+            "voice_latency": latency.summary() if latency else None,
+        }
+
+
+def payload_size(data) -> int:
+    """Rough wire size of an emit payload."""
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if isinstance(data, str):
+        return len(data.encode("utf-8"))
+    if isinstance(data, dict):
+        return sum(payload_size(k) + payload_size(v) for k, v in data.items())
+    if isinstance(data, (list, tuple)):
+        return sum(payload_size(v) for v in data) if len(data) < 64 else len(data) * 4
+    return 8
+
+
+class SessionRegistry:
+    """
+    Maps Socket.IO clients to sessions and bounds how many run at once.
+    """
+
+    def __init__(self, max_live: int = 2, idle_timeout: float = 1800.0, reconnect_grace: float = 60.0):
+        """
+        Args:
+            max_live: Maximum number of sessions with a running AudioLoop
+            idle_timeout: Seconds without client events or voice activity after which a live session is stopped
+            reconnect_grace: Seconds a client-keyed session survives with no connected client
+        """
+        self.max_live = max_live
+        self.idle_timeout = idle_timeout
+        self.reconnect_grace = reconnect_grace
+        self.sessions = {}
+        self._by_sid = {}
+        self.stats = {"admitted": 0, "rejected": 0, "evicted_idle": 0, "closed": 0}
+
+    def attach(self, sid: str, session_id: str = None) -> Session:
+        """Attach a connected socket to its session, creating the session if needed."""
+        key = session_id or sid
+        session = self.sessions.get(key)
+        if session is None:
+            session = Session(key, keyed_by_client=bool(session_id))
+            self.sessions[key] = session
+        session.sids.add(sid)
+        session.detached_at = None
+        session.last_active = time.monotonic()
+        self._by_sid[sid] = session
+        return session
+
+    def detach(self, sid: str):
+        """
+        Detach a disconnected socket.
+
+        Returns:
+            The session if it should be closed now (socket-keyed, no clients left), else None
+        """
+        session = self._by_sid.pop(sid, None)
+        if session is None:
+            return None
+        session.sids.discard(sid)
+        if session.sids:
+            return None
+        session.detached_at = time.monotonic()
+        return None if session.keyed_by_client else session
+
+    def get(self, sid: str, touch: bool = True):
+        """Session of a socket (or None). Counts as activity unless touch=False."""
+        session = self._by_sid.get(sid)
+        if session and touch:
+            session.touch()
+        return session
+
+    def live_sessions(self) -> list:
+        return [s for s in self.sessions.values() if s.live]
+
+    def _busy_sessions(self) -> list:
+        # Live, or admitted and still building their AudioLoop
+        return [s for s in self.sessions.values() if s.live or (s.slot is not None and s.audio_loop is None)]
+
+    def next_slot(self):
+        """The slot the next admitted session gets (None if all are taken)."""
+        used = {s.slot for s in self._busy_sessions()}
+        return next((i for i in range(self.max_live) if i not in used), None)
+
+    def admit(self, session: Session):
+        """
+        Reserve a live slot for a session about to start its AudioLoop.
+
+        Raises:
+            SessionLimitError: If max_live sessions are already running
+        """
+        slot = self.next_slot()
+        if slot is None:
+            self.stats["rejected"] += 1
+            raise SessionLimitError(f"Server busy: {len(self._busy_sessions())} live sessions (max {self.max_live})")
+        session.slot = slot
+        self.stats["admitted"] += 1
+
+    def bind(self, session: Session, audio_loop, loop_task):
+        session.audio_loop = audio_loop
+        session.loop_task = loop_task
+        session._live_since = time.monotonic()
+
+    def stop(self, session: Session):
+        """Stop a session's AudioLoop, keeping the session itself."""
+        if session.audio_loop:
+            try:
+                session.audio_loop.stop()
+            except Exception as e:
+                print(f"[SESSION] [ERR] Failed to stop audio loop of {session.key[:8]}: {e}")
+        if session.loop_task and not session.loop_task.done():
+            session.loop_task.cancel()
+        if session._live_since is not None:
+            session.stats["live_seconds"] += time.monotonic() - session._live_since
+            session._live_since = None
+        session.audio_loop = None
+        session.loop_task = None
+        session.slot = None
+
+    def close(self, session: Session):
+        """Stop a session and forget it."""
+        self.stop(session)
+        for sid in list(session.sids):
+            self._by_sid.pop(sid, None)
+        if self.sessions.pop(session.key, None) is not None:
+            self.stats["closed"] += 1
+            print(f"[SESSION] Closed {session.key[:8]}: {session.to_dict()}")
+
+    def close_all(self):
+        for session in list(self.sessions.values()):
+            self.close(session)
+
+    def expired(self, now: float = None):
+        """
+        Sessions due for eviction.
+
+        Returns:
+            List of (session, reason) with reason "idle" (live but no client events or voice activity for
+            idle_timeout) or "abandoned" (no client reconnected within reconnect_grace)
+        """
+        now = time.monotonic() if now is None else now
+        due = []
+        for session in self.sessions.values():
+            if session.detached_at is not None and now - session.detached_at > self.reconnect_grace:
+                due.append((session, "abandoned"))
+            elif session.live and now - session.last_active > self.idle_timeout:
+                due.append((session, "idle"))
+        return due
+
+    async def run_evictor(self, on_evict=None, interval: float = 30.0):
+        """
+        Periodically evict expired sessions (run as a background task).
+
+        Args:
+            on_evict: Optional async callable(session, reason), called before an idle session is stopped
+        """
+        while True:
+            await asyncio.sleep(interval)
+            for session, reason in self.expired():
+                print(f"[SESSION] Evicting {session.key[:8]} ({reason})")
+                if on_evict:
+                    try:
+                        await on_evict(session, reason)
+                    except Exception as e:
+                        print(f"[SESSION] [ERR] Evict callback failed: {e}")
+                if reason == "idle":
+                    self.stats["evicted_idle"] += 1
+                    self.stop(session)
+                else:
+                    self.close(session)
+
+    def summary(self) -> dict:
+        return {
+            "live": len(self.live_sessions()),
+            "max_live": self.max_live,
+            **self.stats,
+            "sessions": [s.to_dict() for s in self.sessions.values()],
+        }
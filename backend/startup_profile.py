@@ -0,0 +1,118 @@
+"""
+Startup profiling for the backend
+
+Set ADA_PROFILE_STARTUP=1 (or pass --profile-startup to server.py) to get:
+- an import breakdown: which top-level imports made up the time before the
+  server could listen, and which modules were slowest on their own
+- time-to-ready: wall time from process start until /status answers
+
+The import profiler wraps `builtins.__import__`, so it must be installed before
+the imports it should measure (server.py does this first thing).
+"""
+
+import os
+import sys
+import time
+import builtins
+import threading
+import urllib.request
+
+# Close enough to process start for our purposes (interpreter boot is ~50 ms)
+PROCESS_START = time.perf_counter()
+
+
+def enabled() -> bool:
+    return os.getenv("ADA_PROFILE_STARTUP", "0") == "1" or "--profile-startup" in sys.argv
+
+
+class ImportProfiler:
+    """
+    Times imports of not-yet-loaded modules.
+
+    `cumulative` holds the time of each import made from outside any other
+    measured import (what server.py itself pays per line), `self_times` the
+    time of every module minus its own nested imports.
+    """
+
+    def __init__(self):
+        self.cumulative = {}
+        self.self_times = {}
+        self._stack = []  # [name, start, child_time]
+        self._original = None
+        self._lock = threading.Lock()
+
+    def install(self):
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Only time first imports of absolute names on the main thread
+        if level or name in sys.modules or threading.current_thread() is not threading.main_thread():
+            return self._original(name, globals, locals, fromlist, level)
+
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            with self._lock:
+                self.self_times[name] = self.self_times.get(name, 0.0) + elapsed - frame[2]
+                if self._stack:
+                    self._stack[-1][2] += elapsed
+                else:
+                    self.cumulative[name] = self.cumulative.get(name, 0.0) + elapsed
+
+    def report(self, top: int = 10) -> str:
+        """Human readable breakdown of the slowest imports."""
+        lines = [f"imports total {sum(self.cumulative.values()) * 1000:.0f} ms"]
+        lines.append("  top-level (incl. nested):")
+        for name, t in sorted(self.cumulative.items(), key=lambda kv: -kv[1])[:top]:
+            lines.append(f"    {t * 1000:7.1f} ms  {name}")
+        lines.append("  slowest modules (self):")
+        for name, t in sorted(self.self_times.items(), key=lambda kv: -kv[1])[:top]:
+            lines.append(f"    {t * 1000:7.1f} ms  {name}")
+        return "\n".join(lines)
+
+
+def wait_until_ready(url: str, timeout: float = 60.0, interval: float = 0.02):
+    """
+    Poll a health URL until it answers.
+
+    Returns:
+        Seconds since process start when it first answered, or None on timeout
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - PROCESS_START
+        except Exception:
+            pass
+        time.sleep(interval)
+    return None
+
+
+def report_when_ready(url: str, profiler: ImportProfiler = None):
+    """Print the import breakdown and time-to-ready once `url` answers (runs in a thread)."""
+
+    def run():
+        ready = wait_until_ready(url)
+        if profiler:
+            profiler.uninstall()
+            for line in profiler.report().splitlines():
+                print(f"[STARTUP] {line}")
+        if ready is None:
+            print(f"[STARTUP] [WARN] {url} did not answer")
+        else:
+            print(f"[STARTUP] Ready (/status answered) {ready * 1000:.0f} ms after process start")
+
+    threading.Thread(target=run, name="startup-profile", daemon=True).start()
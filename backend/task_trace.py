@@ -0,0 +1,93 @@
+"""
+TaskTrace - Per-task timeline of a web agent run
+
+Records spans (model calls, actions, settle waits, screenshots, frontend
+updates) and exports them as Chrome trace-event JSON, loadable in
+chrome://tracing or https://ui.perfetto.dev. summary() totals time per
+category so it is obvious whether a slow task is model-, browser- or
+wait-bound.
+"""
+
+import os
+import json
+import time
+from contextlib import contextmanager
+
+# One timeline row per category in the trace viewer
+CATEGORY_ROWS = {"model": 1, "browser": 2, "wait": 3, "frontend": 4}
+
+
+class TaskTrace:
+    """
+    Collects complete ("X") trace events for one task.
+    """
+
+    def __init__(self, name: str = "web_task"):
+        self.name = name
+        self.events = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args):
+        """
+        Time a block. Extra keyword args (and any keys added to the yielded dict)
+        end up in the event's args.
+        """
+        start = self._now_us()
+        extra = dict(args)
+        try:
+            yield extra
+        finally:
+            self.events.append({
+                "name": name, "cat": cat, "ph": "X", "ts": round(start, 1),
+                "dur": round(self._now_us() - start, 1),
+                "pid": self._pid, "tid": CATEGORY_ROWS.get(cat, 0), "args": extra,
+            })
+
+    def instant(self, name: str, cat: str, **args):
+        self.events.append({
+            "name": name, "cat": cat, "ph": "i", "s": "t", "ts": round(self._now_us(), 1),
+            "pid": self._pid, "tid": CATEGORY_ROWS.get(cat, 0), "args": args,
+        })
+
+    def to_chrome_trace(self) -> dict:
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": cat}}
+            for cat, tid in CATEGORY_ROWS.items()
+        ]
+        metadata.append({"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": self.name}})
+        return {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+    def totals(self) -> dict:
+        """Milliseconds spent per category (spans of one category are not nested)."""
+        totals = {}
+        for e in self.events:
+            if e["ph"] == "X":
+                totals[e["cat"]] = totals.get(e["cat"], 0.0) + e["dur"] / 1000
+        return totals
+
+    def summary(self) -> str:
+        """One line, e.g. 'model 8.1s (62%) | browser 2.6s (20%) | wait 2.3s (18%) -> model-bound'."""
+        totals = self.totals()
+        overall = sum(totals.values())
+        if not overall:
+            return "no spans recorded"
+        parts = [
+            f"{cat} {ms / 1000:.1f}s ({ms / overall:.0%})"
+            for cat, ms in sorted(totals.items(), key=lambda kv: -kv[1])
+        ]
+        bound = max(totals, key=totals.get)
+        thinking = sum(e["args"].get("thinking_tokens") or 0 for e in self.events if e["cat"] == "model")
+        if thinking:
+            parts.append(f"{thinking} thinking tokens")
+        return " | ".join(parts) + f" -> {bound}-bound"
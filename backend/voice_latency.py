@@ -0,0 +1,179 @@
+"""
+VoiceLatencyTracker - User stops speaking -> first model audio played
+
+AudioLoop reports four points of each voice turn:
+- speech end: start of the silence that the local VAD confirmed (listen_audio)
+- sent: the first mic chunk read after speech end was sent (send_realtime)
+- first response: first `response.data` of the model turn (receive_audio)
+- first play: first write of that turn to the output device (play_audio)
+
+The VAD confirms silence only after SILENCE_DURATION, so the later points may
+already have happened when speech end is reported; recent sends and the
+current model turn's marks are kept to be matched afterwards.
+
+Completed turns are split into stages (upload, model, playback, total) and
+aggregated into fixed-bucket histograms for /metrics plus a window of recent
+samples for percentiles.
+"""
+
+import time
+from collections import deque
+
+STAGES = ("upload", "model", "playback", "total")
+# Histogram bucket upper bounds (ms)
+BUCKETS_MS = (50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Cumulative-bucket histogram plus a bounded window of recent samples."""
+
+    def __init__(self, window: int = 500, buckets=BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, ms: float):
+        self.count += 1
+        self.sum += ms
+        self.recent.append(ms)
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, p: float):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered) + 0.5) - 1))
+        return round(ordered[index])
+
+    def cumulative(self):
+        """(le, cumulative count) pairs, Prometheus style."""
+        total = 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            yield bound, total
+
+
+class VoiceLatencyTracker:
+    """
+    Per-AudioLoop voice turn latency.
+    """
+
+    def __init__(self, on_turn=None, turn_timeout: float = 30.0):
+        """
+        Args:
+            on_turn: Optional callable(dict) with the breakdown of each completed turn
+            turn_timeout: Seconds after speech end without played audio before a turn is dropped
+        """
+        self.on_turn = on_turn
+        self.turn_timeout = turn_timeout
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+
+        self._turn = None          # Marks of the user turn awaiting its reply
+        self._sends = deque(maxlen=128)  # (enqueued_at, sent_at) of recent audio sends
+        self._model_response = None  # First response.data of the current model turn
+        self._model_play = None      # First write to the device after that
+
+        # Stats
+        self.stats = {"turns": 0, "dropped": 0}
+
+    def speech_ended(self, at: float):
+        """Local VAD confirmed the user stopped speaking at `at` (monotonic)."""
+        if self._turn is not None:
+            self.stats["dropped"] += 1
+        sent = next((sent_at for enqueued_at, sent_at in self._sends if enqueued_at >= at), None)
+        self._turn = {"speech_end": at, "sent": sent, "response": None, "play": None}
+        # The reply may have started during the VAD's confirmation delay
+        if self._model_response is not None and self._model_response >= at:
+            self._turn["response"] = self._model_response
+            if self._model_play is not None:
+                self._turn["play"] = self._model_play
+        self._finish()
+
+    def audio_sent(self, enqueued_at: float, sent_at: float = None):
+        """A mic chunk queued at `enqueued_at` was handed to the session."""
+        sent_at = time.monotonic() if sent_at is None else sent_at
+        self._sends.append((enqueued_at, sent_at))
+        turn = self._turn
+        if turn and turn["sent"] is None and enqueued_at >= turn["speech_end"]:
+            turn["sent"] = sent_at
+
+    def response_received(self, at: float = None):
+        """Model audio arrived (call for every response.data; only the first of a turn counts)."""
+        if self._model_response is not None:
+            return
+        at = time.monotonic() if at is None else at
+        self._model_response = at
+        if self._turn and self._turn["response"] is None:
+            self._turn["response"] = at
+
+    def audio_played(self, at: float = None):
+        """A chunk of model audio was written to the output device."""
+        if self._model_response is None or self._model_play is not None:
+            return
+        at = time.monotonic() if at is None else at
+        self._model_play = at
+        if self._turn and self._turn["response"] is not None and self._turn["play"] is None:
+            self._turn["play"] = at
+            self._finish()
+
+    def model_turn_ended(self, at: float = None):
+        """The model finished its turn; the next response starts a new one."""
+        self._model_response = None
+        self._model_play = None
+        at = time.monotonic() if at is None else at
+        turn = self._turn
+        if turn and at - turn["speech_end"] > self.turn_timeout:
+            self.stats["dropped"] += 1
+            self._turn = None
+
+    def _finish(self):
+        turn = self._turn
+        if not turn or turn["play"] is None:
+            return
+        self._turn = None
+
+        def ms(start, end):
+            return round((end - start) * 1000) if start is not None and end is not None else None
+
+        result = {
+            "upload_ms": ms(turn["speech_end"], turn["sent"]),
+            "model_ms": ms(turn["sent"] or turn["speech_end"], turn["response"]),
+            "playback_ms": ms(turn["response"], turn["play"]),
+            "total_ms": ms(turn["speech_end"], turn["play"]),
+        }
+        for stage in STAGES:
+            if result[f"{stage}_ms"] is not None:
+                self.histograms[stage].observe(result[f"{stage}_ms"])
+        self.stats["turns"] += 1
+        total = self.histograms["total"]
+        result.update(turn=self.stats["turns"], p50_ms=total.percentile(50), p90_ms=total.percentile(90))
+        print(f"[ADA DEBUG] [LATENCY] Turn {result['turn']}: {result['total_ms']} ms "
+              f"(upload {result['upload_ms']}, model {result['model_ms']}, playback {result['playback_ms']})")
+        if self.on_turn:
+            try:
+                self.on_turn(result)
+            except Exception as e:
+                print(f"[ADA DEBUG] [ERR] Latency callback failed: {e}")
+
+    def summary(self) -> dict:
+        return {
+            **self.stats,
+            **{f"{stage}_p{p}_ms": self.histograms[stage].percentile(p) for stage in STAGES for p in (50, 90, 99)},
+        }
+
+    def prometheus(self, labels: str) -> list:
+        """Histogram lines for /metrics (`labels` like 'session="ab12"')."""
+        lines = []
+        for stage in STAGES:
+            histogram = self.histograms[stage]
+            for bound, count in histogram.cumulative():
+                lines.append(f'ada_voice_latency_ms_bucket{{{labels},stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'ada_voice_latency_ms_sum{{{labels},stage="{stage}"}} {round(histogram.sum)}')
+            lines.append(f'ada_voice_latency_ms_count{{{labels},stage="{stage}"}} {histogram.count}')
+        return lines
@@ -0,0 +1,163 @@
+"""
+WarmAudioLoopPool - An AudioLoop built and connected before the mic is clicked
+
+Building an AudioLoop creates a WebAgent, a MemoryAgent and a ProjectManager
+(which clears its temp project), and run() then opens the audio devices and the
+Gemini Live connection, all after start_audio. In warm mode the server keeps
+one spare loop ready instead:
+- the spare is built (in a thread) and its mic/speaker streams are opened in
+  the background at startup and again once the live session that took the
+  previous spare has stopped (never while a session is live, which would
+  hold a second mic/speaker pair)
+- when a client connects, the spare's Live session is opened speculatively
+- start_audio takes the spare, gives it the session's temp project and
+  callbacks and runs it, which then only starts its tasks
+
+The spare has no ProjectManager until it is taken, so building it never clears
+a scratch project a session might still want.
+
+A speculative session that isn't used within `preconnect_ttl` is closed and
+reopened on the next connect, since the Live API drops idle sessions.
+Warm mode keeps the microphone open while idle, so it is opt-in.
+"""
+
+import time
+import asyncio
+
+
+class WarmAudioLoopPool:
+    """
+    Holds at most one spare AudioLoop.
+    """
+
+    def __init__(self, factory, preconnect_ttl: float = 300.0):
+        """
+        Args:
+            factory: Callable() -> AudioLoop without a temp project (runs in a worker thread)
+            preconnect_ttl: Seconds a speculative Live session may wait for start_audio
+        """
+        self.factory = factory
+        self.preconnect_ttl = preconnect_ttl
+
+        self.spare = None
+        self._filling = None
+        self._connecting = None
+        self._closed = False
+
+        # Stats
+        self.stats = {"built": 0, "hits": 0, "misses": 0, "preconnects": 0, "expired": 0,
+                      "errors": 0, "build_ms": None, "prepare_ms": None, "preconnect_ms": None}
+
+    def fill(self):
+        """
+        Start building a spare in the background (no-op if one is ready or underway).
+
+        Returns:
+            The fill task (or None if nothing needed to be done)
+        """
+        if self._closed:
+            return None
+        if self._filling and not self._filling.done():
+            return self._filling
+        if self.spare is not None:
+            return None
+        self._filling = asyncio.create_task(self._fill())
+        return self._filling
+
+    async def _fill(self):
+        try:
+            start = time.perf_counter()
+            spare = await asyncio.to_thread(self.factory)
+            self.stats["build_ms"] = round((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            await spare.prepare_audio()
+            self.stats["prepare_ms"] = round((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"[WARM] [ERR] Failed to build a spare AudioLoop: {e}")
+            return
+        self.spare = spare
+        self.stats["built"] += 1
+        print(f"[WARM] Spare AudioLoop ready "
+              f"(build {self.stats['build_ms']} ms, audio devices {self.stats['prepare_ms']} ms)")
+
+    async def preconnect(self):
+        """Open the spare's Live session (waits for a fill in progress)."""
+        if self._filling:
+            await asyncio.shield(self._filling)
+        spare = self.spare
+        if spare is None:
+            return
+        age = spare.preconnected_age
+        if age is not None and age < self.preconnect_ttl:
+            return
+        if self._connecting and not self._connecting.done():
+            await asyncio.shield(self._connecting)  # Another client's connect already opened it
+            return
+        if age is not None:
+            self.stats["expired"] += 1
+            await spare.drop_preconnection()
+        self._connecting = asyncio.create_task(self._preconnect(spare))
+        await asyncio.shield(self._connecting)
+
+    async def _preconnect(self, spare):
+        try:
+            start = time.perf_counter()
+            await spare.preconnect()
+            self.stats["preconnect_ms"] = round((time.perf_counter() - start) * 1000)
+            self.stats["preconnects"] += 1
+            print(f"[WARM] Speculative Live session open ({self.stats['preconnect_ms']} ms)")
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"[WARM] [ERR] Speculative connect failed: {e}")
+
+    async def take(self, temp_project: str):
+        """
+        Hand over the spare, set up for `temp_project`.
+
+        Returns:
+            The AudioLoop, or None (build one the usual way)
+        """
+        if self._filling and not self._filling.done():
+            # Waiting for a half-built spare is still faster than starting over
+            await asyncio.shield(self._filling)
+        if self._connecting and not self._connecting.done():
+            # The Live session is half open; it will be ready sooner than a new one
+            await asyncio.shield(self._connecting)
+        spare, self.spare = self.spare, None
+        if spare is None:
+            self.stats["misses"] += 1
+            return None
+        await asyncio.to_thread(spare.use_temp_project, temp_project)
+
+        age = spare.preconnected_age
+        if age is not None and age >= self.preconnect_ttl:
+            self.stats["expired"] += 1
+            await spare.drop_preconnection()  # run() connects normally
+        self.stats["hits"] += 1
+        return spare
+
+    async def discard(self):
+        """Close the spare (its devices and any speculative session), including one still being built."""
+        if self._filling and not self._filling.done():
+            await asyncio.shield(self._filling)
+        if self._connecting and not self._connecting.done():
+            await asyncio.shield(self._connecting)
+        spare, self.spare = self.spare, None
+        if spare is not None:
+            await spare.close_warm()
+
+    async def close(self):
+        """Discard the spare for good: later fill() calls do nothing (server shutdown)."""
+        self._closed = True
+        await self.discard()
+
+    def summary(self) -> dict:
+        spare = self.spare
+        return {
+            "spare": spare is not None,
+            "filling": bool(self._filling and not self._filling.done()),
+            "preconnected_s": round(spare.preconnected_age, 1) if spare and spare.preconnected_age is not None else None,
+            **self.stats,
+        }
@@ -1,31 +1,56 @@
 import os
 import time
+import uuid
 import asyncio
-import base64
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
 from google import genai
 from google.genai import types
 
+from browser_pool import get_browser_pool
+from screenshot_history import ScreenshotHistory
+from page_settle import PageSettler
+from web_routing import create_router
+from preview_stream import PreviewStream
+from task_trace import TaskTrace
+from dom_snapshot import DomNavigator, ELEMENT_FUNCTIONS, SYSTEM_INSTRUCTION
+
 # 1. Load API Key
 load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
 
-if not API_KEY:
-    raise ValueError("Please set GEMINI_API_KEY in your .env file")
-
 # 2. Configuration
 SCREEN_WIDTH = 1440
 SCREEN_HEIGHT = 900
 # UPDATED: Use the specific Computer Use preview model
 MODEL_ID = "gemini-2.5-computer-use-preview-10-2025"
+# Full-resolution screenshots kept inline in the conversation; older ones become placeholders
+SCREENSHOT_HISTORY = int(os.getenv("WEB_AGENT_SCREENSHOT_HISTORY", "3"))
+SCREENSHOT_HISTORY_MODE = os.getenv("WEB_AGENT_SCREENSHOT_HISTORY_MODE", "text")  # text | thumbnail
+# Directory for Chrome trace-event JSON of each task (unset = don't save)
+TRACE_DIR = os.getenv("WEB_AGENT_TRACE_DIR")
+# "hybrid" adds a text page snapshot with element-id actions and only sends screenshots when needed
+DOM_MODE = os.getenv("WEB_AGENT_DOM_MODE", "off")  # off | hybrid
 
 class WebAgent:
-    def __init__(self):
-        self.client = genai.Client(api_key=API_KEY)
+    def __init__(self, pool=None, client=None, recorder=None):
+        # Replays (web_recorder.py) need neither an API key nor a real client
+        self.recorder = recorder
+        if client is None and not (recorder and recorder.mode == "replay"):
+            if not API_KEY:
+                raise ValueError("Please set GEMINI_API_KEY in your .env file")
+            client = genai.Client(api_key=API_KEY)
+        self.client = recorder.wrap_client(client) if recorder else client
+        # Shared warm browser; each task leases a fresh context from it
+        self.pool = pool or get_browser_pool()
         self.browser = None
         self.context = None
         self.page = None
+        self.settler = None
+        self.router = None
+        self.dom = None
+        self.trace = TaskTrace()
+        # Set when a task ends with an answer: {"answer", "urls", "text", "screenshot"} (for web_result_cache.py)
+        self.last_run = None
 
     def denormalize_x(self, x: int, width: int) -> int:
         return int((x / 1000) * width)
@@ -56,90 +81,98 @@ class WebAgent:
             result_data = {}
             
             try:
-                # --- NAVIGATION ---
-                if fn_name == "open_web_browser":
-                    pass 
-                elif fn_name == "navigate":
-                    await self.page.goto(args["url"])
-                elif fn_name == "go_back":
-                    await self.page.go_back()
-                elif fn_name == "go_forward":
-                    await self.page.go_forward()
-                elif fn_name == "search":
-                    await self.page.goto("https://www.google.com")
-                elif fn_name == "wait_5_seconds":
-                    await asyncio.sleep(5)
-
-                # --- MOUSE CLICKS & TYPING ---
-                elif fn_name == "click_at":
-                    x = self.denormalize_x(args["x"], SCREEN_WIDTH)
-                    y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
-                    await self.page.mouse.click(x, y)
-                    
-                elif fn_name == "type_text_at":
-                    x = self.denormalize_x(args["x"], SCREEN_WIDTH)
-                    y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
-                    text = args["text"]
-                    press_enter = args.get("press_enter", False)
-                    clear_before = args.get("clear_before_typing", True)
-                    
-                    await self.page.mouse.click(x, y)
-                    if clear_before:
-                        # 'Meta+A' for Mac, 'Control+A' for Windows/Linux
-                        # Simply using Control+A is usually fine for headless linux/windows envs
-                        await self.page.keyboard.press("Control+A") 
-                        await self.page.keyboard.press("Backspace")
+                with self.trace.span(fn_name, "browser", args=dict(args)):
+                    # --- NAVIGATION ---
+                    if fn_name == "open_web_browser":
+                        pass 
+                    elif fn_name == "navigate":
+                        await self.page.goto(args["url"])
+                    elif fn_name == "go_back":
+                        await self.page.go_back()
+                    elif fn_name == "go_forward":
+                        await self.page.go_forward()
+                    elif fn_name == "search":
+                        await self.page.goto("https://www.google.com")
+                    elif fn_name == "wait_5_seconds":
+                        pass # Handled by the settle wait below, with a 5 s bound
+
+                    # --- MOUSE CLICKS & TYPING ---
+                    elif fn_name == "click_at":
+                        x = self.denormalize_x(args["x"], SCREEN_WIDTH)
+                        y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
+                        await self.page.mouse.click(x, y)
                     
-                    await self.page.keyboard.type(text)
-                    if press_enter:
-                        await self.page.keyboard.press("Enter")
-
-                # --- MOUSE MOVEMENT / HOVER ---
-                elif fn_name == "hover_at":
-                    x = self.denormalize_x(args["x"], SCREEN_WIDTH)
-                    y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
-                    await self.page.mouse.move(x, y)
-
-                elif fn_name == "drag_and_drop":
-                    start_x = self.denormalize_x(args["x"], SCREEN_WIDTH)
-                    start_y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
-                    end_x = self.denormalize_x(args["destination_x"], SCREEN_WIDTH)
-                    end_y = self.denormalize_y(args["destination_y"], SCREEN_HEIGHT)
+                    elif fn_name == "type_text_at":
+                        x = self.denormalize_x(args["x"], SCREEN_WIDTH)
+                        y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
+                        text = args["text"]
+                        press_enter = args.get("press_enter", False)
+                        clear_before = args.get("clear_before_typing", True)
                     
-                    await self.page.mouse.move(start_x, start_y)
-                    await self.page.mouse.down()
-                    await self.page.mouse.move(end_x, end_y)
-                    await self.page.mouse.up()
-
-                # --- KEYBOARD ---
-                elif fn_name == "key_combination":
-                    key_comb = args.get("keys")
-                    await self.page.keyboard.press(key_comb)
-
-                # --- SCROLLING ---
-                elif fn_name == "scroll_document" or fn_name == "scroll_at":
-                    magnitude = args.get("magnitude", 800)
-                    direction = args.get("direction", "down")
+                        await self.page.mouse.click(x, y)
+                        if clear_before:
+                            # 'Meta+A' for Mac, 'Control+A' for Windows/Linux
+                            # Simply using Control+A is usually fine for headless linux/windows envs
+                            await self.page.keyboard.press("Control+A") 
+                            await self.page.keyboard.press("Backspace")
                     
-                    # If scroll_at, move mouse there first
-                    if fn_name == "scroll_at":
+                        await self.page.keyboard.type(text)
+                        if press_enter:
+                            await self.page.keyboard.press("Enter")
+
+                    # --- MOUSE MOVEMENT / HOVER ---
+                    elif fn_name == "hover_at":
                         x = self.denormalize_x(args["x"], SCREEN_WIDTH)
                         y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
                         await self.page.mouse.move(x, y)
 
-                    dx, dy = 0, 0
-                    if direction == "down": dy = magnitude
-                    elif direction == "up": dy = -magnitude
-                    elif direction == "right": dx = magnitude
-                    elif direction == "left": dx = -magnitude
+                    elif fn_name == "drag_and_drop":
+                        start_x = self.denormalize_x(args["x"], SCREEN_WIDTH)
+                        start_y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
+                        end_x = self.denormalize_x(args["destination_x"], SCREEN_WIDTH)
+                        end_y = self.denormalize_y(args["destination_y"], SCREEN_HEIGHT)
+                    
+                        await self.page.mouse.move(start_x, start_y)
+                        await self.page.mouse.down()
+                        await self.page.mouse.move(end_x, end_y)
+                        await self.page.mouse.up()
+
+                    # --- KEYBOARD ---
+                    elif fn_name == "key_combination":
+                        key_comb = args.get("keys")
+                        await self.page.keyboard.press(key_comb)
+
+                    # --- SCROLLING ---
+                    elif fn_name == "scroll_document" or fn_name == "scroll_at":
+                        magnitude = args.get("magnitude", 800)
+                        direction = args.get("direction", "down")
                     
-                    await self.page.mouse.wheel(dx, dy)
+                        # If scroll_at, move mouse there first
+                        if fn_name == "scroll_at":
+                            x = self.denormalize_x(args["x"], SCREEN_WIDTH)
+                            y = self.denormalize_y(args["y"], SCREEN_HEIGHT)
+                            await self.page.mouse.move(x, y)
+
+                        dx, dy = 0, 0
+                        if direction == "down": dy = magnitude
+                        elif direction == "up": dy = -magnitude
+                        elif direction == "right": dx = magnitude
+                        elif direction == "left": dx = -magnitude
+                    
+                        await self.page.mouse.wheel(dx, dy)
 
-                else:
-                    print(f"[WARN] Warning: Model requested unimplemented function {fn_name}")
+                    # --- ELEMENT ACTIONS (DOM mode) ---
+                    elif self.dom and self.dom.handles(fn_name):
+                        result_data.update(await self.dom.execute(fn_name, args))
 
-                # Wait a moment for UI to settle
-                await asyncio.sleep(1)
+                    else:
+                        print(f"[WARN] Warning: Model requested unimplemented function {fn_name}")
+
+                # Wait for the UI to settle (returns as soon as the page is stable)
+                if fn_name == "wait_5_seconds":
+                    await self.settle(max_wait=5.0, min_wait=0.5)
+                else:
+                    await self.settle()
                 
             except Exception as e:
                 print(f"[ERR] Error executing {fn_name}: {e}")
@@ -153,14 +186,38 @@ class WebAgent:
         
         return results
 
+    async def settle(self, max_wait: float = None, min_wait: float = 0.0):
+        if self.settler is None:
+            await asyncio.sleep(1)
+            return
+        with self.trace.span("settle", "wait") as info:
+            result = await self.settler.wait(max_wait=max_wait, min_wait=min_wait)
+            info["settled"] = result["settled"]
+        print(f"[WEB] Settled in {result['waited_ms']:.0f} ms" + ("" if result["settled"] else " (timed out)"))
+
     async def get_function_responses(self, results):
-        # UPDATED: Changed "jpeg" to "png" to satisfy Computer Use model requirements
-        screenshot_bytes = await self.page.screenshot(type="png") 
+        snapshot_text = None
+        if self.dom:
+            with self.trace.span("dom_snapshot", "browser") as info:
+                snapshot_text = await self.dom.capture()
+                info["bytes"] = len(snapshot_text or "")
+
+        screenshot_bytes = None
+        if not self.dom or self.dom.needs_screenshot([r[1] for r in results]):
+            # UPDATED: Changed "jpeg" to "png" to satisfy Computer Use model requirements
+            with self.trace.span("screenshot", "browser") as info:
+                screenshot_bytes = await self.page.screenshot(type="png")
+                info["bytes"] = len(screenshot_bytes)
         current_url = self.page.url
         
         function_responses = []
-        for call_id, name, result in results:
+        for i, (call_id, name, result) in enumerate(results):
             response_data = {"url": current_url}
+            if snapshot_text and i == len(results) - 1:
+                # One snapshot per turn, on the last response
+                response_data["page"] = snapshot_text
+            if screenshot_bytes is None:
+                response_data["screenshot"] = "Not attached; the page snapshot describes the page"
             response_data.update(result)
             
             # Construct the response object
@@ -178,72 +235,99 @@ class WebAgent:
                             mime_type="image/png",
                             data=screenshot_bytes
                         )
-                    )]
+                    )] if screenshot_bytes else None
                 )
             )
         return function_responses, screenshot_bytes
 
-    async def run_task(self, prompt, update_callback=None):
+    async def run_task(self, prompt, update_callback=None, task_id=None):
         """
         Runs the agent with the given prompt.
-        update_callback: async function(screenshot_b64: str, logs: str)
+        update_callback: async function(preview: bytes | None, logs: str)
+        task_id: WebTask id, used to name the saved trace (a random id when not given)
+            preview is a downscaled JPEG for the UI; the model still gets lossless PNGs.
+        With WEB_AGENT_DOM_MODE=hybrid the model also gets a text page snapshot and
+        element-id actions, and screenshots are only sent when the snapshot isn't enough.
         Returns the final response from the agent.
         """
         print(f"[START] WebAgent started. Goal: {prompt}")
         final_response = "Agent finished without a final summary."
-
-        async with async_playwright() as p:
-            # Launch browser (Headless=True usually, but for dev we might keep it hidden)
-            # Use headless=True for server deployment
-            self.browser = await p.chromium.launch(headless=True) 
-            self.context = await self.browser.new_context(
-                viewport={"width": SCREEN_WIDTH, "height": SCREEN_HEIGHT},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            self.page = await self.context.new_page()
-            
-            # Start at Google
-            await self.page.goto("https://www.google.com")
-
+        answered = False
+        self.trace = TaskTrace(name=f"web_task: {prompt[:60]}")
+        self.last_run = None
+
+        # Lease a pre-warmed context (already sitting on Google) from the pool
+        async with self.pool.session() as (context, page):
+            self.browser = self.pool.browser
+            self.context = context
+            self.page = page
+            self.settler = PageSettler(page)
+            await self.settler.attach()
+            if self.recorder:
+                # Network comes from (or goes into) the recording's HAR instead of the router
+                await self.recorder.prepare_page(page, prompt, self.pool.start_url or "https://www.google.com", MODEL_ID)
+            else:
+                self.router = create_router()
+                await self.router.attach(page)
+            self.dom = DomNavigator(page) if DOM_MODE == "hybrid" else None
+
+            tools = [types.Tool(
+                computer_use=types.ComputerUse(
+                    environment=types.Environment.ENVIRONMENT_BROWSER
+                )
+            )]
+            if self.dom:
+                tools.append(types.Tool(function_declarations=ELEMENT_FUNCTIONS))
             config = types.GenerateContentConfig(
-                tools=[types.Tool(
-                    computer_use=types.ComputerUse(
-                        environment=types.Environment.ENVIRONMENT_BROWSER
-                    )
-                )],
+                tools=tools,
+                system_instruction=SYSTEM_INSTRUCTION if self.dom else None,
                 thinking_config=types.ThinkingConfig(include_thoughts=True) 
             )
 
             # UPDATED: Capture initial screenshot as PNG
-            initial_screenshot = await self.page.screenshot(type="png")
+            with self.trace.span("screenshot", "browser") as info:
+                initial_screenshot = await self.page.screenshot(type="png")
+                info["bytes"] = len(initial_screenshot)
             
             # Send initial state
-            if update_callback:
-                encoded_image = base64.b64encode(initial_screenshot).decode('utf-8')
-                await update_callback(encoded_image, "Web Agent Initialized")
-
-            chat_history = [
-                types.Content(
-                    role="user",
-                    parts=[
-                        types.Part(text=prompt),
-                        # UPDATED: Use PNG mime type
-                        types.Part.from_bytes(data=initial_screenshot, mime_type="image/png")
-                    ]
-                )
-            ]
+            preview = PreviewStream(
+                update_callback,
+                max_fps=float(os.getenv("WEB_AGENT_PREVIEW_FPS", "4")),
+                width=int(os.getenv("WEB_AGENT_PREVIEW_WIDTH", "720")),
+            ) if update_callback else None
+            if preview:
+                with self.trace.span("frontend_update", "frontend"):
+                    await preview.push(initial_screenshot, "Web Agent Initialized")
+
+            initial_parts = [types.Part(text=prompt)]
+            if self.dom:
+                snapshot_text = await self.dom.capture()
+                if snapshot_text:
+                    initial_parts.append(types.Part(text=snapshot_text))
+            if not self.dom or self.dom.needs_screenshot([]):
+                # UPDATED: Use PNG mime type
+                initial_parts.append(types.Part.from_bytes(data=initial_screenshot, mime_type="image/png"))
+
+            chat_history = ScreenshotHistory(keep_last=SCREENSHOT_HISTORY, mode=SCREENSHOT_HISTORY_MODE)
+            chat_history.append(types.Content(role="user", parts=initial_parts))
+            visited_urls = [self.page.url]
 
             MAX_TURNS = 20
             
             for turn in range(MAX_TURNS):
                 print(f"\n--- Turn {turn + 1} ---")
+                request_bytes = chat_history.record_request()
+                print(f"[WEB] Request size: {request_bytes / 1024:.0f} KB")
                 
                 try:
-                    response = await self.client.aio.models.generate_content(
-                        model=MODEL_ID,
-                        contents=chat_history,
-                        config=config
-                    )
+                    with self.trace.span("model_call", "model", turn=turn + 1, request_bytes=request_bytes) as info:
+                        response = await self.client.aio.models.generate_content(
+                            model=MODEL_ID,
+                            contents=chat_history.contents,
+                            config=config
+                        )
+                        usage = response.usage_metadata
+                        info["thinking_tokens"] = usage.thoughts_token_count if usage else None
                 except Exception as e:
                     print(f"[CRITICAL] Critical API Error: {e}")
                     if update_callback: await update_callback(None, f"Error: {e}")
@@ -286,6 +370,7 @@ class WebAgent:
                 if not function_calls:
                     if not has_tool_use:
                         print("[DONE] Task finished details.")
+                        answered = bool(agent_text)
                         if update_callback: await update_callback(None, "Task Finished")
                         break
                     else:
@@ -298,22 +383,65 @@ class WebAgent:
                 # Capture new state
                 print("[SNAP] Capturing new state...")
                 function_responses, screenshot_bytes = await self.get_function_responses(results)
+                if self.page.url != visited_urls[-1]:
+                    visited_urls.append(self.page.url)
                 
                 # Update frontend
-                if update_callback:
-                    encoded_image = base64.b64encode(screenshot_bytes).decode('utf-8')
+                if preview and screenshot_bytes is None:
+                    # The model didn't need pixels this turn; the UI still does, and JPEG is cheaper
+                    with self.trace.span("screenshot", "browser", preview_only=True):
+                        screenshot_bytes = await self.page.screenshot(type="jpeg", quality=60)
+                if preview:
                     # Format a log message from the actions taken
                     actions_log = ", ".join([r[1] for r in results])
-                    await update_callback(encoded_image, f"Executed: {actions_log}")
+                    with self.trace.span("frontend_update", "frontend"):
+                        await preview.push(screenshot_bytes, f"Executed: {actions_log}")
 
                 # Send Response Back
                 response_parts = [types.Part(function_response=fr) for fr in function_responses]
                 chat_history.append(types.Content(role="user", parts=response_parts))
 
-            await self.browser.close()
-            print("[CLOSE] Browser closed.")
-            return final_response
+            if answered:
+                # Keep what the answer was based on, so a repeat of the question can skip the browser
+                try:
+                    with self.trace.span("final_capture", "browser"):
+                        self.last_run = {
+                            "answer": final_response,
+                            "urls": visited_urls,
+                            "text": await self.page.inner_text("body"),
+                            "screenshot": await self.page.screenshot(type="png"),
+                        }
+                except Exception as e:
+                    print(f"[WEB] [WARN] Final page capture failed: {e}")
+
+        if chat_history.turn_bytes:
+            print(f"[WEB] Request bytes per turn (KB): {[round(b / 1024) for b in chat_history.turn_bytes]}")
+        if self.router:
+            print(f"[WEB] Network: {self.router.summary()}")
+        if preview:
+            await preview.close()
+            print(f"[WEB] Preview: {preview.summary()}")
+        if self.dom:
+            print(f"[WEB] DOM: {self.dom.summary()}")
+
+        trace_summary = self.trace.summary()
+        print(f"[WEB] Trace: {trace_summary}")
+        if TRACE_DIR:
+            # Several tasks can finish within the same second, so the name carries the task id
+            trace_id = task_id or uuid.uuid4().hex[:8]
+            path = self.trace.save(os.path.join(TRACE_DIR, f"web_task_{int(time.time())}_{trace_id}.json"))
+            print(f"[WEB] Trace saved to {path}")
+        if update_callback:
+            await update_callback(None, f"Trace: {trace_summary}")
+        print("[CLOSE] Task context released.")
+        return final_response
 
 if __name__ == "__main__":
-    agent = WebAgent()
-    asyncio.run(agent.run_task("Go to google.com and search for 'Gemini API' pricing."))
\ No newline at end of file
+    async def main():
+        agent = WebAgent()
+        try:
+            await agent.run_task("Go to google.com and search for 'Gemini API' pricing.")
+        finally:
+            await agent.pool.stop()
+
+    asyncio.run(main())
\ No newline at end of file
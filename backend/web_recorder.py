@@ -0,0 +1,221 @@
+"""
+WebRecorder - Record/replay harness for the web agent
+
+Record mode runs a real task and saves, per recording directory:
+- meta.json     prompt, start URL and model
+- model.jsonl   every generate_content call: request summary, response, latency
+- network.har   the page's network traffic (Playwright route_from_har, update=True)
+
+Replay mode serves both back locally: a stand-in model client returns the
+recorded responses in order and the page is routed from the HAR, so a task
+runs deterministically with no API key and no internet. Used with
+`python web_recorder.py record|replay ...` to benchmark turn latency, action
+time and screenshot time offline.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+
+from google.genai import types
+
+
+def _strip_binary(value):
+    """Drop inline image data from a dumped request so recordings stay small."""
+    if isinstance(value, dict):
+        return {k: ("<%d bytes>" % (len(v) * 3 // 4) if k == "data" and isinstance(v, str) else _strip_binary(v))
+                for k, v in value.items()}
+    if isinstance(value, list):
+        return [_strip_binary(v) for v in value]
+    return value
+
+
+class _Namespace:
+    pass
+
+
+class RecordingModelClient:
+    """
+    Wraps a genai.Client and appends every generate_content exchange to model.jsonl.
+    Only `client.aio.models.generate_content` (what WebAgent uses) is exposed.
+    """
+
+    def __init__(self, client, path: str):
+        self.client = client
+        self.path = path
+        self.turn = 0
+        self.aio = _Namespace()
+        self.aio.models = _Namespace()
+        self.aio.models.generate_content = self.generate_content
+
+    async def generate_content(self, model, contents, config=None):
+        start = time.perf_counter()
+        response = await self.client.aio.models.generate_content(model=model, contents=contents, config=config)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        request = [c.model_dump(mode="json", exclude_none=True) for c in contents]
+        entry = {
+            "turn": self.turn,
+            "latency_ms": latency_ms,
+            "request": {
+                "contents": len(contents),
+                "digest": hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest(),
+                "last": _strip_binary(request[-1]) if request else None,
+            },
+            "response": response.model_dump(mode="json", exclude_none=True),
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.turn += 1
+        return response
+
+
+class ReplayModelClient:
+    """
+    Stand-in for genai.Client that returns recorded responses in order.
+    """
+
+    def __init__(self, path: str, latency: float = None):
+        """
+        Args:
+            path: model.jsonl from a recording
+            latency: Seconds to wait per call. None replays the recorded latency, 0 disables waiting.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            self.entries = [json.loads(line) for line in f if line.strip()]
+        self.latency = latency
+        self.turn = 0
+        self.aio = _Namespace()
+        self.aio.models = _Namespace()
+        self.aio.models.generate_content = self.generate_content
+
+    async def generate_content(self, model, contents, config=None):
+        if self.turn >= len(self.entries):
+            raise RuntimeError(f"Replay exhausted after {len(self.entries)} recorded turn(s)")
+        entry = self.entries[self.turn]
+        self.turn += 1
+        delay = entry.get("latency_ms", 0) / 1000 if self.latency is None else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+        return types.GenerateContentResponse.model_validate(entry["response"])
+
+
+class WebRecorder:
+    """
+    Hooks a WebAgent task into a recording directory (mode "record" or "replay").
+    """
+
+    def __init__(self, path: str, mode: str = "replay", model_latency: float = None):
+        """
+        Args:
+            path: Recording directory
+            mode: "record" or "replay"
+            model_latency: Replay only; see ReplayModelClient
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown recorder mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.model_latency = model_latency
+        self.har_path = os.path.join(path, "network.har")
+        self.model_path = os.path.join(path, "model.jsonl")
+        self.meta_path = os.path.join(path, "meta.json")
+        if mode == "record":
+            os.makedirs(path, exist_ok=True)
+            if os.path.exists(self.model_path):
+                os.remove(self.model_path)
+
+    def wrap_client(self, client):
+        """Returns the model client the agent should use."""
+        if self.mode == "record":
+            return RecordingModelClient(client, self.model_path)
+        return ReplayModelClient(self.model_path, latency=self.model_latency)
+
+    def load_meta(self) -> dict:
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    async def prepare_page(self, page, prompt: str, start_url: str, model_id: str):
+        """
+        Route the page through the HAR and load the start page, so the first
+        screenshot also comes from the recording.
+        """
+        if self.mode == "record":
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"prompt": prompt, "start_url": start_url, "model": model_id,
+                           "recorded_at": time.time()}, f, indent=2)
+            await page.route_from_har(self.har_path, update=True, update_content="embed")
+        else:
+            start_url = self.load_meta()["start_url"]
+            await page.route_from_har(self.har_path, not_found="abort")
+        await page.goto(start_url)
+
+
+class Timer:
+    """Accumulates wall time of wrapped coroutine methods by name."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def wrap(self, obj, name, label=None):
+        original = getattr(obj, name)
+        label = label or name
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                self.samples.setdefault(label, []).append((time.perf_counter() - start) * 1000)
+
+        setattr(obj, name, timed)
+
+    def report(self) -> dict:
+        return {
+            label: {"count": len(v), "total_ms": round(sum(v), 1), "mean_ms": round(sum(v) / len(v), 1)}
+            for label, v in self.samples.items()
+        }
+
+
+async def run_recorded(path: str, mode: str, prompt: str = None, model_latency: float = 0.0) -> dict:
+    """
+    Run one task in record or replay mode and return timing results.
+    """
+    from browser_pool import BrowserPool
+    from web_agent import WebAgent
+
+    recorder = WebRecorder(path, mode=mode, model_latency=model_latency)
+    if mode == "replay":
+        prompt = prompt or recorder.load_meta()["prompt"]
+
+    pool = BrowserPool(size=1, start_url=None)
+    agent = WebAgent(pool=pool, recorder=recorder)
+    timer = Timer()
+    timer.wrap(agent.client.aio.models, "generate_content", "model_call")
+    timer.wrap(agent, "execute_function_calls", "actions")
+    timer.wrap(agent, "get_function_responses", "screenshot")
+
+    start = time.perf_counter()
+    try:
+        result = await agent.run_task(prompt)
+    finally:
+        await pool.stop()
+    return {"result": result, "total_ms": round((time.perf_counter() - start) * 1000, 1), "timings": timer.report()}
+
+
+if __name__ == "__main__":
+    # python web_recorder.py record <dir> "<prompt>"
+    # python web_recorder.py replay <dir> [model_latency_seconds]
+    if len(sys.argv) < 3 or sys.argv[1] not in ("record", "replay"):
+        print(__doc__)
+        sys.exit(1)
+    mode, path = sys.argv[1], sys.argv[2]
+    if mode == "record":
+        report = asyncio.run(run_recorded(path, "record", prompt=sys.argv[3]))
+    else:
+        latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+        report = asyncio.run(run_recorded(path, "replay", model_latency=latency))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,148 @@
+"""
+WebResultCache - Reuses finished web agent answers for repeated questions
+
+Entries live in the current project's `browser/` folder, one pair of files
+per task: `web_<key>.json` (prompt, answer, URLs the task visited, extracted
+page text, timestamps) and `web_<key>.png` (the final screenshot). The key is
+a hash of the normalized prompt, so "What's the price of X?" and "what is the
+price of x" share an entry. Entries expire after `ttl` seconds and can be
+bypassed with refresh=True.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import unicodedata
+from pathlib import Path
+
+# Leading filler that doesn't change what the task is
+FILLER = re.compile(r"^(?:(?:hey|ok|okay)\s+ada\s+|please\s+|can you\s+|could you\s+|would you\s+|go and\s+)+")
+CONTRACTIONS = {"what's": "what is", "where's": "where is", "who's": "who is", "how's": "how is"}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, drop filler and punctuation (URLs keep theirs), collapse whitespace."""
+    text = unicodedata.normalize("NFKC", prompt).lower().strip()
+    for short, full in CONTRACTIONS.items():
+        text = text.replace(short, full)
+    words = []
+    for word in text.split():
+        if "://" in word or re.match(r"^[\w-]+(\.[\w-]+)+(/\S*)?$", word):
+            words.append(word.rstrip(".,!?;:"))
+        else:
+            word = re.sub(r"[^\w\s-]", "", word)
+            if word:
+                words.append(word)
+    return FILLER.sub("", " ".join(words)).strip()
+
+
+def cache_key(prompt: str) -> str:
+    return hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()[:16]
+
+
+def format_age(seconds: float) -> str:
+    if seconds < 90:
+        return f"{int(seconds)} seconds"
+    if seconds < 5400:
+        return f"{int(seconds / 60)} minutes"
+    return f"{seconds / 3600:.1f} hours"
+
+
+class WebResultCache:
+    """
+    TTL cache of web agent results stored in a project's browser/ folder.
+    """
+
+    def __init__(self, directory, ttl: float = 6 * 3600, max_text: int = 4000):
+        """
+        Args:
+            directory: The project's browser/ folder (created on first write)
+            ttl: Seconds an entry stays valid
+            max_text: Characters of extracted page text kept per entry
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_text = max_text
+
+    def _paths(self, key: str):
+        return self.directory / f"web_{key}.json", self.directory / f"web_{key}.png"
+
+    def _get_sync(self, prompt: str):
+        meta_path, png_path = self._paths(cache_key(prompt))
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl:
+            for path in (meta_path, png_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return None
+
+        try:
+            entry["screenshot"] = png_path.read_bytes()
+        except OSError:
+            entry["screenshot"] = None
+        return entry
+
+    def _put_sync(self, prompt: str, answer: str, urls, text: str, screenshot: bytes):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path, png_path = self._paths(cache_key(prompt))
+        entry = {
+            "prompt": prompt,
+            "normalized_prompt": normalize_prompt(prompt),
+            "answer": answer,
+            "urls": list(dict.fromkeys(urls)),
+            "text": (text or "")[:self.max_text],
+            "created_at": time.time(),
+        }
+        if screenshot:
+            tmp = png_path.with_suffix(".png.tmp")
+            tmp.write_bytes(screenshot)
+            os.replace(tmp, png_path)
+        tmp = meta_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp, meta_path)
+        return entry
+
+    async def get(self, prompt: str):
+        """
+        Look up a fresh result for a prompt.
+
+        Returns:
+            The entry dict (answer, urls, text, created_at, screenshot bytes) or None
+        """
+        return await asyncio.to_thread(self._get_sync, prompt)
+
+    async def put(self, prompt: str, answer: str, urls, text: str = "", screenshot: bytes = None) -> dict:
+        """
+        Store a finished task's result, replacing any older entry for the same prompt.
+
+        Args:
+            prompt: The task prompt as submitted
+            answer: The agent's final answer
+            urls: URLs the task visited, in order
+            text: Text extracted from the final page
+            screenshot: Final PNG screenshot
+        """
+        try:
+            return await asyncio.to_thread(self._put_sync, prompt, answer, urls, text, screenshot)
+        except OSError as e:
+            print(f"[WEB] [ERR] Failed to cache result: {e}")
+            return None
+
+    @staticmethod
+    def describe(entry: dict) -> str:
+        """Answer text returned for a cache hit."""
+        age = format_age(time.time() - entry["created_at"])
+        sources = ", ".join(entry["urls"][-3:]) or "unknown"
+        return (f"{entry['answer']}\n(Cached result from {age} ago, source: {sources}. "
+                f"Run again with refresh=true for up-to-date data.)")
@@ -0,0 +1,326 @@
+"""
+RequestRouter - Request interception and blocking for the web agent
+
+The model only sees screenshots, so ads, analytics beacons and (optionally)
+video and web fonts are wasted bandwidth. The router sits on each task's
+page and:
+- aborts requests to known ad/analytics domains
+- optionally aborts media and font requests
+- serves static assets (scripts, stylesheets, images, fonts) from a local
+  content-addressed cache shared across tasks. Playwright turns off the
+  browser's own HTTP cache once routing is enabled, so this cache replaces it
+  and follows the same rules: freshness from Cache-Control max-age / Expires
+  (Last-Modified heuristic otherwise), nothing stored for no-store, no-cache,
+  private or Vary responses.
+Each task gets its own byte and request counts.
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "web_cache",
+    "assets",
+)
+
+BLOCKED_DOMAINS = {
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+    "googletagmanager.com", "googletagservices.com", "adservice.google.com", "amazon-adsystem.com",
+    "adnxs.com", "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "pubmatic.com",
+    "rubiconproject.com", "openx.net", "scorecardresearch.com", "quantserve.com", "chartbeat.com",
+    "hotjar.com", "clarity.ms", "mixpanel.com", "segment.io", "segment.com", "fullstory.com",
+    "newrelic.com", "nr-data.net", "connect.facebook.net", "ads-twitter.com", "bat.bing.com",
+    "moatads.com", "adsrvr.org", "casalemedia.com", "teads.tv", "yieldmo.com",
+}
+
+CACHEABLE_TYPES = {"script", "stylesheet", "image", "font"}
+# Bodies from route.fetch() are already decoded, so content-encoding is not kept
+CACHED_HEADERS = ("content-type", "access-control-allow-origin", "timing-allow-origin")
+
+
+def is_blocked_host(host: str, blocked=BLOCKED_DOMAINS) -> bool:
+    """True if host or any parent domain is in the block list."""
+    parts = host.lower().split(".")
+    return any(".".join(parts[i:]) in blocked for i in range(len(parts) - 1))
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def freshness_lifetime(headers: dict, now: float = None) -> float:
+    """
+    Seconds a response may be served from cache without revalidation (RFC 9111).
+
+    Args:
+        headers: Response headers
+        now: Current time (defaults to time.time())
+
+    Returns:
+        Remaining lifetime in seconds; 0 when the response must not be cached
+    """
+    now = time.time() if now is None else now
+    headers = {k.lower(): v for k, v in headers.items()}
+
+    directives = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('"')
+    # This cache never revalidates, so no-cache is treated like no-store
+    if {"no-store", "no-cache", "private"} & directives.keys():
+        return 0
+    # Bodies are stored decoded, so only Accept-Encoding variants are interchangeable
+    vary = {v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()}
+    if vary - {"accept-encoding"}:
+        return 0
+
+    try:
+        age = max(0.0, float(headers.get("age", 0)))
+    except ValueError:
+        age = 0.0
+    date = _http_date(headers.get("date")) or now
+
+    if "max-age" in directives:
+        try:
+            lifetime = float(directives["max-age"])
+        except ValueError:
+            return 0
+    elif "expires" in headers:
+        expires = _http_date(headers["expires"])
+        lifetime = expires - date if expires is not None else 0  # Invalid Expires means already expired
+    elif "last-modified" in headers:
+        modified = _http_date(headers["last-modified"])
+        lifetime = 0.1 * (date - modified) if modified is not None else 0
+    else:
+        return 0
+    return max(0.0, lifetime - age)
+
+
+class AssetCache:
+    """
+    Content-addressed store for static responses. Bodies live in objects/<sha256>,
+    the URL index in SQLite. Thread-safe; all methods are blocking.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, max_age: float = 24 * 3600,
+                 max_object: int = 5 * 1024 * 1024):
+        """
+        Args:
+            path: Cache directory
+            max_bytes: Total size above which least recently used objects are evicted
+            max_age: Upper bound on how long an entry stays fresh
+            max_object: Larger responses are not cached
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_object = max_object
+        self._lock = threading.Lock()
+
+        self.objects_dir = os.path.join(path, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(path, "index.db"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS assets ("
+            "url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER, headers TEXT, "
+            "stored_at REAL, used_at REAL, expires_at REAL)"
+        )
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(assets)")]
+        if "expires_at" not in columns:
+            # Entries from before freshness was tracked read as expired
+            self.db.execute("ALTER TABLE assets ADD COLUMN expires_at REAL")
+        self.db.commit()
+
+    def get(self, url: str):
+        """Returns (headers, body) for a fresh entry, else None."""
+        with self._lock:
+            row = self.db.execute("SELECT digest, headers, expires_at FROM assets WHERE url = ?", (url,)).fetchone()
+            if row is None or row[2] is None or time.time() >= row[2]:
+                return None
+            digest, headers, _ = row
+            try:
+                with open(os.path.join(self.objects_dir, digest), "rb") as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self.db.execute("DELETE FROM assets WHERE url = ?", (url,))
+                self.db.commit()
+                return None
+            self.db.execute("UPDATE assets SET used_at = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+        return dict(line.split(":", 1) for line in headers.splitlines() if ":" in line), body
+
+    def put(self, url: str, headers: dict, body: bytes):
+        """Store a response if its headers allow it (see freshness_lifetime)."""
+        lifetime = min(freshness_lifetime(headers), self.max_age)
+        if lifetime <= 0 or len(body) > self.max_object:
+            return
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = os.path.join(self.objects_dir, digest)
+        with self._lock:
+            # Identical bodies (same library from different URLs) are stored once
+            if not os.path.exists(object_path):
+                tmp = object_path + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, object_path)
+            kept = "\n".join(f"{k}:{v}" for k, v in headers.items() if k.lower() in CACHED_HEADERS)
+            now = time.time()
+            self.db.execute(
+                "INSERT OR REPLACE INTO assets (url, digest, size, headers, stored_at, used_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, len(body), kept, now, now, now + lifetime)
+            )
+            self.db.commit()
+            self._evict()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM assets").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, digest, size in self.db.execute("SELECT url, digest, size FROM assets ORDER BY used_at").fetchall():
+            self.db.execute("DELETE FROM assets WHERE url = ?", (url,))
+            still_used = self.db.execute("SELECT 1 FROM assets WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if not still_used:
+                try:
+                    os.remove(os.path.join(self.objects_dir, digest))
+                except FileNotFoundError:
+                    pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self.db.commit()
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+
+class RequestRouter:
+    """
+    Playwright routing layer for one task's page.
+    """
+
+    def __init__(self, cache: AssetCache = None, block_trackers: bool = True, block_media: bool = False,
+                 block_fonts: bool = False, blocked_domains=BLOCKED_DOMAINS):
+        """
+        Args:
+            cache: Shared AssetCache for static assets (None disables caching)
+            block_trackers: Abort requests to ad/analytics domains
+            block_media: Abort video/audio requests
+            block_fonts: Abort web font requests
+            blocked_domains: Domains (and their subdomains) to block
+        """
+        self.cache = cache
+        self.block_trackers = block_trackers
+        self.blocked_types = ({"media"} if block_media else set()) | ({"font"} if block_fonts else set())
+        self.blocked_domains = blocked_domains
+
+        # Per-task stats
+        self.stats = {
+            "requests": 0, "blocked": 0, "cache_hits": 0,
+            "bytes_fetched": 0, "bytes_from_cache": 0,
+        }
+
+    async def attach(self, page):
+        """
+        Route every request made by the page through this router. Routes are set on the
+        page rather than the context, so they go away with the task's page even when the
+        context is shared (persistent profile).
+        """
+        await page.route("**/*", self._handle)
+        page.on("requestfinished", self._on_finished)
+
+    def _should_block(self, request) -> bool:
+        if request.resource_type in self.blocked_types:
+            return True
+        if self.block_trackers:
+            host = urlsplit(request.url).hostname or ""
+            return is_blocked_host(host, self.blocked_domains)
+        return False
+
+    async def _handle(self, route, request):
+        self.stats["requests"] += 1
+
+        if self._should_block(request):
+            self.stats["blocked"] += 1
+            await route.abort("blockedbyclient")
+            return
+
+        if self.cache is None or request.method != "GET" or request.resource_type not in CACHEABLE_TYPES:
+            await route.continue_()
+            return
+
+        cached = await asyncio.to_thread(self.cache.get, request.url)
+        if cached is not None:
+            headers, body = cached
+            self.stats["cache_hits"] += 1
+            self.stats["bytes_from_cache"] += len(body)
+            await route.fulfill(status=200, headers=headers, body=body)
+            return
+
+        try:
+            response = await route.fetch()
+        except Exception:
+            await route.continue_()
+            return
+        body = await response.body()
+        self.stats["bytes_fetched"] += len(body)
+
+        if response.status == 200:
+            # put() skips responses whose headers don't allow caching
+            await asyncio.to_thread(self.cache.put, request.url, response.headers, body)
+        await route.fulfill(response=response)
+
+    def _on_finished(self, request):
+        # Everything not fulfilled by the router itself (documents, XHR, ...) is counted here
+        if self.cache is not None and request.method == "GET" and request.resource_type in CACHEABLE_TYPES:
+            return
+        asyncio.create_task(self._count_bytes(request))
+
+    async def _count_bytes(self, request):
+        try:
+            sizes = await request.sizes()
+            self.stats["bytes_fetched"] += sizes["responseBodySize"]
+        except Exception:
+            pass
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['bytes_fetched'] / 1024:.0f} KB fetched, {s['bytes_from_cache'] / 1024:.0f} KB from cache, "
+                f"{s['blocked']}/{s['requests']} requests blocked")
+
+
+_cache = None
+
+
+def get_asset_cache():
+    """Process-wide AssetCache at WEB_AGENT_ASSET_CACHE (None when set to "0")."""
+    global _cache
+    location = os.getenv("WEB_AGENT_ASSET_CACHE", DEFAULT_CACHE_DIR)
+    if location == "0":
+        return None
+    if _cache is None:
+        _cache = AssetCache(location)
+    return _cache
+
+
+def create_router() -> RequestRouter:
+    """Router configured from WEB_AGENT_BLOCK_TRACKERS, WEB_AGENT_BLOCK_MEDIA and WEB_AGENT_BLOCK_FONTS."""
+    return RequestRouter(
+        cache=get_asset_cache(),
+        block_trackers=os.getenv("WEB_AGENT_BLOCK_TRACKERS", "1") != "0",
+        block_media=os.getenv("WEB_AGENT_BLOCK_MEDIA", "0") == "1",
+        block_fonts=os.getenv("WEB_AGENT_BLOCK_FONTS", "0") == "1",
+    )
@@ -0,0 +1,221 @@
+"""
+WebTaskScheduler - Runs web agent tasks concurrently and in isolation
+
+Each task gets its own WebAgent (and so its own leased browser context), at most
+`max_concurrency` tasks run at once, and the rest wait in a FIFO queue. Tasks
+can be cancelled while queued or running. Progress is reported per task, tagged
+with its id, so the frontend can tell parallel streams apart. With a result
+cache, repeated prompts are answered from the cache without opening a browser.
+"""
+
+import time
+import uuid
+import asyncio
+from collections import deque
+
+
+class WebTask:
+    """State of one submitted web agent task."""
+
+    def __init__(self, prompt: str, refresh: bool = False):
+        self.id = uuid.uuid4().hex[:8]
+        self.prompt = prompt
+        self.refresh = refresh
+        self.status = "queued"  # queued | running | done | error | cancelled
+        self.result = None
+        self.cached = False
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = asyncio.get_running_loop().create_future()
+        self._runner = None
+        self._cache = None
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.id,
+            "prompt": self.prompt,
+            "status": self.status,
+            "result": self.result,
+            "cached": self.cached,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class WebTaskScheduler:
+    """
+    FIFO scheduler for WebAgent tasks with bounded concurrency.
+    """
+
+    def __init__(self, agent_factory, max_concurrency: int = 2, on_update=None, history_size: int = 50,
+                 result_cache=None):
+        """
+        Args:
+            agent_factory: Callable returning a fresh WebAgent for each task
+            max_concurrency: Maximum number of tasks running at once
+            on_update: Callable(dict) receiving {"task_id", "status", "image", "log"} progress events
+            history_size: Number of finished tasks kept for list_tasks()
+            result_cache: Callable returning the WebResultCache to use (e.g. the current
+                project's), or None to disable caching
+        """
+        self.agent_factory = agent_factory
+        self.max_concurrency = max_concurrency
+        self.on_update = on_update
+        self.history_size = history_size
+        self.result_cache = result_cache
+
+        self.tasks = {}
+        self._queue = deque()
+        self._running = set()
+
+    def _emit(self, task: WebTask, image=None, log=None):
+        if self.on_update:
+            try:
+                self.on_update({"task_id": task.id, "status": task.status, "image": image, "log": log})
+            except Exception as e:
+                print(f"[WEB] [ERR] Progress callback failed: {e}")
+
+    def submit(self, prompt: str, refresh: bool = False) -> WebTask:
+        """
+        Queue a task. It starts as soon as a slot is free, unless the result cache answers it.
+
+        Args:
+            prompt: Goal for the web agent
+            refresh: Skip the result cache and browse again
+
+        Returns:
+            The WebTask; await task.future (or wait()) for the result
+        """
+        task = WebTask(prompt, refresh=refresh)
+        self.tasks[task.id] = task
+        task._cache = self.result_cache() if self.result_cache else None
+        if task._cache and not refresh:
+            asyncio.create_task(self._lookup(task))
+            return task
+        self._enqueue(task)
+        return task
+
+    async def _lookup(self, task: WebTask):
+        # Runs as a fire-and-forget task: any error has to end in _enqueue, or task.future never resolves
+        try:
+            entry = await task._cache.get(task.prompt)
+            if task.finished_at is not None:
+                return  # Cancelled while looking up
+            if entry is None:
+                self._enqueue(task)
+                return
+
+            image = None
+            if entry.get("screenshot"):
+                from preview_stream import encode_preview
+                try:
+                    image = await asyncio.to_thread(encode_preview, entry["screenshot"], 720)
+                except Exception as e:
+                    print(f"[WEB] [WARN] Cached screenshot unreadable: {e}")
+            result = task._cache.describe(entry)
+        except Exception as e:
+            print(f"[WEB] [WARN] Result cache lookup failed for task {task.id}, browsing instead: {e}")
+            if task.finished_at is None:
+                self._enqueue(task)
+            return
+        if task.finished_at is not None:
+            return
+
+        task.cached = True
+        task.status = "done"
+        task.result = result
+        task.finished_at = time.time()
+        print(f"[WEB] Task {task.id} answered from cache: {task.prompt}")
+        self._emit(task, image=image, log="Answered from cache")
+        task.future.set_result(task.result)
+        self._prune()
+
+    def _enqueue(self, task: WebTask):
+        self._queue.append(task)
+        position = len(self._queue)
+        print(f"[WEB] Task {task.id} queued (position {position}): {task.prompt}")
+        self._emit(task, log=f"Queued: {task.prompt}")
+        self._pump()
+
+    def _pump(self):
+        while self._queue and len(self._running) < self.max_concurrency:
+            task = self._queue.popleft()
+            task.status = "running"
+            task.started_at = time.time()
+            self._running.add(task.id)
+            task._runner = asyncio.create_task(self._run(task))
+
+    async def _run(self, task: WebTask):
+        async def update_callback(image, log_text):
+            self._emit(task, image=image, log=log_text)
+
+        self._emit(task, log="Started")
+        try:
+            agent = self.agent_factory()
+            task.result = await agent.run_task(task.prompt, update_callback=update_callback, task_id=task.id)
+            task.status = "done"
+            run = getattr(agent, "last_run", None)
+            if task._cache and run:
+                await task._cache.put(task.prompt, run["answer"], run["urls"], run["text"], run["screenshot"])
+        except asyncio.CancelledError:
+            task.status = "cancelled"
+            task.result = "Task was cancelled."
+        except Exception as e:
+            print(f"[WEB] [ERR] Task {task.id} failed: {e}")
+            task.status = "error"
+            task.result = f"Web Agent error: {e}"
+        finally:
+            task.finished_at = time.time()
+            self._running.discard(task.id)
+            if not task.future.done():
+                task.future.set_result(task.result)
+            self._emit(task, log=f"Task {task.status}")
+            self._prune()
+            self._pump()
+
+    def _prune(self):
+        finished = [t for t in self.tasks.values() if t.finished_at is not None]
+        for task in sorted(finished, key=lambda t: t.finished_at)[:-self.history_size or None]:
+            del self.tasks[task.id]
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        Cancel a queued or running task.
+
+        Returns:
+            True if the task was found and not already finished
+        """
+        task = self.tasks.get(task_id)
+        if task is None or task.finished_at is not None:
+            return False
+
+        if task.status == "queued":
+            if task in self._queue:
+                self._queue.remove(task)
+            task.status = "cancelled"
+            task.result = "Task was cancelled."
+            task.finished_at = time.time()
+            task.future.set_result(task.result)
+            self._emit(task, log="Task cancelled")
+        else:
+            task._runner.cancel()
+        print(f"[WEB] Task {task_id} cancelled")
+        return True
+
+    async def wait(self, task_id: str):
+        """Wait for a task and return its result."""
+        return await self.tasks[task_id].future
+
+    def list_tasks(self) -> list:
+        """Snapshot of known tasks, oldest first."""
+        return [t.to_dict() for t in sorted(self.tasks.values(), key=lambda t: t.created_at)]
+
+    async def close(self):
+        """Cancel everything that hasn't finished."""
+        for task_id in [t.id for t in self.tasks.values() if t.finished_at is None]:
+            self.cancel(task_id)
+        runners = [t._runner for t in self.tasks.values() if t._runner is not None]
+        if runners:
+            await asyncio.gather(*runners, return_exceptions=True)
@@ -113,10 +113,8 @@ app.whenReady().then(() => {
             waitForBackend().then(createWindow);
         } else {
             startPythonBackend();
-            // Give it a moment to start, then wait for health check
-            setTimeout(() => {
-                waitForBackend().then(createWindow);
-            }, 1000);
+            // The backend answers /status before its heavy modules are loaded; poll right away
+            waitForBackend().then(createWindow);
         }
     });
 
@@ -144,6 +142,8 @@ function checkBackendPort(port) {
     });
 }
 
+const BACKEND_POLL_MS = 100;
+
 function waitForBackend() {
     return new Promise((resolve) => {
         const check = () => {
@@ -154,11 +154,10 @@ function waitForBackend() {
                     resolve();
                 } else {
                     console.log('Backend not ready, retrying...');
-                    setTimeout(check, 1000);
+                    setTimeout(check, BACKEND_POLL_MS);
                 }
             }).on('error', (err) => {
-                console.log('Waiting for backend...');
-                setTimeout(check, 1000);
+                setTimeout(check, BACKEND_POLL_MS);
             });
         };
         check();
@@ -15,7 +15,16 @@ import SettingsWindow from './components/SettingsWindow';
 
 
 
-const socket = io('http://localhost:8000');
+// Stable per-window session id, so a reload rejoins the same backend session
+const getSessionId = () => {
+    let id = sessionStorage.getItem('ada_session_id');
+    if (!id) {
+        id = crypto.randomUUID();
+        sessionStorage.setItem('ada_session_id', id);
+    }
+    return id;
+};
+const socket = io('http://localhost:8000', { auth: { session_id: getSessionId() } });
 // Handle Electron vs Browser environment
 const electron = window.require ? window.require('electron') : null;
 const ipcRenderer = electron ? electron.ipcRenderer : { 
@@ -65,6 +74,7 @@ function App() {
     const [aiAudioData, setAiAudioData] = useState(new Array(64).fill(0));
     const [micAudioData, setMicAudioData] = useState(new Array(32).fill(0));
     const [fps, setFps] = useState(0);
+    const [voiceLatency, setVoiceLatency] = useState(null); // Last turn: speech end -> first audio played
 
     // Device states - microphones, speakers, webcams
     const [micDevices, setMicDevices] = useState([]);
@@ -361,10 +371,21 @@ function App() {
             addMessage('System', `Error: ${data.msg}`);
         });
         socket.on('browser_frame', (data) => {
-            setBrowserData(prev => ({
-                image: data.image,
-                logs: [...prev.logs, data.log].filter(l => l).slice(-50) // Keep last 50 logs
-            }));
+            // Preview frames arrive as binary JPEG; older backends send base64 strings
+            let image = data.image;
+            if (image && typeof image !== 'string') {
+                image = URL.createObjectURL(new Blob([image]));
+            }
+            setBrowserData(prev => {
+                if (image && prev.image && prev.image !== image && prev.image.startsWith('blob:')) {
+                    URL.revokeObjectURL(prev.image);
+                }
+                return {
+                    image: image || prev.image,
+                    // Tag logs with the task id so parallel web tasks can be told apart
+                    logs: [...prev.logs, data.log && data.task_id ? `[${data.task_id}] ${data.log}` : data.log].filter(l => l).slice(-50) // Keep last 50 logs
+                };
+            });
             setShowBrowserWindow(true);
             // Auto-show browser window if hidden, clamped to viewport
             if (!elementPositions.browser) {
@@ -409,6 +430,11 @@ function App() {
             setConfirmationRequest(data);
         });
 
+        // Per-turn voice latency (see backend/voice_latency.py)
+        socket.on('voice_latency', (data) => {
+            setVoiceLatency(data);
+        });
+
         socket.on('project_update', (data) => {
             console.log("Project Update:", data.project);
             setCurrentProject(data.project);
@@ -502,6 +528,7 @@ function App() {
             socket.off('cad_status');
             socket.off('browser_frame');
             socket.off('transcription');
+            socket.off('voice_latency');
             socket.off('tool_confirmation_request');
             socket.off('kasa_devices');
             socket.off('printer_list');
@@ -1283,6 +1310,15 @@ function App() {
                             FPS: {fps}
                         </div>
                     )}
+                    {/* Voice Latency (last turn) */}
+                    {voiceLatency && (
+                        <div
+                            className={`text-[10px] border px-1 rounded ml-2 font-mono ${voiceLatency.total_ms > 1500 ? 'text-yellow-500 border-yellow-900' : 'text-green-500 border-green-900'}`}
+                            title={`upload ${voiceLatency.upload_ms ?? '-'} ms, model ${voiceLatency.model_ms} ms, playback ${voiceLatency.playback_ms} ms (p50 ${voiceLatency.p50_ms} / p90 ${voiceLatency.p90_ms} ms)`}
+                        >
+                            VOICE: {voiceLatency.total_ms}ms
+                        </div>
+                    )}
                 </div>
 
                 {/* Top Visualizer (User Mic) */}
@@ -0,0 +1,213 @@
+"""
+Tests for the warm browser pool used by WebAgent.
+Pool bookkeeping runs against stand-in browser objects; the launch test needs Chromium.
+"""
+import pytest
+import asyncio
+
+from browser_pool import BrowserPool
+
+
+class FakePage:
+    def __init__(self):
+        self.url = "about:blank"
+        self.closed = False
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+
+    async def new_context(self, **kwargs):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePool(BrowserPool):
+    """BrowserPool that 'launches' FakeBrowsers."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_heap_mb", 0)
+        super().__init__(**kwargs)
+        self.launched = []
+
+    async def _launch_browser(self):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+class TestBrowserPool:
+    """Test leasing, refilling and recycling."""
+
+    @pytest.mark.asyncio
+    async def test_start_warms_contexts(self):
+        """Test start() pre-warms `size` contexts on the start URL."""
+        pool = FakePool(size=2, start_url="https://www.google.com")
+        await pool.start()
+        await asyncio.sleep(0)
+        assert pool._ready.qsize() == 2
+
+        context, page = await pool.acquire()
+        assert page.url == "https://www.google.com"
+        assert pool.stats["warm_hits"] == 1
+        await pool.release(context, page)
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_contexts_are_single_use(self):
+        """Test a released context is closed and replaced, not reused."""
+        pool = FakePool(size=1, start_url=None)
+        async with pool.session() as (first, _):
+            pass
+        await asyncio.sleep(0)
+        async with pool.session() as (second, _):
+            pass
+
+        assert first.closed
+        assert first is not second
+        assert len(pool.launched) == 1
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_cold_start_when_pool_empty(self):
+        """Test concurrent leases beyond the pool size still get a context."""
+        pool = FakePool(size=1, start_url=None)
+        await pool.start()
+        await asyncio.sleep(0)
+        leases = [await pool.acquire() for _ in range(3)]
+
+        assert len({id(c) for c, _ in leases}) == 3
+        assert pool.stats["cold_starts"] >= 1
+        for context, page in leases:
+            await pool.release(context, page)
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_recycles_after_max_tasks(self):
+        """Test the browser is relaunched once it has served max_tasks_per_browser tasks."""
+        pool = FakePool(size=1, max_tasks_per_browser=2, start_url=None)
+        for _ in range(3):
+            async with pool.session():
+                pass
+
+        assert len(pool.launched) == 2
+        assert pool.launched[0].closed
+        assert pool.stats["recycles"] == 1
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_recycle_waits_for_active_tasks(self):
+        """Test a recycle is deferred while another task still holds a context."""
+        pool = FakePool(size=1, max_tasks_per_browser=1, start_url=None)
+        held = await pool.acquire()
+        async with pool.session():
+            pass
+        assert pool._needs_recycle
+        assert len(pool.launched) == 1
+
+        await pool.release(*held)
+        async with pool.session():
+            pass
+        assert len(pool.launched) == 2
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_pending_recycle_stops_new_leases(self):
+        """Test that once a recycle is due, new tasks wait for running ones instead of postponing it."""
+        pool = FakePool(size=1, max_tasks_per_browser=1, start_url=None)
+        held = await pool.acquire()
+        async with pool.session():
+            pass
+        assert pool._needs_recycle
+
+        waiting = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiting.done()  # Not handed a context from the old browser
+
+        await pool.release(*held)
+        context, page = await asyncio.wait_for(waiting, 1)
+        assert len(pool.launched) == 2 and pool.launched[0].closed
+        assert context in pool.launched[1].contexts
+        await pool.release(context, page)
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_recycle_cancels_warm_ups(self):
+        """Test contexts still warming when the browser is recycled don't end up in the new pool."""
+        pool = FakePool(size=2, max_tasks_per_browser=1, start_url=None)
+        gate = asyncio.Event()
+        new_context = pool._new_context
+
+        async def slow_new_context():
+            await gate.wait()
+            return await new_context()
+
+        pool._new_context = slow_new_context
+        await pool.start()
+        await asyncio.sleep(0)
+        warming = list(pool._warming)
+        assert warming
+
+        await pool._close_browser()
+        assert all(t.done() for t in warming) and not pool._warming
+        gate.set()
+        await pool._launch()
+        await asyncio.sleep(0.01)
+        old = pool.launched[0]
+        while not pool._ready.empty():
+            context, _ = pool._ready.get_nowait()
+            assert context not in old.contexts
+        await pool.stop()
+
+
+class TestRealBrowser:
+    """Test the pool against a real Chromium."""
+
+    @pytest.mark.asyncio
+    async def test_lease_is_fast_after_warmup(self):
+        """Test a warm lease is much cheaper than a launch."""
+        import time
+        pool = BrowserPool(size=1, start_url=None, max_heap_mb=0)
+        try:
+            await pool.start()
+        except Exception as e:
+            pytest.skip(f"Playwright browsers not installed: {e}")
+
+        try:
+            await asyncio.sleep(0.5)
+            start = time.perf_counter()
+            context, page = await pool.acquire()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"Warm lease: {elapsed_ms:.1f} ms")
+            await page.set_content("<title>pool</title>")
+            assert await page.title() == "pool"
+            await pool.release(context, page)
+            assert elapsed_ms < 100
+        finally:
+            await pool.stop()
@@ -0,0 +1,202 @@
+"""
+Tests for the web agent's DOM/accessibility snapshot fast path.
+The end-to-end snapshot test needs Chromium.
+"""
+import pytest
+
+from dom_snapshot import DomNavigator, format_snapshot, ELEMENT_FUNCTION_NAMES
+
+
+def make_snapshot(elements=None, text="", visual_ratio=0.0):
+    elements = elements if elements is not None else []
+    return {
+        "url": "https://shop.test/checkout", "title": "Checkout",
+        "scroll_y": 0, "scroll_height": 2400, "viewport_height": 900,
+        "elements": elements, "candidates": len(elements),
+        "text": text, "text_length": len(text), "visual_ratio": visual_ratio,
+    }
+
+
+FORM = [
+    {"id": 1, "role": "textbox", "name": "Email", "value": ""},
+    {"id": 2, "role": "combobox", "name": "Country", "value": "France", "options": ["France", "Spain"]},
+    {"id": 3, "role": "checkbox", "name": "Remember me", "checked": True},
+    {"id": 4, "role": "button", "name": "Pay", "disabled": True},
+    {"id": 5, "role": "link", "name": "Terms", "href": "https://shop.test/terms", "offscreen": True},
+]
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+        self.first = self
+
+    async def count(self):
+        return 1 if self.selector in self.page.present else 0
+
+    async def click(self, timeout=None):
+        self.page.calls.append(("click", self.selector))
+
+    async def fill(self, text, timeout=None):
+        self.page.calls.append(("fill", self.selector, text))
+
+    async def press(self, key):
+        self.page.calls.append(("press", self.selector, key))
+
+    async def select_option(self, option, timeout=None):
+        self.page.calls.append(("select", self.selector, option))
+        return [option]
+
+
+class FakePage:
+    def __init__(self, snapshot=None, present=()):
+        self.snapshot = snapshot
+        self.present = set(present)
+        self.calls = []
+
+    async def evaluate(self, script, arg=None):
+        if self.snapshot is None:
+            raise RuntimeError("Execution context was destroyed")
+        return self.snapshot
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+
+class TestFormat:
+    """Test the text rendering sent to the model."""
+
+    def test_lists_elements_with_ids(self):
+        """Test each element renders as one compact line with its state."""
+        text = format_snapshot(make_snapshot(FORM, text="Order total: 42 EUR"))
+        lines = text.splitlines()
+        assert lines[0] == "Page: Checkout (https://shop.test/checkout)"
+        assert '[1] textbox "Email" value=""' in lines
+        assert '[2] combobox "Country" value="France" options=France|Spain' in lines
+        assert '[3] checkbox "Remember me" checked' in lines
+        assert '[4] button "Pay" disabled' in lines
+        assert '[5]* link "Terms" -> https://shop.test/terms' in lines
+        assert lines[-1] == "Order total: 42 EUR"
+
+    def test_much_smaller_than_a_screenshot(self):
+        """Test a 150-element snapshot stays a few KB."""
+        elements = [{"id": i, "role": "link", "name": f"Result number {i}", "href": f"https://x.test/{i}"}
+                    for i in range(1, 151)]
+        text = format_snapshot(make_snapshot(elements, text="x" * 1500))
+        assert len(text.encode()) < 12 * 1024
+
+
+class TestScreenshotDecision:
+    """Test when a screenshot is still attached."""
+
+    @pytest.mark.asyncio
+    async def test_skipped_for_rich_page(self):
+        """Test element actions on a form-heavy page go without a screenshot."""
+        dom = DomNavigator(FakePage(make_snapshot(FORM)))
+        await dom.capture()
+        assert dom.needs_screenshot(["click_element"]) is False
+        assert dom.stats["screenshots_skipped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_needed_for_canvas_page(self):
+        """Test a page mostly covered by canvas/iframes needs pixels."""
+        dom = DomNavigator(FakePage(make_snapshot(FORM, visual_ratio=0.8)))
+        await dom.capture()
+        assert dom.needs_screenshot(["click_element"]) is True
+
+    @pytest.mark.asyncio
+    async def test_needed_for_empty_page(self):
+        """Test a near-empty snapshot isn't trusted."""
+        dom = DomNavigator(FakePage(make_snapshot([], text="Loading")))
+        await dom.capture()
+        assert dom.needs_screenshot([]) is True
+
+    @pytest.mark.asyncio
+    async def test_needed_after_coordinate_action_or_request(self):
+        """Test coordinate actions and take_screenshot always get a screenshot."""
+        dom = DomNavigator(FakePage(make_snapshot(FORM)))
+        await dom.capture()
+        assert dom.needs_screenshot(["click_at"]) is True
+        assert dom.needs_screenshot(["take_screenshot"]) is True
+
+    @pytest.mark.asyncio
+    async def test_failed_snapshot_falls_back(self):
+        """Test a snapshot taken mid-navigation falls back to a screenshot."""
+        dom = DomNavigator(FakePage(None))
+        assert await dom.capture() is None
+        assert dom.needs_screenshot(["click_element"]) is True
+
+
+class TestElementActions:
+    """Test element-id actions map onto locators."""
+
+    @pytest.mark.asyncio
+    async def test_click_and_type(self):
+        """Test click and type target the element's data attribute."""
+        page = FakePage(present={'[data-ada-id="3"]', '[data-ada-id="1"]'})
+        dom = DomNavigator(page)
+        assert dom.handles("click_element") and not dom.handles("click_at")
+        await dom.execute("click_element", {"element_id": 3})
+        await dom.execute("type_into_element", {"element_id": 1, "text": "a@b.c", "press_enter": True})
+        assert page.calls == [
+            ("click", '[data-ada-id="3"]'),
+            ("fill", '[data-ada-id="1"]', "a@b.c"),
+            ("press", '[data-ada-id="1"]', "Enter"),
+        ]
+        assert dom.stats["element_actions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_select(self):
+        """Test select_option reports what was selected."""
+        dom = DomNavigator(FakePage(present={'[data-ada-id="2"]'}))
+        assert await dom.execute("select_option", {"element_id": 2, "option": "Spain"}) == {"selected": ["Spain"]}
+
+    @pytest.mark.asyncio
+    async def test_stale_id(self):
+        """Test an id from an older snapshot raises a clear error."""
+        dom = DomNavigator(FakePage())
+        with pytest.raises(ValueError, match="latest snapshot"):
+            await dom.execute("click_element", {"element_id": 9})
+
+    def test_declared_functions(self):
+        """Test the functions offered to the model."""
+        assert ELEMENT_FUNCTION_NAMES == {"click_element", "type_into_element", "select_option", "take_screenshot"}
+
+
+class TestRealPage:
+    """Test the snapshot script against Chromium."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_and_click(self):
+        """Test a real form is indexed and an element id can be clicked."""
+        try:
+            from playwright.async_api import async_playwright
+            playwright = await async_playwright().start()
+        except Exception as e:
+            pytest.skip(f"Playwright not available: {e}")
+        try:
+            try:
+                browser = await playwright.chromium.launch(headless=True)
+            except Exception as e:
+                pytest.skip(f"Playwright browsers not installed: {e}")
+            page = await browser.new_page()
+            await page.set_content("""
+                <title>Form</title>
+                <label for=q>Query</label><input id=q value=cats>
+                <select><option>One</option><option>Two</option></select>
+                <button onclick="document.title='clicked'">Go</button>
+                <button style="display:none">Hidden</button>
+                <p>Some body text</p>
+            """)
+            dom = DomNavigator(page)
+            text = await dom.capture()
+            print(text)
+            assert '[1] textbox "Query" value="cats"' in text
+            assert 'combobox' in text and "Hidden" not in text
+            button = next(e for e in dom.last["elements"] if e["name"] == "Go")
+            await dom.execute("click_element", {"element_id": button["id"]})
+            assert await page.title() == "clicked"
+            await browser.close()
+        finally:
+            await playwright.stop()
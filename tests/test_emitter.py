@@ -0,0 +1,112 @@
+"""
+Tests for the coalescing Socket.IO emitter.
+"""
+import pytest
+import asyncio
+
+from emitter import CoalescingEmitter
+
+
+class FakeSio:
+    """Records emits; optionally slow, like a congested client."""
+
+    def __init__(self, delay=0.0):
+        self.sent = []
+        self.delay = delay
+
+    async def emit(self, event, data, room=None):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append((event, data, room))
+
+
+class TestCoalescing:
+    """Test merging and batching."""
+
+    @pytest.mark.asyncio
+    async def test_merges_same_sender_deltas(self):
+        """Test a burst of deltas becomes one event per sender run, text intact."""
+        sio = FakeSio()
+        emitter = CoalescingEmitter(sio, window_ms=5)
+        for word in ["Hel", "lo ", "there"]:
+            emitter.emit("transcription", {"sender": "User", "text": word}, room="r")
+        for word in ["Hi", "!"]:
+            emitter.emit("transcription", {"sender": "ADA", "text": word}, room="r")
+        await asyncio.sleep(0.03)
+
+        assert [(e, d) for e, d, _ in sio.sent] == [
+            ("transcription", {"sender": "User", "text": "Hello there"}),
+            ("transcription", {"sender": "ADA", "text": "Hi!"}),
+        ]
+        assert emitter.stats["merged"] == 3
+        assert emitter.stats["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_other_events_keep_order(self):
+        """Test unmergeable events are all sent, in order, and break merge runs."""
+        sio = FakeSio()
+        emitter = CoalescingEmitter(sio, window_ms=5)
+        emitter.emit("transcription", {"sender": "ADA", "text": "a"}, room="r")
+        emitter.emit("status", {"msg": "x"}, room="r")
+        emitter.emit("transcription", {"sender": "ADA", "text": "b"}, room="r")
+        await emitter.flush()
+        assert [e for e, _, _ in sio.sent] == ["transcription", "status", "transcription"]
+
+    @pytest.mark.asyncio
+    async def test_latest_only_events(self):
+        """Test queued visualizer chunks are replaced and don't break transcript merging."""
+        sio = FakeSio()
+        emitter = CoalescingEmitter(sio, window_ms=5)
+        emitter.emit("transcription", {"sender": "ADA", "text": "a"}, room="r")
+        for i in range(10):
+            emitter.emit("audio_data", {"data": [i]}, room="r")
+        emitter.emit("transcription", {"sender": "ADA", "text": "b"}, room="r")
+        await emitter.flush()
+
+        assert [(e, d) for e, d, _ in sio.sent] == [
+            ("transcription", {"sender": "ADA", "text": "ab"}),
+            ("audio_data", {"data": [9]}),
+        ]
+        assert emitter.stats["replaced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_rooms_are_separate(self):
+        """Test events only reach their own room and never merge across rooms."""
+        sio = FakeSio()
+        emitter = CoalescingEmitter(sio, window_ms=5)
+        emitter.emit("transcription", {"sender": "User", "text": "a"}, room="one")
+        emitter.emit("transcription", {"sender": "User", "text": "b"}, room="two")
+        await emitter.flush()
+        assert sorted((r, d["text"]) for _, d, r in sio.sent) == [("one", "a"), ("two", "b")]
+
+
+class TestBackpressure:
+    """Test a slow client gets fewer, larger frames."""
+
+    @pytest.mark.asyncio
+    async def test_slow_client_coalesces(self):
+        """Test deltas arriving during a slow flush are merged into the next batch."""
+        sio = FakeSio(delay=0.05)
+        emitter = CoalescingEmitter(sio, window_ms=2)
+        emitter.emit("transcription", {"sender": "ADA", "text": "first"}, room="r")
+        await asyncio.sleep(0.01)  # flush started and is stuck sending
+        for i in range(20):
+            emitter.emit("transcription", {"sender": "ADA", "text": str(i % 10)}, room="r")
+            await asyncio.sleep(0.001)
+        await emitter.flush()
+
+        texts = [d["text"] for _, d, _ in sio.sent]
+        assert "".join(texts) == "first" + "".join(str(i % 10) for i in range(20))
+        assert len(texts) <= 3
+        assert emitter.summary()["saved_frames"] >= 18
+
+    @pytest.mark.asyncio
+    async def test_on_sent_accounting(self):
+        """Test the per-event callback sees what was actually sent."""
+        sio = FakeSio()
+        emitter = CoalescingEmitter(sio, window_ms=2)
+        seen = []
+        for word in ["a", "b", "c"]:
+            emitter.emit("transcription", {"sender": "User", "text": word}, room="r", on_sent=seen.append)
+        await emitter.flush()
+        assert seen == [{"sender": "User", "text": "abc"}]
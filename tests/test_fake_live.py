@@ -0,0 +1,136 @@
+"""
+Tests for the fake Gemini Live server.
+The real google-genai client talks to it over a local TLS websocket.
+"""
+import pytest
+import asyncio
+
+from google import genai
+from google.genai import types
+
+try:
+    import cryptography  # noqa: F401 - needed for the server's certificate
+    HAS_CRYPTOGRAPHY = True
+except ImportError:
+    HAS_CRYPTOGRAPHY = False
+
+from fake_live import FakeLiveServer, run_benchmark, RECEIVE_SAMPLE_RATE
+
+pytestmark = pytest.mark.skipif(not HAS_CRYPTOGRAPHY, reason="cryptography not installed")
+
+MODEL = "models/fake-live"
+
+
+def client_for(server):
+    return genai.Client(api_key="dummy", http_options=server.http_options())
+
+
+async def receive_turn(session):
+    """Collect one model turn: (transcripts, audio bytes, tool calls)."""
+    transcripts, audio, calls = [], b"", []
+    async for response in session.receive():
+        if response.data:
+            audio += response.data
+        content = response.server_content
+        if content and content.output_transcription:
+            transcripts.append(content.output_transcription.text)
+        if response.tool_call:
+            calls.extend(response.tool_call.function_calls)
+            break
+    return transcripts, audio, calls
+
+
+class TestProtocol:
+    """Test the Live protocol subset against the SDK client."""
+
+    @pytest.mark.asyncio
+    async def test_text_turn_scripted_reply(self):
+        """Test a text turn gets the scripted transcription and audio, then turn_complete."""
+        async with FakeLiveServer(script=[{"text": "Hello there.", "audio_ms": 200}]) as server:
+            async with client_for(server).aio.live.connect(model=MODEL, config={"response_modalities": ["AUDIO"]}) as session:
+                await session.send_client_content(turns={"role": "user", "parts": [{"text": "Hi"}]}, turn_complete=True)
+                transcripts, audio, _ = await receive_turn(session)
+
+        assert transcripts == ["Hello there."]
+        assert len(audio) == 200 * RECEIVE_SAMPLE_RATE * 2 // 1000
+        assert server.stats["turns"] == 1 and server.stats["texts_in"] == 1
+
+    @pytest.mark.asyncio
+    async def test_speech_then_silence_ends_turn(self):
+        """Test streamed audio triggers a reply only after speech followed by silence."""
+        async with FakeLiveServer(silence_ms=100) as server:
+            async with client_for(server).aio.live.connect(model=MODEL, config={"response_modalities": ["AUDIO"]}) as session:
+                for chunk in [b"\x00\x01" * 1600] * 3 + [b"\x00" * 3200] * 2:  # 300 ms speech, 200 ms silence
+                    await session.send_realtime_input(audio=types.Blob(data=chunk, mime_type="audio/pcm;rate=16000"))
+                _, audio, _ = await asyncio.wait_for(receive_turn(session), 5)
+
+        assert audio
+        assert server.stats["audio_in_bytes"] == 5 * 3200
+        assert server.stats["turns"] == 1
+
+    @pytest.mark.asyncio
+    async def test_tool_call_waits_for_response(self):
+        """Test a scripted tool call is answered before the rest of the reply follows."""
+        script = [{"tool_call": {"name": "list_projects", "args": {}}, "text": "Done.", "audio_ms": 40}]
+        async with FakeLiveServer(script=script) as server:
+            async with client_for(server).aio.live.connect(model=MODEL, config={"response_modalities": ["AUDIO"]}) as session:
+                await session.send_client_content(turns={"role": "user", "parts": [{"text": "List"}]}, turn_complete=True)
+                _, _, calls = await receive_turn(session)
+                assert calls[0].name == "list_projects"
+                await session.send_tool_response(function_responses=[
+                    types.FunctionResponse(id=calls[0].id, name=calls[0].name, response={"result": "a, b"})])
+                transcripts, _, _ = await receive_turn(session)
+
+        assert transcripts == ["Done."]
+        assert server.tool_responses[0]["response"] == {"result": "a, b"}
+        assert server.stats["last_tool_ms"] is not None
+
+    @pytest.mark.asyncio
+    async def test_resumption_handles(self):
+        """Test issued handles resume a session and unknown ones are refused."""
+        config = {"response_modalities": ["AUDIO"], "session_resumption": {}}
+        async with FakeLiveServer() as server:
+            client = client_for(server)
+            async with client.aio.live.connect(model=MODEL, config=config) as session:
+                response = await session._receive()
+                handle = response.session_resumption_update.new_handle
+            async with client.aio.live.connect(model=MODEL, config={**config, "session_resumption": {"handle": handle}}):
+                pass
+            with pytest.raises(Exception):
+                async with client.aio.live.connect(model=MODEL, config={**config, "session_resumption": {"handle": "bogus"}}) as session:
+                    await session._receive()
+
+        assert server.stats["resumed"] == 1
+        assert server.stats["rejected_resumes"] == 1
+
+
+class TestAudioLoopBenchmark:
+    """Test AudioLoop.run end to end against the fake server."""
+
+    @pytest.mark.asyncio
+    async def test_reconnects_and_tools(self, temp_dir, monkeypatch):
+        """Test turns complete across dropped connections and tool calls are dispatched."""
+        import ada
+        import web_agent
+        import memory_agent
+        monkeypatch.setenv("GEMINI_API_KEY", "fake")
+        monkeypatch.setenv("LOCAL_MEMORY_DIR", str(temp_dir / "memory"))
+        monkeypatch.setenv("MEMORY_OUTBOX_PATH", str(temp_dir / "outbox.db"))
+        monkeypatch.setenv("ADA_LIVE_STANDBY", "0")
+        monkeypatch.setenv("ADA_LIVE_BASE_URL", "")
+        monkeypatch.setenv("ADA_LIVE_CA_FILE", "")
+        monkeypatch.setattr(ada, "_client", None)
+        # web_agent reads GEMINI_API_KEY at import, so setting the env var here would be too late
+        monkeypatch.setattr(web_agent, "API_KEY", "dummy")
+        monkeypatch.setattr(memory_agent, "_shared", None)
+
+        try:
+            result = await run_benchmark(turns=3, latency=0.05, pace=8, speech_ms=128, silence_ms=128, pause_ms=64,
+                                         disconnect_after_turns=1, tool_every=2)
+        finally:
+            await memory_agent.close_memory_agent()
+
+        assert result["latency"]["turns"] == 3
+        assert result["server"]["tool_calls"] == 1 and result["server"]["tool_timeouts"] == 0
+        assert result["resumption"]["reconnects"] >= 2
+        assert result["resumption"]["handle_reuse_rate"] == 1.0
@@ -0,0 +1,113 @@
+"""
+Tests for atomic, batched file writes.
+"""
+import pytest
+import asyncio
+import os
+
+from file_writer import FileWriter
+from project_manager import ProjectManager
+
+
+class TestAtomicWrite:
+    """Test single-file writes."""
+
+    @pytest.mark.asyncio
+    async def test_write_creates_file_and_parents(self, temp_dir):
+        """Test writing into a directory that does not exist yet."""
+        writer = FileWriter()
+        target = temp_dir / "sub" / "dir" / "hello.txt"
+
+        await writer.write(target, "hello world")
+
+        assert target.read_text(encoding="utf-8") == "hello world"
+
+    @pytest.mark.asyncio
+    async def test_overwrite_leaves_no_temp_files(self, temp_dir):
+        """Test that the temp file is swapped in and nothing is left behind."""
+        writer = FileWriter()
+        target = temp_dir / "data.json"
+        target.write_text("old", encoding="utf-8")
+
+        await writer.write(target, "new")
+
+        assert target.read_text(encoding="utf-8") == "new"
+        assert os.listdir(temp_dir) == ["data.json"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+    async def test_permissions(self, temp_dir):
+        """Test an overwrite keeps the file's mode and a new file gets the umask default."""
+        writer = FileWriter()
+        script = temp_dir / "run.sh"
+        script.write_text("old", encoding="utf-8")
+        os.chmod(script, 0o755)
+        await writer.write(script, "new")
+        assert os.stat(script).st_mode & 0o777 == 0o755
+
+        umask = os.umask(0)
+        os.umask(umask)
+        await writer.write(temp_dir / "new.txt", "content")
+        assert os.stat(temp_dir / "new.txt").st_mode & 0o777 == 0o666 & ~umask
+
+    @pytest.mark.asyncio
+    async def test_failed_write_raises(self, temp_dir):
+        """Test that a write into an unusable path surfaces the error."""
+        writer = FileWriter()
+        blocker = temp_dir / "blocker"
+        blocker.write_text("not a directory", encoding="utf-8")
+
+        with pytest.raises(OSError):
+            await writer.write(blocker / "child.txt", "content")
+
+
+class TestBatching:
+    """Test that concurrent writes are coalesced."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_one_batch(self, temp_dir):
+        """Test several writes issued in one turn are flushed together."""
+        writer = FileWriter()
+
+        await asyncio.gather(*[
+            writer.write(temp_dir / f"file_{i}.txt", f"content {i}")
+            for i in range(5)
+        ])
+
+        assert writer.batches_flushed == 1
+        assert writer.files_written == 5
+        for i in range(5):
+            assert (temp_dir / f"file_{i}.txt").read_text(encoding="utf-8") == f"content {i}"
+
+    @pytest.mark.asyncio
+    async def test_one_failure_does_not_fail_batch(self, temp_dir):
+        """Test a bad path in a batch does not block the other writes."""
+        writer = FileWriter()
+        (temp_dir / "blocker").write_text("x", encoding="utf-8")
+
+        results = await asyncio.gather(
+            writer.write(temp_dir / "good.txt", "ok"),
+            writer.write(temp_dir / "blocker" / "bad.txt", "nope"),
+            return_exceptions=True,
+        )
+
+        assert results[0] is None
+        assert isinstance(results[1], OSError)
+        assert (temp_dir / "good.txt").read_text(encoding="utf-8") == "ok"
+
+
+class TestProjectContextCache:
+    """Test writes are reported back to ProjectManager."""
+
+    @pytest.mark.asyncio
+    async def test_written_file_served_from_cache(self, temp_dir):
+        """Test project context uses the content recorded by the writer."""
+        pm = ProjectManager(str(temp_dir))
+        writer = FileWriter(on_written=pm.record_file_write)
+        target = pm.get_current_project_path() / "notes.md"
+
+        await writer.write(target, "# Notes")
+
+        assert str(target) in pm._file_cache
+        context = pm.get_project_context()
+        assert "# Notes" in context
@@ -0,0 +1,224 @@
+"""
+Tests for reconnecting the Live session without losing mic audio.
+Live sessions and audio devices are replaced by stand-ins.
+"""
+import time
+import pytest
+import asyncio
+import contextlib
+
+from google.genai import types
+
+from live_connection import SendBuffer, LiveConnectionManager, MIC_BYTES_PER_SECOND
+from live_resumption import LiveResumption
+
+CHUNK = b"\x00" * 2048  # 64 ms of mic audio
+
+
+def audio(seq):
+    return {"data": CHUNK, "mime_type": "audio/pcm", "seq": seq}
+
+
+class FakeSession:
+    """Records sends; receive() fails once `kill()` is called, like a dropped websocket."""
+
+    def __init__(self, name):
+        self.name = name
+        self.sent = []
+        self.opened_at = time.monotonic()
+        self._dead = asyncio.Event()
+
+    def kill(self):
+        self._dead.set()
+
+    async def send(self, input=None, end_of_turn=False):
+        if self._dead.is_set():
+            raise ConnectionError("closed")
+        self.sent.append((input, end_of_turn))
+
+    async def receive(self):
+        await self._dead.wait()
+        raise ConnectionError("websocket closed")
+        yield  # pragma: no cover
+
+
+class FakeConnector:
+    """connect(resume) for the manager; optionally slow or failing resumes."""
+
+    def __init__(self, resume_delay=0.0, resume_fails=False):
+        self.sessions = []
+        self.calls = []
+        self.resume_delay = resume_delay
+        self.resume_fails = resume_fails
+
+    @contextlib.asynccontextmanager
+    async def __call__(self, resume=True):
+        self.calls.append(resume)
+        if resume:
+            await asyncio.sleep(self.resume_delay)
+            if self.resume_fails:
+                raise ConnectionError("handle rejected")
+        session = FakeSession(f"s{len(self.sessions)}")
+        self.sessions.append(session)
+        yield session
+
+
+def with_handle(resumption, handle="h1"):
+    resumption.on_message(types.LiveServerMessage(session_resumption_update=types.LiveServerSessionResumptionUpdate(
+        new_handle=handle, resumable=True)))
+    return resumption
+
+
+class TestSendBuffer:
+    """Test the mic-side buffer."""
+
+    @pytest.mark.asyncio
+    async def test_requeue_goes_first(self):
+        """Test a message that failed to send is delivered before newer ones."""
+        buffer = SendBuffer()
+        for seq in range(3):
+            await buffer.put(audio(seq))
+        first = await buffer.get()
+        buffer.requeue(first)
+        assert [(await buffer.get())["seq"] for _ in range(3)] == [0, 1, 2]
+
+    def test_caps_audio_keeps_newest(self):
+        """Test a long gap drops the oldest audio and counts it."""
+        buffer = SendBuffer(max_audio_seconds=0.5)
+        for seq in range(20):
+            buffer.put_nowait(audio(seq))
+        assert buffer.buffered_ms <= 500
+        assert buffer._items[-1]["seq"] == 19
+        assert buffer.stats["dropped_audio_ms"] == (20 - buffer.qsize()) * len(CHUNK) * 1000 // MIC_BYTES_PER_SECOND
+
+    def test_keeps_latest_image(self):
+        """Test only the newest video frame waits in the buffer."""
+        buffer = SendBuffer()
+        buffer.put_nowait({"mime_type": "image/jpeg", "data": "a"})
+        buffer.put_nowait(audio(0))
+        buffer.put_nowait({"mime_type": "image/jpeg", "data": "b"})
+        assert [m.get("data") for m in buffer._items] == [CHUNK, "b"]
+
+
+class TestManager:
+    """Test how the next connection is opened."""
+
+    @pytest.mark.asyncio
+    async def test_resume_preferred(self):
+        """Test a usable handle resumes instead of opening a new session."""
+        connect = FakeConnector()
+        manager = LiveConnectionManager(connect, with_handle(LiveResumption()))
+        async with contextlib.AsyncExitStack() as stack:
+            _, kind = await manager.open(stack)
+        assert kind == "resumed" and connect.calls == [True]
+
+    @pytest.mark.asyncio
+    async def test_slow_resume_falls_back_to_standby(self):
+        """Test a resume exceeding the timeout swaps in the standby session."""
+        connect = FakeConnector(resume_delay=1.0)
+        resumption = LiveResumption()
+        manager = LiveConnectionManager(connect, resumption, standby=True, resume_timeout=0.05)
+        manager.start_standby()
+        await asyncio.sleep(0.01)
+        standby = connect.sessions[-1]
+        with_handle(resumption)
+
+        async with contextlib.AsyncExitStack() as stack:
+            session, kind = await manager.open(stack)
+        assert (session, kind) == (standby, "standby")
+        assert manager.stats["resume_failures"] == 1
+        assert resumption.usable_handle() is None  # Rejected handles aren't retried
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_standby_replaced_after_swap(self):
+        """Test a new standby is opened as soon as the old one was swapped in."""
+        connect = FakeConnector()
+        manager = LiveConnectionManager(connect, LiveResumption(), standby=True)
+        manager.start_standby()
+        await asyncio.sleep(0.01)
+        async with contextlib.AsyncExitStack() as stack:
+            await manager.open(stack)
+            manager.start_standby()
+            await asyncio.sleep(0.01)
+            assert manager.summary()["standby"] is True
+            assert manager.stats["standby_opened"] == 2
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_expired_standby_not_used(self):
+        """Test a standby older than its TTL is closed and a fresh session opened."""
+        connect = FakeConnector()
+        manager = LiveConnectionManager(connect, LiveResumption(), standby=True, standby_ttl=0.02)
+        manager.start_standby()
+        await asyncio.sleep(0.01)
+        manager._standby_task.cancel()
+        await asyncio.sleep(0.03)
+        async with contextlib.AsyncExitStack() as stack:
+            _, kind = await manager.open(stack)
+        assert kind == "fresh" and manager.stats["standby_expired"] == 1
+
+
+class TestAudioLoopReconnect:
+    """Test AudioLoop.run keeps the mic running across a dropped connection."""
+
+    @pytest.fixture
+    async def audio_loop(self, temp_dir, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEY", "dummy")
+        monkeypatch.setenv("LOCAL_MEMORY_DIR", str(temp_dir / "memory"))
+        monkeypatch.setenv("MEMORY_OUTBOX_PATH", str(temp_dir / "outbox.db"))
+        monkeypatch.setenv("ADA_LIVE_STANDBY", "0")
+        import ada
+        import web_agent
+        import memory_agent
+        from project_manager import ProjectManager
+        # web_agent reads the key at import, before the env var above was set
+        monkeypatch.setattr(web_agent, "API_KEY", "dummy")
+        # A memory agent of our own, on the temp dir, instead of the process-wide one
+        monkeypatch.setattr(memory_agent, "_shared", None)
+
+        loop = ada.AudioLoop(video_mode="none", temp_project=None)
+        loop.project_manager = ProjectManager(str(temp_dir))
+        yield loop
+        await memory_agent.close_memory_agent()
+
+    @pytest.mark.asyncio
+    async def test_no_audio_lost_and_short_gap(self, audio_loop):
+        """Test every mic chunk reaches a session, in order, and reconnecting takes well under a second."""
+        connect = FakeConnector()
+        audio_loop.connections.connect = connect
+        with_handle(audio_loop.resumption)
+        produced = []
+
+        async def fake_mic():
+            seq = 0
+            while True:
+                await audio_loop.out_queue.put(audio(seq))
+                produced.append(seq)
+                seq += 1
+                await asyncio.sleep(0.005)
+
+        async def fake_speaker():
+            await asyncio.Event().wait()
+
+        audio_loop.listen_audio = fake_mic
+        audio_loop.play_audio = fake_speaker
+
+        run = asyncio.create_task(audio_loop.run())
+        await asyncio.sleep(0.1)
+        first = connect.sessions[0]
+        first.kill()
+        killed_at = time.monotonic()
+        while len(connect.sessions) < 2:
+            await asyncio.sleep(0.005)
+        gap = connect.sessions[1].opened_at - killed_at
+        await asyncio.sleep(0.1)
+        audio_loop.stop()
+        await asyncio.wait_for(run, 5)
+
+        delivered = [m["seq"] for s in connect.sessions for m, _ in s.sent if isinstance(m, dict)]
+        assert delivered == produced[:len(delivered)]
+        assert len(delivered) >= len(produced) - 2  # At most what was still buffered at stop
+        assert gap < 0.5
+        assert audio_loop.connections.stats["resumed"] == 2  # Handle offered on both connects
+        assert audio_loop.resumption.stats["last_context_tokens"] == 0
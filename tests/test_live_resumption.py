@@ -0,0 +1,106 @@
+"""
+Tests for Live API session resumption and the reconnect fallback context.
+No network: server messages are built from google-genai types.
+"""
+import pytest
+
+from google.genai import types
+
+from live_resumption import LiveResumption, build_fallback_context, estimate_tokens, SUPPORTS_RESUMPTION
+
+BASE = types.LiveConnectConfig(response_modalities=["AUDIO"], system_instruction="base")
+
+
+def handle_update(handle, resumable=True):
+    return types.LiveServerMessage(session_resumption_update=types.LiveServerSessionResumptionUpdate(
+        new_handle=handle, resumable=resumable))
+
+
+def history(n, text="word " * 20):
+    return [{"sender": "User" if i % 2 == 0 else "ADA", "text": f"#{i} {text}"} for i in range(n)]
+
+
+class TestFallbackContext:
+    """Test the token-budgeted history summary."""
+
+    def test_fits_budget(self):
+        """Test a long history is cut down to the budget, keeping the newest messages verbatim."""
+        context = build_fallback_context(history(300), token_budget=500)
+        assert estimate_tokens(context) <= 500
+        assert "#299 " + "word " * 20 in context
+        assert "earlier messages omitted" in context
+
+    def test_older_messages_abridged(self):
+        """Test messages that don't fit verbatim are kept as short snippets."""
+        context = build_fallback_context(history(40), token_budget=600)
+        assert "Earlier (abridged):" in context
+        abridged = context.split("Earlier (abridged):\n")[1].split("Most recent:")[0]
+        assert all(len(line) <= 100 for line in abridged.splitlines())
+
+    def test_short_history_verbatim(self):
+        """Test a short history is included in full."""
+        context = build_fallback_context(history(3), token_budget=2000)
+        assert all(f"#{i} " in context for i in range(3))
+        assert "omitted" not in context and "abridged" not in context
+        assert build_fallback_context([]) == ""
+
+
+@pytest.mark.skipif(not SUPPORTS_RESUMPTION, reason="google-genai without session resumption")
+class TestResumption:
+    """Test handle tracking and reconnect metrics."""
+
+    def test_config_carries_handle_and_compression(self):
+        """Test the connect config requests handles, then resumes with the latest one."""
+        resumption = LiveResumption()
+        first = resumption.connect_config(BASE)
+        assert first.session_resumption.handle is None
+        assert first.context_window_compression.sliding_window is not None
+        assert first.system_instruction == "base" and BASE.session_resumption is None
+
+        resumption.on_message(handle_update("h1"))
+        resumption.on_message(handle_update("h2"))
+        resumption.on_message(handle_update("ignored", resumable=False))
+        assert resumption.connect_config(BASE).session_resumption.handle == "h2"
+        assert resumption.connect_config(BASE, resume=False).session_resumption.handle is None
+
+    def test_reuse_rate(self):
+        """Test resumed vs fallback reconnects are counted."""
+        resumption = LiveResumption()
+        resumption.connection_lost()
+        resumption.opened(resumed=False)  # No handle yet -> fallback
+        resumption.reconnected(context_tokens=400)
+
+        resumption.on_message(handle_update("h1"))
+        resumption.connection_lost()
+        resumption.opened(resumed=True)
+        resumption.reconnected()
+
+        summary = resumption.summary()
+        assert (summary["resumed"], summary["fallbacks"]) == (1, 1)
+        assert summary["handle_reuse_rate"] == 0.5
+        assert summary["last_context_tokens"] == 0
+        assert summary["last_reconnect_ms"] is not None
+
+    def test_rejected_handle_dropped(self):
+        """Test a failed resume makes the next attempt a fresh session."""
+        resumption = LiveResumption()
+        resumption.on_message(handle_update("stale"))
+        resumption.opened(resumed=True)
+        resumption.resume_failed()
+        assert resumption.connect_config(BASE).session_resumption.handle is None
+        assert not resumption.resuming
+        assert resumption.stats["rejected_handles"] == 1
+
+    def test_go_away(self):
+        """Test a GoAway notice is flagged until the reconnect."""
+        resumption = LiveResumption()
+        resumption.on_message(types.LiveServerMessage(go_away=types.LiveServerGoAway(time_left="5s")))
+        assert resumption.go_away
+        resumption.reconnected()
+        assert not resumption.go_away
+
+    def test_disabled(self):
+        """Test resumption can be switched off (compression still applies)."""
+        config = LiveResumption(enabled=False).connect_config(BASE)
+        assert config.session_resumption is None
+        assert config.context_window_compression is not None
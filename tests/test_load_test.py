@@ -0,0 +1,36 @@
+"""
+Tests for the Socket.IO load-test harness.
+Runs a short load test against a real (mocked AudioLoop) backend process.
+"""
+import pytest
+
+from load_test import run_load_test, percentiles
+
+
+class TestPercentiles:
+    """Test the percentile summary."""
+
+    def test_summary(self):
+        """Test percentiles of 1..100 and of no samples."""
+        stats = percentiles(list(range(1, 101)))
+        assert (stats["p50"], stats["p90"], stats["max"], stats["count"]) == (51, 91, 100, 100)
+        assert percentiles([])["p50"] is None
+
+
+class TestLoadTest:
+    """Test a short end-to-end run."""
+
+    @pytest.mark.asyncio
+    async def test_short_run(self):
+        """Test every event type flows and all metrics are reported."""
+        result = await run_load_test(clients=3, duration=1.5, fps=10, frame_kb=4, input_interval=0.5,
+                                     settings_interval=1.0, probe_interval=0.2, warmup=0.2)
+
+        assert result["client_errors"] == 0
+        assert result["frames_sent"] > 0
+        assert result["frames_processed"] == result["frames_sent"]
+        assert result["rtt_ms"]["count"] > 0
+        assert result["fanout_ms"]["count"] > 0  # user_input replies reached the clients
+        assert result["loop_lag_ms"]["count"] > 0
+        assert result["cpu_percent"] >= 0
+        assert result["emitter"]["emitted"] > 0
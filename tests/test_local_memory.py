@@ -0,0 +1,171 @@
+"""
+Tests for the offline local vector memory backend.
+"""
+import pytest
+import time
+import numpy as np
+
+from local_memory import HashingEmbedder, LocalMemoryAgent, VectorStore
+from memory_agent import MemoryAgent, create_memory_agent
+
+
+class TestHashingEmbedder:
+    """Test the fallback embedder."""
+
+    def test_rows_are_normalized(self):
+        """Test embeddings are unit length."""
+        vectors = HashingEmbedder(dim=128).embed(["hello world", "another sentence"])
+        assert vectors.shape == (2, 128)
+        assert vectors.dtype == np.float32
+        assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+    def test_similar_texts_score_higher(self):
+        """Test related text is closer than unrelated text."""
+        embedder = HashingEmbedder()
+        a, b, c = embedder.embed([
+            "Yash prefers Django for backend projects",
+            "which backend framework does Yash prefer",
+            "the weather is sunny today",
+        ])
+        assert a @ b > a @ c
+
+    def test_empty_text(self):
+        """Test empty input yields a zero vector rather than NaNs."""
+        vector = HashingEmbedder().embed([""])[0]
+        assert not np.isnan(vector).any()
+
+
+class TestLocalMemoryAgent:
+    """Test the MemoryAgent-compatible interface."""
+
+    @pytest.mark.asyncio
+    async def test_add_and_search(self, temp_dir):
+        """Test a stored fact is recalled first."""
+        agent = LocalMemoryAgent(path=str(temp_dir))
+        await agent.add_memory("Yash prefers Django for backend work")
+        await agent.add_memory("Yash's exam is in March")
+        await agent.add_memory("Favourite analogy topic is the college canteen")
+
+        memories = await agent.search_memories("backend framework Django", limit=2)
+        assert len(memories) == 2
+        assert "Django" in memories[0]["content"]
+        assert memories[0]["relevance"] >= memories[1]["relevance"]
+        await agent.close()
+
+    @pytest.mark.asyncio
+    async def test_persists_across_restarts(self, temp_dir):
+        """Test memories survive reopening the store."""
+        agent = LocalMemoryAgent(path=str(temp_dir))
+        await agent.add_memory("The printer is an Ender 3")
+        await agent.close()
+
+        reopened = LocalMemoryAgent(path=str(temp_dir))
+        assert reopened.store.count == 1
+        context = await reopened.get_context_for_query("which printer")
+        assert "Ender 3" in context
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_empty_store(self, temp_dir):
+        """Test searching an empty store."""
+        agent = LocalMemoryAgent(path=str(temp_dir))
+        assert await agent.search_memories("anything") == []
+        await agent.close()
+
+    def test_rejects_mismatched_embedder(self, temp_dir):
+        """Test a store can't be reopened with a different vector size."""
+        VectorStore(str(temp_dir), dim=64, embedder_name="hashing-64").close()
+        agent = LocalMemoryAgent(path=str(temp_dir), embedder=HashingEmbedder(dim=32))
+        assert not agent.is_available
+
+
+class TestVectorStore:
+    """Test the memory-mapped store directly."""
+
+    def test_grows_beyond_initial_capacity(self, temp_dir):
+        """Test the memmap is resized as rows are added."""
+        embedder = HashingEmbedder(dim=32)
+        store = VectorStore(str(temp_dir), dim=32, embedder_name=embedder.name, initial_capacity=4)
+        for i in range(10):
+            store.add(embedder.embed([f"fact {i}"])[0], f"fact {i}", {})
+        assert store.count == 10
+        assert store.capacity >= 10
+        assert store.search(embedder.embed(["fact 7"])[0], 1)[0][2] == "fact 7"
+        store.close()
+
+    def test_two_stores_share_a_path(self, temp_dir):
+        """Test stores opened on the same files don't reuse rows or overwrite each other's vectors."""
+        embedder = HashingEmbedder(dim=32)
+        first = VectorStore(str(temp_dir), dim=32, embedder_name=embedder.name, initial_capacity=4)
+        second = VectorStore(str(temp_dir), dim=32, embedder_name=embedder.name, initial_capacity=4)
+        rows = []
+        for i in range(6):
+            store = first if i % 2 == 0 else second
+            rows.append(store.add(embedder.embed([f"fact {i}"])[0], f"fact {i}", {}))
+        assert sorted(rows) == list(range(6))
+
+        for store in (first, second):
+            for i in range(6):
+                assert store.search(embedder.embed([f"fact {i}"])[0], 1)[0][2] == f"fact {i}"
+        first.close()
+        second.close()
+
+    def test_ivf_search_finds_exact_match(self, temp_dir):
+        """Test IVF search above the threshold still finds the nearest row."""
+        rng = np.random.default_rng(1)
+        store = VectorStore(str(temp_dir), dim=16, embedder_name="random", ivf_threshold=200)
+        vectors = rng.normal(size=(400, 16)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        for i, v in enumerate(vectors):
+            store.add(v, f"row {i}", {})
+
+        results = store.search(vectors[123], 3)
+        assert store._centroids is not None
+        assert results[0][0] == 123
+        store.close()
+
+    def test_recall_is_fast(self, temp_dir):
+        """Test recall over a few thousand facts stays in single-digit milliseconds."""
+        embedder = HashingEmbedder()
+        store = VectorStore(str(temp_dir), dim=embedder.dim, embedder_name=embedder.name)
+        texts = [f"memory number {i} about topic {i % 37}" for i in range(3000)]
+        for text, vector in zip(texts, embedder.embed(texts)):
+            store.add(vector, text, {})
+
+        query = embedder.embed(["topic 5"])[0]
+        start = time.perf_counter()
+        for _ in range(20):
+            store.search(query, 5)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / 20
+        print(f"Average recall: {elapsed_ms:.2f} ms")
+        assert elapsed_ms < 10
+        store.close()
+
+
+class TestBackendSelection:
+    """Test create_memory_agent picks the right backend."""
+
+    def test_local_without_api_key(self, monkeypatch, temp_dir):
+        """Test the local backend is used when no key is configured."""
+        monkeypatch.delenv("SUPERMEMORY_API_KEY", raising=False)
+        monkeypatch.delenv("MEMORY_BACKEND", raising=False)
+        monkeypatch.setenv("LOCAL_MEMORY_DIR", str(temp_dir))
+        monkeypatch.setenv("MEMORY_WRITE_BEHIND", "0")
+        agent = create_memory_agent()
+        assert isinstance(agent.backend, LocalMemoryAgent)
+        assert agent.is_available
+
+    def test_supermemory_with_api_key(self, monkeypatch):
+        """Test Supermemory is used when a key is set."""
+        monkeypatch.setenv("SUPERMEMORY_API_KEY", "test-key")
+        monkeypatch.delenv("MEMORY_BACKEND", raising=False)
+        monkeypatch.setenv("MEMORY_WRITE_BEHIND", "0")
+        assert isinstance(create_memory_agent().backend, MemoryAgent)
+
+    def test_forced_local(self, monkeypatch, temp_dir):
+        """Test MEMORY_BACKEND=local overrides an API key."""
+        monkeypatch.setenv("SUPERMEMORY_API_KEY", "test-key")
+        monkeypatch.setenv("MEMORY_BACKEND", "local")
+        monkeypatch.setenv("LOCAL_MEMORY_DIR", str(temp_dir))
+        monkeypatch.setenv("MEMORY_WRITE_BEHIND", "0")
+        assert isinstance(create_memory_agent().backend, LocalMemoryAgent)
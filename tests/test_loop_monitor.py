@@ -0,0 +1,60 @@
+"""
+Tests for the event-loop lag monitor.
+Stalls are produced with time.sleep on the loop.
+"""
+import time
+import pytest
+import asyncio
+
+from loop_monitor import LoopMonitor, LAG_BUCKETS_MS
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+@pytest.fixture
+async def monitor():
+    monitor = LoopMonitor(interval=0.01, threshold_ms=60)
+    monitor.start()
+    yield monitor
+    await monitor.stop()
+
+
+class TestLoopMonitor:
+    """Test lag measurement and offender attribution."""
+
+    @pytest.mark.asyncio
+    async def test_stall_attributed_to_blocking_code(self, monitor):
+        """Test a blocking call is recorded with the function that blocked."""
+        await asyncio.sleep(0.05)
+        block_the_loop(0.2)
+        await asyncio.sleep(0.05)
+
+        assert monitor.stats["slow"] == 1
+        offender = monitor.offenders[-1]
+        assert offender["lag_ms"] >= 150
+        assert "block_the_loop" in offender["where"]
+        assert any("test_stall_attributed_to_blocking_code" in line for line in offender["stack"])
+        assert monitor.summary()["top_sites"][0]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_idle_loop_has_no_offenders(self, monitor):
+        """Test an idle loop only records small lag samples."""
+        await asyncio.sleep(0.2)
+        assert monitor.stats["slow"] == 0
+        assert monitor.lag.count > 5
+        assert monitor.summary()["lag_ms"]["p50"] < 60
+
+    @pytest.mark.asyncio
+    async def test_prometheus(self, monitor):
+        """Test histogram and counter lines for /metrics."""
+        await asyncio.sleep(0.05)
+        block_the_loop(0.1)
+        await asyncio.sleep(0.03)
+
+        lines = monitor.prometheus()
+        assert "# TYPE ada_event_loop_lag_ms histogram" in lines
+        assert len([l for l in lines if l.startswith("ada_event_loop_lag_ms_bucket")]) == len(LAG_BUCKETS_MS) + 1
+        assert f'ada_event_loop_lag_ms_bucket{{le="+Inf"}} {monitor.lag.count}' in lines
+        assert "ada_event_loop_slow_total 1" in lines
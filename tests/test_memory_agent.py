@@ -0,0 +1,413 @@
+"""
+Tests for the Supermemory-backed MemoryAgent.
+Runs against a local stand-in server, no API key or network needed.
+"""
+import pytest
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from memory_agent import BaseMemoryAgent, CachingMemoryAgent, MemoryAgent, TurnRecall
+
+
+class FakeSupermemoryHandler(BaseHTTPRequestHandler):
+    """Implements the subset of the Supermemory API that MemoryAgent uses."""
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        server.requests.append((self.path, payload))
+
+        if server.delay:
+            time.sleep(server.delay)
+        if server.slow_next > 0:
+            server.slow_next -= 1
+            time.sleep(1.0)
+
+        if server.fail_next > 0:
+            server.fail_next -= 1
+            return self._reply(503, {"error": "unavailable"})
+
+        if self.headers.get("Authorization") != "Bearer test-key":
+            return self._reply(401, {"error": "unauthorized"})
+
+        if self.path == "/v3/documents":
+            memory_id = f"mem_{len(server.memories) + 1}"
+            server.memories.append({"id": memory_id, "memory": payload["content"]})
+            return self._reply(200, {"id": memory_id, "status": "queued"})
+
+        if self.path == "/v4/search":
+            words = set(payload["q"].lower().split())
+            results = []
+            for m in server.memories:
+                overlap = len(words & set(m["memory"].lower().split()))
+                if overlap:
+                    results.append({**m, "similarity": overlap / len(words)})
+            results.sort(key=lambda r: r["similarity"], reverse=True)
+            results = results[:payload.get("limit", 5)]
+            return self._reply(200, {"results": results, "total": len(results), "timing": 1})
+
+        self._reply(404, {"error": "not found"})
+
+
+@pytest.fixture
+def supermemory_server():
+    """Start a local stand-in Supermemory server on a free port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSupermemoryHandler)
+    server.memories = []
+    server.requests = []
+    server.connections = 0
+    server.fail_next = 0
+    server.delay = 0
+    server.slow_next = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+async def agent(supermemory_server):
+    """MemoryAgent pointed at the stand-in server."""
+    host, port = supermemory_server.server_address
+    agent = MemoryAgent(api_key="test-key", base_url=f"http://{host}:{port}", timeout=2.0)
+    yield agent
+    await agent.close()
+
+
+class TestMemoryAgentInit:
+    """Test MemoryAgent initialization."""
+
+    def test_disabled_without_api_key(self, monkeypatch):
+        """Test agent is unavailable when no key is configured."""
+        monkeypatch.delenv("SUPERMEMORY_API_KEY", raising=False)
+        agent = MemoryAgent()
+        assert not agent.is_available
+
+    @pytest.mark.asyncio
+    async def test_unavailable_agent_returns_empty(self, monkeypatch):
+        """Test calls on a disabled agent fail soft."""
+        monkeypatch.delenv("SUPERMEMORY_API_KEY", raising=False)
+        agent = MemoryAgent()
+        assert await agent.search_memories("anything") == []
+        result = await agent.add_memory("fact")
+        assert result["success"] is False
+
+
+    def test_backends_must_implement_interface(self):
+        """Test a backend missing add_memory/search_memories can't be instantiated."""
+        class Incomplete(BaseMemoryAgent):
+            async def add_memory(self, content, metadata=None):
+                return {"success": True}
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestMemoryRoundTrip:
+    """Test storing and recalling memories."""
+
+    @pytest.mark.asyncio
+    async def test_add_and_search(self, agent):
+        """Test a stored fact can be recalled."""
+        result = await agent.add_memory("Yash prefers Django for backend work")
+        assert result["success"]
+        assert result["memory_id"] == "mem_1"
+
+        memories = await agent.search_memories("which backend framework does Yash prefer")
+        assert memories
+        assert "Django" in memories[0]["content"]
+
+    @pytest.mark.asyncio
+    async def test_context_for_query(self, agent):
+        """Test formatted context string."""
+        await agent.add_memory("Yash is learning system design")
+        context = await agent.get_context_for_query("system design")
+        assert context.startswith("[Relevant memories from past conversations:]")
+        assert "1. Yash is learning system design" in context
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, agent, supermemory_server):
+        """Test sequential calls share one keep-alive connection."""
+        for i in range(5):
+            await agent.add_memory(f"fact number {i}")
+        assert supermemory_server.connections == 1
+
+
+class TestResilience:
+    """Test retries and timeouts."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, agent, supermemory_server):
+        """Test 503s are retried until success."""
+        await agent.add_memory("retry me")
+        supermemory_server.fail_next = 2
+        memories = await agent.search_memories("retry me")
+        assert memories
+        assert agent.stats["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, agent, supermemory_server):
+        """Test persistent failures surface as an empty result."""
+        supermemory_server.fail_next = 10
+        assert await agent.search_memories("never found") == []
+        assert agent.stats["retries"] == agent.max_retries
+        assert agent.stats["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_add_not_repeated_once_sent(self, agent, supermemory_server):
+        """Test an add the server may have received is not retried (it could be stored twice)."""
+        supermemory_server.fail_next = 1
+        result = await agent.add_memory("store me once")
+        assert result["success"] is False
+        assert agent.stats["retries"] == 0
+        assert len(supermemory_server.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_add_marked_permanent(self, agent, supermemory_server):
+        """Test a 4xx add is reported as permanent and a 5xx one as transient."""
+        result = await agent.add_memory("anything")
+        assert result["success"]
+        agent.client.headers["Authorization"] = "Bearer wrong"
+        assert not (await agent.add_memory("unauthorized"))["permanent"]  # Fixable config, keep it
+
+        agent.client.headers["Authorization"] = "Bearer test-key"
+        agent.client.base_url = str(agent.client.base_url) + "/missing"
+        result = await agent.add_memory("no such endpoint")
+        assert result["permanent"]
+
+        supermemory_server.fail_next = 1
+        agent.client.base_url = str(agent.client.base_url).replace("/missing", "")
+        assert not (await agent.add_memory("try later")).get("permanent")
+
+    @pytest.mark.asyncio
+    async def test_hung_attempt_retried_within_deadline(self, agent, supermemory_server):
+        """Test each attempt gets a share of the deadline, so a retry still fits in it."""
+        await agent.add_memory("Yash is learning Rust")
+        supermemory_server.slow_next = 1
+        memories = await agent.search_memories("learning Rust")
+        assert memories
+        assert agent.stats["retries"] == 1 and agent.stats["timeouts"] == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout_does_not_block_loop(self, agent, supermemory_server):
+        """Test a slow backend times out while the event loop keeps running."""
+        supermemory_server.delay = 1.0
+        agent.timeout = 0.2
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        memories = await agent.search_memories("slow query")
+        task.cancel()
+
+        assert memories == []
+        assert agent.stats["timeouts"] == 1
+        assert ticks >= 5
+
+
+class CountingBackend(BaseMemoryAgent):
+    """In-memory backend that counts searches."""
+
+    def __init__(self, delay=0.0):
+        self.facts = []
+        self.searches = 0
+        self.delay = delay
+
+    @property
+    def is_available(self):
+        return True
+
+    async def add_memory(self, content, metadata=None):
+        self.facts.append(content)
+        return {"success": True, "memory_id": str(len(self.facts))}
+
+    async def search_memories(self, query, limit=5):
+        self.searches += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        words = set(query.lower().split())
+        hits = [f for f in self.facts if words & set(f.lower().split())]
+        return [{"content": f, "relevance": 1.0} for f in hits[:limit]]
+
+
+class TestQueryCache:
+    """Test the normalized-query cache in front of a backend."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_hits_cache(self):
+        """Test a repeated query is served without a backend call."""
+        backend = CountingBackend()
+        await backend.add_memory("Yash prefers Django")
+        agent = CachingMemoryAgent(backend)
+
+        first = await agent.search_memories("What does Yash prefer?")
+        second = await agent.search_memories("what does yash PREFER")
+
+        assert first == second
+        assert backend.searches == 1
+        assert agent.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_smaller_limit_served_from_cache(self):
+        """Test get_context_for_query (limit=3) reuses a limit=5 search."""
+        backend = CountingBackend()
+        for i in range(5):
+            await backend.add_memory(f"django fact {i}")
+        agent = CachingMemoryAgent(backend)
+
+        await agent.search_memories("django facts", limit=5)
+        context = await agent.get_context_for_query("django facts")
+
+        assert backend.searches == 1
+        assert "3. django fact 2" in context
+
+    @pytest.mark.asyncio
+    async def test_add_memory_invalidates(self):
+        """Test storing a memory clears stale results."""
+        backend = CountingBackend()
+        await backend.add_memory("exam in march")
+        agent = CachingMemoryAgent(backend)
+
+        await agent.search_memories("exam date")
+        await agent.add_memory("exam moved to april")
+        results = await agent.search_memories("exam date")
+
+        assert backend.searches == 2
+        assert len(results) == 2
+
+    @pytest.mark.asyncio
+    async def test_one_content_word_apart_not_shared(self):
+        """Test queries differing in one content word get their own results, cached or in flight."""
+        backend = CountingBackend(delay=0.02)
+        await backend.add_memory("sister's favorite movie genre is horror")
+        await backend.add_memory("brother's favorite movie genre is comedy")
+        agent = CachingMemoryAgent(backend)
+
+        await agent.search_memories("what is my brother's favorite movie genre")
+        await agent.search_memories("what is my sister's favorite movie genre")
+        assert backend.searches == 2  # Not served the brother's results
+
+        agent.prefetch("when is my dentist appointment")
+        await agent.search_memories("when is my doctor appointment")
+        assert backend.searches == 4  # Didn't join the dentist search
+        assert agent.stats["hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """Test entries older than the TTL are refetched."""
+        backend = CountingBackend()
+        await backend.add_memory("printer is an ender")
+        agent = CachingMemoryAgent(backend, ttl=0.05)
+
+        await agent.search_memories("printer model")
+        await asyncio.sleep(0.1)
+        await agent.search_memories("printer model")
+
+        assert backend.searches == 2
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test the cache is bounded."""
+        backend = CountingBackend()
+        await backend.add_memory("alpha beta gamma delta")
+        agent = CachingMemoryAgent(backend, max_entries=2)
+
+        for q in ["alpha one", "beta two", "gamma three"]:
+            await agent.search_memories(q)
+
+        assert len(agent._cache) == 2
+
+
+class TestPrefetch:
+    """Test speculative prefetch."""
+
+    @pytest.mark.asyncio
+    async def test_prefetch_warms_cache(self):
+        """Test a recall after a prefetched utterance needs no new backend call."""
+        backend = CountingBackend()
+        await backend.add_memory("favourite framework is django")
+        agent = CachingMemoryAgent(backend)
+
+        task = agent.prefetch("what is my favourite framework")
+        await task
+        results = await agent.search_memories("my favourite framework")
+
+        assert backend.searches == 1
+        assert results and "django" in results[0]["content"]
+
+    @pytest.mark.asyncio
+    async def test_search_joins_inflight_prefetch(self):
+        """Test a recall issued while the prefetch is running waits for it."""
+        backend = CountingBackend(delay=0.05)
+        await backend.add_memory("favourite framework is django")
+        agent = CachingMemoryAgent(backend)
+
+        agent.prefetch("what is my favourite framework")
+        results = await agent.search_memories("favourite framework")
+
+        assert backend.searches == 1
+        assert results
+
+    @pytest.mark.asyncio
+    async def test_turn_recall_serves_prefetch(self):
+        """Test the model's rephrased recall in the same turn uses the utterance's prefetch, once."""
+        backend = CountingBackend(delay=0.05)
+        await backend.add_memory("favourite framework is django")
+        turn = TurnRecall(CachingMemoryAgent(backend))
+
+        turn.utterance("what is my favourite framework again")
+        results = await turn.recall("user preferred web framework")  # Joins the in-flight prefetch
+        assert results and "django" in results[0]["content"]
+        assert backend.searches == 1
+
+        await turn.recall("user preferred web framework")
+        assert backend.searches == 2  # The slot is used up; later recalls search for themselves
+
+    @pytest.mark.asyncio
+    async def test_turn_recall_falls_back(self):
+        """Test an empty or stale prefetch falls back to the model's query."""
+        backend = CountingBackend()
+        await backend.add_memory("favourite framework is django")
+        turn = TurnRecall(CachingMemoryAgent(backend), ttl=0.01)
+
+        turn.utterance("tell me something nice please")
+        assert await turn.recall("favourite framework")
+        assert turn.stats["fallbacks"] == 1
+
+        turn.utterance("what is my favourite framework again")
+        await asyncio.sleep(0.02)
+        await turn.recall("django")
+        assert turn.stats["served"] == 0
+
+    @pytest.mark.asyncio
+    async def test_prefetch_skips_short_utterances(self):
+        """Test greetings don't trigger a search."""
+        agent = CachingMemoryAgent(CountingBackend())
+        assert agent.prefetch("hello") is None
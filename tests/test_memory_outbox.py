@@ -0,0 +1,242 @@
+"""
+Tests for the write-behind memory outbox.
+"""
+import pytest
+import asyncio
+
+from memory_agent import BaseMemoryAgent, CachingMemoryAgent, create_memory_agent, get_memory_agent, close_memory_agent
+from memory_outbox import MemoryOutbox, WriteBehindMemoryAgent
+
+
+class RecordingBackend(BaseMemoryAgent):
+    """Backend that records uploads and can be told to fail."""
+
+    def __init__(self):
+        self.uploads = []
+        self.failing = False
+
+    @property
+    def is_available(self):
+        return True
+
+    async def add_memory(self, content, metadata=None):
+        if self.failing:
+            return {"success": False, "error": "backend down"}
+        self.uploads.append(content)
+        return {"success": True, "memory_id": str(len(self.uploads))}
+
+    async def search_memories(self, query, limit=5):
+        words = set(query.lower().split())
+        return [{"content": c, "relevance": 1.0} for c in self.uploads if words & set(c.lower().split())][:limit]
+
+
+@pytest.fixture
+def outbox_path(temp_dir):
+    return str(temp_dir / "outbox.db")
+
+
+class TestMemoryOutbox:
+    """Test the SQLite outbox."""
+
+    def test_enqueue_and_pending(self, outbox_path):
+        """Test facts are queued oldest first."""
+        outbox = MemoryOutbox(outbox_path)
+        outbox.enqueue("first fact")
+        outbox.enqueue("second fact", {"type": "test"})
+        pending = outbox.pending()
+        assert [p[1] for p in pending] == ["first fact", "second fact"]
+        assert pending[1][2] == {"type": "test"}
+        outbox.close()
+
+    def test_long_fact_with_filler_word_deduplicated(self, outbox_path):
+        """Test a one-word insertion in a long fact counts as a duplicate."""
+        outbox = MemoryOutbox(outbox_path)
+        base = "Yash wants to build a portfolio of three full stack projects using Django and React before his internship interviews"
+        outbox.enqueue(base)
+        assert outbox.enqueue(base.replace("build a", "build a solid"))["duplicate"]
+        outbox.close()
+
+    def test_near_identical_facts_deduplicated(self, outbox_path):
+        """Test punctuation/case variants collapse into one entry."""
+        outbox = MemoryOutbox(outbox_path)
+        assert not outbox.enqueue("Yash prefers Django for backend work.")["duplicate"]
+        assert outbox.enqueue("yash prefers django for backend work")["duplicate"]
+        assert outbox.enqueue("Yash prefers Django for backend works")["duplicate"]
+        assert not outbox.enqueue("Yash prefers React for frontend work")["duplicate"]
+        assert not outbox.enqueue("Yash prefers Django for backend work in 2024")["duplicate"]
+        assert outbox.count() == 3
+        outbox.close()
+
+    def test_changed_time_is_not_a_duplicate(self, outbox_path):
+        """Test a correction differing in one number, date or time word is kept."""
+        outbox = MemoryOutbox(outbox_path)
+        base = "Yash has a team standup meeting with the backend developers every weekday morning at 9am in the main office"
+        outbox.enqueue(base)
+        assert not outbox.enqueue(base.replace("9am", "11am"))["duplicate"]
+        assert not outbox.enqueue(base.replace("weekday morning", "weekday evening"))["duplicate"]
+        assert outbox.enqueue(base.replace("the main", "the"))["duplicate"]
+        outbox.close()
+
+    def test_already_uploaded_fact_deduplicated(self, outbox_path):
+        """Test a fact uploaded earlier isn't queued again."""
+        outbox = MemoryOutbox(outbox_path)
+        entry = outbox.enqueue("exam is in march")
+        outbox.mark_uploaded([entry["id"]])
+        assert outbox.enqueue("Exam is in March!")["duplicate"]
+        outbox.close()
+
+    def test_survives_restart(self, outbox_path):
+        """Test queued facts are still there after reopening."""
+        outbox = MemoryOutbox(outbox_path)
+        outbox.enqueue("durable fact")
+        outbox.close()
+        assert MemoryOutbox(outbox_path).count() == 1
+
+
+class TestWriteBehindAgent:
+    """Test batching and flushing."""
+
+    @pytest.mark.asyncio
+    async def test_add_acknowledges_without_upload(self, outbox_path):
+        """Test add_memory returns before the backend sees anything."""
+        backend = RecordingBackend()
+        agent = WriteBehindMemoryAgent(backend, path=outbox_path, flush_interval=60)
+        result = await agent.add_memory("quick fact")
+        assert result["success"] and result["queued"]
+        assert backend.uploads == []
+        await agent.close()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_reported_to_caller(self, outbox_path):
+        """Test a skipped duplicate is flagged rather than acknowledged as stored."""
+        agent = WriteBehindMemoryAgent(RecordingBackend(), path=outbox_path, flush_interval=60)
+        await agent.add_memory("exam is in march")
+        result = await agent.add_memory("Exam is in March!")
+        assert result["duplicate"] and result["memory_id"] is None
+        assert agent.stats["deduplicated"] == 1
+        await agent.close()
+
+    @pytest.mark.asyncio
+    async def test_size_trigger_flushes_batch(self, outbox_path):
+        """Test reaching batch_size wakes the uploader."""
+        backend = RecordingBackend()
+        agent = WriteBehindMemoryAgent(backend, path=outbox_path, batch_size=3, flush_interval=60)
+        for i in range(3):
+            await agent.add_memory(f"fact number {i}")
+        await asyncio.sleep(0.1)
+        assert len(backend.uploads) == 3
+        assert agent.stats["batches"] == 1
+        assert agent.outbox.count() == 0
+        await agent.close()
+
+    @pytest.mark.asyncio
+    async def test_time_trigger_flushes(self, outbox_path):
+        """Test the interval flush uploads a partial batch."""
+        backend = RecordingBackend()
+        agent = WriteBehindMemoryAgent(backend, path=outbox_path, batch_size=100, flush_interval=0.05)
+        await agent.add_memory("lonely fact")
+        await asyncio.sleep(0.2)
+        assert backend.uploads == ["lonely fact"]
+        await agent.close()
+
+    @pytest.mark.asyncio
+    async def test_failures_back_off_and_are_kept(self, outbox_path):
+        """Test a failed upload stays queued, backs off exponentially and goes through later."""
+        backend = RecordingBackend()
+        backend.failing = True
+        agent = WriteBehindMemoryAgent(backend, path=outbox_path, flush_interval=60, retry_delay=0.05)
+        await agent.add_memory("unlucky fact")
+
+        for _ in range(8):
+            await agent.flush()
+            await asyncio.sleep(0.06)
+        # Backing off: far fewer attempts than flushes, and nothing dropped
+        assert agent.stats["failed"] <= 4
+        assert agent.outbox.count() == 1 and agent.stats["dropped"] == 0
+
+        backend.failing = False
+        agent.outbox.db.execute("UPDATE outbox SET next_attempt_at = 0")
+        await agent.flush()
+        assert backend.uploads == ["unlucky fact"]
+        await agent.close()
+
+    @pytest.mark.asyncio
+    async def test_rejected_fact_dropped(self, outbox_path):
+        """Test a fact the backend rejects for good (non-retryable 4xx) is dropped."""
+        class RejectingBackend(RecordingBackend):
+            async def add_memory(self, content, metadata=None):
+                return {"success": False, "error": "400 Bad Request", "permanent": True}
+
+        agent = WriteBehindMemoryAgent(RejectingBackend(), path=outbox_path, flush_interval=60)
+        await agent.add_memory("malformed fact")
+        await agent.flush()
+        assert agent.outbox.count() == 0 and agent.stats["dropped"] == 1
+        await agent.close()
+
+    @pytest.mark.asyncio
+    async def test_restart_drains_previous_outbox(self, outbox_path):
+        """Test facts queued before a restart are uploaded by the next session."""
+        MemoryOutbox(outbox_path).enqueue("left over from last time")
+
+        backend = RecordingBackend()
+        agent = WriteBehindMemoryAgent(backend, path=outbox_path, flush_interval=0.05)
+        agent.start()
+        await asyncio.sleep(0.2)
+        assert backend.uploads == ["left over from last time"]
+        await agent.close()
+
+    @pytest.mark.asyncio
+    async def test_search_sees_queued_facts(self, outbox_path):
+        """Test read-your-writes before the fact is uploaded."""
+        backend = RecordingBackend()
+        agent = CachingMemoryAgent(WriteBehindMemoryAgent(backend, path=outbox_path, flush_interval=60))
+        await agent.add_memory("the printer is an ender")
+        results = await agent.search_memories("which printer")
+        assert results[0]["content"] == "the printer is an ender"
+        await agent.close()
+
+    @pytest.mark.asyncio
+    async def test_remember_conversation_is_queued(self, outbox_path):
+        """Test conversation summaries go through the outbox."""
+        backend = RecordingBackend()
+        agent = WriteBehindMemoryAgent(backend, path=outbox_path, flush_interval=60)
+        await agent.remember_conversation(
+            "How should I structure my Django project?",
+            "Split it into apps by domain, like rooms in a hostel."
+        )
+        assert agent.outbox.count() == 1
+        await agent.close()
+        assert len(backend.uploads) == 1
+
+
+class TestFactory:
+    """Test create_memory_agent wiring."""
+
+    def test_write_behind_enabled_by_default(self, monkeypatch, temp_dir, outbox_path):
+        """Test the outbox sits between the cache and the backend."""
+        monkeypatch.delenv("SUPERMEMORY_API_KEY", raising=False)
+        monkeypatch.delenv("MEMORY_BACKEND", raising=False)
+        monkeypatch.delenv("MEMORY_WRITE_BEHIND", raising=False)
+        monkeypatch.setenv("LOCAL_MEMORY_DIR", str(temp_dir / "store"))
+        monkeypatch.setenv("MEMORY_OUTBOX_PATH", outbox_path)
+        agent = create_memory_agent()
+        assert isinstance(agent, CachingMemoryAgent)
+        assert isinstance(agent.backend, WriteBehindMemoryAgent)
+
+    @pytest.mark.asyncio
+    async def test_shared_agent(self, monkeypatch, temp_dir, outbox_path):
+        """Test every caller gets one agent (one outbox worker) until it is closed."""
+        monkeypatch.delenv("SUPERMEMORY_API_KEY", raising=False)
+        monkeypatch.delenv("MEMORY_BACKEND", raising=False)
+        monkeypatch.setenv("LOCAL_MEMORY_DIR", str(temp_dir / "store"))
+        monkeypatch.setenv("MEMORY_OUTBOX_PATH", outbox_path)
+        agent = get_memory_agent()
+        assert get_memory_agent() is agent
+
+        agent.start()
+        agent.start()
+        worker = agent.backend._worker
+        await close_memory_agent()
+        assert worker.done()
+        assert get_memory_agent() is not agent
+        await close_memory_agent()
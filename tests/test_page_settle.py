@@ -0,0 +1,150 @@
+"""
+Tests for adaptive page settle detection.
+Uses a scripted stand-in page, so no browser is needed.
+"""
+import pytest
+import asyncio
+import time
+
+from page_settle import PageSettler
+
+
+class FakeRequest:
+    def __init__(self, resource_type="xhr"):
+        self.resource_type = resource_type
+
+
+class FakeContext:
+    async def add_init_script(self, script):
+        pass
+
+
+class FakePage:
+    """Page whose DOM mutations and screenshots are driven by the test."""
+
+    def __init__(self):
+        self.context = FakeContext()
+        self.handlers = {}
+        self.last_mutation = time.monotonic()
+        self.frame = b"frame-0"
+        self.animating = False
+        self.shots = 0
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def fire(self, event, request):
+        for handler in self.handlers.get(event, []):
+            handler(request)
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    async def evaluate(self, script):
+        if script.startswith("() =>"):
+            return (time.monotonic() - self.last_mutation) * 1000
+
+    async def screenshot(self, **kwargs):
+        self.shots += 1
+        return f"frame-{self.shots}".encode() if self.animating else self.frame
+
+
+@pytest.fixture
+async def page():
+    page = FakePage()
+    page.last_mutation -= 10  # idle for a while
+    return page
+
+
+class TestSettle:
+    """Test when the settler decides a page is stable."""
+
+    @pytest.mark.asyncio
+    async def test_idle_page_settles_fast(self, page):
+        """Test an idle page settles well under the old fixed 1 s sleep."""
+        settler = PageSettler(page, quiet_ms=100)
+        await settler.attach()
+        result = await settler.wait()
+        assert result["settled"]
+        assert result["waited_ms"] < 400
+
+    @pytest.mark.asyncio
+    async def test_waits_for_inflight_requests(self, page):
+        """Test settling waits until pending requests finish."""
+        settler = PageSettler(page, quiet_ms=50, pixel_check=False)
+        await settler.attach()
+        request = FakeRequest()
+        page.fire("request", request)
+
+        async def finish_later():
+            await asyncio.sleep(0.3)
+            page.fire("requestfinished", request)
+
+        asyncio.create_task(finish_later())
+        result = await settler.wait()
+        assert result["settled"]
+        assert result["waited_ms"] >= 300
+
+    @pytest.mark.asyncio
+    async def test_waits_for_dom_quiet(self, page):
+        """Test a mutating DOM delays settling."""
+        settler = PageSettler(page, quiet_ms=100, pixel_check=False)
+        await settler.attach()
+
+        async def mutate():
+            for _ in range(5):
+                page.last_mutation = time.monotonic()
+                await asyncio.sleep(0.05)
+
+        asyncio.create_task(mutate())
+        result = await settler.wait()
+        assert result["settled"]
+        assert result["waited_ms"] >= 300
+
+    @pytest.mark.asyncio
+    async def test_waits_for_pixel_stability(self, page):
+        """Test changing frames (e.g. an animation) delay settling."""
+        settler = PageSettler(page, quiet_ms=50, poll_interval=0.02)
+        await settler.attach()
+
+        async def animate():
+            page.animating = True
+            await asyncio.sleep(0.3)
+            page.animating = False
+
+        asyncio.create_task(animate())
+        result = await settler.wait()
+        assert result["settled"]
+        assert result["waited_ms"] >= 250
+
+    @pytest.mark.asyncio
+    async def test_upper_bound(self, page):
+        """Test a page that never settles returns at max_wait."""
+        settler = PageSettler(page, quiet_ms=50, max_wait=0.3, stale_request=10)
+        await settler.attach()
+        page.fire("request", FakeRequest())
+
+        result = await settler.wait()
+        assert not result["settled"]
+        assert 300 <= result["waited_ms"] < 600
+        assert settler.stats["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_long_polls_are_ignored(self, page):
+        """Test stale requests and websockets don't block settling forever."""
+        settler = PageSettler(page, quiet_ms=50, stale_request=0.1, pixel_check=False)
+        await settler.attach()
+        page.fire("request", FakeRequest("websocket"))
+        page.fire("request", FakeRequest("xhr"))
+
+        result = await settler.wait(max_wait=2.0)
+        assert result["settled"]
+        assert result["waited_ms"] < 1000
+
+    @pytest.mark.asyncio
+    async def test_min_wait(self, page):
+        """Test min_wait is honoured even on an idle page."""
+        settler = PageSettler(page, quiet_ms=10, pixel_check=False)
+        await settler.attach()
+        result = await settler.wait(min_wait=0.2)
+        assert result["waited_ms"] >= 200
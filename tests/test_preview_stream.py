@@ -0,0 +1,105 @@
+"""
+Tests for the BrowserWindow preview stream.
+"""
+import io
+import pytest
+import asyncio
+from PIL import Image
+
+from preview_stream import PreviewStream, encode_preview
+
+
+def make_png(color, size=(1440, 900)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, format="PNG")
+    return out.getvalue()
+
+
+class Collector:
+    def __init__(self):
+        self.frames = []
+        self.logs = []
+
+    async def __call__(self, image, log):
+        if image is not None:
+            self.frames.append(image)
+        if log:
+            self.logs.append(log)
+
+
+class TestEncoding:
+    """Test preview encoding."""
+
+    def test_downscaled_jpeg(self):
+        """Test previews are small JPEGs at the configured width."""
+        png = make_png((10, 120, 200))
+        preview = encode_preview(png, width=720)
+        image = Image.open(io.BytesIO(preview))
+        assert image.format == "JPEG"
+        assert image.size == (720, 450)
+
+    def test_webp(self):
+        """Test WebP output."""
+        preview = encode_preview(make_png((0, 0, 0)), width=320, fmt="WEBP")
+        assert Image.open(io.BytesIO(preview)).format == "WEBP"
+
+
+class TestStream:
+    """Test rate limiting and deduplication."""
+
+    @pytest.mark.asyncio
+    async def test_sends_binary_frames(self):
+        """Test frames are bytes, not base64 strings."""
+        sink = Collector()
+        stream = PreviewStream(sink)
+        await stream.push(make_png((255, 0, 0)), "Web Agent Initialized")
+        assert isinstance(sink.frames[0], bytes)
+        assert sink.logs == ["Web Agent Initialized"]
+        assert stream.stats["preview_bytes"] < stream.stats["source_bytes"]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_frames_skipped(self):
+        """Test an identical screenshot isn't re-encoded or re-sent, but its log is."""
+        sink = Collector()
+        stream = PreviewStream(sink, max_fps=0)
+        png = make_png((0, 255, 0))
+        await stream.push(png, "first")
+        await stream.push(png, "scrolled (nothing changed)")
+        assert len(sink.frames) == 1
+        assert sink.logs == ["first", "scrolled (nothing changed)"]
+        assert stream.stats["unchanged"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_frames_coalesce(self):
+        """Test a burst sends the first frame now and only the latest one later."""
+        sink = Collector()
+        stream = PreviewStream(sink, max_fps=5)
+        colors = [(i * 40, 0, 0) for i in range(4)]
+        for color in colors:
+            await stream.push(make_png(color), "action")
+
+        assert len(sink.frames) == 1
+        await stream.close()
+        assert len(sink.frames) == 2
+        last = Image.open(io.BytesIO(sink.frames[-1])).getpixel((10, 10))
+        assert abs(last[0] - colors[-1][0]) <= 8
+        assert len(sink.logs) == 4
+        assert stream.stats["coalesced"] == 2
+
+    @pytest.mark.asyncio
+    async def test_encode_off_loop(self):
+        """Test encoding runs in a worker thread while the loop keeps ticking."""
+        sink = Collector()
+        stream = PreviewStream(sink, max_fps=0)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await stream.push(make_png((1, 2, 3), size=(2880, 1800)))
+        task.cancel()
+        assert ticks > 1
@@ -20,6 +20,30 @@ MODULES = {
     "web": "test_web_agent.py",
     "auth": "test_authenticator.py",
     "tools": "test_ada_tools.py",
+    "files": "test_file_writer.py",
+    "memory": "test_memory_agent.py",
+    "local_memory": "test_local_memory.py",
+    "outbox": "test_memory_outbox.py",
+    "browser_pool": "test_browser_pool.py",
+    "web_tasks": "test_web_tasks.py",
+    "screenshots": "test_screenshot_history.py",
+    "settle": "test_page_settle.py",
+    "routing": "test_web_routing.py",
+    "preview": "test_preview_stream.py",
+    "recorder": "test_web_recorder.py",
+    "trace": "test_task_trace.py",
+    "dom": "test_dom_snapshot.py",
+    "result_cache": "test_web_result_cache.py",
+    "sessions": "test_session_registry.py",
+    "emitter": "test_emitter.py",
+    "startup": "test_startup.py",
+    "warm": "test_warm_pool.py",
+    "resumption": "test_live_resumption.py",
+    "connection": "test_live_connection.py",
+    "latency": "test_voice_latency.py",
+    "fake_live": "test_fake_live.py",
+    "load": "test_load_test.py",
+    "loop": "test_loop_monitor.py",
 }
 
 TESTS_DIR = Path(__file__).parent
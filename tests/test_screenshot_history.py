@@ -0,0 +1,119 @@
+"""
+Tests for the bounded Computer Use screenshot history.
+"""
+import io
+import pytest
+from PIL import Image
+from google.genai import types
+
+from screenshot_history import PLACEHOLDER_TEXT, SNAPSHOT_PLACEHOLDER, ScreenshotHistory
+
+
+def make_png(color=(200, 30, 30), size=(1440, 900)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, format="PNG")
+    return out.getvalue()
+
+
+def initial_message(png):
+    return types.Content(role="user", parts=[
+        types.Part(text="find the price"),
+        types.Part.from_bytes(data=png, mime_type="image/png"),
+    ])
+
+
+def model_turn():
+    return types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name="click_at", args={"x": 10, "y": 20})),
+    ])
+
+
+def response_turn(png):
+    return types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+        name="click_at",
+        response={"url": "https://example.com"},
+        parts=[types.FunctionResponsePart(
+            inline_data=types.FunctionResponseBlob(mime_type="image/png", data=png)
+        )],
+    ))])
+
+
+def inline_screenshots(history):
+    return len(list(history._screenshot_slots()))
+
+
+class TestScreenshotWindow:
+    """Test old screenshots are demoted."""
+
+    def test_keeps_last_k(self):
+        """Test only keep_last full screenshots remain inline."""
+        png = make_png()
+        history = ScreenshotHistory(keep_last=2)
+        history.append(initial_message(png))
+        for _ in range(5):
+            history.append(model_turn())
+            history.append(response_turn(png))
+
+        assert inline_screenshots(history) == 2
+        assert history.contents[0].parts[1].text == PLACEHOLDER_TEXT
+        old_response = history.contents[2].parts[0].function_response
+        assert old_response.parts is None
+        assert old_response.response["screenshot"] == PLACEHOLDER_TEXT
+        assert old_response.response["url"] == "https://example.com"
+
+    def test_latest_screenshot_is_untouched(self):
+        """Test the newest screenshot stays lossless PNG."""
+        png = make_png()
+        history = ScreenshotHistory(keep_last=1)
+        history.append(initial_message(png))
+        history.append(model_turn())
+        history.append(response_turn(png))
+
+        latest = history.contents[-1].parts[0].function_response.parts[0].inline_data
+        assert latest.mime_type == "image/png"
+        assert latest.data == png
+
+    def test_thumbnail_mode(self):
+        """Test older screenshots become small JPEGs in thumbnail mode."""
+        png = make_png()
+        history = ScreenshotHistory(keep_last=1, mode="thumbnail", thumbnail_width=96)
+        history.append(initial_message(png))
+        history.append(model_turn())
+        history.append(response_turn(png))
+
+        thumb = history.contents[0].parts[1].inline_data
+        assert thumb.mime_type == "image/jpeg"
+        assert Image.open(io.BytesIO(thumb.data)).size[0] <= 96
+        assert len(thumb.data) < len(png)
+
+    def test_page_snapshots_bounded(self):
+        """Test old text page snapshots are demoted like screenshots."""
+        history = ScreenshotHistory(keep_last=2)
+        for i in range(4):
+            history.append(model_turn())
+            history.append(types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+                name="click_element", response={"url": "https://example.com", "page": f"snapshot {i}"},
+            ))]))
+
+        pages = [c.parts[0].function_response.response["page"] for c in history.contents[1::2]]
+        assert pages == [SNAPSHOT_PLACEHOLDER, SNAPSHOT_PLACEHOLDER, "snapshot 2", "snapshot 3"]
+
+
+class TestRequestSize:
+    """Test per-turn request size reporting."""
+
+    def test_request_size_is_bounded(self):
+        """Test request size stops growing once the window is full."""
+        png = make_png()
+        history = ScreenshotHistory(keep_last=3)
+        history.append(initial_message(png))
+        for _ in range(15):
+            history.record_request()
+            history.append(model_turn())
+            history.append(response_turn(png))
+
+        sizes = history.turn_bytes
+        assert len(sizes) == 15
+        assert max(sizes) <= 3 * len(png) + 10_000
+        # Unbounded history would have reached ~16 screenshots by now
+        assert sizes[-1] < 5 * len(png)
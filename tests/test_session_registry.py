@@ -0,0 +1,192 @@
+"""
+Tests for the server's per-client session registry.
+Uses stand-in audio loops, so no audio devices or API key are needed.
+"""
+import time
+import pytest
+import asyncio
+
+from session_registry import SessionRegistry, SessionLimitError, payload_size
+from project_manager import ProjectManager
+
+
+class FakeAudioLoop:
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    async def run(self):
+        await asyncio.sleep(3600)
+
+
+def start(registry, session):
+    """What server.start_audio does: admit, create the loop, bind it."""
+    registry.admit(session)
+    audio_loop = FakeAudioLoop()
+    registry.bind(session, audio_loop, asyncio.create_task(audio_loop.run()))
+    return audio_loop
+
+
+class TestAttach:
+    """Test mapping sockets to sessions."""
+
+    def test_client_keyed_session_is_shared(self):
+        """Test two sockets with the same session_id share one session and room."""
+        registry = SessionRegistry()
+        a = registry.attach("sid-1", "window-a")
+        b = registry.attach("sid-2", "window-a")
+        other = registry.attach("sid-3", "window-b")
+        assert a is b
+        assert a.room != other.room
+        assert registry.get("sid-2") is a
+
+    def test_socket_keyed_session_ends_with_socket(self):
+        """Test a session without a client id is returned for closing on disconnect."""
+        registry = SessionRegistry()
+        session = registry.attach("sid-1")
+        assert registry.detach("sid-1") is session
+        registry.close(session)
+        assert registry.sessions == {}
+
+    def test_client_keyed_session_survives_reload(self):
+        """Test a reload (disconnect, reconnect with the same id) keeps the session."""
+        registry = SessionRegistry()
+        session = registry.attach("sid-1", "window-a")
+        assert registry.detach("sid-1") is None
+        assert session.detached_at is not None
+        assert registry.attach("sid-9", "window-a") is session
+        assert session.detached_at is None
+
+
+class TestAdmission:
+    """Test the live session limit."""
+
+    @pytest.mark.asyncio
+    async def test_limit_and_slot_reuse(self):
+        """Test starts beyond max_live are rejected until a slot frees up."""
+        registry = SessionRegistry(max_live=2)
+        first, second, third = (registry.attach(f"sid-{i}", f"w{i}") for i in range(3))
+        start(registry, first)
+        start(registry, second)
+        assert (first.slot, second.slot) == (0, 1)
+
+        with pytest.raises(SessionLimitError):
+            registry.admit(third)
+        assert registry.stats["rejected"] == 1
+
+        registry.stop(first)
+        start(registry, third)
+        assert third.slot == 0
+        registry.close_all()
+
+    def test_slot_reserved_while_building(self):
+        """Test a session admitted but not yet bound keeps its slot."""
+        registry = SessionRegistry(max_live=2)
+        first = registry.attach("sid-1", "a")
+        registry.admit(first)
+        assert registry.next_slot() == 1
+        registry.admit(registry.attach("sid-2", "b"))
+        with pytest.raises(SessionLimitError):
+            registry.admit(registry.attach("sid-3", "c"))
+
+    @pytest.mark.asyncio
+    async def test_crashed_loop_frees_slot(self):
+        """Test a session whose loop task ended no longer counts as live."""
+        registry = SessionRegistry(max_live=1)
+        session = registry.attach("sid-1")
+        start(registry, session)
+        session.loop_task.cancel()
+        await asyncio.sleep(0)
+        assert not session.live
+        registry.admit(registry.attach("sid-2"))
+
+
+class TestEviction:
+    """Test idle and abandoned sessions are cleaned up."""
+
+    @pytest.mark.asyncio
+    async def test_expired(self):
+        """Test idle live sessions and abandoned sessions are reported."""
+        registry = SessionRegistry(idle_timeout=10, reconnect_grace=5)
+        idle = registry.attach("sid-1", "idle")
+        start(registry, idle)
+        gone = registry.attach("sid-2", "gone")
+        registry.detach("sid-2")
+        fresh = registry.attach("sid-3", "fresh")
+        start(registry, fresh)
+
+        now = time.monotonic()
+        idle.last_active = now - 11
+        gone.detached_at = now - 6
+        due = dict((s.key, reason) for s, reason in registry.expired(now))
+        assert due == {"idle": "idle", "gone": "abandoned"}
+        registry.close_all()
+
+    @pytest.mark.asyncio
+    async def test_voice_activity_keeps_session(self):
+        """Test a voice-only session (no socket events) isn't reported idle."""
+        registry = SessionRegistry(idle_timeout=10)
+        session = registry.attach("sid-1", "voice")
+        start(registry, session)
+        session.last_active = time.monotonic() - 11
+        session.mark_active()
+        assert registry.expired() == []
+        assert session.stats["events_in"] == 0
+        registry.close_all()
+
+    @pytest.mark.asyncio
+    async def test_evictor(self):
+        """Test the evictor stops idle loops and notifies their clients."""
+        registry = SessionRegistry(idle_timeout=0.01)
+        session = registry.attach("sid-1", "w")
+        audio_loop = start(registry, session)
+        notified = []
+
+        async def on_evict(s, reason):
+            notified.append((s.key, reason))
+
+        evictor = asyncio.create_task(registry.run_evictor(on_evict=on_evict, interval=0.02))
+        await asyncio.sleep(0.1)
+        evictor.cancel()
+
+        assert notified == [("w", "idle")]
+        assert audio_loop.stopped and not session.live
+        assert "w" in registry.sessions  # The client is still connected
+        assert registry.stats["evicted_idle"] == 1
+
+
+class TestAccounting:
+    """Test per-session resource accounting."""
+
+    def test_emit_accounting(self):
+        """Test emits and their approximate bytes are counted per session."""
+        registry = SessionRegistry()
+        a = registry.attach("sid-1", "a")
+        b = registry.attach("sid-2", "b")
+        a.account_emit({"sender": "User", "text": "hello"})
+        a.account_emit({"image": b"x" * 1000, "log": None})
+
+        assert a.stats["emits"] == 2
+        assert a.stats["emit_bytes"] > 1000
+        assert b.stats["emits"] == 0
+        summary = registry.summary()
+        assert summary["live"] == 0 and len(summary["sessions"]) == 2
+
+    def test_payload_size(self):
+        """Test large sample lists are sized without walking them."""
+        assert payload_size({"data": list(range(4096))}) == len("data") + 4096 * 4
+
+
+class TestProjectIsolation:
+    """Test sessions get separate scratch projects."""
+
+    def test_separate_temp_projects(self, temp_dir):
+        """Test a second session's scratch project doesn't clear the first one's."""
+        first = ProjectManager(str(temp_dir))
+        (first.get_current_project_path() / "notes.txt").write_text("keep me")
+        second = ProjectManager(str(temp_dir), temp_project="temp-2")
+
+        assert second.current_project == "temp-2"
+        assert (temp_dir / "projects" / "temp" / "notes.txt").read_text() == "keep me"
@@ -0,0 +1,94 @@
+"""
+Tests for backend startup cost: importing server.py must stay cheap and
+/status must answer quickly. Both run in a fresh interpreter.
+
+Budgets can be raised on slow machines with ADA_STARTUP_IMPORT_BUDGET and
+ADA_STARTUP_READY_BUDGET (seconds).
+"""
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+import urllib.request
+from pathlib import Path
+
+from startup_profile import wait_until_ready
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+# Measured ~0.5 s here; fastapi and socketio are most of it
+IMPORT_BUDGET = float(os.getenv("ADA_STARTUP_IMPORT_BUDGET", "1.5"))
+READY_BUDGET = float(os.getenv("ADA_STARTUP_READY_BUDGET", "3.0"))
+
+# Must only load when a session or face auth needs them
+HEAVY_MODULES = ["ada", "authenticator", "cv2", "pyaudio", "mediapipe", "google.genai", "playwright", "mss"]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import server
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def server_env(**extra):
+    env = dict(os.environ, WEB_AGENT_PREWARM="0", ADA_PREIMPORT="0", **extra)
+    env.pop("ADA_PROFILE_STARTUP", None)
+    return env
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestImport:
+    """Test what importing server.py loads."""
+
+    def test_import_is_light(self):
+        """Test heavy modules are deferred and the import stays within budget."""
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=server_env(),
+            capture_output=True, text=True, timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+        assert probe["loaded"] == []
+        assert probe["elapsed"] < IMPORT_BUDGET, f"import server took {probe['elapsed']:.2f}s"
+
+
+class TestReady:
+    """Test time until the health check answers."""
+
+    def test_status_answers_within_budget(self):
+        """Test /status answers soon after the process starts, before ada is loaded."""
+        port = free_port()
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "server.py"], cwd=BACKEND_DIR, env=server_env(ADA_PORT=str(port)),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}/status"
+            assert wait_until_ready(url, timeout=30) is not None
+            ready = time.perf_counter() - start
+            assert ready < READY_BUDGET, f"/status answered after {ready:.2f}s"
+
+            with urllib.request.urlopen(url) as response:
+                status = json.load(response)
+            assert status["status"] == "running"
+            assert status["sessions"]["live"] == 0
+
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                metrics = response.read().decode()
+            assert "ada_sessions_live 0" in metrics
+            assert "# TYPE ada_event_loop_lag_ms histogram" in metrics
+            assert status["loop"]["threshold_ms"] > 0
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
@@ -0,0 +1,73 @@
+"""
+Tests for the per-task trace timeline.
+"""
+import json
+import time
+
+from task_trace import TaskTrace, CATEGORY_ROWS
+
+
+class TestSpans:
+    """Test span recording and export."""
+
+    def test_span_records_complete_event(self):
+        """Test a span becomes an "X" event with args on its category's row."""
+        trace = TaskTrace()
+        with trace.span("model_call", "model", turn=1) as info:
+            info["thinking_tokens"] = 42
+        event = trace.events[0]
+        assert event["ph"] == "X"
+        assert event["tid"] == CATEGORY_ROWS["model"]
+        assert event["args"] == {"turn": 1, "thinking_tokens": 42}
+        assert event["dur"] >= 0
+
+    def test_span_recorded_on_error(self):
+        """Test a failing block is still timed."""
+        trace = TaskTrace()
+        try:
+            with trace.span("click_at", "browser"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+        assert [e["name"] for e in trace.events] == ["click_at"]
+
+    def test_chrome_trace_format(self, temp_dir):
+        """Test the saved file is loadable trace-event JSON with named rows."""
+        trace = TaskTrace("demo")
+        with trace.span("screenshot", "browser"):
+            pass
+        trace.instant("done", "browser")
+        path = trace.save(str(temp_dir / "traces" / "task.json"))
+
+        data = json.loads(open(path).read())
+        assert data["displayTimeUnit"] == "ms"
+        names = {e["args"]["name"] for e in data["traceEvents"] if e["ph"] == "M"}
+        assert {"demo", "model", "browser", "wait", "frontend"} <= names
+        assert [e["ph"] for e in data["traceEvents"] if e["ph"] != "M"] == ["X", "i"]
+
+
+class TestSummary:
+    """Test per-category totals and classification."""
+
+    def test_empty(self):
+        """Test a trace with no spans says so."""
+        assert TaskTrace().summary() == "no spans recorded"
+
+    def test_classifies_bound(self):
+        """Test the dominant category is named and thinking tokens are summed."""
+        trace = TaskTrace()
+        with trace.span("model_call", "model") as info:
+            time.sleep(0.03)
+            info["thinking_tokens"] = 100
+        with trace.span("model_call", "model") as info:
+            time.sleep(0.03)
+            info["thinking_tokens"] = None
+        with trace.span("settle", "wait"):
+            time.sleep(0.01)
+
+        totals = trace.totals()
+        assert totals["model"] > totals["wait"] > 0
+        summary = trace.summary()
+        assert summary.startswith("model ")
+        assert "100 thinking tokens" in summary
+        assert summary.endswith("-> model-bound")
@@ -0,0 +1,97 @@
+"""
+Tests for end-to-end voice latency tracking.
+Timestamps are passed explicitly, so no audio or timing is involved.
+"""
+import pytest
+
+from voice_latency import VoiceLatencyTracker, LatencyHistogram, BUCKETS_MS
+
+
+def play_turn(tracker, speech_end, sent, response, play):
+    """Report the points of one turn in the order AudioLoop sees them."""
+    tracker.audio_sent(enqueued_at=speech_end - 0.05, sent_at=sent - 0.05)  # Speech itself
+    tracker.audio_sent(enqueued_at=speech_end + 0.01, sent_at=sent)
+    tracker.speech_ended(speech_end)
+    tracker.response_received(response)
+    tracker.audio_played(play)
+    tracker.model_turn_ended(play + 1.0)
+
+
+class TestHistogram:
+    """Test bucket counts and percentiles."""
+
+    def test_buckets_and_percentiles(self):
+        """Test samples land in cumulative buckets and percentiles come from the window."""
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.observe(ms * 10)
+        assert histogram.percentile(50) == 500
+        assert histogram.percentile(90) == 900
+        cumulative = dict(histogram.cumulative())
+        assert cumulative[100] == 10
+        assert cumulative["+Inf"] == 100 == histogram.count
+        assert len(cumulative) == len(BUCKETS_MS) + 1
+
+    def test_empty(self):
+        """Test percentiles of an empty histogram are None."""
+        assert LatencyHistogram().percentile(50) is None
+
+
+class TestTracker:
+    """Test turn assembly."""
+
+    def test_turn_breakdown(self):
+        """Test a turn is split into upload, model and playback stages."""
+        turns = []
+        tracker = VoiceLatencyTracker(on_turn=turns.append)
+        play_turn(tracker, speech_end=10.0, sent=10.02, response=10.7, play=10.75)
+
+        assert len(turns) == 1
+        turn = turns[0]
+        assert (turn["upload_ms"], turn["model_ms"], turn["playback_ms"], turn["total_ms"]) == (20, 680, 50, 750)
+        assert turn["p50_ms"] == 750
+
+    def test_reply_before_vad_confirmation(self):
+        """Test a reply that started during the VAD's silence delay still completes the turn."""
+        turns = []
+        tracker = VoiceLatencyTracker(on_turn=turns.append)
+        tracker.audio_sent(enqueued_at=20.01, sent_at=20.03)
+        tracker.response_received(20.3)
+        tracker.audio_played(20.32)
+        tracker.speech_ended(20.0)  # Reported 0.5 s after the silence began
+        assert turns[0]["total_ms"] == 320
+        assert turns[0]["upload_ms"] == 30
+
+    def test_reply_from_previous_turn_ignored(self):
+        """Test model audio that started before the user finished doesn't count as the reply."""
+        turns = []
+        tracker = VoiceLatencyTracker(on_turn=turns.append)
+        tracker.response_received(5.0)
+        tracker.audio_played(5.1)
+        tracker.speech_ended(6.0)
+        assert turns == []
+        tracker.model_turn_ended(6.2)
+        tracker.response_received(6.8)
+        tracker.audio_played(6.9)
+        assert turns[0]["total_ms"] == 900
+
+    def test_unanswered_turn_dropped(self):
+        """Test a new utterance replaces one that never got a reply."""
+        tracker = VoiceLatencyTracker()
+        tracker.speech_ended(1.0)
+        play_turn(tracker, speech_end=3.0, sent=3.01, response=3.5, play=3.55)
+        assert tracker.stats == {"turns": 1, "dropped": 1}
+
+    def test_summary_and_prometheus(self):
+        """Test percentiles per stage and histogram lines for /metrics."""
+        tracker = VoiceLatencyTracker()
+        for i in range(10):
+            play_turn(tracker, speech_end=i * 10.0, sent=i * 10.0 + 0.02, response=i * 10.0 + 0.5 + i * 0.01,
+                      play=i * 10.0 + 0.55 + i * 0.01)
+        summary = tracker.summary()
+        assert summary["turns"] == 10
+        assert summary["total_p50_ms"] <= summary["total_p90_ms"] <= summary["total_p99_ms"]
+
+        lines = tracker.prometheus('session="abc"')
+        assert 'ada_voice_latency_ms_count{session="abc",stage="total"} 10' in lines
+        assert 'ada_voice_latency_ms_bucket{session="abc",stage="total",le="+Inf"} 10' in lines
@@ -0,0 +1,158 @@
+"""
+Tests for the warm AudioLoop pool.
+Uses stand-in audio loops, so no audio devices, API key or network are needed.
+"""
+import time
+import pytest
+import asyncio
+
+from warm_pool import WarmAudioLoopPool
+
+
+class FakeAudioLoop:
+    """Records what the pool did to it; connecting takes `connect_delay` seconds."""
+
+    connect_delay = 0.0
+
+    def __init__(self):
+        self.temp_project = None
+        self.prepared = False
+        self.connects = 0
+        self.closed = False
+        self._opened_at = None
+
+    def use_temp_project(self, temp_project):
+        self.temp_project = temp_project
+
+    async def prepare_audio(self):
+        self.prepared = True
+
+    async def preconnect(self):
+        await asyncio.sleep(self.connect_delay)
+        self.connects += 1
+        self._opened_at = time.monotonic()
+
+    @property
+    def preconnected_age(self):
+        return time.monotonic() - self._opened_at if self._opened_at else None
+
+    async def drop_preconnection(self):
+        self._opened_at = None
+
+    async def close_warm(self):
+        self.closed = True
+        self._opened_at = None
+
+
+class TestFill:
+    """Test building the spare."""
+
+    @pytest.mark.asyncio
+    async def test_fill_builds_one_prepared_spare(self):
+        """Test a fill builds a spare with open devices, and a second fill is a no-op."""
+        built = []
+        pool = WarmAudioLoopPool(lambda: built.append(FakeAudioLoop()) or built[-1])
+        await pool.fill()
+        assert pool.fill() is None
+
+        assert len(built) == 1 and built[0].prepared
+        assert built[0].temp_project is None  # No scratch project cleared ahead of time
+        assert pool.summary()["spare"] is True
+
+    @pytest.mark.asyncio
+    async def test_factory_error_leaves_no_spare(self):
+        """Test a failing build is counted and start_audio falls back to the cold path."""
+        def broken():
+            raise RuntimeError("no key")
+
+        pool = WarmAudioLoopPool(broken)
+        await pool.fill()
+        assert pool.stats["errors"] == 1
+        assert await pool.take("temp") is None
+        assert pool.stats["misses"] == 1
+
+
+class TestTake:
+    """Test handing the spare over to start_audio."""
+
+    @pytest.mark.asyncio
+    async def test_take_sets_temp_project(self):
+        """Test the spare is handed over once, with the session's scratch project."""
+        pool = WarmAudioLoopPool(FakeAudioLoop)
+        await pool.fill()
+        spare = await pool.take("temp-2")
+        assert spare.temp_project == "temp-2"
+        assert await pool.take("temp") is None
+        assert pool.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_take_waits_for_fill(self):
+        """Test a start right after boot gets the spare that is still being built."""
+        pool = WarmAudioLoopPool(FakeAudioLoop)
+        pool.fill()
+        assert await pool.take("temp") is not None
+
+    @pytest.mark.asyncio
+    async def test_take_waits_for_speculative_connect(self):
+        """Test a start during a speculative connect gets the connected spare, not a leaked session."""
+        spare = FakeAudioLoop()
+        spare.connect_delay = 0.05
+        pool = WarmAudioLoopPool(lambda: spare)
+        await pool.fill()
+        connecting = asyncio.create_task(pool.preconnect())
+        await asyncio.sleep(0.01)
+
+        assert await pool.take("temp") is spare
+        assert spare.preconnected_age is not None
+        await connecting
+
+
+class TestPreconnect:
+    """Test the speculative Live session."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_connects_open_one_session(self):
+        """Test two clients connecting at once open a single speculative session."""
+        FakeAudioLoop.connect_delay = 0.02
+        try:
+            pool = WarmAudioLoopPool(FakeAudioLoop)
+            await pool.fill()
+            await asyncio.gather(pool.preconnect(), pool.preconnect())
+            await pool.preconnect()  # Still fresh
+            assert pool.spare.connects == 1
+            assert pool.stats["preconnects"] == 1
+        finally:
+            FakeAudioLoop.connect_delay = 0.0
+
+    @pytest.mark.asyncio
+    async def test_stale_session_is_dropped(self):
+        """Test a speculative session older than the TTL isn't handed to run()."""
+        pool = WarmAudioLoopPool(FakeAudioLoop, preconnect_ttl=0.01)
+        await pool.fill()
+        await pool.preconnect()
+        await asyncio.sleep(0.02)
+
+        spare = await pool.take("temp")
+        assert spare.preconnected_age is None
+        assert pool.stats["expired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_discard_closes_spare(self):
+        """Test discarding releases devices and the session."""
+        pool = WarmAudioLoopPool(FakeAudioLoop)
+        await pool.fill()
+        spare = pool.spare
+        await pool.preconnect()
+        await pool.discard()
+        assert spare.closed and pool.spare is None
+
+    @pytest.mark.asyncio
+    async def test_close_releases_spare_being_built(self):
+        """Test close() waits for an in-progress fill, closes that spare and stops refills."""
+        built = []
+        pool = WarmAudioLoopPool(lambda: built.append(FakeAudioLoop()) or built[-1])
+        pool.fill()
+        await pool.close()
+
+        assert built[0].closed and pool.spare is None
+        assert pool.fill() is None
@@ -0,0 +1,136 @@
+"""
+Tests for the web agent record/replay harness.
+The end-to-end replay needs Chromium but no API key or internet.
+"""
+import pytest
+import json
+from google.genai import types
+
+from web_recorder import RecordingModelClient, ReplayModelClient, WebRecorder, run_recorded
+
+
+def text_response(text):
+    return types.GenerateContentResponse(candidates=[types.Candidate(
+        content=types.Content(role="model", parts=[types.Part(text=text)])
+    )])
+
+
+def call_response(name, **args):
+    return types.GenerateContentResponse(candidates=[types.Candidate(
+        content=types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))])
+    )])
+
+
+class FakeModels:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    async def generate_content(self, model, contents, config=None):
+        return self.responses.pop(0)
+
+
+class FakeClient:
+    def __init__(self, responses):
+        self.aio = type("Aio", (), {})()
+        self.aio.models = FakeModels(responses)
+
+
+def user_message(png=b"\x89PNG fake"):
+    return types.Content(role="user", parts=[
+        types.Part(text="find the title"),
+        types.Part.from_bytes(data=png, mime_type="image/png"),
+    ])
+
+
+class TestModelRecordReplay:
+    """Test capturing and serving generate_content exchanges."""
+
+    @pytest.mark.asyncio
+    async def test_roundtrip(self, temp_dir):
+        """Test recorded responses replay identically, in order."""
+        path = str(temp_dir / "model.jsonl")
+        recorded = [call_response("navigate", url="https://example.com"), text_response("done")]
+        recorder = RecordingModelClient(FakeClient(recorded), path)
+        for _ in recorded:
+            await recorder.aio.models.generate_content(model="m", contents=[user_message()])
+
+        replay = ReplayModelClient(path, latency=0)
+        first = await replay.aio.models.generate_content(model="m", contents=[])
+        second = await replay.aio.models.generate_content(model="m", contents=[])
+        assert first.candidates[0].content.parts[0].function_call.args == {"url": "https://example.com"}
+        assert second.candidates[0].content.parts[0].text == "done"
+
+    @pytest.mark.asyncio
+    async def test_requests_are_recorded_without_images(self, temp_dir):
+        """Test request summaries are kept but screenshot bytes are not."""
+        path = str(temp_dir / "model.jsonl")
+        recorder = RecordingModelClient(FakeClient([text_response("ok")]), path)
+        await recorder.aio.models.generate_content(model="m", contents=[user_message(b"x" * 3000)])
+
+        entry = json.loads(open(path).read())
+        assert entry["request"]["contents"] == 1
+        assert "latency_ms" in entry
+        assert "<3000 bytes>" in json.dumps(entry["request"]["last"])
+
+    @pytest.mark.asyncio
+    async def test_replay_exhausted(self, temp_dir):
+        """Test asking for more turns than were recorded fails loudly."""
+        path = temp_dir / "model.jsonl"
+        path.write_text("")
+        with pytest.raises(RuntimeError):
+            await ReplayModelClient(str(path)).aio.models.generate_content(model="m", contents=[])
+
+    def test_rejects_unknown_mode(self, temp_dir):
+        """Test only record and replay are accepted."""
+        with pytest.raises(ValueError):
+            WebRecorder(str(temp_dir), mode="live")
+
+
+def write_recording(path):
+    """Hand-built recording: one navigation, then a final answer, against a two-page site."""
+    pages = {
+        "http://example.test/": "<html><head><title>Home</title></head><body><a href='/two'>next</a></body></html>",
+        "http://example.test/two": "<html><head><title>Page Two</title></head><body>Second page</body></html>",
+    }
+    entries = [{
+        "startedDateTime": "2025-01-01T00:00:00.000Z", "time": 1,
+        "request": {"method": "GET", "url": url, "httpVersion": "HTTP/1.1", "headers": [],
+                    "queryString": [], "cookies": [], "headersSize": -1, "bodySize": 0},
+        "response": {"status": 200, "statusText": "OK", "httpVersion": "HTTP/1.1",
+                     "headers": [{"name": "Content-Type", "value": "text/html"}], "cookies": [],
+                     "content": {"size": len(html), "mimeType": "text/html", "text": html},
+                     "redirectURL": "", "headersSize": -1, "bodySize": len(html)},
+        "cache": {}, "timings": {"send": 0, "wait": 1, "receive": 0},
+    } for url, html in pages.items()]
+    (path / "network.har").write_text(json.dumps({"log": {
+        "version": "1.2", "creator": {"name": "test", "version": "1"}, "entries": entries,
+    }}))
+
+    turns = [call_response("navigate", url="http://example.test/two"), text_response("The title is Page Two")]
+    with open(path / "model.jsonl", "w") as f:
+        for i, response in enumerate(turns):
+            f.write(json.dumps({"turn": i, "latency_ms": 5,
+                                "response": response.model_dump(mode="json", exclude_none=True)}) + "\n")
+    (path / "meta.json").write_text(json.dumps({"prompt": "What is the title of the next page?",
+                                                "start_url": "http://example.test/", "model": "m"}))
+
+
+class TestOfflineReplay:
+    """Test a full WebAgent task replayed with no network."""
+
+    @pytest.mark.asyncio
+    async def test_replay_task(self, temp_dir):
+        """Test a recorded task replays and reports timings."""
+        write_recording(temp_dir)
+        try:
+            report = await run_recorded(str(temp_dir), "replay")
+        except Exception as e:
+            if "Executable doesn't exist" in str(e) or "playwright install" in str(e):
+                pytest.skip(f"Playwright browsers not installed: {e}")
+            raise
+
+        print(json.dumps(report, indent=2))
+        assert report["result"] == "The title is Page Two"
+        assert report["timings"]["model_call"]["count"] == 2
+        assert report["timings"]["actions"]["count"] == 1
+        assert report["timings"]["screenshot"]["count"] == 1
@@ -0,0 +1,140 @@
+"""
+Tests for the web agent result cache.
+Uses a stand-in agent, so no browser or API key is needed.
+"""
+import io
+import json
+import time
+import asyncio
+import pytest
+from PIL import Image
+
+from web_result_cache import WebResultCache, normalize_prompt, cache_key
+from web_tasks import WebTaskScheduler
+
+
+def make_png() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (1440, 900), (20, 90, 160)).save(out, format="PNG")
+    return out.getvalue()
+
+
+class CachingAgent:
+    """Stands in for WebAgent and leaves a last_run like a task that found its answer."""
+
+    runs = 0
+
+    def __init__(self):
+        self.last_run = None
+
+    async def run_task(self, prompt, update_callback=None, task_id=None):
+        CachingAgent.runs += 1
+        self.last_run = {"answer": f"answer {CachingAgent.runs}", "urls": ["https://www.google.com", "https://shop.test/x"],
+                         "text": "Price: 42 EUR", "screenshot": make_png()}
+        return self.last_run["answer"]
+
+
+@pytest.fixture(autouse=True)
+def reset_runs():
+    CachingAgent.runs = 0
+
+
+class TestNormalization:
+    """Test which prompts share an entry."""
+
+    def test_equivalent_prompts(self):
+        """Test case, punctuation, contractions and filler don't matter."""
+        assert normalize_prompt("What's the price of the Pixel 9?") == "what is the price of the pixel 9"
+        assert cache_key("Please, what is the price of the  Pixel 9") == cache_key("what's the price of the pixel 9?")
+
+    def test_urls_kept(self):
+        """Test URLs and domains keep their punctuation."""
+        assert normalize_prompt("Open https://docs.python.org/3/library/asyncio.html.") == \
+            "open https://docs.python.org/3/library/asyncio.html"
+        assert "example.com/pricing" in normalize_prompt("check example.com/pricing!")
+
+    def test_different_questions_differ(self):
+        """Test different lookups get different keys."""
+        assert cache_key("price of pixel 9") != cache_key("price of pixel 8")
+
+
+class TestStore:
+    """Test entries on disk."""
+
+    @pytest.mark.asyncio
+    async def test_roundtrip(self, temp_dir):
+        """Test answer, URLs, text and screenshot come back."""
+        cache = WebResultCache(temp_dir / "browser")
+        png = make_png()
+        await cache.put("Price of X?", "42 EUR", ["https://a.test", "https://b.test", "https://a.test"], "Price: 42", png)
+
+        entry = await cache.get("price of x")
+        assert entry["answer"] == "42 EUR"
+        assert entry["urls"] == ["https://a.test", "https://b.test"]
+        assert entry["screenshot"] == png
+        assert "42 EUR" in cache.describe(entry) and "refresh=true" in cache.describe(entry)
+        assert sorted(p.suffix for p in (temp_dir / "browser").iterdir()) == [".json", ".png"]
+
+    @pytest.mark.asyncio
+    async def test_expiry(self, temp_dir):
+        """Test expired entries are misses and are deleted."""
+        cache = WebResultCache(temp_dir, ttl=60)
+        await cache.put("q", "a", [], screenshot=make_png())
+        meta = temp_dir / f"web_{cache_key('q')}.json"
+        entry = json.loads(meta.read_text())
+        entry["created_at"] = time.time() - 120
+        meta.write_text(json.dumps(entry))
+
+        assert await cache.get("q") is None
+        assert list(temp_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_miss(self, temp_dir):
+        """Test an unknown prompt (or missing folder) is a miss."""
+        assert await WebResultCache(temp_dir / "nope").get("anything") is None
+
+
+class TestSchedulerCache:
+    """Test repeated tasks skip the browser."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_answered_from_cache(self, temp_dir):
+        """Test the second identical prompt is answered without running an agent."""
+        cache = WebResultCache(temp_dir)
+        updates = []
+        scheduler = WebTaskScheduler(CachingAgent, result_cache=lambda: cache, on_update=updates.append)
+
+        first = scheduler.submit("Price of X?")
+        assert await first.future == "answer 1"
+        second = scheduler.submit("price of x")
+        result = await second.future
+
+        assert CachingAgent.runs == 1
+        assert second.cached and second.status == "done"
+        assert result.startswith("answer 1\n(Cached result")
+        frame = [u for u in updates if u["task_id"] == second.id and u["image"]][0]["image"]
+        assert Image.open(io.BytesIO(frame)).format == "JPEG"
+
+    @pytest.mark.asyncio
+    async def test_refresh_bypasses_cache(self, temp_dir):
+        """Test refresh=True browses again and replaces the entry."""
+        cache = WebResultCache(temp_dir)
+        scheduler = WebTaskScheduler(CachingAgent, result_cache=lambda: cache)
+
+        await scheduler.submit("price of x").future
+        fresh = scheduler.submit("price of x", refresh=True)
+        assert await fresh.future == "answer 2"
+        assert not fresh.cached
+        assert (await cache.get("price of x"))["answer"] == "answer 2"
+
+    @pytest.mark.asyncio
+    async def test_broken_cache_falls_back_to_browsing(self, temp_dir):
+        """Test a failing cache read still runs the task instead of leaving it queued forever."""
+        class BrokenCache(WebResultCache):
+            async def get(self, prompt):
+                raise OSError("disk gone")
+
+        scheduler = WebTaskScheduler(CachingAgent, result_cache=lambda: BrokenCache(temp_dir))
+        task = scheduler.submit("price of x")
+        assert await asyncio.wait_for(task.future, 5) == "answer 1"
+        assert not task.cached
@@ -0,0 +1,208 @@
+"""
+Tests for the web agent's request routing, blocking and asset cache.
+Uses stand-in route/request objects, so no browser is needed.
+"""
+import pytest
+import os
+
+from web_routing import AssetCache, RequestRouter, freshness_lifetime, is_blocked_host
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type="script", method="GET"):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+
+
+class FakeResponse:
+    def __init__(self, body, status=200, headers=None):
+        self._body = body
+        self.status = status
+        self.headers = headers or {"content-type": "text/javascript", "content-encoding": "gzip",
+                                   "cache-control": "public, max-age=3600"}
+
+    async def body(self):
+        return self._body
+
+
+class FakeRoute:
+    """Records what the router decided to do with a request."""
+
+    def __init__(self, response=None):
+        self.response = response
+        self.outcome = None
+        self.fulfilled = None
+
+    async def abort(self, reason=None):
+        self.outcome = "abort"
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+    async def fetch(self):
+        self.outcome = "fetch"
+        return self.response
+
+    async def fulfill(self, **kwargs):
+        self.outcome = "fulfill" if self.outcome is None else self.outcome
+        self.fulfilled = kwargs
+
+
+FRESH = {"cache-control": "max-age=3600"}
+
+
+@pytest.fixture
+def cache(temp_dir):
+    cache = AssetCache(str(temp_dir / "assets"))
+    yield cache
+    cache.close()
+
+
+class TestBlockList:
+    """Test domain matching."""
+
+    def test_subdomains_are_blocked(self):
+        """Test a listed domain blocks its subdomains."""
+        assert is_blocked_host("stats.g.doubleclick.net")
+        assert is_blocked_host("www.google-analytics.com")
+
+    def test_lookalikes_are_not_blocked(self):
+        """Test only exact domain suffixes match."""
+        assert not is_blocked_host("notdoubleclick.net")
+        assert not is_blocked_host("www.google.com")
+
+
+class TestAssetCache:
+    """Test the content-addressed store."""
+
+    def test_roundtrip(self, cache):
+        """Test a stored asset is served back with its content type."""
+        cache.put("https://cdn.example.com/app.js", {"content-type": "text/javascript", **FRESH}, b"console.log(1)")
+        headers, body = cache.get("https://cdn.example.com/app.js")
+        assert body == b"console.log(1)"
+        assert headers["content-type"] == "text/javascript"
+
+    def test_identical_bodies_stored_once(self, cache):
+        """Test the same library under two URLs takes one object on disk."""
+        cache.put("https://a.example.com/jquery.js", FRESH, b"jquery")
+        cache.put("https://b.example.com/jquery.js", FRESH, b"jquery")
+        assert len(os.listdir(cache.objects_dir)) == 1
+
+    def test_expired_entries_miss(self, cache):
+        """Test entries past their freshness lifetime are not served."""
+        cache.put("https://cdn.example.com/app.css", {"cache-control": "max-age=3600", "age": "3600"}, b"body{}")
+        assert cache.get("https://cdn.example.com/app.css") is None
+
+        cache.max_age = 0
+        cache.put("https://cdn.example.com/app.css", FRESH, b"body{}")
+        assert cache.get("https://cdn.example.com/app.css") is None
+
+    def test_eviction_bounds_size(self, cache):
+        """Test least recently used objects are evicted above max_bytes."""
+        cache.max_bytes = 250
+        for i in range(5):
+            cache.put(f"https://cdn.example.com/{i}.js", FRESH, bytes([i]) * 100)
+        assert cache.get("https://cdn.example.com/0.js") is None
+        assert cache.get("https://cdn.example.com/4.js") is not None
+        assert len(os.listdir(cache.objects_dir)) <= 2
+
+
+class TestFreshness:
+    """Test freshness and cacheability from response headers."""
+
+    def test_max_age_and_expires(self):
+        """Test max-age wins over Expires, and Expires counts from Date."""
+        now = 1_700_000_000
+        date = "Tue, 14 Nov 2023 22:13:20 GMT"  # == now
+        expires = "Tue, 14 Nov 2023 23:13:20 GMT"
+        assert freshness_lifetime({"Cache-Control": "public, max-age=60", "Expires": expires}, now) == 60
+        assert freshness_lifetime({"Expires": expires, "Date": date}, now) == 3600
+        assert freshness_lifetime({"Expires": "0"}, now) == 0
+        assert freshness_lifetime({"cache-control": "max-age=60", "age": "50"}, now) == 10
+
+    def test_uncacheable_responses(self):
+        """Test no-store, no-cache, private and Vary responses get no lifetime."""
+        for headers in ({"cache-control": "no-store"}, {"cache-control": "no-cache, max-age=60"},
+                        {"cache-control": "private, max-age=60"}, {"cache-control": "max-age=60", "vary": "Cookie"},
+                        {}):
+            assert freshness_lifetime(headers) == 0, headers
+        assert freshness_lifetime({"cache-control": "max-age=60", "vary": "Accept-Encoding"}) == 60
+
+    def test_last_modified_heuristic(self):
+        """Test a response with only Last-Modified stays fresh for a tenth of its age."""
+        now = 1_700_000_000
+        headers = {"date": "Tue, 14 Nov 2023 22:13:20 GMT", "last-modified": "Sat, 04 Nov 2023 22:13:20 GMT"}
+        assert freshness_lifetime(headers, now) == pytest.approx(86400)
+
+
+class TestRouter:
+    """Test per-request routing decisions."""
+
+    @pytest.mark.asyncio
+    async def test_blocks_trackers(self, cache):
+        """Test ad/analytics requests are aborted and counted."""
+        router = RequestRouter(cache=cache)
+        route = FakeRoute()
+        await router._handle(route, FakeRequest("https://www.googletagmanager.com/gtm.js"))
+        assert route.outcome == "abort"
+        assert router.stats["blocked"] == 1
+
+    @pytest.mark.asyncio
+    async def test_optional_media_blocking(self):
+        """Test media is only blocked when enabled."""
+        request = FakeRequest("https://example.com/intro.mp4", resource_type="media")
+
+        route = FakeRoute()
+        await RequestRouter(block_media=True)._handle(route, request)
+        assert route.outcome == "abort"
+
+        route = FakeRoute()
+        await RequestRouter()._handle(route, request)
+        assert route.outcome == "continue"
+
+    @pytest.mark.asyncio
+    async def test_documents_pass_through(self, cache):
+        """Test non-static requests are never cached."""
+        router = RequestRouter(cache=cache)
+        route = FakeRoute()
+        await router._handle(route, FakeRequest("https://example.com/", resource_type="document"))
+        assert route.outcome == "continue"
+
+    @pytest.mark.asyncio
+    async def test_static_assets_cached_across_tasks(self, cache):
+        """Test a second task gets a static asset from the cache without fetching."""
+        url = "https://cdn.example.com/app.js"
+
+        first = RequestRouter(cache=cache)
+        route = FakeRoute(FakeResponse(b"x" * 2048))
+        await first._handle(route, FakeRequest(url))
+        assert route.outcome == "fetch"
+        assert first.stats["bytes_fetched"] == 2048
+
+        second = RequestRouter(cache=cache)
+        route = FakeRoute()
+        await second._handle(route, FakeRequest(url))
+        assert route.outcome == "fulfill"
+        assert route.fulfilled["body"] == b"x" * 2048
+        assert "content-encoding" not in route.fulfilled["headers"]
+        assert second.stats["cache_hits"] == 1
+        assert second.stats["bytes_fetched"] == 0
+
+    @pytest.mark.asyncio
+    async def test_no_store_not_cached(self, cache):
+        """Test responses marked no-store are not kept."""
+        url = "https://cdn.example.com/private.js"
+        router = RequestRouter(cache=cache)
+        response = FakeResponse(b"secret", headers={"cache-control": "no-store"})
+        await router._handle(FakeRoute(response), FakeRequest(url))
+        assert cache.get(url) is None
+
+    @pytest.mark.asyncio
+    async def test_vary_not_cached(self, cache):
+        """Test a response that varies on request headers (e.g. cookies) is not shared."""
+        url = "https://cdn.example.com/per-user.js"
+        router = RequestRouter(cache=cache)
+        response = FakeResponse(b"user", headers={"cache-control": "max-age=3600", "vary": "Cookie"})
+        await router._handle(FakeRoute(response), FakeRequest(url))
+        assert cache.get(url) is None
@@ -0,0 +1,150 @@
+"""
+Tests for the web agent task scheduler.
+Uses a stand-in agent, so no browser or API key is needed.
+"""
+import pytest
+import asyncio
+
+from web_tasks import WebTaskScheduler
+
+
+class FakeAgent:
+    """Stands in for WebAgent: sleeps, reports progress and tracks concurrency."""
+
+    active = 0
+    peak = 0
+
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+
+    async def run_task(self, prompt, update_callback=None, task_id=None):
+        FakeAgent.active += 1
+        FakeAgent.peak = max(FakeAgent.peak, FakeAgent.active)
+        try:
+            if update_callback:
+                await update_callback("aW1n", f"working on {prompt}")
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("page crashed")
+            return f"result for {prompt}"
+        finally:
+            FakeAgent.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    FakeAgent.active = 0
+    FakeAgent.peak = 0
+
+
+class TestScheduling:
+    """Test concurrency limits and ordering."""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_parallel_up_to_limit(self):
+        """Test no more than max_concurrency tasks run at once."""
+        scheduler = WebTaskScheduler(FakeAgent, max_concurrency=2)
+        tasks = [scheduler.submit(f"task {i}") for i in range(5)]
+        results = await asyncio.gather(*[t.future for t in tasks])
+
+        assert results == [f"result for task {i}" for i in range(5)]
+        assert FakeAgent.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_fifo_order(self):
+        """Test queued tasks start in submission order."""
+        scheduler = WebTaskScheduler(FakeAgent, max_concurrency=1)
+        tasks = [scheduler.submit(f"task {i}") for i in range(3)]
+        await asyncio.gather(*[t.future for t in tasks])
+
+        starts = [t.started_at for t in tasks]
+        assert starts == sorted(starts)
+
+    @pytest.mark.asyncio
+    async def test_each_task_gets_its_own_agent(self):
+        """Test tasks never share an agent (and so never share a page)."""
+        agents = []
+
+        def factory():
+            agents.append(FakeAgent())
+            return agents[-1]
+
+        scheduler = WebTaskScheduler(factory, max_concurrency=3)
+        await asyncio.gather(*[scheduler.submit(f"t{i}").future for i in range(3)])
+        assert len({id(a) for a in agents}) == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_is_reported(self):
+        """Test an agent exception becomes an error result, not a crash."""
+        scheduler = WebTaskScheduler(lambda: FakeAgent(fail=True))
+        task = scheduler.submit("broken")
+        result = await scheduler.wait(task.id)
+
+        assert task.status == "error"
+        assert "page crashed" in result
+
+
+class TestCancellation:
+    """Test cancelling queued and running tasks."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued(self):
+        """Test a queued task is removed without ever starting."""
+        scheduler = WebTaskScheduler(lambda: FakeAgent(delay=0.1), max_concurrency=1)
+        first = scheduler.submit("first")
+        second = scheduler.submit("second")
+
+        assert scheduler.cancel(second.id)
+        await first.future
+        assert second.status == "cancelled"
+        assert second.started_at is None
+
+    @pytest.mark.asyncio
+    async def test_cancel_running(self):
+        """Test a running task is interrupted and frees its slot."""
+        scheduler = WebTaskScheduler(lambda: FakeAgent(delay=5), max_concurrency=1)
+        slow = scheduler.submit("slow")
+        queued = scheduler.submit("next")
+        await asyncio.sleep(0.01)
+
+        assert scheduler.cancel(slow.id)
+        await slow.future
+        assert slow.status == "cancelled"
+        await asyncio.sleep(0.01)
+        assert queued.status == "running"
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_cancel_unknown(self):
+        """Test cancelling an unknown id is a no-op."""
+        scheduler = WebTaskScheduler(FakeAgent)
+        assert not scheduler.cancel("missing")
+
+
+class TestProgress:
+    """Test per-task progress events."""
+
+    @pytest.mark.asyncio
+    async def test_updates_are_tagged_with_task_id(self):
+        """Test every progress event carries its task id."""
+        events = []
+        scheduler = WebTaskScheduler(FakeAgent, max_concurrency=2, on_update=events.append)
+        a = scheduler.submit("a")
+        b = scheduler.submit("b")
+        await asyncio.gather(a.future, b.future)
+
+        assert {e["task_id"] for e in events} == {a.id, b.id}
+        frames = [e for e in events if e["image"]]
+        assert {e["task_id"] for e in frames} == {a.id, b.id}
+        assert events[-1]["status"] == "done"
+
+    @pytest.mark.asyncio
+    async def test_list_tasks(self):
+        """Test the task listing reflects status."""
+        scheduler = WebTaskScheduler(FakeAgent, max_concurrency=1)
+        task = scheduler.submit("a")
+        await task.future
+        listing = scheduler.list_tasks()
+        assert listing[0]["task_id"] == task.id
+        assert listing[0]["status"] == "done"